@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+
+from src.api.inference import create_face_service
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.utils.image import decode_image
+from src.utils.logging import logger
+from src.utils.posprocessing import serialize_result
+
+ORGANIZATION = "benchmark"
+
+
+async def run(args: argparse.Namespace) -> list:
+    image = decode_image(args.image)
+    with tempfile.TemporaryDirectory() as root:
+        service = create_face_service(
+            MemoryMappedFaceDatabase(
+                root, dimensions=int(os.getenv("EMBEDDING_DIMENSIONS", 512))
+            )
+        )
+        await service.create_organization(ORGANIZATION)
+        await service.register_person([image], "probe", ORGANIZATION)
+        # Warm-up request so lazy model state is not charged to the first sample
+        await service.recognize_person(image, args.threshold, ORGANIZATION)
+
+        peaks = []
+        tracemalloc.start()
+        for _ in range(args.requests):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            result = await service.recognize_person(image, args.threshold, ORGANIZATION)
+            json.dumps(jsonable_encoder(serialize_result(result)))
+            del result
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+        tracemalloc.stop()
+    return peaks
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Measure the peak heap allocated by a recognition request"
+    )
+    parser.add_argument("image", help="Image file, URL or base64 string to recognize")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    peaks = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"{len(peaks)} requests in {elapsed:.1f}s: peak memory per request "
+        f"mean {sum(peaks) / len(peaks) / 1024:.0f} KiB, "
+        f"max {max(peaks) / 1024:.0f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from src.services.routing import ConsistentHashRing
+from src.utils.logging import logger
+
+load_dotenv()
+
+APP = "src.api.gateway:app"
+
+# Routes whose second path segment is the organization
+ORGANIZATION_ROUTES = {"orgs", "register", "recognize", "jobs"}
+# Connection-level headers that are not forwarded. Content-Length is kept so
+# streamed bodies are not re-sent chunked
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "host",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+def request_organization(
+    path: str, query_params, body: Optional[bytes] = None
+) -> Optional[str]:
+    """
+    Find the organization a request is about.
+
+    Args:
+        path (str): Request path
+        query_params: Query parameters of the request
+        body (Optional[bytes], optional): Buffered JSON body, read for `POST /orgs`.
+            Defaults to None.
+
+    Returns:
+        Optional[str]: The organization, or None for routes not tied to one
+    """
+    segments = [segment for segment in path.split("/") if segment]
+    if len(segments) >= 2 and segments[0] in ORGANIZATION_ROUTES:
+        return segments[1]
+    if segments[:2] == ["metrics", "inference"] and len(segments) == 3:
+        return segments[2]
+    if body:
+        try:
+            organization = json.loads(body).get("organization")
+        except (ValueError, AttributeError):
+            organization = None
+        if isinstance(organization, str):
+            return organization
+    return query_params.get("organization")
+
+
+class Gateway:
+    """
+    Routes requests to API replicas by organization.
+
+    Organizations are placed on a consistent hash ring with bounded loads, so
+    each organization's requests reach the same replica and its per-process state
+    (auth cache entries, galleries, settings) stays warm there, while a replica
+    carrying more than its share of in-flight requests spills over to the next
+    one. Replicas are health-checked: one that stops answering leaves the ring and
+    its organizations move to their next replica; it rejoins once healthy again.
+    Requests not tied to an organization go to the least loaded replica.
+    """
+
+    def __init__(
+        self,
+        replicas: List[str],
+        client: httpx.AsyncClient,
+        virtual_nodes: int = 100,
+        load_factor: float = 1.25,
+        health_interval: float = 5.0,
+        health_path: str = "/health",
+    ):
+        """
+        Initialize the gateway.
+
+        Args:
+            replicas (List[str]): Base URLs of the replicas, e.g. "http://10.0.0.2:8000"
+            client (httpx.AsyncClient): Client used to forward requests
+            virtual_nodes (int, optional): Ring points per replica. Defaults to 100.
+            load_factor (float, optional): Load a replica may reach, relative to the
+                average, before organizations spill over. Defaults to 1.25.
+            health_interval (float, optional): Seconds between health checks.
+                Defaults to 5.0.
+            health_path (str, optional): Path answered by healthy replicas.
+                Defaults to "/health".
+        """
+        self.replicas = [replica.rstrip("/") for replica in replicas]
+        self.client = client
+        self.ring = ConsistentHashRing(self.replicas, virtual_nodes, load_factor)
+        self.health_interval = health_interval
+        self.health_path = health_path
+        # In-flight requests and open WebSockets by replica
+        self.loads: Counter = Counter()
+        self.routed: Counter = Counter()
+
+    def route(self, organization: Optional[str]) -> str:
+        """
+        Pick the replica for a request.
+
+        Args:
+            organization (Optional[str]): Organization of the request, if any
+
+        Returns:
+            str: Base URL of the replica
+
+        Raises:
+            HTTPException: 503 if no replica is healthy
+        """
+        if not self.ring.nodes:
+            raise HTTPException(status_code=503, detail="No healthy replica")
+        if organization is None:
+            return min(self.ring.nodes, key=lambda replica: self.loads[replica])
+        return self.ring.assign(organization, self.loads)
+
+    def mark_down(self, replica: str) -> None:
+        if self.ring.remove(replica):
+            logger.warning(f"Replica {replica} left the ring")
+
+    def mark_up(self, replica: str) -> None:
+        if self.ring.add(replica):
+            logger.info(f"Replica {replica} joined the ring")
+
+    async def check_health(self) -> None:
+        """
+        Probe every replica once, adding healthy ones to the ring and removing others.
+        """
+
+        async def probe(replica: str) -> bool:
+            try:
+                response = await self.client.get(
+                    f"{replica}{self.health_path}", timeout=2.0
+                )
+                return response.status_code == 200
+            except httpx.HTTPError:
+                return False
+
+        results = await asyncio.gather(*(probe(replica) for replica in self.replicas))
+        for replica, healthy in zip(self.replicas, results):
+            if healthy:
+                self.mark_up(replica)
+            else:
+                self.mark_down(replica)
+
+    async def watch_health(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_interval)
+
+    async def forward(self, request: Request) -> StreamingResponse:
+        """
+        Forward an HTTP request to its replica and stream the response back.
+
+        The body is streamed through, except for `POST /orgs` whose organization is
+        in the body. A replica refusing the connection is taken off the ring and
+        the request is sent to the organization's next replica.
+
+        Args:
+            request (Request): Incoming request
+
+        Returns:
+            StreamingResponse: The replica's response, with an `X-Replica` header
+
+        Raises:
+            HTTPException: 503 if no replica accepts the connection
+        """
+        body = None
+        if request.method == "POST" and request.url.path.rstrip("/") == "/orgs":
+            body = await request.body()
+        organization = request_organization(request.url.path, request.query_params, body)
+        headers = [
+            (name, value)
+            for name, value in request.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        streamed = body is None and any(
+            name in request.headers for name in ("content-length", "transfer-encoding")
+        )
+
+        for _ in range(len(self.replicas)):
+            replica = self.route(organization)
+            upstream_request = self.client.build_request(
+                request.method,
+                f"{replica}{request.url.path}",
+                params=request.query_params,
+                headers=headers,
+                content=request.stream() if streamed else body,
+            )
+            self.loads[replica] += 1
+            try:
+                upstream = await self.client.send(upstream_request, stream=True)
+            except httpx.ConnectError:
+                # Nothing was sent yet, so the body stream can be replayed elsewhere
+                self.loads[replica] -= 1
+                self.mark_down(replica)
+                continue
+            except BaseException:
+                self.loads[replica] -= 1
+                raise
+            self.routed[replica] += 1
+
+            async def close(upstream=upstream, replica=replica):
+                await upstream.aclose()
+                self.loads[replica] -= 1
+
+            response_headers = {
+                name: value
+                for name, value in upstream.headers.items()
+                if name.lower() not in HOP_BY_HOP_HEADERS
+            }
+            response_headers["X-Replica"] = replica
+            return StreamingResponse(
+                upstream.aiter_raw(),
+                status_code=upstream.status_code,
+                headers=response_headers,
+                background=BackgroundTask(close),
+            )
+        raise HTTPException(status_code=503, detail="No healthy replica")
+
+    async def forward_websocket(self, websocket: WebSocket) -> None:
+        """
+        Relay a WebSocket connection to the replica of its `organization` parameter.
+
+        Args:
+            websocket (WebSocket): Incoming connection, not yet accepted
+        """
+        import websockets
+
+        replica = self.route(websocket.query_params.get("organization"))
+        url = replica.replace("http", "ws", 1) + websocket.url.path
+        if websocket.url.query:
+            url = f"{url}?{websocket.url.query}"
+
+        self.loads[replica] += 1
+        self.routed[replica] += 1
+        try:
+            try:
+                upstream = await websockets.connect(url, max_size=None)
+            except websockets.InvalidHandshake:
+                # The replica rejected the connection, e.g. an invalid API key
+                await websocket.close(code=1008)
+                return
+            except OSError:
+                self.mark_down(replica)
+                await websocket.close(code=1013)
+                return
+
+            await websocket.accept()
+
+            async def client_to_replica():
+                try:
+                    while True:
+                        message = await websocket.receive()
+                        if message["type"] == "websocket.disconnect":
+                            return
+                        text = message.get("text")
+                        await upstream.send(text if text is not None else message["bytes"])
+                except WebSocketDisconnect:
+                    return
+
+            async def replica_to_client():
+                async for message in upstream:
+                    if isinstance(message, bytes):
+                        await websocket.send_bytes(message)
+                    else:
+                        await websocket.send_text(message)
+
+            tasks = [
+                asyncio.create_task(client_to_replica()),
+                asyncio.create_task(replica_to_client()),
+            ]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await upstream.close()
+                try:
+                    await websocket.close()
+                except RuntimeError:
+                    pass  # Already closed by the client
+        finally:
+            self.loads[replica] -= 1
+
+    def stats(self) -> dict:
+        """
+        Report the ring membership and the load of every replica.
+
+        Returns:
+            dict: Healthy and configured replicas, in-flight load and requests routed
+        """
+        return {
+            "healthy": self.ring.nodes,
+            "replicas": {
+                replica: {
+                    "healthy": replica in self.ring.nodes,
+                    "load": self.loads[replica],
+                    "routed": self.routed[replica],
+                }
+                for replica in self.replicas
+            },
+            "capacity": self.ring.capacity(self.loads) if self.ring.nodes else 0,
+        }
+
+
+def create_gateway() -> Gateway:
+    """
+    Build the gateway configured by the environment.
+
+    Returns:
+        Gateway: Gateway over the replicas in `GATEWAY_REPLICAS`
+    """
+    replicas = [
+        replica.strip()
+        for replica in os.getenv("GATEWAY_REPLICAS", "").split(",")
+        if replica.strip()
+    ]
+    return Gateway(
+        replicas,
+        httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=2.0)),
+        virtual_nodes=int(os.getenv("GATEWAY_VIRTUAL_NODES", 100)),
+        load_factor=float(os.getenv("GATEWAY_LOAD_FACTOR", 1.25)),
+        health_interval=float(os.getenv("GATEWAY_HEALTH_INTERVAL", 5)),
+    )
+
+
+def create_gateway_app(gateway: Gateway) -> FastAPI:
+    """
+    Build the gateway application.
+
+    Args:
+        gateway (Gateway): Gateway routing the requests
+
+    Returns:
+        FastAPI: Application forwarding every route of the API to the replicas
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        watcher = asyncio.create_task(gateway.watch_health())
+        yield
+        watcher.cancel()
+        await gateway.client.aclose()
+
+    app = FastAPI(title="Face Recognition API Gateway", lifespan=lifespan)
+
+    @app.get("/gateway/replicas")
+    async def replicas():
+        return gateway.stats()
+
+    @app.get("/gateway/route/{organization}")
+    async def route(organization: str):
+        # For load balancers that route by header instead of proxying through here
+        replica = gateway.route(organization)
+        return JSONResponse(
+            {"organization": organization, "replica": replica},
+            headers={"X-Replica": replica},
+        )
+
+    @app.api_route(
+        "/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+    )
+    async def forward(request: Request, path: str):
+        return await gateway.forward(request)
+
+    @app.websocket("/{path:path}")
+    async def forward_websocket(websocket: WebSocket, path: str):
+        await gateway.forward_websocket(websocket)
+
+    return app
+
+
+app = create_gateway_app(create_gateway())
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        description="Route API requests to replicas by organization"
+    )
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument(
+        "--replicas",
+        default=os.getenv("GATEWAY_REPLICAS", ""),
+        help="Comma-separated replica URLs, e.g. http://127.0.0.1:8001,http://127.0.0.1:8002",
+    )
+    args = parser.parse_args()
+
+    # The app is imported again by uvicorn and reads the replicas from the environment
+    os.environ["GATEWAY_REPLICAS"] = args.replicas
+    uvicorn.run(APP, host=args.host, port=args.port, log_config=None)
+
+
+if __name__ == "__main__":
+    main()
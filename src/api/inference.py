@@ -0,0 +1,109 @@
+import os
+from functools import lru_cache
+
+from src.domain.interfaces import AsyncFaceDatabase, FaceDatabase, FaceDetector, FaceEmbedder
+from src.domain.models import QualitySettings
+from src.services.admission import AdmissionController, parse_weights
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.logging import logger
+
+
+@lru_cache(maxsize=None)
+def get_detector() -> FaceDetector:
+    """
+    Get the process-wide face detector configured by `DEEPFACE_DETECTOR_BACKEND`.
+
+    When `DEEPFACE_FAST_DETECTOR_BACKEND` is set, that backend runs first and
+    images are escalated to `DEEPFACE_DETECTOR_BACKEND` only when it finds no face
+    or one scoring under `DETECTOR_CASCADE_MIN_CONFIDENCE`.
+
+    Returns:
+        FaceDetector: Detector shared by every request of the process
+    """
+    from src.infrastructure.ml.detect.deepface_detector import DeepFaceDetector
+
+    detector = DeepFaceDetector(os.getenv("DEEPFACE_DETECTOR_BACKEND"))
+    fast_backend = os.getenv("DEEPFACE_FAST_DETECTOR_BACKEND")
+    if not fast_backend:
+        return detector
+
+    from src.infrastructure.ml.detect.cascade_detector import CascadeDetector
+
+    return CascadeDetector(
+        DeepFaceDetector(fast_backend),
+        detector,
+        min_confidence=float(os.getenv("DETECTOR_CASCADE_MIN_CONFIDENCE", 0.9)),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embedder() -> FaceEmbedder:
+    """
+    Get the process-wide face embedder configured by `DEEPFACE_EMBEDDER_MODEL`.
+
+    Returns:
+        FaceEmbedder: Embedder shared by every request of the process
+    """
+    from src.infrastructure.ml.embedd.deepface_embedder import DeepFaceEmbedder
+
+    return DeepFaceEmbedder(os.getenv("DEEPFACE_EMBEDDER_MODEL"))
+
+
+def preload_models() -> None:
+    """
+    Import the ML stack and load the detector and embedder weights.
+
+    Run by the multi-worker server in the master process: workers forked afterwards
+    find the models already built and share their memory pages copy-on-write.
+
+    Raises:
+        RuntimeError: If a model fails to load
+    """
+    try:
+        get_detector().load()
+        get_embedder().load()
+        logger.info("Detection and embedding models loaded")
+    except Exception as e:
+        raise RuntimeError(f"Failed to load models: {str(e)}")
+
+
+def create_face_service(
+    database: FaceDatabase | AsyncFaceDatabase,
+) -> FaceRecognitionService:
+    """
+    Build the recognition service configured by the environment.
+
+    Shared by the API and the job workers so both enforce the same enrollment,
+    admission and quality settings.
+
+    Args:
+        database (FaceDatabase | AsyncFaceDatabase): Database created in the calling process
+
+    Returns:
+        FaceRecognitionService: Service using the process-wide detector and embedder
+    """
+    return FaceRecognitionService(
+        detector=get_detector(),
+        embedder=get_embedder(),
+        database=database,
+        duplicate_threshold=float(os.getenv("ENROLLMENT_DUPLICATE_THRESHOLD", 0.95)),
+        max_embeddings_per_person=int(os.getenv("ENROLLMENT_MAX_EMBEDDINGS_PER_PERSON", 20)),
+        admission=AdmissionController(
+            max_concurrency=int(os.getenv("INFERENCE_MAX_CONCURRENCY", 2)),
+            max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", 16)),
+            priority_weights=parse_weights(os.getenv("INFERENCE_PRIORITY_WEIGHTS")),
+            organization_weights=parse_weights(os.getenv("INFERENCE_ORGANIZATION_WEIGHTS")),
+            organization_quotas={
+                organization: int(quota)
+                for organization, quota in parse_weights(
+                    os.getenv("INFERENCE_ORGANIZATION_QUOTAS")
+                ).items()
+            },
+        ),
+        quality=QualitySettings(
+            min_face_size=int(os.getenv("QUALITY_MIN_FACE_SIZE", 0)),
+            min_blur_variance=float(os.getenv("QUALITY_MIN_BLUR_VARIANCE", 0)),
+            min_brightness=float(os.getenv("QUALITY_MIN_BRIGHTNESS", 0)),
+            max_brightness=float(os.getenv("QUALITY_MAX_BRIGHTNESS", 255)),
+        ),
+    )
@@ -2,25 +2,55 @@ from fastapi import (
     FastAPI,
     HTTPException,
     Depends,
+    Header,
+    Request,
+    Response,
     WebSocket,
     WebSocketDisconnect,
 )
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from fastapi.security import HTTPAuthorizationCredentials
 
 import os
+import json
+import time
+import asyncio
+import tempfile
+from starlette.background import BackgroundTask
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Optional, Tuple, Type, Union
 import numpy as np
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from dataclasses import asdict
 
-from src.services.face_recognition_service import FaceRecognitionService
-from src.infrastructure.ml.detect.deepface_detector import DeepFaceDetector
-from src.infrastructure.ml.embedd.deepface_embedder import DeepFaceEmbedder
-from src.infrastructure.database.mongodb import MongoDBFaceDatabase
-from src.utils.posprocessing import remove_face_image
+from src.domain.interfaces import SearchUnavailableError
+from src.domain.models import FrameDetections
+from src.services.motion import MotionGate, frame_signature
+from src.services.stream_control import StreamController
+from src.services.admission import INTERACTIVE, OverloadedError
+from src.services.profiling import create_profiler
+from src.api.inference import create_face_service
+from src.jobs.queue import (
+    RECOGNIZE_BATCH,
+    REGISTER,
+    REINDEX,
+    create_job_queue,
+)
+from src.infrastructure.database import create_face_database
+from src.infrastructure.ml.detect.cascade_detector import CascadeDetector
+from src.utils.embeddings import decode_embeddings
+from src.utils.image import decode_image
+from src.utils.logging import logger
+from src.utils.posprocessing import serialize_result
 from src.api.middleware.auth import APIKeyAuth
+from src.api.middleware.route_context import RouteContextMiddleware
 
 load_dotenv()
 
@@ -34,22 +64,43 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Tags log records with the request path for per-route sampling
+app.add_middleware(RouteContextMiddleware)
 
-# Initialize services
-db = MongoDBFaceDatabase(
-    connection_string=os.getenv("MONGODB_URI"),
-)
+# Initialize services. Under the multi-worker server this module is imported in each
+# worker after the fork, so database and cache clients are never shared across processes
+db = create_face_database()
 
-face_service = FaceRecognitionService(
-    detector=DeepFaceDetector(os.getenv("DEEPFACE_DETECTOR_BACKEND")),
-    embedder=DeepFaceEmbedder(os.getenv("DEEPFACE_EMBEDDER_MODEL")),
-    database=db,
-)
+face_service = create_face_service(db)
+
+# Long-running work is handed to the job workers (python -m src.jobs.worker)
+job_queue = create_job_queue()
+
+# Opt-in per-request profiling, retrieved from the /admin/profiles routes
+profiler = create_profiler()
 
 # Initialize auth middleware
 auth_handler = APIKeyAuth(face_service)
 
 
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Server is busy, retry later",
+            "retry_after": exc.retry_after,
+            "queue_depth": exc.queue_depth,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(SearchUnavailableError)
+async def search_unavailable_handler(request: Request, exc: SearchUnavailableError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 # Requests types
 class APIKeyRequest(BaseModel):
     user: str
@@ -68,12 +119,118 @@ class RegisterRequest(BaseModel):
     images: List[str]
     name: str
     api_auth: APIKeyRequest
+    duplicate_threshold: Optional[float] = None
+    max_embeddings: Optional[int] = None
+
+
+class QualityRequest(BaseModel):
+    min_face_size: Optional[int] = None
+    min_blur_variance: Optional[float] = None
+    min_brightness: Optional[float] = None
+    max_brightness: Optional[float] = None
+
+
+class EmbeddingModelRequest(BaseModel):
+    model: Optional[str] = None
+    dimensions: Optional[int] = None
+
+
+class OrganizationSettingsRequest(BaseModel):
+    api_auth: APIKeyRequest
+    quality: Optional[QualityRequest] = None
+    embedding: Optional[EmbeddingModelRequest] = None
 
 
 class RecognizeRequest(BaseModel):
     image: str
     threshold: float
     api_auth: APIKeyRequest
+    quality: Optional[QualityRequest] = None
+    accurate: bool = False
+
+
+class BatchRecognizeRequest(BaseModel):
+    images: List[str]
+    threshold: float
+    api_auth: APIKeyRequest
+    batch_size: int = 8
+    quality: Optional[QualityRequest] = None
+
+
+async def profile_request(request: Request, response: Response):
+    # Unprofiled requests only pay for the header lookup and, when sampling, a draw
+    if not profiler.should_profile(request.headers.get("X-Profile")):
+        yield
+        return
+    profile = profiler.start(f"{request.method} {request.url.path}")
+    response.headers["X-Profile-Id"] = profile.id
+    try:
+        yield
+    finally:
+        await profiler.finish(profile)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled")
+    if not profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def decode_frame(image: str):
+    frame = decode_image(image)
+    return frame, frame_signature(frame)
+
+
+# Skip statistics of closed WebSocket connections and gates of open ones
+motion_totals = {"connections": 0, "frames": 0, "processed": 0, "skipped": 0}
+motion_gates = set()
+
+
+def quality_overrides(quality: Optional[QualityRequest]) -> Optional[dict]:
+    return quality.model_dump(exclude_none=True) if quality else None
+
+
+class JobRequest(BaseModel):
+    api_auth: APIKeyRequest
+
+
+class EmbeddingsRequest(BaseModel):
+    model: str
+    dimensions: int
+    # Vectors as numbers, or base64 of little-endian float32 values
+    embeddings: Union[List[List[float]], List[float], str]
+    api_auth: Optional[APIKeyRequest] = None
+
+
+class RegisterEmbeddingsRequest(EmbeddingsRequest):
+    name: str
+    duplicate_threshold: Optional[float] = None
+    max_embeddings: Optional[int] = None
+
+
+class RecognizeEmbeddingsRequest(EmbeddingsRequest):
+    threshold: float
+
+
+async def read_embeddings_request(
+    request: Request, schema: Type[EmbeddingsRequest]
+) -> Tuple[EmbeddingsRequest, np.ndarray]:
+    # JSON bodies carry everything; raw float32 bodies take the other fields
+    # from the query string, like the auth middleware
+    content_type = request.headers.get("content-type", "application/json")
+    try:
+        if content_type.startswith("application/json"):
+            payload = schema.model_validate_json(await request.body())
+            data = payload.embeddings
+        else:
+            payload = schema.model_validate({**request.query_params, "embeddings": ""})
+            data = await request.body()
+        return payload, decode_embeddings(data, payload.dimensions)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 class DetectionRequest(BaseModel):
@@ -81,21 +238,39 @@ class DetectionRequest(BaseModel):
     api_auth: APIKeyRequest
 
 
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
 ## Config routes
 @app.post("/orgs")
 async def create_organization(
     request: OrganizationRequest,
+    response: Response,
 ):
-    success = face_service.create_organization(request.organization)
+    success = await face_service.create_organization(request.organization)
     if not success:
         raise HTTPException(status_code=400, detail="Failed to create organization")
+    # Search indexes keep building after the response; their progress is at Location
+    response.headers["Location"] = f"/orgs/{request.organization}/status"
     return {"message": "Organization created successfully"}
 
 
+@app.get("/orgs/{organization}/status")
+async def get_organization_status(organization: str):
+    try:
+        return await face_service.get_organization_status(organization)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/orgs")
 async def get_organizations():
     try:
-        organizations = face_service.get_organizations()
+        organizations = await face_service.get_organizations()
         return {"organizations": organizations}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -103,7 +278,7 @@ async def get_organizations():
 
 @app.post("/orgs/{organization}/api-key")
 async def create_api_key(organization: str, request: APIKeyRequest):
-    api_key = face_service.generate_api_key(
+    api_key = await face_service.generate_api_key(
         request.user, request.api_key_name, organization
     )
     if api_key is None:
@@ -118,7 +293,7 @@ async def revoke_api_key(
     request: RevokeAPIKeyRequest,
     credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
 ):
-    success = face_service.revoke_api_key(
+    success = await face_service.revoke_api_key(
         credentials.credentials,
         request.api_auth.user,
         request.api_auth.api_key_name,
@@ -126,34 +301,394 @@ async def revoke_api_key(
     )
     if not success:
         raise HTTPException(status_code=400, detail="Failed to revoke API key")
+    # Stop every replica from accepting the key out of its caches. The key is
+    # already revoked in the database, so a failure here is not a failed revoke
+    try:
+        auth_handler.invalidate(
+            organization, request.api_auth.user, request.api_auth.api_key_name
+        )
+    except RuntimeError as e:
+        logger.error(f"API key revoked but cache invalidation failed: {e}")
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": "API key revoked, cache invalidation pending",
+                "cache_ttl": auth_handler.cache_ttl,
+            },
+        )
     return {"message": "API key revoked successfully"}
 
 
+@app.get("/orgs/{organization}/settings")
+async def get_organization_settings(
+    organization: str,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    return {
+        "quality": asdict(await face_service.get_quality_settings(organization)),
+        "embedding": await face_service.get_embedding_model(organization),
+        "stored": await face_service.get_organization_settings(organization),
+    }
+
+
+@app.put("/orgs/{organization}/settings")
+async def update_organization_settings(
+    organization: str,
+    request: OrganizationSettingsRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    settings = {}
+    if request.quality is not None:
+        settings["quality"] = quality_overrides(request.quality)
+    if request.embedding is not None:
+        settings["embedding"] = request.embedding.model_dump(exclude_none=True)
+    try:
+        stored = await face_service.update_organization_settings(organization, settings)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "quality": asdict(await face_service.get_quality_settings(organization)),
+        "embedding": await face_service.get_embedding_model(organization),
+        "stored": stored,
+    }
+
+
 ## Functionalites routes
-@app.post("/register/{organization}")
+@app.post("/register/{organization}", dependencies=[Depends(profile_request)])
 async def register_person(
     organization: str,
     request: RegisterRequest,
     credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
 ):
-    success = face_service.register_person(request.images, request.name, organization)
-    print(success)
-    if not success:
+    enrollment = await face_service.register_person(
+        request.images,
+        request.name,
+        organization,
+        duplicate_threshold=request.duplicate_threshold,
+        max_embeddings=request.max_embeddings,
+    )
+    if enrollment is None:
         raise HTTPException(status_code=400, detail="Failed to register person")
-    return {"message": "Person registered successfully"}
+    return {"message": "Person registered successfully", **asdict(enrollment)}
 
 
-@app.post("/recognize/{organization}")
+@app.post("/register/{organization}/embeddings", dependencies=[Depends(profile_request)])
+async def register_embeddings(
+    organization: str,
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    payload, embeddings = await read_embeddings_request(request, RegisterEmbeddingsRequest)
+    try:
+        enrollment = await face_service.register_embeddings(
+            embeddings,
+            payload.model,
+            payload.name,
+            organization,
+            duplicate_threshold=payload.duplicate_threshold,
+            max_embeddings=payload.max_embeddings,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SearchUnavailableError:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Person registered successfully", **asdict(enrollment)}
+
+
+@app.post("/recognize/{organization}", dependencies=[Depends(profile_request)])
 async def recognize_person(
     organization: str,
     request: RecognizeRequest,
     credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
 ):
-    recognize_result = asdict(
-        face_service.recognize_person(request.image, request.threshold, organization)
+    recognize_result = await face_service.recognize_person(
+        request.image,
+        request.threshold,
+        organization,
+        quality=quality_overrides(request.quality),
+        accurate=request.accurate,
     )
-    cleaned_result = remove_face_image(recognize_result)
-    return cleaned_result
+    return serialize_result(recognize_result)
+
+
+@app.post("/recognize/{organization}/embeddings", dependencies=[Depends(profile_request)])
+async def recognize_embeddings(
+    organization: str,
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    payload, embeddings = await read_embeddings_request(request, RecognizeEmbeddingsRequest)
+    try:
+        searchs = await face_service.recognize_embeddings(
+            embeddings, payload.model, payload.threshold, organization
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SearchUnavailableError:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"searchs": [asdict(search) for search in searchs]}
+
+
+@app.post("/recognize/{organization}/batch")
+async def recognize_batch(
+    organization: str,
+    request: BatchRecognizeRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    # Shed before the 200 status line goes out; once streaming, chunks wait their turn
+    face_service.check_admission(organization)
+
+    async def stream_results():
+        results = face_service.recognize_batch(
+            request.images,
+            request.threshold,
+            organization,
+            request.batch_size,
+            quality=quality_overrides(request.quality),
+        )
+        index = 0
+        try:
+            async for recognize_result in results:
+                cleaned_result = serialize_result(recognize_result)
+                yield json.dumps(
+                    jsonable_encoder({"index": index, **cleaned_result})
+                ) + "\n"
+                index += 1
+        except Exception as e:
+            yield json.dumps({"index": index, "error": str(e)}) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+## Gallery transfer routes
+@app.get("/orgs/{organization}/export")
+async def export_gallery(
+    organization: str,
+    batch_size: int = 10000,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    descriptor, path = tempfile.mkstemp(suffix=".npz")
+    os.close(descriptor)
+    try:
+        await face_service.export_gallery(organization, path, batch_size)
+    except NotImplementedError as e:
+        os.remove(path)
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        os.remove(path)
+        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=f"{organization}.npz",
+        background=BackgroundTask(os.remove, path),
+    )
+
+
+@app.post("/orgs/{organization}/import")
+async def import_gallery(
+    organization: str,
+    request: Request,
+    batch_size: int = 10000,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    descriptor, path = tempfile.mkstemp(suffix=".npz")
+    try:
+        with os.fdopen(descriptor, "wb") as upload:
+            async for chunk in request.stream():
+                upload.write(chunk)
+        imported = await face_service.import_gallery(organization, path, batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        os.remove(path)
+    return {"message": "Gallery imported successfully", "imported": imported}
+
+
+## Job routes
+def submit_job(kind: str, organization: str, payload: dict) -> JSONResponse:
+    try:
+        job_id = job_queue.submit(kind, organization, payload)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Job queue unavailable: {str(e)}")
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued"},
+        headers={"Location": f"/jobs/{organization}/{job_id}"},
+    )
+
+
+@app.post("/jobs/{organization}/register")
+async def submit_register_job(
+    organization: str,
+    request: RegisterRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    return submit_job(REGISTER, organization, request.model_dump(exclude={"api_auth"}))
+
+
+@app.post("/jobs/{organization}/recognize/batch")
+async def submit_recognize_batch_job(
+    organization: str,
+    request: BatchRecognizeRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    payload = request.model_dump(exclude={"api_auth", "quality"})
+    payload["quality"] = quality_overrides(request.quality)
+    return submit_job(RECOGNIZE_BATCH, organization, payload)
+
+
+@app.post("/jobs/{organization}/reindex")
+async def submit_reindex_job(
+    organization: str,
+    request: JobRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    return submit_job(REINDEX, organization, {})
+
+
+def get_organization_job(organization: str, job_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if job is None or job["organization"] != organization:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{organization}/{job_id}")
+async def get_job(
+    organization: str,
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    return get_organization_job(organization, job_id)
+
+
+@app.get("/jobs/{organization}/{job_id}/events")
+async def job_events(
+    organization: str,
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(auth_handler),
+):
+    get_organization_job(organization, job_id)
+
+    async def stream_events():
+        async for job in job_queue.watch(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(job)}\n\n"
+
+    return StreamingResponse(stream_events(), media_type="text/event-stream")
+
+
+@app.get("/metrics/jobs")
+async def job_metrics():
+    return job_queue.stats()
+
+
+@app.get("/metrics/inference")
+async def inference_metrics():
+    return face_service.admission.stats()
+
+
+@app.get("/metrics/inference/{organization}")
+async def organization_inference_metrics(organization: str):
+    organizations = face_service.admission.stats()["organizations"]
+    if organization not in organizations:
+        raise HTTPException(status_code=404, detail="No inference recorded for organization")
+    return organizations[organization]
+
+
+@app.get("/metrics/detector")
+async def detector_metrics():
+    detector = face_service.face_detector
+    if not isinstance(detector, CascadeDetector):
+        raise HTTPException(status_code=404, detail="Detector cascade is not enabled")
+    return detector.stats()
+
+
+@app.get("/metrics/motion")
+async def motion_metrics():
+    totals = dict(motion_totals)
+    for gate in motion_gates:
+        for field in ("frames", "processed", "skipped"):
+            totals[field] += gate.stats()[field]
+    totals["open_connections"] = len(motion_gates)
+    totals["skip_ratio"] = totals["skipped"] / totals["frames"] if totals["frames"] else 0.0
+    return totals
+
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    return {"profiles": profiler.list()}
+
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str, format: str = "json"):
+    report = profiler.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(report["collapsed"])
+    if format == "stats":
+        return PlainTextResponse(report["stats"])
+    return report
+
+
+async def stream_progressive_result(
+    websocket: WebSocket,
+    frame_id,
+    frame: np.ndarray,
+    threshold: float,
+    organization: str,
+    quality: Optional[dict],
+    accurate: bool,
+) -> dict:
+    # Boxes go out as soon as detection returns, identities as each search completes;
+    # the assembled result is returned for the motion gate
+    result = {}
+    async for event in face_service.recognize_person_progressive(
+        frame,
+        threshold,
+        organization,
+        priority=INTERACTIVE,
+        quality=quality,
+        accurate=accurate,
+    ):
+        if isinstance(event, FrameDetections):
+            detections = jsonable_encoder(serialize_result(event.detections))
+            skipped = jsonable_encoder([asdict(face) for face in event.skipped])
+            result = {
+                "detections": detections,
+                "searchs": [
+                    {"name": "unknown", "distance": None} for _ in detections["result"]
+                ],
+                "skipped": skipped,
+            }
+            await websocket.send_json(
+                {
+                    "type": "detections",
+                    "frame_id": frame_id,
+                    "detections": detections,
+                    "skipped": skipped,
+                    "pending": event.pending,
+                }
+            )
+        else:
+            search = jsonable_encoder(asdict(event.search))
+            result["searchs"][event.index] = search
+            await websocket.send_json(
+                {"type": "identity", "frame_id": frame_id, "index": event.index, **search}
+            )
+    return result
 
 
 @app.websocket("/ws/recognize")
@@ -161,27 +696,129 @@ async def websocket_endpoint(
     websocket: WebSocket, token: str = Depends(auth_handler.authenticate_websocket)
 ):
     await websocket.accept()
+    gate = MotionGate(
+        threshold=float(os.getenv("MOTION_THRESHOLD", 4.0)),
+        refresh_interval=int(os.getenv("MOTION_REFRESH_INTERVAL", 30)),
+    )
+    motion_gates.add(gate)
+    controller = StreamController(
+        face_service.admission,
+        min_fps=float(os.getenv("STREAM_MIN_FPS", 0.5)),
+        max_fps=float(os.getenv("STREAM_MAX_FPS", 10)),
+        target_latency=float(os.getenv("STREAM_TARGET_LATENCY", 0.5)),
+    )
+    frame_count = 0
     try:
+        await websocket.send_json(controller.update())
         while True:
             data = await websocket.receive_json()
+            start = time.perf_counter()
+            frame_count += 1
+            # Clients may number their own frames; every reply for a frame carries its ID
+            frame_id = data.get("frame_id", frame_count)
             image = data.get("image")
             threshold = data.get("threshold", 0.5)
             organization = data.get("organization")
 
             if not image or not organization:
-                await websocket.send_json({"error": "Missing image or organization"})
+                await websocket.send_json(
+                    {"error": "Missing image or organization", "frame_id": frame_id}
+                )
+                continue
+
+            try:
+                frame, signature = await asyncio.to_thread(decode_frame, image)
+            except Exception as e:
+                await websocket.send_json(
+                    {"error": f"Failed to decode image: {str(e)}", "frame_id": frame_id}
+                )
                 continue
 
-            recognize_result = asdict(
-                face_service.recognize_person(image, threshold, organization)
+            # A cached result only holds for the same search parameters
+            accurate = bool(data.get("accurate", False))
+            key = (
+                organization,
+                threshold,
+                json.dumps(data.get("quality"), sort_keys=True),
+                accurate,
             )
-            cleaned_result = remove_face_image(recognize_result)
-            await websocket.send_json(cleaned_result)
+            unchanged, cached_result = gate.check(signature, key)
+            if unchanged:
+                await websocket.send_json(
+                    {"type": "result", "frame_id": frame_id, **cached_result, "cached": True}
+                )
+                continue
+
+            # Admins profile a frame by sending the admin token in its `profile` field
+            profile = None
+            if profiler.should_profile(data.get("profile")):
+                profile = profiler.start(f"WS /ws/recognize frame {frame_id}")
+            try:
+                if data.get("progressive"):
+                    cleaned_result = await stream_progressive_result(
+                        websocket,
+                        frame_id,
+                        frame,
+                        threshold,
+                        organization,
+                        data.get("quality"),
+                        accurate,
+                    )
+                else:
+                    recognize_result = await face_service.recognize_person(
+                        frame,
+                        threshold,
+                        organization,
+                        priority=INTERACTIVE,
+                        quality=data.get("quality"),
+                        accurate=accurate,
+                    )
+                    cleaned_result = jsonable_encoder(serialize_result(recognize_result))
+            except OverloadedError as e:
+                controller.record_overload()
+                await websocket.send_json(
+                    {
+                        "error": "busy",
+                        "frame_id": frame_id,
+                        "retry_after": e.retry_after,
+                        "queue_depth": e.queue_depth,
+                    }
+                )
+                await websocket.send_json(controller.update() or controller.control())
+                continue
+            except (ValueError, RuntimeError) as e:
+                await websocket.send_json({"error": str(e), "frame_id": frame_id})
+                continue
+            finally:
+                if profile is not None:
+                    await profiler.finish(profile)
+                    await websocket.send_json(
+                        {"type": "profile", "frame_id": frame_id, "profile_id": profile.id}
+                    )
+            controller.record(time.perf_counter() - start)
+            gate.update(signature, cleaned_result, key)
+            if not data.get("progressive"):
+                await websocket.send_json(
+                    {"type": "result", "frame_id": frame_id, **cleaned_result, "cached": False}
+                )
+
+            control = controller.update()
+            if control is not None:
+                await websocket.send_json(control)
     except WebSocketDisconnect:
-        print("Client disconnected")
+        logger.info("Client disconnected")
+    finally:
+        motion_gates.discard(gate)
+        stats = gate.stats()
+        motion_totals["connections"] += 1
+        for field in ("frames", "processed", "skipped"):
+            motion_totals[field] += stats[field]
+        logger.info(
+            f"Stream closed: {stats['skipped']} of {stats['frames']} frames served from cache"
+        )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None)
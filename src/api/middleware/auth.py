@@ -1,10 +1,26 @@
 from fastapi import Request, HTTPException, WebSocket, WebSocketException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import hmac
 import json
 import os
+import threading
+import time
 from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.logging import logger
 import redis
 
+# Pub/sub channel on which revocations are announced to every replica
+INVALIDATION_CHANNEL = "auth:invalidate"
+# How long a revoked key blocks re-caching, covering validations still in flight
+REVOCATION_GRACE = 60
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 class APIKeyAuth(HTTPBearer):
     """
@@ -13,6 +29,15 @@ class APIKeyAuth(HTTPBearer):
     This class extends FastAPI's HTTPBearer to implement custom API key authentication
     with Redis caching for performance. It validates API keys against the face recognition
     service and caches valid keys to reduce database lookups.
+
+    Validated keys are cached in two layers: Redis, shared by every replica, under
+    `auth:{organization}:{user}:{api_key_name}` holding a SHA-256 of the token, and
+    a bounded in-process cache in front of it. Revoking a key overwrites its Redis
+    entry with a tombstone and publishes the key on `INVALIDATION_CHANNEL`; every
+    replica listens on that channel and drops its in-process entry, so both caches
+    can keep long TTLs while revocation takes effect at once. The in-process cache
+    is only used while the listener is subscribed, and is cleared whenever it
+    reconnects, since announcements may have been missed in between.
     
     The middleware supports both HTTP REST endpoints and WebSocket connections.
     """
@@ -22,6 +47,9 @@ class APIKeyAuth(HTTPBearer):
         cache_host: str = os.getenv("REDIS_HOST", "localhost"),
         cache_port: int = os.getenv("REDIS_PORT", 6379),
         cache_password: str = os.getenv("REDIS_PASSWORD", ""),
+        cache_ttl: int = int(os.getenv("AUTH_CACHE_TTL", 86400)),
+        local_cache_ttl: float = float(os.getenv("AUTH_LOCAL_CACHE_TTL", 300)),
+        local_cache_size: int = int(os.getenv("AUTH_LOCAL_CACHE_SIZE", 10000)),
     ):
         """
         Initialize the API Key authentication middleware.
@@ -31,6 +59,12 @@ class APIKeyAuth(HTTPBearer):
             cache_host (str, optional): Redis host address. Defaults to environment variable or "localhost".
             cache_port (int, optional): Redis port. Defaults to environment variable or 6379.
             cache_password (str, optional): Redis password. Defaults to environment variable or empty string.
+            cache_ttl (int, optional): Seconds a validated key stays in Redis. Defaults to
+                `AUTH_CACHE_TTL` or one day.
+            local_cache_ttl (float, optional): Seconds a validated key stays in the process.
+                Defaults to `AUTH_LOCAL_CACHE_TTL` or 300.
+            local_cache_size (int, optional): Keys held in the process. Defaults to
+                `AUTH_LOCAL_CACHE_SIZE` or 10000.
         """
         super(APIKeyAuth, self).__init__(auto_error=True)
         self.service = service
@@ -40,6 +74,17 @@ class APIKeyAuth(HTTPBearer):
             password=cache_password,
             decode_responses=True,
         )
+        self.cache_ttl = cache_ttl
+        self.local_cache_ttl = local_cache_ttl
+        self.local_cache_size = local_cache_size
+        # (organization, user, api_key_name) -> (token hash, expiry)
+        self._local: OrderedDict = OrderedDict()
+        self._local_lock = threading.Lock()
+        # Bumped on every invalidation, so validations started before one are not cached
+        self._generation = 0
+        self._listening = threading.Event()
+        self._stopped = threading.Event()
+        self._listener: Optional[threading.Thread] = None
 
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials:
         """
@@ -66,7 +111,9 @@ class APIKeyAuth(HTTPBearer):
         Authenticate an HTTP request using the Bearer token.
         
         The method extracts the API key from the Authorization header, looks up organization,
-        user, and API key name from the request, and validates the key. It uses Redis
+        user, and API key name from the request (the JSON body's `api_auth`, or the `user`
+        and `api_key_name` query parameters of GET requests and non-JSON uploads),
+        and validates the key. It uses Redis
         to cache valid keys for better performance.
         
         Args:
@@ -91,33 +138,30 @@ class APIKeyAuth(HTTPBearer):
         if not organization:
             raise HTTPException(status_code=400, detail="Organization not specified.")
 
-        request_body = await request.body()
-        if not request_body:
-            raise HTTPException(status_code=400, detail="Missing request body.")
+        content_type = request.headers.get("content-type", "application/json")
+        if request.method == "GET" or not content_type.startswith("application/json"):
+            # Body-less reads and binary uploads pass the key owner as query
+            # parameters, so large bodies are never buffered here
+            user = request.query_params.get("user")
+            api_key_name = request.query_params.get("api_key_name")
+        else:
+            request_body = await request.body()
+            if not request_body:
+                raise HTTPException(status_code=400, detail="Missing request body.")
 
-        request_data = json.loads(request_body.decode("utf-8"))
-        user = request_data.get("api_auth", {}).get("user")
-        api_key_name = request_data.get("api_auth", {}).get("api_key_name")
+            request_data = json.loads(request_body.decode("utf-8"))
+            user = request_data.get("api_auth", {}).get("user")
+            api_key_name = request_data.get("api_auth", {}).get("api_key_name")
 
         if not user or not api_key_name:
             raise HTTPException(
                 status_code=400, detail="User or API key name not specified."
             )
 
-        cache_key = f"{organization}:{user}:{api_key_name}:{credentials.credentials}"
-        if self.cache.exists(cache_key):
-            print("Cache hit")
-            return credentials
-
-        # Validate with the service if not in cache
-        if not self.service.validate_api_key(
-            credentials.credentials, user, api_key_name, organization
-        ):
+        token = credentials.credentials
+        if not await self.validate(token, organization, user, api_key_name):
             raise HTTPException(status_code=403, detail="Invalid or expired API key.")
 
-        # Store in cache
-        self.cache.set(cache_key, "valid", ex=3600)  # Cache for 1 hour
-
         return credentials
 
     async def authenticate_websocket(self, websocket: WebSocket) -> str:
@@ -154,13 +198,177 @@ class APIKeyAuth(HTTPBearer):
                 code=400, reason="Missing organization, user, or api_key_name"
             )
 
-        cache_key = f"{organization}:{user}:{api_key_name}:{token}"
-        if self.cache.exists(cache_key):
-            print("Cache hit")
-            return token
-
-        if not self.service.validate_api_key(token, user, api_key_name, organization):
+        if not await self.validate(token, organization, user, api_key_name):
             raise WebSocketException(code=403, reason="Invalid or expired API key")
 
-        self.cache.set(cache_key, "valid", ex=3600)  # Cache for 1 hour
         return token
+
+    @staticmethod
+    def _cache_key(organization: str, user: str, api_key_name: str) -> str:
+        return f"auth:{organization}:{user}:{api_key_name}"
+
+    def _local_get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        if not self._listening.is_set():
+            return None
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            token_hash, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return token_hash
+
+    def _local_set(
+        self, key: Tuple[str, str, str], token_hash: str, generation: int
+    ) -> None:
+        with self._local_lock:
+            if generation != self._generation or not self._listening.is_set():
+                return
+            self._local[key] = (token_hash, time.monotonic() + self.local_cache_ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_cache_size:
+                self._local.popitem(last=False)
+
+    def _local_drop(self, key: Optional[Tuple[str, str, str]] = None) -> None:
+        with self._local_lock:
+            self._generation += 1
+            if key is None:
+                self._local.clear()
+            else:
+                self._local.pop(key, None)
+
+    async def validate(
+        self, token: str, organization: str, user: str, api_key_name: str
+    ) -> bool:
+        """
+        Check an API key, going through the in-process cache, Redis and the database.
+
+        Args:
+            token (str): API key presented by the client
+            organization (str): Organization the key belongs to
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+
+        Returns:
+            bool: True if the key is valid
+        """
+        self.start()
+        key = (organization, user, api_key_name)
+        token_hash = _hash_token(token)
+        generation = self._generation
+
+        cached = self._local_get(key)
+        if cached is not None and hmac.compare_digest(cached, token_hash):
+            return True
+
+        cache_key = self._cache_key(organization, user, api_key_name)
+        try:
+            cached = self.cache.get(cache_key)
+        except redis.RedisError as e:
+            logger.warning(f"Auth cache unavailable: {e}")
+            cached = None
+        if cached is not None and hmac.compare_digest(cached, token_hash):
+            logger.debug("Cache hit")
+            self._local_set(key, token_hash, generation)
+            return True
+
+        # Validate with the service if not in cache
+        if not await self.service.validate_api_key(token, user, api_key_name, organization):
+            return False
+
+        try:
+            # NX keeps a revocation tombstone written meanwhile from being overwritten
+            self.cache.set(cache_key, token_hash, ex=self.cache_ttl, nx=True)
+        except redis.RedisError as e:
+            logger.warning(f"Auth cache unavailable: {e}")
+        self._local_set(key, token_hash, generation)
+        return True
+
+    def invalidate(self, organization: str, user: str, api_key_name: str) -> None:
+        """
+        Drop a revoked key from every cache layer of every replica.
+
+        The Redis entry is replaced by a short-lived tombstone, so a validation that
+        was already in flight cannot cache the key again, and the key is announced
+        on `INVALIDATION_CHANNEL` for the replicas to drop their in-process entry.
+
+        Args:
+            organization (str): Organization the key belongs to
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+
+        Raises:
+            RuntimeError: If Redis cannot be reached
+        """
+        self._local_drop((organization, user, api_key_name))
+        try:
+            pipeline = self.cache.pipeline()
+            pipeline.set(
+                self._cache_key(organization, user, api_key_name),
+                "revoked",
+                ex=REVOCATION_GRACE,
+            )
+            pipeline.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps(
+                    {
+                        "organization": organization,
+                        "user": user,
+                        "api_key_name": api_key_name,
+                    }
+                ),
+            )
+            pipeline.execute()
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to invalidate API key: {str(e)}")
+        logger.info(f"API key '{api_key_name}' of '{user}' invalidated in '{organization}'")
+
+    def start(self) -> None:
+        """
+        Start listening for invalidations, once per process.
+        """
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._stopped.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="auth-invalidations", daemon=True
+        )
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+
+    def _listen(self) -> None:
+        delay = 0.5
+        while not self._stopped.is_set():
+            pubsub = self.cache.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Entries cached while not subscribed may have missed a revocation
+                self._local_drop()
+                self._listening.set()
+                delay = 0.5
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                        key = (event["organization"], event["user"], event["api_key_name"])
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring malformed auth invalidation")
+                        continue
+                    self._local_drop(key)
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Auth invalidation listener disconnected: {e}")
+            finally:
+                self._listening.clear()
+                self._local_drop()
+                pubsub.close()
+            self._stopped.wait(delay)
+            delay = min(delay * 2, 30)
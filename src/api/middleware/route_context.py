@@ -0,0 +1,26 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utils.logging import request_route
+
+
+class RouteContextMiddleware:
+    """
+    Pure ASGI middleware recording the request path for the logging filters.
+
+    The path is kept in a context variable for the whole request or WebSocket
+    connection, so success logs can be sampled per route without passing the
+    request around. Being a plain ASGI wrapper, it adds no task or buffering.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        token = request_route.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_route.reset(token)
@@ -0,0 +1,186 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from src.api.inference import preload_models
+from src.utils.logging import logger, stop_logging
+
+APP = "src.api.main:app"
+
+
+def _bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    # uvicorn installs its own handlers for a graceful shutdown
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    gc.enable()
+    # Already built in the master when preloading, otherwise loaded per worker
+    preload_models()
+
+    # The app module is imported here, after the fork, so MongoDB and Redis clients
+    # and their connection pools belong to this worker only
+    # Without a log config uvicorn's loggers keep propagating to the queued handler
+    config = uvicorn.Config(APP, log_level=log_level, log_config=None, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """
+    Pre-fork supervisor sharing loaded models between uvicorn workers.
+
+    The master process imports TensorFlow and builds the detector and embedder
+    once, freezes the garbage collector so those objects are never written to
+    again, binds the listening socket and forks the workers. Each worker then
+    imports the application, creating its own database and cache clients, and
+    serves requests from the shared socket. Model weights stay in pages shared
+    copy-on-write with the master instead of being duplicated per worker.
+    Workers that die are restarted until the master receives SIGINT or SIGTERM.
+    Subclasses override `_prepare` and `_child` to supervise other kinds of workers.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 2,
+        log_level: str = "info",
+        preload: bool = True,
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            host (str, optional): Address to bind. Defaults to "0.0.0.0".
+            port (int, optional): Port to bind. Defaults to 8000.
+            workers (int, optional): Number of worker processes. Defaults to 2.
+            log_level (str, optional): uvicorn log level. Defaults to "info".
+            preload (bool, optional): Load models in the master before forking.
+                Defaults to True.
+        """
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.log_level = log_level
+        self.preload = preload
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+        self.sock = None
+
+    def _prepare(self) -> None:
+        self.sock = _bind_socket(self.host, self.port)
+        logger.info(f"Listening on {self.host}:{self.port}")
+
+    def _child(self) -> None:
+        _run_worker(self.sock, self.log_level)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self._child()
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} failed: {e}")
+                stop_logging()
+                os._exit(1)
+            stop_logging()
+            os._exit(0)
+        self.children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        """
+        Load the models, fork the workers and supervise them until shutdown.
+
+        Raises:
+            RuntimeError: If the models fail to load
+        """
+        # Objects created before the fork are moved out of the collector's reach,
+        # otherwise every collection in a worker would touch and copy their pages
+        gc.disable()
+        if self.preload:
+            preload_models()
+        self._prepare()
+        gc.freeze()
+
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        logger.info(f"Master {os.getpid()} starting {self.workers} workers")
+        for _ in range(self.workers):
+            self._spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.warning(
+                f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting"
+            )
+            if time.monotonic() - started < 1:
+                # Avoid a tight restart loop when workers crash on startup
+                time.sleep(1)
+            if not self.stopping:
+                self._spawn()
+
+        if self.sock is not None:
+            self.sock.close()
+        logger.info("Master shut down")
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the API with pre-forked workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
+    parser.add_argument("--log-level", default=os.getenv("UVICORN_LOG_LEVEL", "info"))
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="Let every worker load its own models (for comparing memory usage)",
+    )
+    args = parser.parse_args()
+
+    PreforkServer(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        preload=not args.no_preload,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
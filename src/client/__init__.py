@@ -0,0 +1,12 @@
+from src.client.async_client import AsyncFaceAPIClient
+from src.client.base import FaceAPIError, encode_image
+from src.client.stream import FrameStream
+from src.client.sync_client import FaceAPIClient
+
+__all__ = [
+    "AsyncFaceAPIClient",
+    "FaceAPIClient",
+    "FaceAPIError",
+    "FrameStream",
+    "encode_image",
+]
@@ -0,0 +1,399 @@
+import asyncio
+import json
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import httpx
+import numpy as np
+
+from src.client.base import Call, FaceAPIError, Image, Routes, raise_for_status
+from src.client.stream import FrameStream
+
+
+class _RecognizeBatcher:
+    """
+    Coalesces concurrent `recognize` calls into batch requests.
+
+    Calls sharing a threshold and quality overrides wait up to `window` seconds for
+    company; the pending images are then sent as one `/recognize/{org}/batch`
+    request, or as soon as `max_batch_size` images are pending, and each caller
+    gets its own line of the streamed answer.
+    """
+
+    def __init__(self, client: "AsyncFaceAPIClient", window: float, max_batch_size: int):
+        self.client = client
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[Tuple, List[Tuple[Image, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._sending: Set[asyncio.Task] = set()
+
+    async def recognize(
+        self, image: Image, threshold: float, quality: Optional[dict]
+    ) -> dict:
+        key = (threshold, json.dumps(quality, sort_keys=True))
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((image, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, key
+            )
+        return await future
+
+    def _flush(self, key: Tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(key, None)
+        if not pending:
+            return
+        task = asyncio.create_task(self._send(key, pending))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(
+        self, key: Tuple, pending: List[Tuple[Image, asyncio.Future]]
+    ) -> None:
+        threshold, quality = key[0], json.loads(key[1])
+        futures = [future for _, future in pending]
+        try:
+            results = self.client.recognize_batch(
+                [image for image, _ in pending], threshold, len(pending), quality
+            )
+            async for result in results:
+                index = result.pop("index")
+                if "error" in result:
+                    # The server stops at the first failed chunk
+                    raise FaceAPIError(500, result["error"])
+                if not futures[index].done():
+                    futures[index].set_result(result)
+            error: Exception = FaceAPIError(500, "Batch ended without a result")
+        except Exception as e:
+            error = e
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self) -> None:
+        for key in list(self._pending):
+            self._flush(key)
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+
+class AsyncFaceAPIClient:
+    """
+    Asynchronous client of the Face Recognition API for one organization.
+
+    Requests share a pooled `httpx.AsyncClient`. With a `batch_window`, concurrent
+    `recognize` calls are coalesced client-side into batch requests, trading up to
+    that much latency for fewer round trips and larger server-side batches.
+    `stream` sends camera frames over the WebSocket route.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        organization: str,
+        api_key: str = "",
+        user: str = "",
+        api_key_name: str = "",
+        timeout: float = 60.0,
+        max_connections: int = 10,
+        batch_window: Optional[float] = None,
+        max_batch_size: int = 8,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url (str): URL of the API, e.g. "http://localhost:8000"
+            organization (str): Organization every call is made for
+            api_key (str, optional): API key sent as Bearer token. Defaults to "".
+            user (str, optional): User owning the API key. Defaults to "".
+            api_key_name (str, optional): Name of the API key. Defaults to "".
+            timeout (float, optional): Seconds per request. Defaults to 60.0.
+            max_connections (int, optional): Size of the connection pool. Defaults to 10.
+            batch_window (Optional[float], optional): Seconds a `recognize` call waits
+                for others to share its batch request; None sends each call on its
+                own. Defaults to None.
+            max_batch_size (int, optional): Images per coalesced batch request.
+                Defaults to 8.
+            http_client (Optional[httpx.AsyncClient], optional): Client to send
+                requests with instead of a new pool. Defaults to None.
+        """
+        self.base_url = base_url
+        self.routes = Routes(organization, api_key, user, api_key_name)
+        self.http = http_client or httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._batcher = (
+            _RecognizeBatcher(self, batch_window, max_batch_size)
+            if batch_window is not None
+            else None
+        )
+
+    async def __aenter__(self) -> "AsyncFaceAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            await self._batcher.close()
+        await self.http.aclose()
+
+    def _build(self, call: Call) -> httpx.Request:
+        return self.http.build_request(
+            call.method,
+            call.path,
+            json=call.json,
+            params=call.params,
+            content=call.content,
+            headers={**self.routes.headers, **call.headers},
+        )
+
+    async def _send(self, call: Call):
+        response = await self.http.send(self._build(call))
+        raise_for_status(response)
+        return response.json()
+
+    async def health(self) -> dict:
+        return await self._send(self.routes.health())
+
+    async def create_organization(self) -> dict:
+        return await self._send(self.routes.create_organization())
+
+    async def get_organizations(self) -> List[str]:
+        return (await self._send(self.routes.get_organizations()))["organizations"]
+
+    async def get_organization_status(self) -> dict:
+        return await self._send(self.routes.get_organization_status())
+
+    async def create_api_key(self, user: str, api_key_name: str) -> dict:
+        """
+        Create an API key and start using it for the following calls.
+
+        Args:
+            user (str): User owning the key
+            api_key_name (str): Name of the key
+
+        Returns:
+            dict: The created key, including the plain `key` shown only once
+        """
+        api_key = await self._send(self.routes.create_api_key(user, api_key_name))
+        self.routes.api_key = api_key["key"]
+        self.routes.user = user
+        self.routes.api_key_name = api_key_name
+        return api_key
+
+    async def revoke_api_key(self) -> dict:
+        return await self._send(self.routes.revoke_api_key())
+
+    async def get_settings(self) -> dict:
+        return await self._send(self.routes.get_settings())
+
+    async def update_settings(
+        self, quality: Optional[dict] = None, embedding: Optional[dict] = None
+    ) -> dict:
+        return await self._send(self.routes.update_settings(quality, embedding))
+
+    async def register(
+        self,
+        images: List[Image],
+        name: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> dict:
+        return await self._send(
+            self.routes.register(images, name, duplicate_threshold, max_embeddings)
+        )
+
+    async def register_embeddings(
+        self,
+        embeddings: np.ndarray,
+        model: str,
+        name: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> dict:
+        return await self._send(
+            self.routes.register_embeddings(
+                embeddings, model, name, duplicate_threshold, max_embeddings
+            )
+        )
+
+    async def recognize(
+        self,
+        image: Image,
+        threshold: float = 0.5,
+        quality: Optional[dict] = None,
+        accurate: bool = False,
+    ) -> dict:
+        """
+        Recognize the faces of an image.
+
+        With a `batch_window`, the image joins the next batch request; calls asking
+        for the accurate detector are always sent on their own, since the batch
+        route has no such option.
+
+        Args:
+            image (Image): Image to recognize
+            threshold (float, optional): Distance threshold. Defaults to 0.5.
+            quality (Optional[dict], optional): Quality gate overrides. Defaults to None.
+            accurate (bool, optional): Skip the fast detector. Defaults to False.
+
+        Returns:
+            dict: Detected faces and their matches
+
+        Raises:
+            FaceAPIError: If the API answers with an error
+        """
+        if self._batcher is not None and not accurate:
+            return await self._batcher.recognize(image, threshold, quality)
+        return await self._send(
+            self.routes.recognize(image, threshold, quality, accurate)
+        )
+
+    async def recognize_embeddings(
+        self, embeddings: np.ndarray, model: str, threshold: float = 0.5
+    ) -> List[dict]:
+        call = self.routes.recognize_embeddings(embeddings, model, threshold)
+        return (await self._send(call))["searchs"]
+
+    async def recognize_batch(
+        self,
+        images: List[Image],
+        threshold: float = 0.5,
+        batch_size: int = 8,
+        quality: Optional[dict] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Recognize images in one request, yielding each result as it is streamed back.
+
+        Args:
+            images (List[Image]): Images to recognize
+            threshold (float, optional): Distance threshold. Defaults to 0.5.
+            batch_size (int, optional): Images per server-side chunk. Defaults to 8.
+            quality (Optional[dict], optional): Quality gate overrides. Defaults to None.
+
+        Yields:
+            dict: Result of each image, with its `index`, or an `error`
+        """
+        call = self.routes.recognize_batch(images, threshold, batch_size, quality)
+        response = await self.http.send(self._build(call), stream=True)
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                raise_for_status(response)
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            await response.aclose()
+
+    async def recognize_many(
+        self,
+        images: Iterable[Image],
+        threshold: float = 0.5,
+        batch_size: int = 8,
+        quality: Optional[dict] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Recognize any number of images, sending them `batch_size` per batch request.
+
+        Args:
+            images (Iterable[Image]): Images to recognize, read lazily
+            threshold (float, optional): Distance threshold. Defaults to 0.5.
+            batch_size (int, optional): Images per request. Defaults to 8.
+            quality (Optional[dict], optional): Quality gate overrides. Defaults to None.
+
+        Yields:
+            dict: Result of each image in input order, with its global `index`
+        """
+        batch: List[Image] = []
+        offset = 0
+        for image in images:
+            batch.append(image)
+            if len(batch) == batch_size:
+                async for result in self.recognize_batch(
+                    batch, threshold, batch_size, quality
+                ):
+                    yield {**result, "index": offset + result["index"]}
+                offset += len(batch)
+                batch = []
+        if batch:
+            async for result in self.recognize_batch(
+                batch, threshold, batch_size, quality
+            ):
+                yield {**result, "index": offset + result["index"]}
+
+    async def export_gallery(self, path: str, batch_size: int = 10000) -> None:
+        call = self.routes.export_gallery(batch_size)
+        response = await self.http.send(self._build(call), stream=True)
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                raise_for_status(response)
+            with open(path, "wb") as gallery:
+                async for chunk in response.aiter_bytes():
+                    gallery.write(chunk)
+        finally:
+            await response.aclose()
+
+    async def import_gallery(self, path: str, batch_size: int = 10000) -> dict:
+        with open(path, "rb") as gallery:
+            content = gallery.read()
+        return await self._send(self.routes.import_gallery(content, batch_size))
+
+    async def submit_job(self, kind: str, **body) -> dict:
+        """
+        Submit a background job.
+
+        Args:
+            kind (str): "register", "recognize/batch" or "reindex"
+            **body: Fields of the job's request, e.g. `images` and `name`
+
+        Returns:
+            dict: The `job_id` and its initial `status`
+        """
+        return await self._send(self.routes.submit_job(kind, body))
+
+    async def get_job(self, job_id: str) -> dict:
+        return await self._send(self.routes.get_job(job_id))
+
+    def stream(
+        self, frames: AsyncIterable[Image], **options
+    ) -> AsyncIterator[dict]:
+        """
+        Recognize camera frames over the WebSocket route.
+
+        Args:
+            frames (AsyncIterable[Image]): Frames to recognize, read as the server
+                is ready for them
+            **options: Options of `FrameStream`, e.g. `threshold`, `progressive`
+                or `max_in_flight`
+
+        Returns:
+            AsyncIterator[dict]: Replies of the server, tagged with their `frame_id`
+        """
+        url = self.routes.websocket_url(self.base_url)
+        return FrameStream(url, **options).run(frames)
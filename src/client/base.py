@@ -0,0 +1,290 @@
+import base64
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+import numpy as np
+
+Image = Union[str, bytes, os.PathLike, np.ndarray]
+
+
+class FaceAPIError(Exception):
+    """Error answered by the API, with its status code and detail."""
+
+    def __init__(
+        self, status_code: int, detail: Any, retry_after: Optional[float] = None
+    ):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def encode_image(image: Image) -> str:
+    """
+    Encode an image the way the API's `image` fields expect it.
+
+    Args:
+        image (Image): Encoded image bytes, a file path, a URL or base64 string
+            (sent as is), or a BGR array (JPEG-encoded, requires OpenCV)
+
+    Returns:
+        str: URL or base64 string
+
+    Raises:
+        TypeError: If the image type is not supported
+    """
+    if isinstance(image, np.ndarray):
+        import cv2
+
+        ok, encoded = cv2.imencode(".jpg", image)
+        if not ok:
+            raise ValueError("Failed to encode image as JPEG")
+        image = encoded.tobytes()
+    if isinstance(image, os.PathLike) or (
+        isinstance(image, str)
+        and not image.startswith(("http://", "https://"))
+        and os.path.isfile(image)
+    ):
+        with open(image, "rb") as file:
+            image = file.read()
+    if isinstance(image, (bytes, bytearray)):
+        return base64.b64encode(image).decode("ascii")
+    if isinstance(image, str):
+        return image
+    raise TypeError(f"Unsupported image type: {type(image).__name__}")
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    """
+    Raise the API's error for a failed response.
+
+    Args:
+        response (httpx.Response): Response, already read
+
+    Raises:
+        FaceAPIError: If the status is 400 or above
+    """
+    if response.status_code < 400:
+        return
+    try:
+        body = response.json()
+    except ValueError:
+        body = {"detail": response.text}
+    retry_after = body.get("retry_after") if isinstance(body, dict) else None
+    detail = body.get("detail", body) if isinstance(body, dict) else body
+    raise FaceAPIError(response.status_code, detail, retry_after)
+
+
+@dataclass
+class Call:
+    """HTTP request of one API route, sent by the sync or async client."""
+
+    method: str
+    path: str
+    json: Optional[dict] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    content: Optional[bytes] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class Routes:
+    """
+    Builds the requests of every route of the API for one organization and API key.
+
+    The key owner (`user`, `api_key_name`) is added to each request where the auth
+    middleware reads it: the JSON body's `api_auth`, or the query string of GET
+    requests and binary uploads.
+    """
+
+    def __init__(
+        self, organization: str, api_key: str = "", user: str = "", api_key_name: str = ""
+    ):
+        self.organization = organization
+        self.api_key = api_key
+        self.user = user
+        self.api_key_name = api_key_name
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    @property
+    def api_auth(self) -> dict:
+        return {"user": self.user, "api_key_name": self.api_key_name}
+
+    def _authed(
+        self, method: str, path: str, body: Optional[dict] = None, **params
+    ) -> Call:
+        params = {name: value for name, value in params.items() if value is not None}
+        if body is None:
+            return Call(method, path, params={**params, **self.api_auth})
+        return Call(method, path, json={**body, "api_auth": self.api_auth}, params=params)
+
+    def _binary(self, path: str, content: bytes, **params) -> Call:
+        params = {name: value for name, value in params.items() if value is not None}
+        return Call(
+            "POST",
+            path,
+            params={**params, **self.api_auth},
+            content=content,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+    @staticmethod
+    def _drop_none(values: dict) -> dict:
+        return {name: value for name, value in values.items() if value is not None}
+
+    def health(self) -> Call:
+        return Call("GET", "/health")
+
+    def create_organization(self) -> Call:
+        return Call("POST", "/orgs", json={"organization": self.organization})
+
+    def get_organizations(self) -> Call:
+        return Call("GET", "/orgs")
+
+    def get_organization_status(self) -> Call:
+        return Call("GET", f"/orgs/{self.organization}/status")
+
+    def create_api_key(self, user: str, api_key_name: str) -> Call:
+        return Call(
+            "POST",
+            f"/orgs/{self.organization}/api-key",
+            json={"user": user, "api_key_name": api_key_name},
+        )
+
+    def revoke_api_key(self) -> Call:
+        return self._authed("DELETE", f"/orgs/{self.organization}/api-key", {})
+
+    def get_settings(self) -> Call:
+        return self._authed("GET", f"/orgs/{self.organization}/settings")
+
+    def update_settings(
+        self, quality: Optional[dict] = None, embedding: Optional[dict] = None
+    ) -> Call:
+        return self._authed(
+            "PUT",
+            f"/orgs/{self.organization}/settings",
+            self._drop_none({"quality": quality, "embedding": embedding}),
+        )
+
+    def register(
+        self,
+        images: List[Image],
+        name: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> Call:
+        return self._authed(
+            "POST",
+            f"/register/{self.organization}",
+            self._drop_none(
+                {
+                    "images": [encode_image(image) for image in images],
+                    "name": name,
+                    "duplicate_threshold": duplicate_threshold,
+                    "max_embeddings": max_embeddings,
+                }
+            ),
+        )
+
+    def register_embeddings(
+        self,
+        embeddings: np.ndarray,
+        model: str,
+        name: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> Call:
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype="<f4"))
+        return self._binary(
+            f"/register/{self.organization}/embeddings",
+            embeddings.tobytes(),
+            model=model,
+            dimensions=embeddings.shape[1],
+            name=name,
+            duplicate_threshold=duplicate_threshold,
+            max_embeddings=max_embeddings,
+        )
+
+    def recognize(
+        self,
+        image: Image,
+        threshold: float,
+        quality: Optional[dict] = None,
+        accurate: bool = False,
+    ) -> Call:
+        return self._authed(
+            "POST",
+            f"/recognize/{self.organization}",
+            self._drop_none(
+                {
+                    "image": encode_image(image),
+                    "threshold": threshold,
+                    "quality": quality,
+                    "accurate": accurate,
+                }
+            ),
+        )
+
+    def recognize_embeddings(
+        self, embeddings: np.ndarray, model: str, threshold: float
+    ) -> Call:
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype="<f4"))
+        return self._binary(
+            f"/recognize/{self.organization}/embeddings",
+            embeddings.tobytes(),
+            model=model,
+            dimensions=embeddings.shape[1],
+            threshold=threshold,
+        )
+
+    def recognize_batch(
+        self,
+        images: List[Image],
+        threshold: float,
+        batch_size: int = 8,
+        quality: Optional[dict] = None,
+    ) -> Call:
+        return self._authed(
+            "POST",
+            f"/recognize/{self.organization}/batch",
+            self._drop_none(
+                {
+                    "images": [encode_image(image) for image in images],
+                    "threshold": threshold,
+                    "batch_size": batch_size,
+                    "quality": quality,
+                }
+            ),
+        )
+
+    def export_gallery(self, batch_size: int = 10000) -> Call:
+        return self._authed(
+            "GET", f"/orgs/{self.organization}/export", batch_size=batch_size
+        )
+
+    def import_gallery(self, content: bytes, batch_size: int = 10000) -> Call:
+        return self._binary(
+            f"/orgs/{self.organization}/import", content, batch_size=batch_size
+        )
+
+    def submit_job(self, kind: str, body: dict) -> Call:
+        if "images" in body:
+            body = {**body, "images": [encode_image(image) for image in body["images"]]}
+        return self._authed("POST", f"/jobs/{self.organization}/{kind}", body)
+
+    def get_job(self, job_id: str) -> Call:
+        return self._authed("GET", f"/jobs/{self.organization}/{job_id}")
+
+    def websocket_url(self, base_url: str) -> str:
+        query = httpx.QueryParams(
+            {
+                "token": self.api_key,
+                "organization": self.organization,
+                **self.api_auth,
+            }
+        )
+        return f"{base_url.rstrip('/').replace('http', 'ws', 1)}/ws/recognize?{query}"
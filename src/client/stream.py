@@ -0,0 +1,246 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+from src.client.base import Image, encode_image
+from src.utils.logging import logger
+
+_DONE = object()
+
+
+async def _websockets_connect(url: str):
+    import websockets
+
+    return await websockets.connect(url, max_size=None)
+
+
+def _connection_errors() -> tuple:
+    try:
+        from websockets.exceptions import ConnectionClosed
+    except ImportError:
+        return (OSError,)
+    return (OSError, ConnectionClosed)
+
+
+class FrameStream:
+    """
+    Streams frames over `/ws/recognize`, reconnecting and pacing itself to the server.
+
+    At most `max_in_flight` frames wait for their result at once; the next frame is
+    only read from the source once a slot frees up, so a live source should yield
+    its latest frame when asked rather than queue them. Sending follows the
+    server's control messages: frames are spaced by `1 / target_fps` and, for
+    arrays, scaled down to `max_resolution` and JPEG-encoded at `jpeg_quality`.
+    A `busy` reply pauses sending for its `retry_after`. When the connection drops,
+    frames in flight are reported as `disconnected` errors and the stream
+    reconnects with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        threshold: float = 0.5,
+        progressive: bool = False,
+        accurate: bool = False,
+        quality: Optional[dict] = None,
+        max_in_flight: int = 2,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 10.0,
+        max_reconnects: Optional[int] = None,
+        connect: Optional[Callable[[str], Awaitable]] = None,
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            url (str): WebSocket URL, including the authentication query parameters
+            threshold (float, optional): Distance threshold. Defaults to 0.5.
+            progressive (bool, optional): Receive detections before identities.
+                Defaults to False.
+            accurate (bool, optional): Skip the fast detector. Defaults to False.
+            quality (Optional[dict], optional): Quality gate overrides. Defaults to None.
+            max_in_flight (int, optional): Frames awaiting a result at once. Defaults to 2.
+            reconnect_delay (float, optional): First reconnection delay in seconds.
+                Defaults to 0.5.
+            max_reconnect_delay (float, optional): Longest reconnection delay in seconds.
+                Defaults to 10.0.
+            max_reconnects (Optional[int], optional): Consecutive failed connection
+                attempts before giving up; None retries forever. Defaults to None.
+            connect (Optional[Callable[[str], Awaitable]], optional): Opens a
+                connection with `send`, `recv` and `close` coroutines. Defaults to
+                `websockets.connect`.
+        """
+        self.url = url
+        self.threshold = threshold
+        self.progressive = progressive
+        self.accurate = accurate
+        self.quality = quality
+        self.max_in_flight = max_in_flight
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_reconnects = max_reconnects
+        self.connect = connect or _websockets_connect
+        # Latest control message sent by the server
+        self.control: Optional[dict] = None
+        self.reconnects = 0
+        self._in_flight: Dict[int, Optional[set]] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._paused_until = 0.0
+        self._last_sent = 0.0
+
+    def _encode(self, image: Image) -> str:
+        if isinstance(image, np.ndarray) and self.control is not None:
+            import cv2
+
+            scale = self.control["max_resolution"] / max(image.shape[:2])
+            if scale < 1:
+                image = cv2.resize(
+                    image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+                )
+            quality = int(self.control["jpeg_quality"] * 100)
+            _, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            image = encoded.tobytes()
+        return encode_image(image)
+
+    def _complete(self, frame_id) -> None:
+        if frame_id in self._in_flight:
+            del self._in_flight[frame_id]
+            self._slots.release()
+
+    def _fail_in_flight(self, output: asyncio.Queue) -> None:
+        for frame_id in list(self._in_flight):
+            output.put_nowait(
+                {"type": "error", "frame_id": frame_id, "error": "disconnected"}
+            )
+            self._complete(frame_id)
+
+    def _handle(self, message: dict, output: asyncio.Queue) -> None:
+        kind = message.get("type")
+        frame_id = message.get("frame_id")
+        if kind == "control":
+            self.control = message
+            return
+        output.put_nowait(message)
+        if "error" in message:
+            if message["error"] == "busy":
+                retry_after = float(message.get("retry_after") or 1)
+                self._paused_until = time.monotonic() + retry_after
+            self._complete(frame_id)
+        elif kind == "result":
+            self._complete(frame_id)
+        elif kind == "detections" and frame_id in self._in_flight:
+            self._in_flight[frame_id] = set(message.get("pending", []))
+            if not self._in_flight[frame_id]:
+                self._complete(frame_id)
+        elif kind == "identity" and self._in_flight.get(frame_id):
+            self._in_flight[frame_id].discard(message.get("index"))
+            if not self._in_flight[frame_id]:
+                self._complete(frame_id)
+
+    async def _receive(self, connection, output: asyncio.Queue) -> None:
+        try:
+            while True:
+                self._handle(json.loads(await connection.recv()), output)
+        except _connection_errors():
+            self._fail_in_flight(output)
+
+    async def _pace(self) -> None:
+        resume = self._paused_until
+        if self.control is not None and self.control.get("target_fps"):
+            resume = max(resume, self._last_sent + 1 / self.control["target_fps"])
+        delay = resume - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _connect(self):
+        failures = 0
+        delay = self.reconnect_delay
+        while True:
+            try:
+                return await self.connect(self.url)
+            except OSError as e:
+                failures += 1
+                if self.max_reconnects is not None and failures > self.max_reconnects:
+                    raise
+                logger.warning(
+                    f"WebSocket connection failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _pump(self, frames: AsyncIterable[Image], output: asyncio.Queue) -> None:
+        source = frames.__aiter__()
+        frame_id = 0
+        try:
+            while True:
+                connection = await self._connect()
+                receiver = asyncio.create_task(self._receive(connection, output))
+                try:
+                    while True:
+                        await self._slots.acquire()
+                        await self._pace()
+                        if receiver.done():
+                            self._slots.release()
+                            raise ConnectionError("WebSocket connection closed")
+                        try:
+                            image = await source.__anext__()
+                        except StopAsyncIteration:
+                            self._slots.release()
+                            # Let the last results arrive before closing
+                            while self._in_flight and not receiver.done():
+                                await asyncio.sleep(0.01)
+                            await connection.close()
+                            return
+                        frame_id += 1
+                        self._in_flight[frame_id] = None
+                        message = {
+                            "frame_id": frame_id,
+                            "image": self._encode(image),
+                            "threshold": self.threshold,
+                            "progressive": self.progressive,
+                            "accurate": self.accurate,
+                            "quality": self.quality,
+                        }
+                        await connection.send(json.dumps(message))
+                        self._last_sent = time.monotonic()
+                except _connection_errors():
+                    self._fail_in_flight(output)
+                    self.reconnects += 1
+                finally:
+                    receiver.cancel()
+        except Exception as e:
+            output.put_nowait(e)
+        finally:
+            output.put_nowait(_DONE)
+
+    async def run(self, frames: AsyncIterable[Image]) -> AsyncIterator[dict]:
+        """
+        Send frames and yield every reply as it arrives.
+
+        Args:
+            frames (AsyncIterable[Image]): Frames to recognize, read as slots free up
+
+        Yields:
+            dict: Replies tagged with their `frame_id`: `result`, or `detections` and
+                `identity` when progressive, and errors (`busy`, `disconnected`, ...)
+
+        Raises:
+            OSError: If the server stays unreachable for `max_reconnects` attempts
+        """
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._in_flight = {}
+        output: asyncio.Queue = asyncio.Queue()
+        pump = asyncio.create_task(self._pump(frames, output))
+        try:
+            while True:
+                item = await output.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            pump.cancel()
@@ -0,0 +1,252 @@
+import json
+from typing import Iterable, Iterator, List, Optional
+
+import httpx
+import numpy as np
+
+from src.client.base import Call, Image, Routes, raise_for_status
+
+
+class FaceAPIClient:
+    """
+    Synchronous client of the Face Recognition API for one organization.
+
+    Requests share a pooled `httpx.Client`, so consecutive calls reuse kept-alive
+    connections instead of opening one per call. The API key owner is added to
+    every request, and embeddings are sent as raw float32 bytes.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        organization: str,
+        api_key: str = "",
+        user: str = "",
+        api_key_name: str = "",
+        timeout: float = 60.0,
+        max_connections: int = 10,
+        http_client: Optional[httpx.Client] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url (str): URL of the API, e.g. "http://localhost:8000"
+            organization (str): Organization every call is made for
+            api_key (str, optional): API key sent as Bearer token. Defaults to "".
+            user (str, optional): User owning the API key. Defaults to "".
+            api_key_name (str, optional): Name of the API key. Defaults to "".
+            timeout (float, optional): Seconds per request. Defaults to 60.0.
+            max_connections (int, optional): Size of the connection pool. Defaults to 10.
+            http_client (Optional[httpx.Client], optional): Client to send requests with
+                instead of a new pool, e.g. a FastAPI TestClient. Defaults to None.
+        """
+        self.routes = Routes(organization, api_key, user, api_key_name)
+        self.http = http_client or httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def __enter__(self) -> "FaceAPIClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.http.close()
+
+    def _build(self, call: Call) -> httpx.Request:
+        return self.http.build_request(
+            call.method,
+            call.path,
+            json=call.json,
+            params=call.params,
+            content=call.content,
+            headers={**self.routes.headers, **call.headers},
+        )
+
+    def _send(self, call: Call):
+        response = self.http.send(self._build(call))
+        raise_for_status(response)
+        return response.json()
+
+    def health(self) -> dict:
+        return self._send(self.routes.health())
+
+    def create_organization(self) -> dict:
+        return self._send(self.routes.create_organization())
+
+    def get_organizations(self) -> List[str]:
+        return self._send(self.routes.get_organizations())["organizations"]
+
+    def get_organization_status(self) -> dict:
+        return self._send(self.routes.get_organization_status())
+
+    def create_api_key(self, user: str, api_key_name: str) -> dict:
+        """
+        Create an API key and start using it for the following calls.
+
+        Args:
+            user (str): User owning the key
+            api_key_name (str): Name of the key
+
+        Returns:
+            dict: The created key, including the plain `key` shown only once
+        """
+        api_key = self._send(self.routes.create_api_key(user, api_key_name))
+        self.routes.api_key = api_key["key"]
+        self.routes.user = user
+        self.routes.api_key_name = api_key_name
+        return api_key
+
+    def revoke_api_key(self) -> dict:
+        return self._send(self.routes.revoke_api_key())
+
+    def get_settings(self) -> dict:
+        return self._send(self.routes.get_settings())
+
+    def update_settings(
+        self, quality: Optional[dict] = None, embedding: Optional[dict] = None
+    ) -> dict:
+        return self._send(self.routes.update_settings(quality, embedding))
+
+    def register(
+        self,
+        images: List[Image],
+        name: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> dict:
+        return self._send(
+            self.routes.register(images, name, duplicate_threshold, max_embeddings)
+        )
+
+    def register_embeddings(
+        self,
+        embeddings: np.ndarray,
+        model: str,
+        name: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> dict:
+        return self._send(
+            self.routes.register_embeddings(
+                embeddings, model, name, duplicate_threshold, max_embeddings
+            )
+        )
+
+    def recognize(
+        self,
+        image: Image,
+        threshold: float = 0.5,
+        quality: Optional[dict] = None,
+        accurate: bool = False,
+    ) -> dict:
+        return self._send(self.routes.recognize(image, threshold, quality, accurate))
+
+    def recognize_embeddings(
+        self, embeddings: np.ndarray, model: str, threshold: float = 0.5
+    ) -> List[dict]:
+        call = self.routes.recognize_embeddings(embeddings, model, threshold)
+        return self._send(call)["searchs"]
+
+    def recognize_batch(
+        self,
+        images: List[Image],
+        threshold: float = 0.5,
+        batch_size: int = 8,
+        quality: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        """
+        Recognize images in one request, yielding each result as it is streamed back.
+
+        Args:
+            images (List[Image]): Images to recognize
+            threshold (float, optional): Distance threshold. Defaults to 0.5.
+            batch_size (int, optional): Images per server-side chunk. Defaults to 8.
+            quality (Optional[dict], optional): Quality gate overrides. Defaults to None.
+
+        Yields:
+            dict: Result of each image, with its `index`, or an `error`
+        """
+        call = self.routes.recognize_batch(images, threshold, batch_size, quality)
+        response = self.http.send(self._build(call), stream=True)
+        try:
+            if response.status_code >= 400:
+                response.read()
+                raise_for_status(response)
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            response.close()
+
+    def recognize_many(
+        self,
+        images: Iterable[Image],
+        threshold: float = 0.5,
+        batch_size: int = 8,
+        quality: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        """
+        Recognize any number of images, sending them `batch_size` per batch request.
+
+        Args:
+            images (Iterable[Image]): Images to recognize, read lazily
+            threshold (float, optional): Distance threshold. Defaults to 0.5.
+            batch_size (int, optional): Images per request. Defaults to 8.
+            quality (Optional[dict], optional): Quality gate overrides. Defaults to None.
+
+        Yields:
+            dict: Result of each image in input order, with its global `index`
+        """
+        batch: List[Image] = []
+        offset = 0
+        for image in images:
+            batch.append(image)
+            if len(batch) == batch_size:
+                for result in self.recognize_batch(batch, threshold, batch_size, quality):
+                    yield {**result, "index": offset + result["index"]}
+                offset += len(batch)
+                batch = []
+        if batch:
+            for result in self.recognize_batch(batch, threshold, batch_size, quality):
+                yield {**result, "index": offset + result["index"]}
+
+    def export_gallery(self, path: str, batch_size: int = 10000) -> None:
+        call = self.routes.export_gallery(batch_size)
+        response = self.http.send(self._build(call), stream=True)
+        try:
+            if response.status_code >= 400:
+                response.read()
+                raise_for_status(response)
+            with open(path, "wb") as gallery:
+                for chunk in response.iter_bytes():
+                    gallery.write(chunk)
+        finally:
+            response.close()
+
+    def import_gallery(self, path: str, batch_size: int = 10000) -> dict:
+        with open(path, "rb") as gallery:
+            return self._send(self.routes.import_gallery(gallery.read(), batch_size))
+
+    def submit_job(self, kind: str, **body) -> dict:
+        """
+        Submit a background job.
+
+        Args:
+            kind (str): "register", "recognize/batch" or "reindex"
+            **body: Fields of the job's request, e.g. `images` and `name`
+
+        Returns:
+            dict: The `job_id` and its initial `status`
+        """
+        return self._send(self.routes.submit_job(kind, body))
+
+    def get_job(self, job_id: str) -> dict:
+        return self._send(self.routes.get_job(job_id))
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple, Union
 import numpy as np
 from .models import DetectionResults, VectorSearchResult, APIKey
 
@@ -26,6 +27,30 @@ class FaceDetector(ABC):
         """
         pass
 
+    def detect_accurate(self, image: Union[str, np.ndarray]) -> DetectionResults:
+        """
+        Detect faces with the most accurate model available, whatever it costs.
+
+        Used where missed or imprecise faces are worse than latency, such as
+        enrollment. The default implementation is `detect`.
+
+        Args:
+            image (Union[str, np.ndarray]): Image to analyze, either as a file path or numpy array
+
+        Returns:
+            DetectionResults: Container object with detection results
+        """
+        return self.detect(image)
+
+    def load(self) -> None:
+        """
+        Load the detection model ahead of the first request.
+
+        Called by the multi-worker server before forking so every worker shares the
+        loaded weights. The default implementation does nothing.
+        """
+        pass
+
 
 class FaceEmbedder(ABC):
     """
@@ -48,6 +73,39 @@ class FaceEmbedder(ABC):
         """
         pass
 
+    def generate_embeddings(self, face_images: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Generate embedding vectors for a batch of face images.
+
+        The default implementation calls `generate_embedding` once per face.
+        Implementations backed by a model that accepts batched input should
+        override it to run a single forward pass.
+
+        Args:
+            face_images (List[np.ndarray]): Cropped and aligned face images
+
+        Returns:
+            List[np.ndarray]: One embedding per face image, in input order
+        """
+        return [self.generate_embedding(face_image) for face_image in face_images]
+
+    def load(self) -> None:
+        """
+        Load the embedding model ahead of the first request.
+
+        Called by the multi-worker server before forking so every worker shares the
+        loaded weights. The default implementation does nothing.
+        """
+        pass
+
+
+class SearchUnavailableError(RuntimeError):
+    """
+    Raised when an organization cannot be searched until an operator or a
+    pending index build intervenes, e.g. its vector index failed to build or
+    is still building over a gallery too large to scan exactly.
+    """
+
 
 class FaceDatabase(ABC):
     """
@@ -87,6 +145,94 @@ class FaceDatabase(ABC):
         """
         pass
 
+    def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Save several face embeddings of the same person.
+
+        The default implementation calls `save_embedding` once per embedding;
+        implementations should override it with a bulk write.
+
+        Args:
+            name (str): Name of the person associated with the embeddings
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Face embedding vectors to save
+
+        Returns:
+            None
+        """
+        for embedding in embeddings:
+            self.save_embedding(name, organization, embedding)
+
+    def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Save a batch of embeddings belonging to any number of people.
+
+        Used to import galleries. The default implementation groups the rows by
+        name and calls `save_embeddings` once per person.
+
+        Args:
+            organization (str): Organization the people belong to
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+        """
+        rows_by_name = {}
+        for name, embedding in zip(names, embeddings):
+            rows_by_name.setdefault(name, []).append(np.asarray(embedding))
+        for name, rows in rows_by_name.items():
+            self.save_embeddings(name, organization, rows)
+
+    def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream every stored embedding of an organization in batches.
+
+        Args:
+            organization (str): Organization to read
+            batch_size (int, optional): Rows per batch. Defaults to 10000.
+
+        Returns:
+            Iterator[Tuple[List[str], np.ndarray]]: Names and N x D float32 embeddings
+                of each batch
+
+        Raises:
+            NotImplementedError: If the backend cannot export its embeddings
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support export")
+
+    def rebuild_index(self, organization: str) -> int:
+        """
+        Rebuild the derived search structures of an organization from its embeddings.
+
+        Args:
+            organization (str): Organization to re-index
+
+        Returns:
+            int: Number of indexed entries
+
+        Raises:
+            NotImplementedError: If the backend has no index to rebuild
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support re-indexing")
+
+    @abstractmethod
+    def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        """
+        Get every stored embedding of a person.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+
+        Returns:
+            List[np.ndarray]: Stored face embedding vectors, possibly empty
+        """
+        pass
+
     @abstractmethod
     def vector_search(
         self, embedding: np.ndarray, threshold: float, organization: str
@@ -104,6 +250,27 @@ class FaceDatabase(ABC):
         """
         pass
 
+    def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search for the closest match of each embedding in a batch.
+
+        The default implementation calls `vector_search` once per embedding.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+        """
+        return [
+            self.vector_search(embedding, threshold, organization)
+            for embedding in embeddings
+        ]
+
     @abstractmethod
     def generate_api_key(
         self, user: str, api_key_name: str, organization: str
@@ -156,3 +323,345 @@ class FaceDatabase(ABC):
             bool: True if the API key is valid, False otherwise
         """
         pass
+
+    @abstractmethod
+    def get_organizations(self) -> List[str]:
+        """
+        Get a list of all registered organizations.
+
+        Returns:
+            List[str]: A list of organization names
+        """
+        pass
+
+    def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        """
+        Report whether an organization can be searched at full speed.
+
+        Backends that build search indexes in the background report their
+        progress. The default implementation has nothing to build and is always ready.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: `status` ("ready", "provisioning" or "failed") and the
+                state of each index by name in `indexes`
+        """
+        return {"status": "ready", "indexes": {}}
+
+    def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get the settings stored for an organization, such as its quality gate.
+
+        The default implementation stores nothing and returns an empty mapping.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name, e.g. {"quality": {...}}
+        """
+        return {}
+
+    def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Replace the given settings sections of an organization, keeping the others.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, by section name
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            NotImplementedError: If the backend cannot store settings
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support organization settings"
+        )
+
+
+class AsyncFaceDatabase(ABC):
+    """
+    Asynchronous counterpart of the FaceDatabase interface.
+
+    Implementations are awaited directly from the event loop, so database
+    round trips from concurrent requests overlap instead of blocking it.
+    """
+
+    @abstractmethod
+    async def create_organization(self, organization: str) -> bool:
+        """
+        Create a new organization in the database.
+
+        Args:
+            organization (str): Name of the organization to create
+
+        Returns:
+            bool: True if creation was successful, False otherwise
+        """
+        pass
+
+    @abstractmethod
+    async def save_embedding(
+        self, name: str, organization: str, embedding: np.ndarray
+    ) -> None:
+        """
+        Save a face embedding to the database.
+
+        Args:
+            name (str): Name of the person associated with the embedding
+            organization (str): Organization the person belongs to
+            embedding (np.ndarray): Face embedding vector to save
+
+        Returns:
+            None
+        """
+        pass
+
+    async def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Save several face embeddings of the same person.
+
+        The default implementation awaits `save_embedding` once per embedding;
+        implementations should override it with a bulk write.
+
+        Args:
+            name (str): Name of the person associated with the embeddings
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Face embedding vectors to save
+
+        Returns:
+            None
+        """
+        for embedding in embeddings:
+            await self.save_embedding(name, organization, embedding)
+
+    async def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Save a batch of embeddings belonging to any number of people.
+
+        Used to import galleries. The default implementation groups the rows by
+        name and awaits `save_embeddings` once per person.
+
+        Args:
+            organization (str): Organization the people belong to
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+        """
+        rows_by_name = {}
+        for name, embedding in zip(names, embeddings):
+            rows_by_name.setdefault(name, []).append(np.asarray(embedding))
+        for name, rows in rows_by_name.items():
+            await self.save_embeddings(name, organization, rows)
+
+    def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> AsyncIterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream every stored embedding of an organization in batches.
+
+        Args:
+            organization (str): Organization to read
+            batch_size (int, optional): Rows per batch. Defaults to 10000.
+
+        Returns:
+            AsyncIterator[Tuple[List[str], np.ndarray]]: Names and N x D float32
+                embeddings of each batch
+
+        Raises:
+            NotImplementedError: If the backend cannot export its embeddings
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support export")
+
+    async def rebuild_index(self, organization: str) -> int:
+        """
+        Rebuild the derived search structures of an organization from its embeddings.
+
+        Args:
+            organization (str): Organization to re-index
+
+        Returns:
+            int: Number of indexed entries
+
+        Raises:
+            NotImplementedError: If the backend has no index to rebuild
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support re-indexing")
+
+    @abstractmethod
+    async def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        """
+        Get every stored embedding of a person.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+
+        Returns:
+            List[np.ndarray]: Stored face embedding vectors, possibly empty
+        """
+        pass
+
+    @abstractmethod
+    async def vector_search(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        """
+        Search for the closest match to the provided embedding.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+        """
+        pass
+
+    async def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search for the closest match of each embedding in a batch.
+
+        The default implementation runs `vector_search` for every embedding concurrently.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.vector_search(embedding, threshold, organization)
+                    for embedding in embeddings
+                )
+            )
+        )
+
+    @abstractmethod
+    async def generate_api_key(
+        self, user: str, api_key_name: str, organization: str
+    ) -> APIKey:
+        """
+        Generate a new API key for a user in an organization.
+
+        Args:
+            user (str): Username requesting the API key
+            api_key_name (str): Name/identifier for the API key
+            organization (str): Organization the key is associated with
+
+        Returns:
+            APIKey: Generated API key information
+        """
+        pass
+
+    @abstractmethod
+    async def revoke_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Revoke an existing API key.
+
+        Args:
+            api_key (str): The API key to revoke
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if revocation was successful, False otherwise
+        """
+        pass
+
+    @abstractmethod
+    async def validate_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Validate if an API key is authentic and active.
+
+        Args:
+            api_key (str): The API key to validate
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if the API key is valid, False otherwise
+        """
+        pass
+
+    @abstractmethod
+    async def get_organizations(self) -> List[str]:
+        """
+        Get a list of all registered organizations.
+
+        Returns:
+            List[str]: A list of organization names
+        """
+        pass
+
+    async def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        """
+        Report whether an organization can be searched at full speed.
+
+        Backends that build search indexes in the background report their
+        progress. The default implementation has nothing to build and is always ready.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: `status` ("ready", "provisioning" or "failed") and the
+                state of each index by name in `indexes`
+        """
+        return {"status": "ready", "indexes": {}}
+
+    async def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get the settings stored for an organization, such as its quality gate.
+
+        The default implementation stores nothing and returns an empty mapping.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name, e.g. {"quality": {...}}
+        """
+        return {}
+
+    async def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Replace the given settings sections of an organization, keeping the others.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, by section name
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            NotImplementedError: If the backend cannot store settings
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support organization settings"
+        )
@@ -1,37 +1,68 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 import numpy as np
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class BoundingBox:
     x: int
     y: int
     w: int
     h: int
 
-@dataclass
+@dataclass(slots=True)
 class DetectionResult:
     bounding_box: BoundingBox
     confidence: float
-    face_image: np.ndarray
+    # uint8 RGB crop; released (None) once the face is embedded
+    face_image: Optional[np.ndarray]
 
-@dataclass
+@dataclass(slots=True)
 class DetectionResults:
     result: List[DetectionResult]
     inference_time: float
 
-@dataclass
+@dataclass(slots=True)
 class VectorSearchResult:
     name: str
     distance: Optional[float]
     
-@dataclass
+@dataclass(slots=True)
+class QualitySettings:
+    min_face_size: int = 0
+    min_blur_variance: float = 0.0
+    min_brightness: float = 0.0
+    max_brightness: float = 255.0
+
+@dataclass(slots=True)
+class SkippedFace:
+    index: int
+    reason: str
+    value: float
+
+@dataclass(slots=True)
 class RecognizeResult:
     detections: DetectionResults
     searchs: List[VectorSearchResult]
+    skipped: List[SkippedFace] = field(default_factory=list)
+
+@dataclass(slots=True)
+class FrameDetections:
+    detections: DetectionResults
+    skipped: List[SkippedFace]
+    pending: List[int]
+
+@dataclass(slots=True)
+class FaceIdentity:
+    index: int
+    search: VectorSearchResult
+
+@dataclass(slots=True)
+class EnrollmentResult:
+    kept: int
+    discarded: int
 
-@dataclass
+@dataclass(slots=True)
 class APIKey:
     key: str
     user: str
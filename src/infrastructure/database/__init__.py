@@ -0,0 +1,109 @@
+import os
+
+from src.domain.interfaces import AsyncFaceDatabase
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+def _two_stage_options() -> dict:
+    return {
+        "two_stage_search": _env_flag("MONGODB_TWO_STAGE_SEARCH", False),
+        "rerank": _env_flag("MONGODB_RERANK", True),
+        "prototype_candidates": int(os.getenv("MONGODB_PROTOTYPE_CANDIDATES", 5)),
+    }
+
+
+def _index_options() -> dict:
+    return {
+        "index_build_timeout": float(os.getenv("MONGODB_INDEX_BUILD_TIMEOUT", 3600)),
+        "exact_search_max_rows": int(os.getenv("MONGODB_EXACT_SEARCH_MAX_ROWS", 10000)),
+    }
+
+
+def create_face_database() -> AsyncFaceDatabase:
+    """
+    Build the face database configured through environment variables.
+
+    `FACE_DATABASE_BACKEND` selects the implementation:
+        - "mongodb" (default): asynchronous PyMongo driver
+        - "mongodb-sync": synchronous PyMongo driver run in a thread pool
+        - "mmap": memory-mapped files under `FACE_DATABASE_PATH`, for sites without Atlas
+
+    `MONGODB_URI` is the connection string and `MONGODB_MAX_POOL_SIZE` /
+    `MONGODB_MIN_POOL_SIZE` size the connection pool. `MONGODB_LAYOUT` selects how
+    the asynchronous backend stores organizations: "database" (default) gives each
+    one its own database and search indexes, "shared" keeps all of them in the
+    collections of the `MONGODB_DATABASE` database. `MONGODB_TWO_STAGE_SEARCH`,
+    `MONGODB_RERANK` and `MONGODB_PROTOTYPE_CANDIDATES` configure prototype search.
+    `MONGODB_INDEX_BUILD_TIMEOUT` and `MONGODB_EXACT_SEARCH_MAX_ROWS` bound the index
+    builds and the exact scans served while they run. The file-backed backend reads
+    `EMBEDDING_DIMENSIONS`, `MMAP_IVF_LISTS`, `MMAP_IVF_PROBES` and `MMAP_IVF_MIN_ROWS`.
+
+    Returns:
+        AsyncFaceDatabase: Database ready to be awaited by FaceRecognitionService
+
+    Raises:
+        ValueError: If the configured backend or layout is unknown
+    """
+    backend = os.getenv("FACE_DATABASE_BACKEND", "mongodb")
+    connection_string = os.getenv("MONGODB_URI")
+    layout = os.getenv("MONGODB_LAYOUT", "database")
+    if layout not in ("database", "shared"):
+        raise ValueError(f"Unknown MONGODB_LAYOUT '{layout}'")
+
+    if backend == "mongodb":
+        pool_options = {
+            "max_pool_size": int(os.getenv("MONGODB_MAX_POOL_SIZE", 100)),
+            "min_pool_size": int(os.getenv("MONGODB_MIN_POOL_SIZE", 0)),
+        }
+        if layout == "shared":
+            from src.infrastructure.database.shared_mongodb import SharedMongoDBFaceDatabase
+
+            return SharedMongoDBFaceDatabase(
+                connection_string=connection_string,
+                database=os.getenv("MONGODB_DATABASE", "faceapi"),
+                **pool_options,
+                **_two_stage_options(),
+                **_index_options(),
+            )
+
+        from src.infrastructure.database.async_mongodb import AsyncMongoDBFaceDatabase
+
+        return AsyncMongoDBFaceDatabase(
+            connection_string=connection_string,
+            **pool_options,
+            **_two_stage_options(),
+            **_index_options(),
+        )
+
+    if backend == "mongodb-sync":
+        if layout == "shared":
+            raise ValueError("MONGODB_LAYOUT=shared requires FACE_DATABASE_BACKEND=mongodb")
+        from src.infrastructure.database.mongodb import MongoDBFaceDatabase
+        from src.infrastructure.database.threaded import ThreadedFaceDatabase
+
+        return ThreadedFaceDatabase(
+            MongoDBFaceDatabase(
+                connection_string=connection_string,
+                **_two_stage_options(),
+                **_index_options(),
+            )
+        )
+
+    if backend == "mmap":
+        from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+        from src.infrastructure.database.threaded import ThreadedFaceDatabase
+
+        return ThreadedFaceDatabase(
+            MemoryMappedFaceDatabase(
+                root_path=os.getenv("FACE_DATABASE_PATH", "data/faces"),
+                dimensions=int(os.getenv("EMBEDDING_DIMENSIONS", 512)),
+                ivf_lists=int(os.getenv("MMAP_IVF_LISTS", 0)),
+                ivf_probes=int(os.getenv("MMAP_IVF_PROBES", 8)),
+                ivf_min_rows=int(os.getenv("MMAP_IVF_MIN_ROWS", 10000)),
+            )
+        )
+
+    raise ValueError(f"Unknown FACE_DATABASE_BACKEND '{backend}'")
@@ -0,0 +1,969 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.server_api import ServerApi
+import secrets
+
+from src.domain.interfaces import AsyncFaceDatabase, SearchUnavailableError
+from src.domain.models import VectorSearchResult, APIKey
+from src.infrastructure.database.mongodb_common import (
+    EMBEDDING_PROJECTION,
+    ORGANIZATION_INDEXES,
+    SETTINGS_DOCUMENT_ID,
+    VECTOR_SEARCH_INDEX_DEFINITION,
+    EmbeddingBatcher,
+    PrototypeAccumulator,
+    build_api_key_document,
+    build_embedding_documents,
+    build_prototype_operations,
+    build_prototype_rebuild,
+    build_prototype_search_pipeline,
+    build_prototype_update,
+    build_search_index_model,
+    build_vector_search_pipeline,
+    check_api_key,
+    check_exact_scan,
+    hash_api_key,
+    indexes_settled,
+    is_permanent_error,
+    needs_exact_search,
+    organization_names,
+    parse_index_state,
+    parse_vector_search_result,
+    rerank_by_embeddings,
+    search_exactly,
+    summarize_index_states,
+)
+from src.utils.logging import logger
+
+
+class AsyncMongoDBFaceDatabase(AsyncFaceDatabase):
+    """
+    MongoDB implementation of the AsyncFaceDatabase interface.
+
+    Uses the asynchronous PyMongo driver so that searches, saves and API key
+    validations issued by concurrent requests share a connection pool and overlap
+    on the event loop. The storage layout is identical to MongoDBFaceDatabase.
+    """
+
+    vector_search_index_definition = VECTOR_SEARCH_INDEX_DEFINITION
+
+    def __init__(
+        self,
+        connection_string: str,
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        two_stage_search: bool = False,
+        rerank: bool = True,
+        prototype_candidates: int = 5,
+        index_poll_interval: float = 5.0,
+        index_build_timeout: float = 3600.0,
+        exact_search_max_rows: int = 10000,
+    ):
+        """
+        Initialize the asynchronous MongoDB client.
+
+        The client connects lazily; call `verify_connection` from an async context
+        (e.g. application startup) to fail fast on a bad connection string.
+
+        Args:
+            connection_string (str): MongoDB connection string
+            max_pool_size (int, optional): Maximum number of pooled connections. Defaults to 100.
+            min_pool_size (int, optional): Minimum number of pooled connections. Defaults to 0.
+            two_stage_search (bool, optional): Search per-person prototypes first instead of
+                every stored embedding. Defaults to False.
+            rerank (bool, optional): Re-rank the candidate people against their individual
+                embeddings in two-stage search. Defaults to True.
+            prototype_candidates (int, optional): Number of people kept by the prototype
+                stage. Defaults to 5.
+            index_poll_interval (float, optional): Seconds between checks of a new
+                organization's index builds. A state other than ready is also reused
+                by searches for this long. Defaults to 5.0.
+            index_build_timeout (float, optional): Seconds after which an index still
+                building is reported as failed. Defaults to 3600.0.
+            exact_search_max_rows (int, optional): Largest gallery scanned exactly while
+                its index builds; larger ones are unsearchable until it is ready.
+                Defaults to 10000.
+        """
+        self.client = AsyncMongoClient(
+            connection_string,
+            server_api=ServerApi("1"),
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+        )
+        self.two_stage_search = two_stage_search
+        self.rerank = rerank
+        self.prototype_candidates = prototype_candidates
+        self.index_poll_interval = index_poll_interval
+        self.index_build_timeout = index_build_timeout
+        self.exact_search_max_rows = exact_search_max_rows
+        self._known_indexes = set()
+        self._ready_indexes = set()
+        # Indexes whose build outlived `index_build_timeout`
+        self._failed_indexes = set()
+        # Other states are re-read at most once per `index_poll_interval`, so
+        # searches against a building or missing index don't each query Atlas
+        self._pending_states = {}
+        self._index_watchers = set()
+
+    async def verify_connection(self) -> None:
+        """
+        Verify that the MongoDB connection is working.
+
+        Raises:
+            Exception: If connection to MongoDB fails
+        """
+        try:
+            await self.client.admin.command("ping")
+            logger.info("Successfully connected to MongoDB")
+        except Exception as e:
+            logger.error(f"MongoDB connection failed: {e}")
+            raise
+
+    def _get_organization_db(self, organization: str) -> AsyncDatabase:
+        """
+        Get the MongoDB database object for an organization.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            AsyncDatabase: MongoDB database object
+        """
+        return self.client[organization]
+
+    async def database_exists(self, database_name: str) -> bool:
+        """
+        Check if a database exists in MongoDB.
+
+        Args:
+            database_name (str): Name of the database to check
+
+        Returns:
+            bool: True if the database exists, False otherwise
+        """
+        return database_name in await self.client.list_database_names()
+
+    async def vector_index_exists(
+        self, organization: str, index_name: str, collection: str = "embeddings"
+    ) -> bool:
+        """
+        Check if a vector search index exists for a collection.
+
+        Args:
+            organization (str): Organization name
+            index_name (str): Name of the vector index to check
+            collection (str, optional): Collection holding the index. Defaults to "embeddings".
+
+        Returns:
+            bool: True if the vector index exists, False otherwise
+
+        Raises:
+            RuntimeError: If checking for index existence fails
+        """
+        if (organization, collection, index_name) in self._known_indexes:
+            return True
+        try:
+            cursor = (
+                await self._get_organization_db(organization)
+                .get_collection(collection)
+                .list_search_indexes()
+            )
+            indexes = await cursor.to_list(None)
+            exists = any(index["name"] == index_name for index in indexes)
+        except Exception as e:
+            raise RuntimeError(f"Failed to verify vector index: {str(e)}")
+
+        if exists:
+            self._known_indexes.add((organization, collection, index_name))
+        return exists
+
+    async def index_state(
+        self, organization: str, index_name: str, collection: str = "embeddings"
+    ) -> str:
+        """
+        Get the build state of a vector search index.
+
+        Args:
+            organization (str): Organization name
+            index_name (str): Name of the vector index
+            collection (str, optional): Collection holding the index. Defaults to "embeddings".
+
+        Returns:
+            str: "READY" once queryable, "FAILED" if the build timed out,
+                otherwise the Atlas index status
+
+        Raises:
+            RuntimeError: If reading the index state fails
+        """
+        key = (organization, collection, index_name)
+        if key in self._ready_indexes:
+            return "READY"
+        cached = self._pending_states.get(key)
+        if cached is not None and time.monotonic() < cached[1]:
+            state = cached[0]
+        else:
+            try:
+                cursor = (
+                    await self._get_organization_db(organization)
+                    .get_collection(collection)
+                    .list_search_indexes(index_name)
+                )
+                state = parse_index_state(await cursor.to_list(None))
+            except Exception as e:
+                raise RuntimeError(f"Failed to read vector index state: {str(e)}") from e
+
+            if state == "READY":
+                self._ready_indexes.add(key)
+                self._failed_indexes.discard(key)
+                self._pending_states.pop(key, None)
+                return state
+            self._pending_states[key] = (state, time.monotonic() + self.index_poll_interval)
+        if key in self._failed_indexes:
+            return "FAILED"
+        return state
+
+    async def vector_index_ready(
+        self, organization: str, index_name: str, collection: str = "embeddings"
+    ) -> bool:
+        """
+        Check if a vector search index can be queried.
+
+        Args:
+            organization (str): Organization name
+            index_name (str): Name of the vector index
+            collection (str, optional): Collection holding the index. Defaults to "embeddings".
+
+        Returns:
+            bool: True if `$vectorSearch` can use the index
+        """
+        return await self.index_state(organization, index_name, collection) == "READY"
+
+    async def _index_states(self, organization: str) -> Dict[str, str]:
+        return {
+            index_name: await self.index_state(organization, index_name, collection)
+            for collection, index_name in ORGANIZATION_INDEXES
+        }
+
+    async def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        """
+        Report whether an organization's vector indexes are built.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: `status` ("ready", "provisioning" or "failed") and the
+                state of each index in `indexes`
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        if not await self.database_exists(organization):
+            raise ValueError(f"Database '{organization}' does not exist.")
+        states = await self._index_states(organization)
+        return {"status": summarize_index_states(states), "indexes": states}
+
+    async def _watch_indexes(self, organization: str) -> None:
+        """
+        Poll a new organization's index builds until every index is queryable or failed.
+
+        Indexes still building after `index_build_timeout` are reported as failed.
+        Polling stops early if the server rejects the state query, e.g. because the
+        organization was dropped.
+
+        Args:
+            organization (str): Organization whose indexes are building
+        """
+        start = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(self.index_poll_interval)
+            try:
+                states = await self._index_states(organization)
+                if indexes_settled(states):
+                    break
+            except RuntimeError as e:
+                if is_permanent_error(e):
+                    logger.error(f"Stopped watching the indexes of '{organization}': {e}")
+                    return
+                logger.warning(f"Cannot read index state of '{organization}': {e}")
+            if asyncio.get_running_loop().time() - start >= self.index_build_timeout:
+                self._failed_indexes.update(
+                    (organization, collection, index_name)
+                    for collection, index_name in ORGANIZATION_INDEXES
+                )
+                logger.error(
+                    f"Indexes of '{organization}' not built after "
+                    f"{self.index_build_timeout:.0f}s, marking them failed"
+                )
+                return
+        elapsed = asyncio.get_running_loop().time() - start
+        logger.info(
+            f"Indexes of '{organization}' settled after {elapsed:.0f}s: {states}"
+        )
+
+    def _start_index_watcher(self, organization: str) -> None:
+        # Keep a reference, or the task could be garbage collected while it runs
+        watcher = asyncio.create_task(self._watch_indexes(organization))
+        self._index_watchers.add(watcher)
+        watcher.add_done_callback(self._index_watchers.discard)
+
+    async def _create_prototypes_collection(self, organization: str) -> None:
+        """
+        Create the per-person prototypes collection and its vector index.
+
+        Args:
+            organization (str): Organization name
+        """
+        db = self._get_organization_db(organization)
+        if "prototypes" not in await db.list_collection_names():
+            await db.create_collection("prototypes")
+            await db["prototypes"].create_index("name", unique=True)
+        if not await self.vector_index_exists(
+            organization, "face_prototypes", "prototypes"
+        ):
+            logger.info(f"Creating prototype vector index for '{organization}'")
+            await db["prototypes"].create_search_index(
+                build_search_index_model(
+                    "face_prototypes", self.vector_search_index_definition
+                )
+            )
+
+    async def create_organization(self, organization: str) -> bool:
+        """
+        Create a new organization with required collections and indexes.
+
+        Returns as soon as the index builds are requested. Their progress is
+        polled in the background and reported by `get_organization_status`;
+        until the search index is queryable, searches scan the organization's
+        embeddings exactly.
+
+        Args:
+            organization (str): Name of the organization to create
+
+        Returns:
+            bool: True if creation was successful or organization already exists
+        """
+        if await self.database_exists(organization):
+            logger.info(f"Organization '{organization}' already exists.")
+            return True
+
+        db = self._get_organization_db(organization)
+        collections = await db.list_collection_names()
+
+        if "api_keys" not in collections:
+            await db.create_collection("api_keys")
+            await db["api_keys"].create_index(
+                [("user", 1), ("api_key_name", 1), ("organization", 1)], unique=True
+            )
+
+        if "embeddings" not in collections:
+            await db.create_collection("embeddings")
+            await db["embeddings"].create_index("name")
+            if not await self.vector_index_exists(organization, "face_embbedings"):
+                logger.info(f"Creating vector index for '{organization}'")
+                await db["embeddings"].create_search_index(
+                    build_search_index_model(
+                        "face_embbedings", self.vector_search_index_definition
+                    )
+                )
+
+        await self._create_prototypes_collection(organization)
+        self._start_index_watcher(organization)
+
+        return True
+
+    async def generate_api_key(
+        self, user: str, api_key_name: str, organization: str
+    ) -> APIKey:
+        """
+        Generate a new API key for a user in an organization.
+
+        Args:
+            user (str): Username requesting the API key
+            api_key_name (str): Name/identifier for the API key
+            organization (str): Organization the key is associated with
+
+        Returns:
+            APIKey: Generated API key information
+
+        Raises:
+            ValueError: If organization doesn't exist or API key already exists
+            RuntimeError: If API key creation fails
+        """
+        if not await self.database_exists(organization):
+            raise ValueError(
+                f"Database '{organization}' does not exist. Create it first."
+            )
+
+        api_keys_collection = self._get_organization_db(organization)["api_keys"]
+        existing_key = await api_keys_collection.find_one(
+            {"user": user, "api_key_name": api_key_name, "organization": organization}
+        )
+        if existing_key:
+            raise ValueError(
+                f"API key for '{user}' with name '{api_key_name}' already exists in '{organization}'."
+            )
+
+        api_key = secrets.token_urlsafe(32)
+        # bcrypt is deliberately slow; keep it off the event loop
+        hashed_key = await asyncio.to_thread(hash_api_key, api_key)
+
+        api_key_doc = build_api_key_document(user, api_key_name, organization)
+        try:
+            await api_keys_collection.insert_one({**api_key_doc, "key": hashed_key})
+            logger.info(
+                f"API key generated for '{user}' in organization '{organization}'"
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create API key: {str(e)}")
+
+        return APIKey(**api_key_doc, key=api_key)
+
+    async def validate_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Validate if an API key is authentic and active.
+
+        Args:
+            api_key (str): The API key to validate
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if the API key is valid, False otherwise
+
+        Raises:
+            ValueError: If organization doesn't exist
+        """
+        if not await self.database_exists(organization):
+            raise ValueError(f"Database '{organization}' does not exist.")
+
+        api_keys_collection = self._get_organization_db(organization)["api_keys"]
+        key_doc = await api_keys_collection.find_one(
+            {"user": user, "api_key_name": api_key_name, "is_active": True}
+        )
+        if not key_doc:
+            logger.info(
+                f"No API key '{api_key_name}' found for user '{user}' in organization '{organization}'"
+            )
+            return False
+
+        is_valid = await asyncio.to_thread(check_api_key, api_key, key_doc)
+        if is_valid:
+            await api_keys_collection.update_one(
+                {"_id": key_doc["_id"]}, {"$set": {"last_used": datetime.now()}}
+            )
+        else:
+            logger.info(
+                f"Hash mismatch for API key '{api_key_name}' of user '{user}' in organization '{organization}'"
+            )
+
+        return is_valid
+
+    async def revoke_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Revoke an existing API key.
+
+        Args:
+            api_key (str): The API key to revoke
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if revocation was successful, False otherwise
+        """
+        if not await self.validate_api_key(api_key, user, api_key_name, organization):
+            return False
+
+        logger.info(f"Revoking API key for {user} in organization '{organization}'")
+        await self._get_organization_db(organization)["api_keys"].delete_one(
+            {"user": user, "api_key_name": api_key_name}
+        )
+        return True
+
+    async def save_embedding(
+        self, name: str, organization: str, embedding: np.ndarray
+    ) -> None:
+        """
+        Save a face embedding to the database.
+
+        Args:
+            name (str): Name of the person associated with the embedding
+            organization (str): Organization the person belongs to
+            embedding (np.ndarray): Face embedding vector to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embedding fails
+        """
+        try:
+            if not await self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+
+            [document] = build_embedding_documents([name], [embedding], datetime.now())
+            await self._get_organization_db(organization)["embeddings"].insert_one(
+                document
+            )
+            await self._update_prototype(name, organization, [embedding])
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embedding: {str(e)}")
+
+    async def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Save several face embeddings of the same person with a single bulk insert.
+
+        Args:
+            name (str): Name of the person associated with the embeddings
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Face embedding vectors to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not embeddings:
+            return
+        try:
+            if not await self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+
+            await self._get_organization_db(organization)["embeddings"].insert_many(
+                build_embedding_documents(
+                    [name] * len(embeddings), embeddings, datetime.now()
+                )
+            )
+            await self._update_prototype(name, organization, embeddings)
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    async def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Save a batch of embeddings of any number of people in two round trips.
+
+        Rows are inserted with one unordered `insert_many` and every affected
+        prototype is updated with one `bulk_write`.
+
+        Args:
+            organization (str): Organization the people belong to
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not len(names):
+            return
+        try:
+            if not await self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+
+            db = self._get_organization_db(organization)
+            await db["embeddings"].insert_many(
+                build_embedding_documents(names, embeddings, datetime.now()),
+                ordered=False,
+            )
+            await db["prototypes"].bulk_write(
+                build_prototype_operations(names, embeddings), ordered=False
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    async def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> AsyncIterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream every stored embedding of an organization in cursor batches.
+
+        Args:
+            organization (str): Organization to read
+            batch_size (int, optional): Rows per batch and cursor batch size.
+                Defaults to 10000.
+
+        Yields:
+            Tuple[List[str], np.ndarray]: Names and N x D float32 embeddings of each batch
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            cursor = self._get_organization_db(organization)["embeddings"].find(
+                {}, EMBEDDING_PROJECTION, batch_size=batch_size
+            )
+            batcher = EmbeddingBatcher(batch_size)
+            async for document in cursor:
+                batch = batcher.add(document)
+                if batch is not None:
+                    yield batch
+            batch = batcher.flush()
+            if batch is not None:
+                yield batch
+        except Exception as e:
+            raise RuntimeError(f"Failed to export embeddings: {str(e)}")
+
+    async def _update_prototype(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Fold newly saved embeddings into the person's prototype.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Embeddings that were just saved
+        """
+        await self._get_organization_db(organization)["prototypes"].update_one(
+            {"name": name}, build_prototype_update(embeddings), upsert=True
+        )
+
+    async def rebuild_index(self, organization: str, batch_size: int = 1000) -> int:
+        """
+        Recompute every prototype of an organization from its stored embeddings.
+
+        Embeddings are streamed in cursor batches and only one running sum per
+        person is kept in memory. Prototypes are replaced one person at a time, so
+        searches never see an empty collection. People enrolled while it runs keep
+        their incrementally updated prototype until the next rebuild.
+
+        Args:
+            organization (str): Organization to re-index
+            batch_size (int, optional): Cursor batch size. Defaults to 1000.
+
+        Returns:
+            int: Number of prototypes recomputed
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or rebuilding fails
+        """
+        if not await self.database_exists(organization):
+            raise RuntimeError(f"Database '{organization}' does not exist.")
+        try:
+            await self._create_prototypes_collection(organization)
+            db = self._get_organization_db(organization)
+
+            stored = {
+                document["name"]: document.get("count")
+                async for document in db["prototypes"].find(
+                    {}, {"_id": 0, "name": 1, "count": 1}
+                )
+            }
+            accumulator = PrototypeAccumulator()
+            async for document in db["embeddings"].find(
+                {}, EMBEDDING_PROJECTION, batch_size=batch_size
+            ):
+                accumulator.add(document)
+
+            documents = accumulator.documents()
+            operations = build_prototype_rebuild(documents, stored)
+            for start in range(0, len(operations), batch_size):
+                await db["prototypes"].bulk_write(
+                    operations[start : start + batch_size], ordered=False
+                )
+        except Exception as e:
+            raise RuntimeError(f"Failed to rebuild index: {str(e)}")
+
+        logger.info(f"Rebuilt {len(documents)} prototypes for '{organization}'")
+        return len(documents)
+
+    async def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        """
+        Get every stored embedding of a person.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+
+        Returns:
+            List[np.ndarray]: Stored face embedding vectors, possibly empty
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            cursor = self._get_organization_db(organization)["embeddings"].find(
+                {"name": name}, {"_id": 0, "embedding": 1}
+            )
+            return [np.array(document["embedding"]) async for document in cursor]
+        except Exception as e:
+            raise RuntimeError(f"Failed to get embeddings: {str(e)}")
+
+    async def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get the settings stored for an organization, such as its quality gate.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name, empty if none were stored
+
+        Raises:
+            RuntimeError: If reading the settings fails
+        """
+        try:
+            document = await self._get_organization_db(organization)["settings"].find_one(
+                {"_id": SETTINGS_DOCUMENT_ID}, {"_id": 0}
+            )
+            return document or {}
+        except Exception as e:
+            raise RuntimeError(f"Failed to get organization settings: {str(e)}")
+
+    async def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Replace the given settings sections of an organization, keeping the others.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, by section name
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the settings fails
+        """
+        try:
+            if not await self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+            if not settings:
+                return await self.get_organization_settings(organization)
+
+            document = await self._get_organization_db(organization)[
+                "settings"
+            ].find_one_and_update(
+                {"_id": SETTINGS_DOCUMENT_ID},
+                {"$set": settings},
+                projection={"_id": 0},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return document
+        except Exception as e:
+            raise RuntimeError(f"Failed to update organization settings: {str(e)}")
+
+    async def _check_searchable(self, organization: str) -> bool:
+        """
+        Ensure an organization's database exists and check its vector index before searching.
+
+        Args:
+            organization (str): Organization to search within
+
+        Returns:
+            bool: True if the vector index is queryable, False while it is building
+
+        Raises:
+            ValueError: If the organization doesn't exist
+            SearchUnavailableError: If the vector index failed or doesn't exist
+        """
+        if not await self.database_exists(organization):
+            raise ValueError(
+                f"Database '{organization}' does not exist. Create it first."
+            )
+        state = await self.index_state(organization, "face_embbedings")
+        return not needs_exact_search(state, organization)
+
+    async def _search_exact(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search an organization whose vector index is not queryable yet.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+
+        Raises:
+            SearchUnavailableError: If the gallery is too large to scan
+        """
+        documents = await (
+            self._get_organization_db(organization)["embeddings"]
+            .find({}, EMBEDDING_PROJECTION)
+            .limit(self.exact_search_max_rows + 1)
+            .to_list(None)
+        )
+        check_exact_scan(documents, self.exact_search_max_rows, organization)
+        return search_exactly(embeddings, documents, threshold)
+
+    async def _uses_prototypes(self, organization: str) -> bool:
+        """
+        Check whether searches for an organization should go through prototypes.
+
+        Args:
+            organization (str): Organization to search within
+
+        Returns:
+            bool: True if two-stage search is enabled and the prototype index is queryable
+        """
+        return self.two_stage_search and await self.vector_index_ready(
+            organization, "face_prototypes", "prototypes"
+        )
+
+    async def _search(
+        self,
+        embedding: np.ndarray,
+        threshold: float,
+        organization: str,
+        use_prototypes: bool,
+    ) -> VectorSearchResult:
+        """
+        Run the vector search for a single embedding.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+            use_prototypes (bool): Search the prototypes first, as decided once per
+                call by `_uses_prototypes`
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+        """
+        if use_prototypes:
+            return await self._search_two_stage(embedding, threshold, organization)
+
+        cursor = await self._get_organization_db(organization)["embeddings"].aggregate(
+            build_vector_search_pipeline(embedding)
+        )
+        return parse_vector_search_result(await cursor.to_list(None), threshold)
+
+    async def _search_two_stage(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        """
+        Search prototypes first, then optionally re-rank the candidates' embeddings.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+        """
+        db = self._get_organization_db(organization)
+        cursor = await db["prototypes"].aggregate(
+            build_prototype_search_pipeline(embedding, self.prototype_candidates)
+        )
+        candidates = await cursor.to_list(None)
+        if not self.rerank or not candidates:
+            return parse_vector_search_result(candidates, threshold)
+
+        documents = await db["embeddings"].find(
+            {"name": {"$in": [candidate["name"] for candidate in candidates]}},
+            EMBEDDING_PROJECTION,
+        ).to_list(None)
+        return rerank_by_embeddings(embedding, documents, threshold)
+
+    async def vector_search(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        """
+        Search for the closest match to the provided embedding.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+
+        Raises:
+            SearchUnavailableError: If the organization's index cannot serve searches
+            RuntimeError: If the organization is missing, or the search fails
+        """
+        try:
+            if not await self._check_searchable(organization):
+                [result] = await self._search_exact([embedding], threshold, organization)
+                return result
+            use_prototypes = await self._uses_prototypes(organization)
+            return await self._search(embedding, threshold, organization, use_prototypes)
+        except SearchUnavailableError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
+
+    async def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search for the closest match of each embedding in a batch.
+
+        The organization and index checks run once, then all aggregations are
+        issued concurrently over the connection pool. While the index is building,
+        the organization's embeddings are read once and scanned for every query,
+        up to `exact_search_max_rows` of them.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+
+        Raises:
+            SearchUnavailableError: If the organization's index cannot serve searches
+            RuntimeError: If search operation fails
+        """
+        if not embeddings:
+            return []
+        try:
+            if not await self._check_searchable(organization):
+                return await self._search_exact(embeddings, threshold, organization)
+            use_prototypes = await self._uses_prototypes(organization)
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._search(embedding, threshold, organization, use_prototypes)
+                        for embedding in embeddings
+                    )
+                )
+            )
+        except SearchUnavailableError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
+
+    async def get_organizations(self) -> List[str]:
+        """
+        Get a list of all organizations (databases) in MongoDB,
+        filtering out system databases.
+
+        Returns:
+            List[str]: List of organization names
+
+        Raises:
+            RuntimeError: If getting organizations fails
+        """
+        try:
+            return organization_names(await self.client.list_database_names())
+        except Exception as e:
+            logger.error(f"Failed to get organizations: {e}")
+            raise RuntimeError(f"Failed to get organizations: {str(e)}")
@@ -0,0 +1,962 @@
+import fcntl
+import json
+import os
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import bcrypt
+import numpy as np
+
+from src.domain.interfaces import FaceDatabase
+from src.domain.models import VectorSearchResult, APIKey
+from src.utils.logging import logger
+
+EMBEDDINGS_FILE = "embeddings.f32"
+METADATA_FILE = "metadata.sqlite"
+LOCK_FILE = ".lock"
+IVF_CENTROIDS_FILE = "ivf_centroids.npy"
+IVF_ASSIGNMENTS_FILE = "ivf_assignments.i32"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    row INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_name ON embeddings (name);
+CREATE TABLE IF NOT EXISTS api_keys (
+    user TEXT NOT NULL,
+    api_key_name TEXT NOT NULL,
+    organization TEXT NOT NULL,
+    key TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_used TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (user, api_key_name, organization)
+);
+"""
+
+# Created on demand as well, for organizations that predate settings
+SETTINGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    section TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class _Gallery:
+    """
+    In-process view over an organization's mapped embedding matrix.
+
+    Only the names column is held in Python memory; the float32 matrix and IVF
+    assignments are read-only memory maps, so their pages live in the OS page
+    cache and are shared by every worker process mapping the same files.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.names: List[str] = []
+        self.matrix: Optional[np.memmap] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.memmap] = None
+        # Identity of the centroids file the IVF view was loaded from
+        self.ivf_identity: Optional[Tuple[int, int]] = None
+        # The first `listed_rows` rows grouped by IVF list, so that list i holds
+        # `list_rows[list_offsets[i] : list_offsets[i + 1]]`
+        self.list_rows: Optional[np.ndarray] = None
+        self.list_offsets: Optional[np.ndarray] = None
+        self.listed_rows = 0
+
+    def group_lists(self) -> None:
+        """
+        Group every visible row by its IVF list.
+        """
+        self.list_rows = np.argsort(self.assignments, kind="stable")
+        counts = np.bincount(self.assignments, minlength=len(self.centroids))
+        self.list_offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.listed_rows = self.rows
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class MemoryMappedFaceDatabase(FaceDatabase):
+    """
+    File-backed implementation of the FaceDatabase interface for on-prem and edge sites.
+
+    Each organization is a directory holding an append-only file of L2-normalized
+    float32 embeddings (one fixed-size row per face) and a SQLite sidecar with the
+    name of every row and the organization's API keys. Nothing is parsed at startup:
+    the matrix is memory-mapped on first use and searched with exact, vectorized
+    cosine similarity, optionally restricted to a few inverted-file (IVF) partitions
+    for large galleries.
+
+    Scores follow MongoDB Atlas' cosine convention, `(1 + cosine) / 2`, so thresholds
+    are interchangeable with the MongoDB backend.
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        dimensions: int = 512,
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+        ivf_min_rows: int = 10000,
+    ):
+        """
+        Initialize the file-backed database.
+
+        Args:
+            root_path (str): Directory holding one sub-directory per organization
+            dimensions (int, optional): Embedding dimension. Defaults to 512.
+            ivf_lists (int, optional): Number of IVF partitions to train for large galleries;
+                0 disables IVF and always searches exhaustively. Defaults to 0.
+            ivf_probes (int, optional): Number of partitions scanned per query. Defaults to 8.
+            ivf_min_rows (int, optional): Gallery size from which the IVF index is built.
+                Defaults to 10000.
+        """
+        self.root_path = root_path
+        self.dimensions = dimensions
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.ivf_min_rows = ivf_min_rows
+        self._row_bytes = dimensions * np.dtype(np.float32).itemsize
+        self._galleries = {}
+        self._galleries_lock = threading.Lock()
+        self._ivf_build_lock = threading.Lock()
+        # Organizations whose first IVF index is being trained in the background
+        self._ivf_builds = set()
+        os.makedirs(root_path, exist_ok=True)
+
+    def _path(self, organization: str, filename: str = "") -> str:
+        """
+        Get the path of an organization's directory or one of its files.
+
+        Args:
+            organization (str): Organization name
+            filename (str, optional): File inside the organization directory
+
+        Returns:
+            str: Absolute or root-relative path
+
+        Raises:
+            ValueError: If the organization name is not a plain directory name
+        """
+        if not organization or os.sep in organization or organization in (".", ".."):
+            raise ValueError(f"Invalid organization name '{organization}'")
+        return os.path.join(self.root_path, organization, filename)
+
+    def _connect(self, organization: str) -> sqlite3.Connection:
+        """
+        Open a connection to an organization's metadata sidecar.
+
+        Connections are short-lived so they are safe across threads and forks.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            sqlite3.Connection: Open connection in WAL mode
+        """
+        connection = sqlite3.connect(self._path(organization, METADATA_FILE), timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _named_rows(self, organization: str) -> int:
+        """
+        Count the rows whose name is written, which are never rewritten.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            int: Number of leading rows of the embeddings file with a name
+        """
+        connection = self._connect(organization)
+        try:
+            (rows,) = connection.execute(
+                "SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings"
+            ).fetchone()
+        finally:
+            connection.close()
+        return rows
+
+    @contextmanager
+    def _exclusive(self, organization: str) -> Iterator[None]:
+        """
+        Hold the organization's cross-process write lock.
+
+        Args:
+            organization (str): Organization name
+        """
+        with open(self._path(organization, LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def database_exists(self, organization: str) -> bool:
+        """
+        Check if an organization directory exists.
+
+        Args:
+            organization (str): Name of the organization to check
+
+        Returns:
+            bool: True if the organization exists, False otherwise
+        """
+        return os.path.isfile(self._path(organization, METADATA_FILE))
+
+    def _require_organization(self, organization: str) -> None:
+        """
+        Raise if the organization has not been created.
+
+        Args:
+            organization (str): Organization name
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        if not self.database_exists(organization):
+            raise ValueError(
+                f"Database '{organization}' does not exist. Create it first."
+            )
+
+    def create_organization(self, organization: str) -> bool:
+        """
+        Create the organization directory, embeddings file and metadata sidecar.
+
+        Args:
+            organization (str): Name of the organization to create
+
+        Returns:
+            bool: True if creation was successful or organization already exists
+        """
+        if self.database_exists(organization):
+            logger.info(f"Organization '{organization}' already exists.")
+            return True
+
+        os.makedirs(self._path(organization), exist_ok=True)
+        with self._exclusive(organization):
+            open(self._path(organization, EMBEDDINGS_FILE), "ab").close()
+            connection = self._connect(organization)
+            try:
+                connection.executescript(SCHEMA + SETTINGS_SCHEMA)
+            finally:
+                connection.close()
+        return True
+
+    def get_organizations(self) -> List[str]:
+        """
+        Get a list of all organizations stored under the root path.
+
+        Returns:
+            List[str]: List of organization names
+        """
+        return sorted(
+            entry
+            for entry in os.listdir(self.root_path)
+            if os.path.isfile(os.path.join(self.root_path, entry, METADATA_FILE))
+        )
+
+    def generate_api_key(
+        self, user: str, api_key_name: str, organization: str
+    ) -> APIKey:
+        """
+        Generate a new API key for a user in an organization.
+
+        Args:
+            user (str): Username requesting the API key
+            api_key_name (str): Name/identifier for the API key
+            organization (str): Organization the key is associated with
+
+        Returns:
+            APIKey: Generated API key information
+
+        Raises:
+            ValueError: If organization doesn't exist or API key already exists
+        """
+        self._require_organization(organization)
+
+        api_key = secrets.token_urlsafe(32)
+        hashed_key = bcrypt.hashpw(api_key.encode(), bcrypt.gensalt())
+        created_at = datetime.now()
+
+        connection = self._connect(organization)
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO api_keys (user, api_key_name, organization, key, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (user, api_key_name, organization, hashed_key.decode(), created_at.isoformat()),
+                )
+        except sqlite3.IntegrityError:
+            raise ValueError(
+                f"API key for '{user}' with name '{api_key_name}' already exists in '{organization}'."
+            )
+        finally:
+            connection.close()
+
+        logger.info(f"API key generated for '{user}' in organization '{organization}'")
+        return APIKey(
+            key=api_key,
+            user=user,
+            api_key_name=api_key_name,
+            organization=organization,
+            created_at=created_at,
+            last_used=None,
+            is_active=True,
+        )
+
+    def validate_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Validate if an API key is authentic and active.
+
+        Args:
+            api_key (str): The API key to validate
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if the API key is valid, False otherwise
+
+        Raises:
+            ValueError: If organization doesn't exist
+        """
+        if not self.database_exists(organization):
+            raise ValueError(f"Database '{organization}' does not exist.")
+
+        connection = self._connect(organization)
+        try:
+            row = connection.execute(
+                "SELECT rowid, key FROM api_keys "
+                "WHERE user = ? AND api_key_name = ? AND is_active = 1",
+                (user, api_key_name),
+            ).fetchone()
+            if row is None:
+                return False
+
+            is_valid = bcrypt.checkpw(api_key.encode("utf-8"), row[1].encode("utf-8"))
+            if is_valid:
+                with connection:
+                    connection.execute(
+                        "UPDATE api_keys SET last_used = ? WHERE rowid = ?",
+                        (datetime.now().isoformat(), row[0]),
+                    )
+            return is_valid
+        finally:
+            connection.close()
+
+    def revoke_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Revoke an existing API key.
+
+        Args:
+            api_key (str): The API key to revoke
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if revocation was successful, False otherwise
+        """
+        if not self.validate_api_key(api_key, user, api_key_name, organization):
+            return False
+
+        logger.info(f"Revoking API key for {user} in organization '{organization}'")
+        connection = self._connect(organization)
+        try:
+            with connection:
+                connection.execute(
+                    "DELETE FROM api_keys WHERE user = ? AND api_key_name = ?",
+                    (user, api_key_name),
+                )
+        finally:
+            connection.close()
+        return True
+
+    def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get the settings stored for an organization, such as its quality gate.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name, empty if none were stored
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        self._require_organization(organization)
+        connection = self._connect(organization)
+        try:
+            connection.executescript(SETTINGS_SCHEMA)
+            rows = connection.execute("SELECT section, value FROM settings").fetchall()
+            return {section: json.loads(value) for section, value in rows}
+        finally:
+            connection.close()
+
+    def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Replace the given settings sections of an organization, keeping the others.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, by section name
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        self._require_organization(organization)
+        connection = self._connect(organization)
+        try:
+            connection.executescript(SETTINGS_SCHEMA)
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO settings (section, value) VALUES (?, ?)",
+                    [(section, json.dumps(value)) for section, value in settings.items()],
+                )
+        finally:
+            connection.close()
+        return self.get_organization_settings(organization)
+
+    def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Convert embeddings to contiguous, L2-normalized float32 rows.
+
+        Args:
+            embeddings (np.ndarray): One embedding or a matrix of embeddings
+
+        Returns:
+            np.ndarray: Matrix of shape (n, dimensions)
+
+        Raises:
+            ValueError: If the embedding dimension doesn't match the database
+        """
+        matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if matrix.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Expected {self.dimensions}-d embeddings, got {matrix.shape[1]}-d"
+            )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.ascontiguousarray(matrix / np.maximum(norms, 1e-12))
+
+    def save_embedding(
+        self, name: str, organization: str, embedding: np.ndarray
+    ) -> None:
+        """
+        Append a face embedding to the organization's mapped matrix.
+
+        Args:
+            name (str): Name of the person associated with the embedding
+            organization (str): Organization the person belongs to
+            embedding (np.ndarray): Face embedding vector to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embedding fails
+        """
+        try:
+            self._append(organization, [name], self._normalize(embedding))
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embedding: {str(e)}")
+
+    def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Append several face embeddings of the same person under a single lock.
+
+        Args:
+            name (str): Name of the person associated with the embeddings
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Face embedding vectors to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not embeddings:
+            return
+        try:
+            self._append(
+                organization, [name] * len(embeddings), self._normalize(np.stack(embeddings))
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Append a batch of embeddings of any number of people under a single lock.
+
+        Args:
+            organization (str): Organization the people belong to
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not len(names):
+            return
+        try:
+            self._append(organization, list(names), self._normalize(np.asarray(embeddings)))
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream every stored embedding of an organization in row order.
+
+        Rows are sliced straight out of the memory-mapped matrix.
+
+        Args:
+            organization (str): Organization to read
+            batch_size (int, optional): Rows per batch. Defaults to 10000.
+
+        Yields:
+            Tuple[List[str], np.ndarray]: Names and N x D float32 embeddings of each batch
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            self._require_organization(organization)
+            gallery = self._load_gallery(organization)
+            for start in range(0, gallery.rows, batch_size):
+                stop = min(start + batch_size, gallery.rows)
+                yield gallery.names[start:stop], np.array(gallery.matrix[start:stop])
+        except Exception as e:
+            raise RuntimeError(f"Failed to export embeddings: {str(e)}")
+
+    def _append(self, organization: str, names: List[str], vectors: np.ndarray) -> None:
+        """
+        Append normalized rows and their names while holding the write lock.
+
+        Vectors are written before their names, so readers never see a name
+        without its row. The first row is numbered from the sidecar, and vectors a
+        crashed writer left without names are truncated first, so row numbers stay
+        contiguous and names keep lining up with their vectors.
+
+        Args:
+            organization (str): Organization name
+            names (List[str]): Name of each row
+            vectors (np.ndarray): Normalized float32 matrix of shape (len(names), dimensions)
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        self._require_organization(organization)
+
+        with self._exclusive(organization):
+            first_row = self._named_rows(organization)
+
+            embeddings_path = self._path(organization, EMBEDDINGS_FILE)
+            if os.path.getsize(embeddings_path) > first_row * self._row_bytes:
+                # Readers never map rows without names, so the orphans are unmapped
+                logger.warning(f"Dropping orphan embedding rows of '{organization}'")
+                os.truncate(embeddings_path, first_row * self._row_bytes)
+            with open(embeddings_path, "ab") as embeddings_file:
+                embeddings_file.write(vectors.tobytes())
+
+            centroids_path = self._path(organization, IVF_CENTROIDS_FILE)
+            if os.path.exists(centroids_path):
+                centroids = np.load(centroids_path)
+                assignments = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+                with open(self._path(organization, IVF_ASSIGNMENTS_FILE), "r+b") as assignments_file:
+                    assignments_file.seek(first_row * 4)
+                    assignments_file.write(assignments.tobytes())
+
+            created_at = datetime.now().isoformat()
+            connection = self._connect(organization)
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO embeddings (row, name, created_at) VALUES (?, ?, ?)",
+                        [(first_row + offset, name, created_at) for offset, name in enumerate(names)],
+                    )
+            finally:
+                connection.close()
+
+    def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        """
+        Get every stored embedding of a person.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+
+        Returns:
+            List[np.ndarray]: Stored (normalized) face embedding vectors, possibly empty
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            self._require_organization(organization)
+            gallery = self._load_gallery(organization)
+            connection = self._connect(organization)
+            try:
+                rows = [
+                    row
+                    for (row,) in connection.execute(
+                        "SELECT row FROM embeddings WHERE name = ? AND row < ? ORDER BY row",
+                        (name, gallery.rows),
+                    )
+                ]
+            finally:
+                connection.close()
+            return [np.array(gallery.matrix[row]) for row in rows]
+        except Exception as e:
+            raise RuntimeError(f"Failed to get embeddings: {str(e)}")
+
+    def _load_gallery(self, organization: str) -> _Gallery:
+        """
+        Get an up-to-date mapped view of an organization's gallery.
+
+        The view is cached per process and only extended when the embeddings file
+        has grown, by mapping the new size and reading the names of the new rows.
+        The IVF view is reloaded whenever the centroids file is replaced, e.g. by a
+        re-index run in another process.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            _Gallery: Mapped gallery view
+        """
+        embeddings_path = self._path(organization, EMBEDDINGS_FILE)
+        centroids_path = self._path(organization, IVF_CENTROIDS_FILE)
+        file_rows = os.path.getsize(embeddings_path) // self._row_bytes
+        ivf_identity = _file_identity(centroids_path)
+
+        with self._galleries_lock:
+            gallery = self._galleries.setdefault(organization, _Gallery())
+            if file_rows == gallery.rows and ivf_identity == gallery.ivf_identity:
+                return gallery
+
+            connection = self._connect(organization)
+            try:
+                gallery.names.extend(
+                    name
+                    for (name,) in connection.execute(
+                        "SELECT name FROM embeddings WHERE row >= ? ORDER BY row",
+                        (len(gallery.names),),
+                    )
+                )
+            finally:
+                connection.close()
+
+            # A row is visible once both its vector and its name are written
+            gallery.rows = min(file_rows, len(gallery.names))
+            gallery.matrix = (
+                np.memmap(embeddings_path, dtype=np.float32, mode="r", shape=(gallery.rows, self.dimensions))
+                if gallery.rows
+                else None
+            )
+
+            reindexed = ivf_identity != gallery.ivf_identity
+            gallery.ivf_identity = ivf_identity
+            if gallery.rows and ivf_identity is not None:
+                gallery.centroids = np.load(centroids_path)
+                gallery.assignments = np.memmap(
+                    self._path(organization, IVF_ASSIGNMENTS_FILE),
+                    dtype=np.int32,
+                    mode="r",
+                    shape=(gallery.rows,),
+                )
+                # Rows appended since the last grouping are scanned apart until
+                # they outgrow an eighth of the grouped ones
+                if reindexed or gallery.rows - gallery.listed_rows > gallery.listed_rows // 8:
+                    gallery.group_lists()
+            else:
+                gallery.centroids = None
+                gallery.assignments = None
+                gallery.list_rows = None
+                gallery.list_offsets = None
+                gallery.listed_rows = 0
+            return gallery
+
+    def _assign(self, matrix: np.ndarray, centroids: np.ndarray, assignments_file) -> None:
+        """
+        Write the nearest partition of every row, streaming the matrix in chunks.
+
+        Args:
+            matrix (np.ndarray): Normalized rows, usually a memory map
+            centroids (np.ndarray): Normalized partition centroids
+            assignments_file: Binary file receiving one int32 per row
+        """
+        for start in range(0, len(matrix), 65536):
+            chunk = np.asarray(matrix[start : start + 65536])
+            assignments_file.write(np.argmax(chunk @ centroids.T, axis=1).astype(np.int32).tobytes())
+
+    def build_ivf_index(self, organization: str, n_lists: Optional[int] = None, iterations: int = 10) -> None:
+        """
+        Train IVF partitions with spherical k-means and assign every stored row.
+
+        Training uses a bounded sample and assignment streams the matrix in chunks,
+        so memory stays independent of gallery size. Rows with a name are never
+        rewritten, so they are trained on and assigned without the write lock; it is
+        only held to assign the rows appended meanwhile and swap the files in.
+
+        Args:
+            organization (str): Organization name
+            n_lists (Optional[int], optional): Number of partitions. Defaults to `ivf_lists`.
+            iterations (int, optional): k-means iterations. Defaults to 10.
+        """
+        n_lists = n_lists or self.ivf_lists
+        self._require_organization(organization)
+
+        embeddings_path = self._path(organization, EMBEDDINGS_FILE)
+        rows = self._named_rows(organization)
+        if rows < n_lists:
+            return
+        matrix = np.memmap(embeddings_path, dtype=np.float32, mode="r", shape=(rows, self.dimensions))
+
+        rng = np.random.default_rng(0)
+        sample = np.asarray(matrix[np.sort(rng.choice(rows, size=min(rows, n_lists * 256), replace=False))])
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for index in range(n_lists):
+                members = sample[labels == index]
+                if len(members):
+                    centroids[index] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        # Other threads and processes may have the current files mapped, so the
+        # new ones are written aside and swapped in; the centroids go last since
+        # readers reload the IVF view when the centroids file changes
+        assignments_path = self._path(organization, IVF_ASSIGNMENTS_FILE)
+        centroids_path = self._path(organization, IVF_CENTROIDS_FILE)
+        suffix = f".{os.getpid()}.tmp"
+        with open(assignments_path + suffix, "wb") as assignments_file:
+            self._assign(matrix, centroids, assignments_file)
+            with self._exclusive(organization):
+                total = os.path.getsize(embeddings_path) // self._row_bytes
+                if total > rows:
+                    appended = np.memmap(
+                        embeddings_path,
+                        dtype=np.float32,
+                        mode="r",
+                        offset=rows * self._row_bytes,
+                        shape=(total - rows, self.dimensions),
+                    )
+                    self._assign(appended, centroids, assignments_file)
+                assignments_file.flush()
+                with open(centroids_path + suffix, "wb") as centroids_file:
+                    np.save(centroids_file, centroids)
+                os.replace(assignments_path + suffix, assignments_path)
+                os.replace(centroids_path + suffix, centroids_path)
+        logger.info(f"Built IVF index with {n_lists} lists over {total} rows for '{organization}'")
+
+        with self._galleries_lock:
+            self._galleries.pop(organization, None)
+
+    def _build_ivf_in_background(self, organization: str) -> None:
+        """
+        Train the first IVF index of an organization that outgrew exact search.
+
+        Args:
+            organization (str): Organization name
+        """
+        try:
+            with self._ivf_build_lock:
+                if not os.path.exists(self._path(organization, IVF_CENTROIDS_FILE)):
+                    self.build_ivf_index(organization)
+        except Exception as e:
+            # Left marked as building, so searches don't retrain it in a loop;
+            # `rebuild_index` can still train it
+            logger.error(f"Failed to build IVF index for '{organization}': {e}")
+            return
+        with self._galleries_lock:
+            self._ivf_builds.discard(organization)
+
+    def rebuild_index(self, organization: str) -> int:
+        """
+        Retrain the IVF partitions of an organization.
+
+        Galleries below `ivf_min_rows` rows, or any gallery when IVF is disabled,
+        are searched exactly and have nothing to rebuild.
+
+        Args:
+            organization (str): Organization to re-index
+
+        Returns:
+            int: Number of rows assigned to partitions, 0 if no index was built
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        self._require_organization(organization)
+        rows = self._load_gallery(organization).rows
+        if not self.ivf_lists or rows < max(self.ivf_min_rows, self.ivf_lists):
+            return 0
+        with self._ivf_build_lock:
+            self.build_ivf_index(organization)
+        return rows
+
+    def _top_k(self, gallery: _Gallery, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Find the k most similar rows of each query.
+
+        Args:
+            gallery (_Gallery): Mapped gallery view
+            queries (np.ndarray): Normalized query matrix of shape (m, dimensions)
+            k (int): Number of neighbours per query
+
+        Returns:
+            List[List[Tuple[int, float]]]: Row indices and cosine similarities, best first
+        """
+        if gallery.matrix is None:
+            return [[] for _ in queries]
+
+        if gallery.centroids is None:
+            scores = queries @ gallery.matrix.T
+            candidates = [np.arange(gallery.rows)] * len(queries)
+        else:
+            probes = min(self.ivf_probes, len(gallery.centroids))
+            probe_lists = np.argpartition(-(queries @ gallery.centroids.T), probes - 1, axis=1)[:, :probes]
+            unlisted = np.arange(gallery.listed_rows, gallery.rows)
+            unlisted_lists = np.asarray(gallery.assignments[gallery.listed_rows :])
+            candidates = [
+                np.sort(
+                    np.concatenate(
+                        [
+                            gallery.list_rows[gallery.list_offsets[index] : gallery.list_offsets[index + 1]]
+                            for index in lists
+                        ]
+                        + [unlisted[np.isin(unlisted_lists, lists)]]
+                    )
+                )
+                for lists in probe_lists
+            ]
+            scores = [gallery.matrix[rows] @ query for rows, query in zip(candidates, queries)]
+
+        neighbours = []
+        for rows, row_scores in zip(candidates, scores):
+            count = min(k, len(rows))
+            if count == 0:
+                neighbours.append([])
+                continue
+            best = np.argpartition(-row_scores, count - 1)[:count]
+            best = best[np.argsort(-row_scores[best])]
+            neighbours.append([(int(rows[i]), float(row_scores[i])) for i in best])
+        return neighbours
+
+    def search_top_k(
+        self, embeddings: List[np.ndarray], organization: str, k: int = 1
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Exact (or IVF-restricted) top-k search over the mapped matrix.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            organization (str): Organization to search within
+            k (int, optional): Number of neighbours per query. Defaults to 1.
+
+        Returns:
+            List[List[Tuple[str, float]]]: Names and scores of the neighbours of each query, best first
+        """
+        self._require_organization(organization)
+        gallery = self._load_gallery(organization)
+
+        if (
+            self.ivf_lists
+            and gallery.centroids is None
+            and gallery.rows >= max(self.ivf_min_rows, self.ivf_lists)
+        ):
+            # Training would stall this request, so it runs in the background and
+            # searches stay exact until the centroids file appears
+            with self._galleries_lock:
+                start_build = organization not in self._ivf_builds
+                self._ivf_builds.add(organization)
+            if start_build:
+                threading.Thread(
+                    target=self._build_ivf_in_background,
+                    args=(organization,),
+                    name=f"ivf-build-{organization}",
+                    daemon=True,
+                ).start()
+
+        neighbours = self._top_k(gallery, self._normalize(np.stack(embeddings)), k)
+        return [
+            [(gallery.names[row], (1.0 + score) / 2.0) for row, score in query_neighbours]
+            for query_neighbours in neighbours
+        ]
+
+    def vector_search(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        """
+        Search for the closest match to the provided embedding.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or the search fails
+        """
+        return self.vector_search_batch([embedding], threshold, organization)[0]
+
+    def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search for the closest match of each embedding with a single matrix product.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or the search fails
+        """
+        if not embeddings:
+            return []
+        try:
+            results = []
+            for neighbours in self.search_top_k(embeddings, organization, k=1):
+                if not neighbours:
+                    results.append(VectorSearchResult(name="unknown", distance=None))
+                    continue
+                name, score = neighbours[0]
+                results.append(
+                    VectorSearchResult(name=name if score >= threshold else "unknown", distance=score)
+                )
+            return results
+        except Exception as e:
+            raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
@@ -1,18 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Tuple
 
 import numpy as np
 import time
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
 from pymongo.server_api import ServerApi
-from pymongo.operations import SearchIndexModel
 from pymongo.database import Database
-from pymongo.errors import DuplicateKeyError
-import bcrypt
 import secrets
 
-from src.domain.interfaces import FaceDatabase
+from src.domain.interfaces import FaceDatabase, SearchUnavailableError
 from src.domain.models import VectorSearchResult, APIKey
+from src.infrastructure.database.mongodb_common import (
+    EMBEDDING_PROJECTION,
+    ORGANIZATION_INDEXES,
+    SETTINGS_DOCUMENT_ID,
+    VECTOR_SEARCH_INDEX_DEFINITION,
+    EmbeddingBatcher,
+    PrototypeAccumulator,
+    build_api_key_document,
+    build_embedding_documents,
+    build_prototype_operations,
+    build_prototype_rebuild,
+    build_prototype_search_pipeline,
+    build_prototype_update,
+    build_search_index_model,
+    build_vector_search_pipeline,
+    check_api_key,
+    check_exact_scan,
+    hash_api_key,
+    indexes_settled,
+    is_permanent_error,
+    needs_exact_search,
+    organization_names,
+    parse_index_state,
+    parse_vector_search_result,
+    rerank_by_embeddings,
+    search_exactly,
+    summarize_index_states,
+)
 from src.utils.logging import logger
 
 
@@ -24,25 +51,59 @@ class MongoDBFaceDatabase(FaceDatabase):
     including vector search capabilities for facial recognition.
     """
 
-    vector_search_index_definition = {
-        "fields": [
-            {
-                "type": "vector",
-                "path": "embedding",
-                "similarity": "cosine",
-                "numDimensions": 512,
-            },
-        ]
-    }
-
-    def __init__(self, connection_string: str):
+    vector_search_index_definition = VECTOR_SEARCH_INDEX_DEFINITION
+
+    def __init__(
+        self,
+        connection_string: str,
+        search_concurrency: int = 8,
+        two_stage_search: bool = False,
+        rerank: bool = True,
+        prototype_candidates: int = 5,
+        index_poll_interval: float = 5.0,
+        index_build_timeout: float = 3600.0,
+        exact_search_max_rows: int = 10000,
+    ):
         """
         Initialize the MongoDB database connection.
 
         Args:
             connection_string (str): MongoDB connection string
+            search_concurrency (int, optional): Maximum number of vector searches issued
+                in parallel by `vector_search_batch`. Defaults to 8.
+            two_stage_search (bool, optional): Search per-person prototypes first instead of
+                every stored embedding. Organizations without a prototype index keep using
+                the single-stage search. Defaults to False.
+            rerank (bool, optional): Re-rank the candidate people against their individual
+                embeddings in two-stage search. Defaults to True.
+            prototype_candidates (int, optional): Number of people kept by the prototype
+                stage. Defaults to 5.
+            index_poll_interval (float, optional): Seconds between checks of a new
+                organization's index builds. A state other than ready is also reused
+                by searches for this long. Defaults to 5.0.
+            index_build_timeout (float, optional): Seconds after which an index still
+                building is reported as failed. Defaults to 3600.0.
+            exact_search_max_rows (int, optional): Largest gallery scanned exactly while
+                its index builds; larger ones are unsearchable until it is ready.
+                Defaults to 10000.
         """
         self.client = MongoClient(connection_string, server_api=ServerApi("1"))
+        self._search_executor = ThreadPoolExecutor(max_workers=search_concurrency)
+        self.two_stage_search = two_stage_search
+        self.rerank = rerank
+        self.prototype_candidates = prototype_candidates
+        self.index_poll_interval = index_poll_interval
+        self.index_build_timeout = index_build_timeout
+        self.exact_search_max_rows = exact_search_max_rows
+        # Search indexes are never dropped by this class, so existence and
+        # readiness are cached once seen
+        self._known_indexes = set()
+        self._ready_indexes = set()
+        # Indexes whose build outlived `index_build_timeout`
+        self._failed_indexes = set()
+        # Other states are re-read at most once per `index_poll_interval`, so
+        # searches against a building or missing index don't each query Atlas
+        self._pending_states = {}
         self._verify_connection()
 
     def _verify_connection(self) -> None:
@@ -83,13 +144,16 @@ class MongoDBFaceDatabase(FaceDatabase):
         """
         return database_name in self.client.list_database_names()
 
-    def vector_index_exists(self, organization: str, index_name: str) -> bool:
+    def vector_index_exists(
+        self, organization: str, index_name: str, collection: str = "embeddings"
+    ) -> bool:
         """
         Check if a vector search index exists for a collection.
 
         Args:
             organization (str): Organization name
             index_name (str): Name of the vector index to check
+            collection (str, optional): Collection holding the index. Defaults to "embeddings".
 
         Returns:
             bool: True if the vector index exists, False otherwise
@@ -97,20 +161,175 @@ class MongoDBFaceDatabase(FaceDatabase):
         Raises:
             RuntimeError: If checking for index existence fails
         """
+        if (organization, collection, index_name) in self._known_indexes:
+            return True
         try:
             indexes = (
                 self.client[organization]
-                .get_collection("embeddings")
+                .get_collection(collection)
                 .list_search_indexes()
             )
-            return any(index["name"] == index_name for index in indexes)
+            exists = any(index["name"] == index_name for index in indexes)
         except Exception as e:
             raise RuntimeError(f"Failed to verify vector index: {str(e)}")
 
+        if exists:
+            self._known_indexes.add((organization, collection, index_name))
+        return exists
+
+    def index_state(
+        self, organization: str, index_name: str, collection: str = "embeddings"
+    ) -> str:
+        """
+        Get the build state of a vector search index.
+
+        Args:
+            organization (str): Organization name
+            index_name (str): Name of the vector index
+            collection (str, optional): Collection holding the index. Defaults to "embeddings".
+
+        Returns:
+            str: "READY" once queryable, "FAILED" if the build timed out,
+                otherwise the Atlas index status
+
+        Raises:
+            RuntimeError: If reading the index state fails
+        """
+        key = (organization, collection, index_name)
+        if key in self._ready_indexes:
+            return "READY"
+        cached = self._pending_states.get(key)
+        if cached is not None and time.monotonic() < cached[1]:
+            state = cached[0]
+        else:
+            try:
+                state = parse_index_state(
+                    list(
+                        self.client[organization]
+                        .get_collection(collection)
+                        .list_search_indexes(index_name)
+                    )
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to read vector index state: {str(e)}") from e
+
+            if state == "READY":
+                self._ready_indexes.add(key)
+                self._failed_indexes.discard(key)
+                self._pending_states.pop(key, None)
+                return state
+            self._pending_states[key] = (state, time.monotonic() + self.index_poll_interval)
+        if key in self._failed_indexes:
+            return "FAILED"
+        return state
+
+    def vector_index_ready(
+        self, organization: str, index_name: str, collection: str = "embeddings"
+    ) -> bool:
+        """
+        Check if a vector search index can be queried.
+
+        Args:
+            organization (str): Organization name
+            index_name (str): Name of the vector index
+            collection (str, optional): Collection holding the index. Defaults to "embeddings".
+
+        Returns:
+            bool: True if `$vectorSearch` can use the index
+        """
+        return self.index_state(organization, index_name, collection) == "READY"
+
+    def _index_states(self, organization: str) -> Dict[str, str]:
+        return {
+            index_name: self.index_state(organization, index_name, collection)
+            for collection, index_name in ORGANIZATION_INDEXES
+        }
+
+    def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        """
+        Report whether an organization's vector indexes are built.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: `status` ("ready", "provisioning" or "failed") and the
+                state of each index in `indexes`
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        if not self.database_exists(organization):
+            raise ValueError(f"Database '{organization}' does not exist.")
+        states = self._index_states(organization)
+        return {"status": summarize_index_states(states), "indexes": states}
+
+    def _watch_indexes(self, organization: str) -> None:
+        """
+        Poll a new organization's index builds until every index is queryable or failed.
+
+        Indexes still building after `index_build_timeout` are reported as failed.
+        Polling stops early if the server rejects the state query, e.g. because the
+        organization was dropped.
+
+        Args:
+            organization (str): Organization whose indexes are building
+        """
+        start = time.monotonic()
+        while True:
+            time.sleep(self.index_poll_interval)
+            try:
+                states = self._index_states(organization)
+                if indexes_settled(states):
+                    break
+            except RuntimeError as e:
+                if is_permanent_error(e):
+                    logger.error(f"Stopped watching the indexes of '{organization}': {e}")
+                    return
+                logger.warning(f"Cannot read index state of '{organization}': {e}")
+            if time.monotonic() - start >= self.index_build_timeout:
+                self._failed_indexes.update(
+                    (organization, collection, index_name)
+                    for collection, index_name in ORGANIZATION_INDEXES
+                )
+                logger.error(
+                    f"Indexes of '{organization}' not built after "
+                    f"{self.index_build_timeout:.0f}s, marking them failed"
+                )
+                return
+        logger.info(
+            f"Indexes of '{organization}' settled after "
+            f"{time.monotonic() - start:.0f}s: {states}"
+        )
+
+    def _create_prototypes_collection(self, organization: str) -> None:
+        """
+        Create the per-person prototypes collection and its vector index.
+
+        Args:
+            organization (str): Organization name
+        """
+        db = self._get_organization_db(organization)
+        if "prototypes" not in db.list_collection_names():
+            db.create_collection("prototypes")
+            db["prototypes"].create_index("name", unique=True)
+        if not self.vector_index_exists(organization, "face_prototypes", "prototypes"):
+            logger.info(f"Creating prototype vector index for '{organization}'")
+            db["prototypes"].create_search_index(
+                build_search_index_model(
+                    "face_prototypes", self.vector_search_index_definition
+                )
+            )
+
     def create_organization(self, organization: str) -> bool:
         """
         Create a new organization with required collections and indexes.
 
+        Returns as soon as the index builds are requested. Their progress is
+        polled by a background thread and reported by `get_organization_status`;
+        until the search index is queryable, searches scan the organization's
+        embeddings exactly.
+
         Args:
             organization (str): Name of the organization to create
 
@@ -118,7 +337,7 @@ class MongoDBFaceDatabase(FaceDatabase):
             bool: True if creation was successful or organization already exists
         """
         if self.database_exists(organization):
-            print(f"Organization '{organization}' already exists.")
+            logger.info(f"Organization '{organization}' already exists.")
             return True
 
         db = self._get_organization_db(organization)
@@ -133,16 +352,19 @@ class MongoDBFaceDatabase(FaceDatabase):
         # Create `embeddings` collection
         if "embeddings" not in db.list_collection_names():
             db.create_collection("embeddings")
+            db["embeddings"].create_index("name")
             if not self.vector_index_exists(organization, f"face_embbedings"):
-                print(f"Creating vector index for '{organization}'")
+                logger.info(f"Creating vector index for '{organization}'")
                 db["embeddings"].create_search_index(
-                    SearchIndexModel(
-                        definition=self.vector_search_index_definition,
-                        name="face_embbedings",
-                        type="vectorSearch",
+                    build_search_index_model(
+                        "face_embbedings", self.vector_search_index_definition
                     )
                 )
-                time.sleep(2)  # Wait for index creation
+
+        self._create_prototypes_collection(organization)
+        threading.Thread(
+            target=self._watch_indexes, args=(organization,), daemon=True
+        ).start()
 
         return True
 
@@ -165,7 +387,7 @@ class MongoDBFaceDatabase(FaceDatabase):
             RuntimeError: If API key creation fails
         """
         api_key = secrets.token_urlsafe(32)
-        hashed_key = bcrypt.hashpw(api_key.encode(), bcrypt.gensalt())
+        hashed_key = hash_api_key(api_key)
 
         if not self.database_exists(organization):
             raise ValueError(
@@ -185,19 +407,10 @@ class MongoDBFaceDatabase(FaceDatabase):
                 f"API key for '{user}' with name '{api_key_name}' already exists in '{organization}'."
             )
 
-        api_key_doc = {
-            "user": user,
-            "api_key_name": api_key_name,
-            "organization": organization,
-            "created_at": datetime.now(),
-            "last_used": None,
-            "is_active": True,
-        }
+        api_key_doc = build_api_key_document(user, api_key_name, organization)
         try:
-            api_keys_collection.insert_one(
-                {**api_key_doc, "key": str(hashed_key.decode())}
-            )
-            print(f"API key generated for '{user}' in organization '{organization}'")
+            api_keys_collection.insert_one({**api_key_doc, "key": hashed_key})
+            logger.info(f"API key generated for '{user}' in organization '{organization}'")
         except Exception as e:
             raise RuntimeError(f"Failed to create API key: {str(e)}")
 
@@ -230,30 +443,21 @@ class MongoDBFaceDatabase(FaceDatabase):
             {"user": user, "api_key_name": api_key_name, "is_active": True}
         )
 
-        logger.info(
-            f"Validating {api_key} API key for '{user}' in organization '{organization}'"
-        )
-        print(
-            f"Validating {api_key} API key for '{user}' in organization '{organization}'"
-        )
-
         if not key_doc:
-            print(
-                f"No {api_key} API key found for user '{user}' in organization '{organization}'"
+            logger.warning(
+                f"No API key '{api_key_name}' found for user '{user}' in organization '{organization}'"
             )
             return False
 
-        is_valid = bcrypt.checkpw(
-            api_key.encode("utf-8"), key_doc["key"].encode("utf-8")
-        )
+        is_valid = check_api_key(api_key, key_doc)
         if is_valid:
             db["api_keys"].update_one(
                 {"_id": key_doc["_id"]}, {"$set": {"last_used": datetime.now()}}
             )
         else:
-            print(f"Hash mismatch for API key: {api_key}")
-
-        print(f"API key validated for {user} in org:'{organization}'")
+            logger.warning(
+                f"Hash mismatch for API key '{api_key_name}' of user '{user}' in organization '{organization}'"
+            )
 
         return is_valid
 
@@ -276,7 +480,6 @@ class MongoDBFaceDatabase(FaceDatabase):
             return False
 
         logger.info(f"Revoking API key for {user} in organization '{organization}'")
-        print(f"Revoking API key for {user} in organization '{organization}'")
 
         db = self._get_organization_db(organization)
         db["api_keys"].delete_one({"user": user, "api_key_name": api_key_name})
@@ -305,17 +508,393 @@ class MongoDBFaceDatabase(FaceDatabase):
                     f"Database '{organization}' does not exist. Create it first."
                 )
 
-            document = {
-                "name": name,
-                "embedding": embedding.tolist(),
-                "created_at": datetime.now(),
-            }
+            [document] = build_embedding_documents([name], [embedding], datetime.now())
 
             db = self._get_organization_db(organization)
             db["embeddings"].insert_one(document)
+            self._update_prototype(name, organization, [embedding])
         except Exception as e:
             raise RuntimeError(f"Failed to save embedding: {str(e)}")
 
+    def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Save several face embeddings of the same person with a single bulk insert.
+
+        Args:
+            name (str): Name of the person associated with the embeddings
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Face embedding vectors to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not embeddings:
+            return
+        try:
+            if not self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+
+            self._get_organization_db(organization)["embeddings"].insert_many(
+                build_embedding_documents(
+                    [name] * len(embeddings), embeddings, datetime.now()
+                )
+            )
+            self._update_prototype(name, organization, embeddings)
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Save a batch of embeddings of any number of people in two round trips.
+
+        Rows are inserted with one unordered `insert_many` and every affected
+        prototype is updated with one `bulk_write`.
+
+        Args:
+            organization (str): Organization the people belong to
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not len(names):
+            return
+        try:
+            if not self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+
+            db = self._get_organization_db(organization)
+            db["embeddings"].insert_many(
+                build_embedding_documents(names, embeddings, datetime.now()),
+                ordered=False,
+            )
+            db["prototypes"].bulk_write(
+                build_prototype_operations(names, embeddings), ordered=False
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream every stored embedding of an organization in cursor batches.
+
+        Args:
+            organization (str): Organization to read
+            batch_size (int, optional): Rows per batch and cursor batch size.
+                Defaults to 10000.
+
+        Yields:
+            Tuple[List[str], np.ndarray]: Names and N x D float32 embeddings of each batch
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            cursor = self._get_organization_db(organization)["embeddings"].find(
+                {}, EMBEDDING_PROJECTION, batch_size=batch_size
+            )
+            batcher = EmbeddingBatcher(batch_size)
+            for document in cursor:
+                batch = batcher.add(document)
+                if batch is not None:
+                    yield batch
+            batch = batcher.flush()
+            if batch is not None:
+                yield batch
+        except Exception as e:
+            raise RuntimeError(f"Failed to export embeddings: {str(e)}")
+
+    def _update_prototype(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Fold newly saved embeddings into the person's prototype.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Embeddings that were just saved
+        """
+        self._get_organization_db(organization)["prototypes"].update_one(
+            {"name": name}, build_prototype_update(embeddings), upsert=True
+        )
+
+    def rebuild_prototypes(self, organization: str, batch_size: int = 1000) -> int:
+        """
+        Recompute every prototype of an organization from its stored embeddings.
+
+        Used to backfill organizations created before prototypes existed. Embeddings
+        are streamed in cursor batches and only one running sum per person is kept
+        in memory. Prototypes are replaced one person at a time, so searches never
+        see an empty collection. People enrolled while it runs keep their
+        incrementally updated prototype until the next rebuild.
+
+        Args:
+            organization (str): Organization name
+            batch_size (int, optional): Cursor batch size. Defaults to 1000.
+
+        Returns:
+            int: Number of prototypes recomputed
+        """
+        self._create_prototypes_collection(organization)
+        db = self._get_organization_db(organization)
+
+        stored = {
+            document["name"]: document.get("count")
+            for document in db["prototypes"].find({}, {"_id": 0, "name": 1, "count": 1})
+        }
+        accumulator = PrototypeAccumulator()
+        for document in db["embeddings"].find(
+            {}, EMBEDDING_PROJECTION, batch_size=batch_size
+        ):
+            accumulator.add(document)
+
+        documents = accumulator.documents()
+        operations = build_prototype_rebuild(documents, stored)
+        for start in range(0, len(operations), batch_size):
+            db["prototypes"].bulk_write(
+                operations[start : start + batch_size], ordered=False
+            )
+
+        logger.info(f"Rebuilt {len(documents)} prototypes for '{organization}'")
+        return len(documents)
+
+    def rebuild_index(self, organization: str) -> int:
+        """
+        Rebuild the prototypes of an organization.
+
+        Args:
+            organization (str): Organization to re-index
+
+        Returns:
+            int: Number of prototypes recomputed
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or rebuilding fails
+        """
+        if not self.database_exists(organization):
+            raise RuntimeError(f"Database '{organization}' does not exist.")
+        try:
+            return self.rebuild_prototypes(organization)
+        except Exception as e:
+            raise RuntimeError(f"Failed to rebuild index: {str(e)}")
+
+    def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        """
+        Get every stored embedding of a person.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+
+        Returns:
+            List[np.ndarray]: Stored face embedding vectors, possibly empty
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            cursor = self._get_organization_db(organization)["embeddings"].find(
+                {"name": name}, {"_id": 0, "embedding": 1}
+            )
+            return [np.array(document["embedding"]) for document in cursor]
+        except Exception as e:
+            raise RuntimeError(f"Failed to get embeddings: {str(e)}")
+
+    def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get the settings stored for an organization, such as its quality gate.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name, empty if none were stored
+
+        Raises:
+            RuntimeError: If reading the settings fails
+        """
+        try:
+            document = self._get_organization_db(organization)["settings"].find_one(
+                {"_id": SETTINGS_DOCUMENT_ID}, {"_id": 0}
+            )
+            return document or {}
+        except Exception as e:
+            raise RuntimeError(f"Failed to get organization settings: {str(e)}")
+
+    def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Replace the given settings sections of an organization, keeping the others.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, by section name
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the settings fails
+        """
+        try:
+            if not self.database_exists(organization):
+                raise ValueError(
+                    f"Database '{organization}' does not exist. Create it first."
+                )
+            if not settings:
+                return self.get_organization_settings(organization)
+
+            document = self._get_organization_db(organization)[
+                "settings"
+            ].find_one_and_update(
+                {"_id": SETTINGS_DOCUMENT_ID},
+                {"$set": settings},
+                projection={"_id": 0},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return document
+        except Exception as e:
+            raise RuntimeError(f"Failed to update organization settings: {str(e)}")
+
+    def _check_searchable(self, organization: str) -> bool:
+        """
+        Ensure an organization's database exists and check its vector index before searching.
+
+        Args:
+            organization (str): Organization to search within
+
+        Returns:
+            bool: True if the vector index is queryable, False while it is building
+
+        Raises:
+            ValueError: If the organization doesn't exist
+            SearchUnavailableError: If the vector index failed or doesn't exist
+        """
+        # Check if collection exists
+        if not self.database_exists(organization):
+            raise ValueError(
+                f"Database '{organization}' does not exist. Create it first."
+            )
+        state = self.index_state(organization, "face_embbedings")
+        return not needs_exact_search(state, organization)
+
+    def _search_exact(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search an organization whose vector index is not queryable yet.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+
+        Raises:
+            SearchUnavailableError: If the gallery is too large to scan
+        """
+        documents = list(
+            self._get_organization_db(organization)["embeddings"]
+            .find({}, EMBEDDING_PROJECTION)
+            .limit(self.exact_search_max_rows + 1)
+        )
+        check_exact_scan(documents, self.exact_search_max_rows, organization)
+        return search_exactly(embeddings, documents, threshold)
+
+    def _uses_prototypes(self, organization: str) -> bool:
+        """
+        Check whether searches for an organization should go through prototypes.
+
+        Args:
+            organization (str): Organization to search within
+
+        Returns:
+            bool: True if two-stage search is enabled and the prototype index is queryable
+        """
+        return self.two_stage_search and self.vector_index_ready(
+            organization, "face_prototypes", "prototypes"
+        )
+
+    def _search(
+        self,
+        embedding: np.ndarray,
+        threshold: float,
+        organization: str,
+        use_prototypes: bool,
+    ) -> VectorSearchResult:
+        """
+        Run the vector search for a single embedding.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+            use_prototypes (bool): Search the prototypes first, as decided once per
+                call by `_uses_prototypes`
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+        """
+        if use_prototypes:
+            return self._search_two_stage(embedding, threshold, organization)
+
+        results = list(
+            self._get_organization_db(organization)["embeddings"].aggregate(
+                build_vector_search_pipeline(embedding)
+            )
+        )
+        return parse_vector_search_result(results, threshold)
+
+    def _search_two_stage(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        """
+        Search prototypes first, then optionally re-rank the candidates' embeddings.
+
+        The prototype index holds one vector per person, so the ANN stage scans a
+        gallery smaller by the average number of photos per person.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+        """
+        db = self._get_organization_db(organization)
+        candidates = list(
+            db["prototypes"].aggregate(
+                build_prototype_search_pipeline(embedding, self.prototype_candidates)
+            )
+        )
+        if not self.rerank or not candidates:
+            return parse_vector_search_result(candidates, threshold)
+
+        documents = list(
+            db["embeddings"].find(
+                {"name": {"$in": [candidate["name"] for candidate in candidates]}},
+                EMBEDDING_PROJECTION,
+            )
+        )
+        return rerank_by_embeddings(embedding, documents, threshold)
+
     def vector_search(
         self, embedding: np.ndarray, threshold: float, organization: str
     ) -> VectorSearchResult:
@@ -331,60 +910,59 @@ class MongoDBFaceDatabase(FaceDatabase):
             VectorSearchResult: Result containing the name of the matched person and similarity score
 
         Raises:
-            ValueError: If organization or vector index doesn't exist
+            SearchUnavailableError: If the organization's index cannot serve searches
             RuntimeError: If search operation fails
         """
         try:
-            # Check if collection exists
-            if not self.database_exists(organization):
-                raise ValueError(
-                    f"Database '{organization}' does not exist. Create it first."
-                )
+            if not self._check_searchable(organization):
+                return self._search_exact([embedding], threshold, organization)[0]
+            use_prototypes = self._uses_prototypes(organization)
+            return self._search(embedding, threshold, organization, use_prototypes)
+        except SearchUnavailableError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
 
-            # Check if index exists
-            index_name = f"face_embbedings"
-            if not self.vector_index_exists(organization, index_name):
-                raise ValueError(
-                    f"Vector index '{index_name}' does not exist for '{organization}'. Create it first."
-                )
+    def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search for the closest match of each embedding in a batch.
 
-            pipeline = [
-                {
-                    "$vectorSearch": {
-                        "index": f"face_embbedings",
-                        "exact": False,
-                        "numCandidates": 20,
-                        "path": "embedding",
-                        "queryVector": embedding.tolist(),
-                        "limit": 1,
-                    }
-                },
-                {
-                    "$project": {
-                        "_id": 0,
-                        "name": 1,
-                        "score": {"$meta": "vectorSearchScore"},
-                    }
-                },
-            ]
-
-            results = list(
-                self._get_organization_db(organization)["embeddings"].aggregate(
-                    pipeline
-                )
-            )
+        The organization and index checks run once for the whole batch, and the
+        `$vectorSearch` aggregations are issued concurrently over the client's
+        connection pool. While the index is building, the organization's
+        embeddings are read once and scanned for every query, up to
+        `exact_search_max_rows` of them.
 
-            if not results:  # Check if no results
-                return VectorSearchResult(name="unknown", distance=None)
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
 
-            best_match = results[0]  # Get the first (and only) result
-            if best_match["score"] < threshold:
-                return VectorSearchResult(name="unknown", distance=best_match["score"])
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
 
-            return VectorSearchResult(
-                name=best_match["name"], distance=best_match["score"]
+        Raises:
+            SearchUnavailableError: If the organization's index cannot serve searches
+            RuntimeError: If search operation fails
+        """
+        if not embeddings:
+            return []
+        try:
+            if not self._check_searchable(organization):
+                return self._search_exact(embeddings, threshold, organization)
+            use_prototypes = self._uses_prototypes(organization)
+            return list(
+                self._search_executor.map(
+                    lambda embedding: self._search(
+                        embedding, threshold, organization, use_prototypes
+                    ),
+                    embeddings,
+                )
             )
-
+        except SearchUnavailableError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
 
@@ -400,12 +978,7 @@ class MongoDBFaceDatabase(FaceDatabase):
             RuntimeError: If getting organizations fails
         """
         try:
-            all_dbs = self.client.list_database_names()
-
-            system_dbs = ["admin", "local", "config"]
-            organizations = [db for db in all_dbs if db not in system_dbs]
-
-            return organizations
+            return organization_names(self.client.list_database_names())
         except Exception as e:
             logger.error(f"Failed to get organizations: {e}")
             raise RuntimeError(f"Failed to get organizations: {str(e)}")
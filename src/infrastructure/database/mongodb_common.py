@@ -0,0 +1,650 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import bcrypt
+import numpy as np
+from pymongo.errors import ExecutionTimeout, OperationFailure
+from pymongo.operations import DeleteOne, ReplaceOne, SearchIndexModel, UpdateOne
+
+from src.domain.interfaces import SearchUnavailableError
+from src.domain.models import VectorSearchResult
+
+# Organization settings live in a single document of the `settings` collection
+SETTINGS_DOCUMENT_ID = "organization"
+
+# Vector indexes of an organization as (collection, index name); searches need the
+# first one, the second only serves two-stage search
+ORGANIZATION_INDEXES = (("embeddings", "face_embbedings"), ("prototypes", "face_prototypes"))
+
+# Provisioning states reported for an organization
+READY = "ready"
+PROVISIONING = "provisioning"
+FAILED = "failed"
+
+# Atlas index state reported for an index that hasn't been created
+INDEX_MISSING = "DOES_NOT_EXIST"
+
+# Index states during which searches scan the organization's embeddings exactly
+EXACT_SEARCH_STATES = ("PENDING", "BUILDING")
+
+# Atlas vector index over the `embedding` field of embeddings and prototypes
+VECTOR_SEARCH_INDEX_DEFINITION = {
+    "fields": [
+        {
+            "type": "vector",
+            "path": "embedding",
+            "similarity": "cosine",
+            "numDimensions": 512,
+        },
+    ]
+}
+
+# Fields read whenever embeddings are scanned or exported
+EMBEDDING_PROJECTION = {"_id": 0, "name": 1, "embedding": 1}
+
+# Databases of a MongoDB deployment that are never organizations
+SYSTEM_DATABASES = ("admin", "local", "config")
+
+
+def build_search_index_model(index_name: str, definition: dict) -> SearchIndexModel:
+    """
+    Build the model of a vector search index.
+
+    Args:
+        index_name (str): Name of the index
+        definition (dict): Index definition, e.g. VECTOR_SEARCH_INDEX_DEFINITION
+
+    Returns:
+        SearchIndexModel: Model for `create_search_index`
+    """
+    return SearchIndexModel(definition=definition, name=index_name, type="vectorSearch")
+
+
+def indexes_settled(states: Dict[str, str]) -> bool:
+    """
+    Check whether every index build is over, successfully or not.
+
+    Args:
+        states (Dict[str, str]): State of each index by name
+
+    Returns:
+        bool: True once no index is still pending or building
+    """
+    return all(state in ("READY", "FAILED") for state in states.values())
+
+
+def needs_exact_search(state: str, organization: str) -> bool:
+    """
+    Decide how to search an organization given the state of its embeddings index.
+
+    Args:
+        state (str): State of the embeddings vector index
+        organization (str): Organization to search within
+
+    Returns:
+        bool: False if `$vectorSearch` can be used, True while the index is
+            still being built and embeddings must be scanned exactly
+
+    Raises:
+        SearchUnavailableError: If the index failed to build or doesn't exist
+    """
+    if state == "READY":
+        return False
+    if state in EXACT_SEARCH_STATES:
+        return True
+    if state == INDEX_MISSING:
+        raise SearchUnavailableError(
+            f"Organization '{organization}' has no vector search index."
+        )
+    raise SearchUnavailableError(
+        f"Vector search index of '{organization}' is unusable ({state})."
+    )
+
+
+def check_exact_scan(documents: list, max_rows: int, organization: str) -> None:
+    """
+    Refuse exact searches over galleries too large to scan per request.
+
+    Args:
+        documents (list): Embedding documents read with a limit of `max_rows + 1`
+        max_rows (int): Largest number of embeddings scanned by an exact search
+        organization (str): Organization being searched
+
+    Raises:
+        SearchUnavailableError: If the gallery holds more than `max_rows` embeddings
+    """
+    if len(documents) > max_rows:
+        raise SearchUnavailableError(
+            f"Vector search index of '{organization}' is still building and its "
+            f"gallery exceeds {max_rows} embeddings; retry once it is ready."
+        )
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """
+    Check whether a failed MongoDB call would fail again if retried.
+
+    Network errors and timeouts clear on their own; a command the server rejects,
+    e.g. on a dropped database or a deployment without Atlas Search, does not.
+
+    Args:
+        error (BaseException): Raised error, possibly wrapping the driver's error
+
+    Returns:
+        bool: True if the driver's error was an operation failure other than a timeout
+    """
+    cause = error.__cause__ or error
+    return isinstance(cause, OperationFailure) and not isinstance(
+        cause, ExecutionTimeout
+    )
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash a new API key for storage.
+
+    Args:
+        api_key (str): Plain API key
+
+    Returns:
+        str: bcrypt hash of the key
+    """
+    return bcrypt.hashpw(api_key.encode(), bcrypt.gensalt()).decode()
+
+
+def check_api_key(api_key: str, key_doc: dict) -> bool:
+    """
+    Check a plain API key against its stored document.
+
+    Args:
+        api_key (str): Plain API key
+        key_doc (dict): Stored API key document holding the bcrypt hash in `key`
+
+    Returns:
+        bool: True if the key matches the hash
+    """
+    return bcrypt.checkpw(api_key.encode("utf-8"), key_doc["key"].encode("utf-8"))
+
+
+def build_api_key_document(user: str, api_key_name: str, organization: str) -> dict:
+    """
+    Build the fields of a new API key document, without its hash.
+
+    Args:
+        user (str): Username owning the key
+        api_key_name (str): Name/identifier of the key
+        organization (str): Organization the key belongs to
+
+    Returns:
+        dict: Document fields, also used to build the returned APIKey
+    """
+    return {
+        "user": user,
+        "api_key_name": api_key_name,
+        "organization": organization,
+        "created_at": datetime.now(),
+        "last_used": None,
+        "is_active": True,
+    }
+
+
+def organization_names(database_names: List[str]) -> List[str]:
+    """
+    Filter the system databases out of a deployment's database names.
+
+    Args:
+        database_names (List[str]): Names returned by `list_database_names`
+
+    Returns:
+        List[str]: Organization names
+    """
+    return [name for name in database_names if name not in SYSTEM_DATABASES]
+
+
+def parse_index_state(indexes: list) -> str:
+    """
+    Get the state of a search index from `list_search_indexes` output.
+
+    Args:
+        indexes (list): Index descriptions returned for a single index name
+
+    Returns:
+        str: "READY" once the index can be queried, otherwise the Atlas status
+            (e.g. "PENDING", "BUILDING", "FAILED") or INDEX_MISSING
+    """
+    if not indexes:
+        return INDEX_MISSING
+    index = indexes[0]
+    if index.get("queryable"):
+        return "READY"
+    return index.get("status", "PENDING")
+
+
+def summarize_index_states(states: Dict[str, str]) -> str:
+    """
+    Derive an organization's provisioning state from its index states.
+
+    Args:
+        states (Dict[str, str]): State of each index by name
+
+    Returns:
+        str: FAILED if an index failed, READY once the embeddings index is
+            queryable, PROVISIONING otherwise
+    """
+    if "FAILED" in states.values():
+        return FAILED
+    if states.get("face_embbedings") == "READY":
+        return READY
+    return PROVISIONING
+
+
+def search_exactly(
+    embeddings: List[np.ndarray], documents: list, threshold: float
+) -> List[VectorSearchResult]:
+    """
+    Search a gallery without a vector index, while the index is still building.
+
+    Args:
+        embeddings (List[np.ndarray]): Query face embedding vectors
+        documents (list): Every embedding document of the organization
+        threshold (float): Similarity threshold for matching
+
+    Returns:
+        List[VectorSearchResult]: One search result per embedding, in input order
+    """
+    return [rerank_by_embeddings(embedding, documents, threshold) for embedding in embeddings]
+
+
+def build_vector_search_pipeline(
+    embedding: np.ndarray, filter: Optional[dict] = None
+) -> list:
+    """
+    Build the `$vectorSearch` aggregation pipeline for a single query embedding.
+
+    Args:
+        embedding (np.ndarray): Query face embedding vector
+        filter (Optional[dict], optional): Pre-filter on indexed filter fields, such as
+            the organization in the shared layout. Defaults to None.
+
+    Returns:
+        list: Aggregation pipeline returning the best match name and score
+    """
+    vector_search = {
+        "index": f"face_embbedings",
+        "exact": False,
+        "numCandidates": 20,
+        "path": "embedding",
+        "queryVector": embedding.tolist(),
+        "limit": 1,
+    }
+    if filter:
+        vector_search["filter"] = filter
+    return [
+        {"$vectorSearch": vector_search},
+        {
+            "$project": {
+                "_id": 0,
+                "name": 1,
+                "score": {"$meta": "vectorSearchScore"},
+            }
+        },
+    ]
+
+
+def parse_vector_search_result(results: list, threshold: float) -> VectorSearchResult:
+    """
+    Convert `$vectorSearch` output into a VectorSearchResult.
+
+    Args:
+        results (list): Documents returned by the vector search pipeline
+        threshold (float): Similarity threshold for matching
+
+    Returns:
+        VectorSearchResult: Result containing the name of the matched person and similarity score
+    """
+    if not results:  # Check if no results
+        return VectorSearchResult(name="unknown", distance=None)
+
+    best_match = results[0]  # Get the first (and only) result
+    if best_match["score"] < threshold:
+        return VectorSearchResult(name="unknown", distance=best_match["score"])
+
+    return VectorSearchResult(name=best_match["name"], distance=best_match["score"])
+
+
+def build_prototype_update(embeddings: List[np.ndarray]) -> list:
+    """
+    Build the update pipeline folding new embeddings into a person's prototype.
+
+    The prototype keeps the running sum and count of the person's unit-normalized
+    embeddings and stores their normalized mean as `embedding`. The update runs
+    server-side in a single upsert, so concurrent enrollments never lose a vector.
+
+    Args:
+        embeddings (List[np.ndarray]): New face embedding vectors of the person
+
+    Returns:
+        list: Aggregation pipeline usable with `update_one(..., upsert=True)`
+    """
+    vectors = np.asarray(embeddings, dtype=np.float64).reshape(len(embeddings), -1)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    delta = vectors.sum(axis=0).tolist()
+
+    return [
+        {
+            "$set": {
+                "count": {"$add": [{"$ifNull": ["$count", 0]}, len(vectors)]},
+                "sum": {
+                    "$map": {
+                        "input": {"$range": [0, len(delta)]},
+                        "as": "i",
+                        "in": {
+                            "$add": [
+                                {"$ifNull": [{"$arrayElemAt": ["$sum", "$$i"]}, 0]},
+                                {"$arrayElemAt": [{"$literal": delta}, "$$i"]},
+                            ]
+                        },
+                    }
+                },
+                "updated_at": "$$NOW",
+            }
+        },
+        {
+            "$set": {
+                "embedding": {
+                    "$let": {
+                        "vars": {
+                            "norm": {
+                                "$sqrt": {
+                                    "$reduce": {
+                                        "input": "$sum",
+                                        "initialValue": 0,
+                                        "in": {
+                                            "$add": [
+                                                "$$value",
+                                                {"$multiply": ["$$this", "$$this"]},
+                                            ]
+                                        },
+                                    }
+                                }
+                            }
+                        },
+                        "in": {
+                            "$map": {
+                                "input": "$sum",
+                                "as": "x",
+                                "in": {"$divide": ["$$x", {"$max": ["$$norm", 1e-12]}]},
+                            }
+                        },
+                    }
+                }
+            }
+        },
+    ]
+
+
+def build_embedding_documents(
+    names: List[str],
+    embeddings: np.ndarray,
+    created_at: datetime,
+    organization: Optional[str] = None,
+) -> List[dict]:
+    """
+    Build the `embeddings` documents of a bulk insert.
+
+    Args:
+        names (List[str]): Person name of each row
+        embeddings (np.ndarray): Embeddings as an N x D array
+        created_at (datetime): Creation time recorded on every document
+        organization (Optional[str], optional): Organization recorded on every document,
+            for collections shared by all organizations. Defaults to None.
+
+    Returns:
+        List[dict]: One document per row
+    """
+    tenant = {"organization": organization} if organization is not None else {}
+    return [
+        {
+            **tenant,
+            "name": name,
+            "embedding": np.asarray(embedding).tolist(),
+            "created_at": created_at,
+        }
+        for name, embedding in zip(names, embeddings)
+    ]
+
+
+def build_prototype_operations(
+    names: List[str], embeddings: np.ndarray, organization: Optional[str] = None
+) -> List[UpdateOne]:
+    """
+    Build one prototype upsert per person present in a bulk insert.
+
+    Args:
+        names (List[str]): Person name of each row
+        embeddings (np.ndarray): Embeddings as an N x D array
+        organization (Optional[str], optional): Organization the prototypes are keyed by,
+            for collections shared by all organizations. Defaults to None.
+
+    Returns:
+        List[UpdateOne]: Operations for a single `bulk_write` on `prototypes`
+    """
+    tenant = {"organization": organization} if organization is not None else {}
+    rows_by_name = {}
+    for name, embedding in zip(names, embeddings):
+        rows_by_name.setdefault(name, []).append(embedding)
+    return [
+        UpdateOne({**tenant, "name": name}, build_prototype_update(rows), upsert=True)
+        for name, rows in rows_by_name.items()
+    ]
+
+
+def build_prototype_rebuild(
+    documents: List[dict], stored: Dict[str, int], organization: Optional[str] = None
+) -> list:
+    """
+    Build the writes swapping stored prototypes for recomputed ones.
+
+    Each person's prototype is replaced in place, so searches keep finding every
+    person while a rebuild runs. A write only applies to a prototype still holding
+    the count read before the embeddings were streamed. One that an enrollment
+    updated meanwhile is kept as is, since the recomputed sum may miss the new
+    embeddings, and is refreshed by the next rebuild.
+
+    Args:
+        documents (List[dict]): Prototype documents from PrototypeAccumulator
+        stored (Dict[str, int]): Count of every stored prototype, read before the
+            embeddings were streamed
+        organization (Optional[str], optional): Organization the prototypes are keyed by,
+            for collections shared by all organizations. Defaults to None.
+
+    Returns:
+        list: Replacements, inserts of new people and deletions of people left without
+            embeddings, for `bulk_write` on `prototypes`
+    """
+    tenant = {"organization": organization} if organization is not None else {}
+    operations = []
+    for document in documents:
+        name = document["name"]
+        if name in stored:
+            operations.append(
+                ReplaceOne({**tenant, "name": name, "count": stored[name]}, document)
+            )
+        else:
+            # Left alone if an enrollment created the prototype first
+            operations.append(
+                UpdateOne(
+                    {**tenant, "name": name}, {"$setOnInsert": document}, upsert=True
+                )
+            )
+    seen = {document["name"] for document in documents}
+    operations.extend(
+        DeleteOne({**tenant, "name": name, "count": count})
+        for name, count in stored.items()
+        if name not in seen
+    )
+    return operations
+
+
+def build_prototype_search_pipeline(
+    embedding: np.ndarray, limit: int, filter: Optional[dict] = None
+) -> list:
+    """
+    Build the `$vectorSearch` pipeline over per-person prototypes.
+
+    Args:
+        embedding (np.ndarray): Query face embedding vector
+        limit (int): Number of candidate people to return
+        filter (Optional[dict], optional): Pre-filter on indexed filter fields.
+            Defaults to None.
+
+    Returns:
+        list: Aggregation pipeline returning candidate names and scores, best first
+    """
+    vector_search = {
+        "index": "face_prototypes",
+        "exact": False,
+        "numCandidates": max(20, limit * 10),
+        "path": "embedding",
+        "queryVector": embedding.tolist(),
+        "limit": limit,
+    }
+    if filter:
+        vector_search["filter"] = filter
+    return [
+        {"$vectorSearch": vector_search},
+        {
+            "$project": {
+                "_id": 0,
+                "name": 1,
+                "score": {"$meta": "vectorSearchScore"},
+            }
+        },
+    ]
+
+
+def rerank_by_embeddings(
+    embedding: np.ndarray, documents: list, threshold: float
+) -> VectorSearchResult:
+    """
+    Pick the best match among candidate people's individual embeddings.
+
+    Scores use Atlas' cosine convention, `(1 + cosine) / 2`, so they are
+    comparable with `$vectorSearch` scores and thresholds.
+
+    Args:
+        embedding (np.ndarray): Query face embedding vector
+        documents (list): Embedding documents with `name` and `embedding` fields
+        threshold (float): Similarity threshold for matching
+
+    Returns:
+        VectorSearchResult: Result containing the name of the matched person and similarity score
+    """
+    if not documents:
+        return VectorSearchResult(name="unknown", distance=None)
+
+    matrix = np.asarray([document["embedding"] for document in documents], dtype=np.float64)
+    query = np.asarray(embedding, dtype=np.float64)
+    cosine = (matrix @ query) / np.maximum(
+        np.linalg.norm(matrix, axis=1) * np.linalg.norm(query), 1e-12
+    )
+    best = int(np.argmax(cosine))
+    return parse_vector_search_result(
+        [{"name": documents[best]["name"], "score": float((1.0 + cosine[best]) / 2.0)}],
+        threshold,
+    )
+
+
+class EmbeddingBatcher:
+    """
+    Group streamed embedding documents into fixed-size batches.
+
+    Args:
+        batch_size (int): Rows per batch
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.names: List[str] = []
+        self.rows: List[list] = []
+
+    def add(self, document: dict) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Add a document, returning the batch it completes.
+
+        Args:
+            document (dict): Document with `name` and `embedding` fields
+
+        Returns:
+            Optional[Tuple[List[str], np.ndarray]]: Names and N x D float32 embeddings
+                of the completed batch, None while it is still filling
+        """
+        self.names.append(document["name"])
+        self.rows.append(document["embedding"])
+        if len(self.names) == self.batch_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Return the partial batch left at the end of the stream.
+
+        Returns:
+            Optional[Tuple[List[str], np.ndarray]]: Names and embeddings of the
+                remaining rows, None if there are none
+        """
+        if not self.names:
+            return None
+        batch = self.names, np.asarray(self.rows, dtype=np.float32)
+        self.names, self.rows = [], []
+        return batch
+
+
+class PrototypeAccumulator:
+    """
+    Recompute per-person prototypes from streamed embedding documents.
+
+    Only one running sum of unit-normalized embeddings per person is kept in memory.
+    """
+
+    def __init__(self):
+        self.sums: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, document: dict) -> None:
+        """
+        Fold an embedding document into its person's running sum.
+
+        Args:
+            document (dict): Document with `name` and `embedding` fields
+        """
+        vector = np.asarray(document["embedding"], dtype=np.float64)
+        vector /= max(np.linalg.norm(vector), 1e-12)
+        name = document["name"]
+        self.sums[name] = self.sums.get(name, 0) + vector
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def documents(self, organization: Optional[str] = None) -> List[dict]:
+        """
+        Build the prototype document of every person seen.
+
+        Args:
+            organization (Optional[str], optional): Organization recorded on every
+                document, for collections shared by all organizations. Defaults to None.
+
+        Returns:
+            List[dict]: One prototype document per person
+        """
+        tenant = {"organization": organization} if organization is not None else {}
+        now = datetime.now()
+        return [
+            {
+                **tenant,
+                "name": name,
+                "sum": total.tolist(),
+                "count": self.counts[name],
+                "embedding": (total / max(np.linalg.norm(total), 1e-12)).tolist(),
+                "updated_at": now,
+            }
+            for name, total in self.sums.items()
+        ]
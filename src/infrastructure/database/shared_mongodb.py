@@ -0,0 +1,903 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import DuplicateKeyError
+from pymongo.server_api import ServerApi
+import secrets
+
+from src.domain.interfaces import AsyncFaceDatabase, SearchUnavailableError
+from src.domain.models import VectorSearchResult, APIKey
+from src.infrastructure.database.mongodb_common import (
+    EMBEDDING_PROJECTION,
+    ORGANIZATION_INDEXES,
+    VECTOR_SEARCH_INDEX_DEFINITION,
+    EmbeddingBatcher,
+    PrototypeAccumulator,
+    build_api_key_document,
+    build_embedding_documents,
+    build_prototype_operations,
+    build_prototype_rebuild,
+    build_prototype_search_pipeline,
+    build_prototype_update,
+    build_search_index_model,
+    build_vector_search_pipeline,
+    check_api_key,
+    check_exact_scan,
+    hash_api_key,
+    indexes_settled,
+    is_permanent_error,
+    needs_exact_search,
+    parse_index_state,
+    parse_vector_search_result,
+    rerank_by_embeddings,
+    search_exactly,
+    summarize_index_states,
+)
+from src.utils.logging import logger
+
+# Collections of the shared database, each holding the documents of every organization
+SHARED_COLLECTIONS = ("organizations", "api_keys", "embeddings", "prototypes")
+
+
+class SharedMongoDBFaceDatabase(AsyncFaceDatabase):
+    """
+    MongoDB implementation of the AsyncFaceDatabase interface with one set of
+    collections shared by every organization.
+
+    The per-organization layout of AsyncMongoDBFaceDatabase gives each tenant its
+    own database and Atlas search indexes, so the number of tenants is bounded by
+    the cluster's search index limit. Here all tenants live in a single database:
+    `organizations` registers each tenant and holds its settings, `api_keys`,
+    `embeddings` and `prototypes` tag every document with its `organization`, and
+    the two vector indexes declare `organization` as a filter field so every
+    search is pre-filtered to a single tenant. Creating an organization is a
+    single insert and builds no index.
+    """
+
+    vector_search_index_definition = {
+        "fields": [
+            *VECTOR_SEARCH_INDEX_DEFINITION["fields"],
+            {"type": "filter", "path": "organization"},
+        ]
+    }
+
+    def __init__(
+        self,
+        connection_string: str,
+        database: str = "faceapi",
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        two_stage_search: bool = False,
+        rerank: bool = True,
+        prototype_candidates: int = 5,
+        index_poll_interval: float = 5.0,
+        index_build_timeout: float = 3600.0,
+        exact_search_max_rows: int = 10000,
+    ):
+        """
+        Initialize the asynchronous MongoDB client.
+
+        Collections and indexes are created on first use; call `verify_connection`
+        from an async context to fail fast on a bad connection string.
+
+        Args:
+            connection_string (str): MongoDB connection string
+            database (str, optional): Database holding every organization. Defaults to "faceapi".
+            max_pool_size (int, optional): Maximum number of pooled connections. Defaults to 100.
+            min_pool_size (int, optional): Minimum number of pooled connections. Defaults to 0.
+            two_stage_search (bool, optional): Search per-person prototypes first instead of
+                every stored embedding. Defaults to False.
+            rerank (bool, optional): Re-rank the candidate people against their individual
+                embeddings in two-stage search. Defaults to True.
+            prototype_candidates (int, optional): Number of people kept by the prototype
+                stage. Defaults to 5.
+            index_poll_interval (float, optional): Seconds between checks of the shared
+                index builds. A state other than ready is also reused by searches
+                for this long. Defaults to 5.0.
+            index_build_timeout (float, optional): Seconds after which an index still
+                building is reported as failed. Defaults to 3600.0.
+            exact_search_max_rows (int, optional): Largest organization gallery scanned
+                exactly while the index builds; larger ones are unsearchable until it is
+                ready. Defaults to 10000.
+        """
+        self.client = AsyncMongoClient(
+            connection_string,
+            server_api=ServerApi("1"),
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+        )
+        self.db = self.client[database]
+        self.organizations: AsyncCollection = self.db["organizations"]
+        self.api_keys: AsyncCollection = self.db["api_keys"]
+        self.embeddings: AsyncCollection = self.db["embeddings"]
+        self.prototypes: AsyncCollection = self.db["prototypes"]
+        self.two_stage_search = two_stage_search
+        self.rerank = rerank
+        self.prototype_candidates = prototype_candidates
+        self.index_poll_interval = index_poll_interval
+        self.index_build_timeout = index_build_timeout
+        self.exact_search_max_rows = exact_search_max_rows
+        # Neither organizations nor search indexes are dropped by this class,
+        # so both are cached once seen
+        self._known_organizations = set()
+        self._known_indexes = set()
+        self._ready_indexes = set()
+        # Indexes whose build outlived `index_build_timeout`
+        self._failed_indexes = set()
+        # Other states are re-read at most once per `index_poll_interval`, so
+        # searches against a building or missing index don't each query Atlas
+        self._pending_states = {}
+        self._index_watchers = set()
+        self._collections_ready = False
+
+    async def verify_connection(self) -> None:
+        """
+        Verify that the MongoDB connection is working.
+
+        Raises:
+            Exception: If connection to MongoDB fails
+        """
+        try:
+            await self.client.admin.command("ping")
+            logger.info("Successfully connected to MongoDB")
+        except Exception as e:
+            logger.error(f"MongoDB connection failed: {e}")
+            raise
+
+    async def vector_index_exists(self, index_name: str, collection: str) -> bool:
+        """
+        Check if a vector search index exists on a shared collection.
+
+        Args:
+            index_name (str): Name of the vector index to check
+            collection (str): Collection holding the index
+
+        Returns:
+            bool: True if the vector index exists, False otherwise
+
+        Raises:
+            RuntimeError: If checking for index existence fails
+        """
+        if (collection, index_name) in self._known_indexes:
+            return True
+        try:
+            cursor = await self.db[collection].list_search_indexes()
+            indexes = await cursor.to_list(None)
+            exists = any(index["name"] == index_name for index in indexes)
+        except Exception as e:
+            raise RuntimeError(f"Failed to verify vector index: {str(e)}")
+
+        if exists:
+            self._known_indexes.add((collection, index_name))
+        return exists
+
+    async def index_state(self, index_name: str, collection: str) -> str:
+        """
+        Get the build state of a shared vector search index.
+
+        Args:
+            index_name (str): Name of the vector index
+            collection (str): Collection holding the index
+
+        Returns:
+            str: "READY" once queryable, "FAILED" if the build timed out,
+                otherwise the Atlas index status
+
+        Raises:
+            RuntimeError: If reading the index state fails
+        """
+        key = (collection, index_name)
+        if key in self._ready_indexes:
+            return "READY"
+        cached = self._pending_states.get(key)
+        if cached is not None and time.monotonic() < cached[1]:
+            state = cached[0]
+        else:
+            try:
+                cursor = await self.db[collection].list_search_indexes(index_name)
+                state = parse_index_state(await cursor.to_list(None))
+            except Exception as e:
+                raise RuntimeError(f"Failed to read vector index state: {str(e)}") from e
+
+            if state == "READY":
+                self._ready_indexes.add(key)
+                self._failed_indexes.discard(key)
+                self._pending_states.pop(key, None)
+                return state
+            self._pending_states[key] = (state, time.monotonic() + self.index_poll_interval)
+        if key in self._failed_indexes:
+            return "FAILED"
+        return state
+
+    async def vector_index_ready(self, index_name: str, collection: str) -> bool:
+        """
+        Check if a shared vector search index can be queried.
+
+        Args:
+            index_name (str): Name of the vector index
+            collection (str): Collection holding the index
+
+        Returns:
+            bool: True if `$vectorSearch` can use the index
+        """
+        return await self.index_state(index_name, collection) == "READY"
+
+    async def _index_states(self) -> Dict[str, str]:
+        return {
+            index_name: await self.index_state(index_name, collection)
+            for collection, index_name in ORGANIZATION_INDEXES
+        }
+
+    async def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        """
+        Report whether the vector indexes serving an organization are built.
+
+        The indexes are shared, so every organization is ready as soon as they are.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: `status` ("ready", "provisioning" or "failed") and the
+                state of each index in `indexes`
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        await self._require_organization(organization)
+        states = await self._index_states()
+        return {"status": summarize_index_states(states), "indexes": states}
+
+    async def _watch_indexes(self) -> None:
+        """
+        Poll the shared index builds until every index is queryable or failed.
+
+        Indexes still building after `index_build_timeout` are reported as failed.
+        Polling stops early if the server rejects the state query.
+        """
+        start = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(self.index_poll_interval)
+            try:
+                states = await self._index_states()
+                if indexes_settled(states):
+                    break
+            except RuntimeError as e:
+                if is_permanent_error(e):
+                    logger.error(f"Stopped watching the shared indexes: {e}")
+                    return
+                logger.warning(f"Cannot read shared index state: {e}")
+            if asyncio.get_running_loop().time() - start >= self.index_build_timeout:
+                self._failed_indexes.update(ORGANIZATION_INDEXES)
+                logger.error(
+                    f"Shared indexes not built after {self.index_build_timeout:.0f}s, "
+                    "marking them failed"
+                )
+                return
+        logger.info(f"Shared indexes settled: {states}")
+
+    async def ensure_collections(self) -> None:
+        """
+        Create the shared collections, their indexes and vector indexes if missing.
+
+        Runs once per process, on the first organization created, and is safe to
+        run concurrently from several processes. Index builds are not awaited;
+        searches scan embeddings exactly until the embeddings index is queryable.
+        """
+        if self._collections_ready:
+            return
+        existing = await self.db.list_collection_names()
+        for collection in SHARED_COLLECTIONS:
+            if collection not in existing:
+                await self.db.create_collection(collection)
+
+        await self.api_keys.create_index(
+            [("organization", 1), ("user", 1), ("api_key_name", 1)], unique=True
+        )
+        await self.embeddings.create_index([("organization", 1), ("name", 1)])
+        await self.prototypes.create_index(
+            [("organization", 1), ("name", 1)], unique=True
+        )
+        created = False
+        for collection, index_name in ORGANIZATION_INDEXES:
+            if not await self.vector_index_exists(index_name, collection):
+                logger.info(f"Creating shared vector index '{index_name}'")
+                await self.db[collection].create_search_index(
+                    build_search_index_model(
+                        index_name, self.vector_search_index_definition
+                    )
+                )
+                created = True
+        if created:
+            # Keep a reference, or the task could be garbage collected while it runs
+            watcher = asyncio.create_task(self._watch_indexes())
+            self._index_watchers.add(watcher)
+            watcher.add_done_callback(self._index_watchers.discard)
+        self._collections_ready = True
+
+    async def organization_exists(self, organization: str) -> bool:
+        """
+        Check if an organization is registered.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            bool: True if the organization exists, False otherwise
+        """
+        if organization in self._known_organizations:
+            return True
+        exists = await self.organizations.count_documents({"_id": organization}, limit=1)
+        if exists:
+            self._known_organizations.add(organization)
+        return bool(exists)
+
+    async def _require_organization(self, organization: str) -> None:
+        if not await self.organization_exists(organization):
+            raise ValueError(
+                f"Organization '{organization}' does not exist. Create it first."
+            )
+
+    async def create_organization(self, organization: str) -> bool:
+        """
+        Register a new organization.
+
+        Args:
+            organization (str): Name of the organization to create
+
+        Returns:
+            bool: True if creation was successful or organization already exists
+        """
+        await self.ensure_collections()
+        try:
+            await self.organizations.insert_one(
+                {"_id": organization, "created_at": datetime.now(), "settings": {}}
+            )
+        except DuplicateKeyError:
+            logger.info(f"Organization '{organization}' already exists.")
+        self._known_organizations.add(organization)
+        return True
+
+    async def generate_api_key(
+        self, user: str, api_key_name: str, organization: str
+    ) -> APIKey:
+        """
+        Generate a new API key for a user in an organization.
+
+        Args:
+            user (str): Username requesting the API key
+            api_key_name (str): Name/identifier for the API key
+            organization (str): Organization the key is associated with
+
+        Returns:
+            APIKey: Generated API key information
+
+        Raises:
+            ValueError: If organization doesn't exist or API key already exists
+            RuntimeError: If API key creation fails
+        """
+        await self._require_organization(organization)
+
+        api_key = secrets.token_urlsafe(32)
+        # bcrypt is deliberately slow; keep it off the event loop
+        hashed_key = await asyncio.to_thread(hash_api_key, api_key)
+
+        api_key_doc = build_api_key_document(user, api_key_name, organization)
+        try:
+            await self.api_keys.insert_one({**api_key_doc, "key": hashed_key})
+        except DuplicateKeyError:
+            raise ValueError(
+                f"API key for '{user}' with name '{api_key_name}' already exists in '{organization}'."
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create API key: {str(e)}")
+        logger.info(f"API key generated for '{user}' in organization '{organization}'")
+
+        return APIKey(**api_key_doc, key=api_key)
+
+    async def validate_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Validate if an API key is authentic and active.
+
+        Args:
+            api_key (str): The API key to validate
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if the API key is valid, False otherwise
+
+        Raises:
+            ValueError: If organization doesn't exist
+        """
+        if not await self.organization_exists(organization):
+            raise ValueError(f"Organization '{organization}' does not exist.")
+
+        key_doc = await self.api_keys.find_one(
+            {
+                "organization": organization,
+                "user": user,
+                "api_key_name": api_key_name,
+                "is_active": True,
+            }
+        )
+        if not key_doc:
+            logger.info(
+                f"No API key '{api_key_name}' found for user '{user}' in organization '{organization}'"
+            )
+            return False
+
+        is_valid = await asyncio.to_thread(check_api_key, api_key, key_doc)
+        if is_valid:
+            await self.api_keys.update_one(
+                {"_id": key_doc["_id"]}, {"$set": {"last_used": datetime.now()}}
+            )
+        else:
+            logger.info(
+                f"Hash mismatch for API key '{api_key_name}' of user '{user}' in organization '{organization}'"
+            )
+
+        return is_valid
+
+    async def revoke_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        """
+        Revoke an existing API key.
+
+        Args:
+            api_key (str): The API key to revoke
+            user (str): Username that owns the key
+            api_key_name (str): Name/identifier of the API key
+            organization (str): Organization the key belongs to
+
+        Returns:
+            bool: True if revocation was successful, False otherwise
+        """
+        if not await self.validate_api_key(api_key, user, api_key_name, organization):
+            return False
+
+        logger.info(f"Revoking API key for {user} in organization '{organization}'")
+        await self.api_keys.delete_one(
+            {"organization": organization, "user": user, "api_key_name": api_key_name}
+        )
+        return True
+
+    async def save_embedding(
+        self, name: str, organization: str, embedding: np.ndarray
+    ) -> None:
+        """
+        Save a face embedding to the database.
+
+        Args:
+            name (str): Name of the person associated with the embedding
+            organization (str): Organization the person belongs to
+            embedding (np.ndarray): Face embedding vector to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embedding fails
+        """
+        try:
+            await self._require_organization(organization)
+            [document] = build_embedding_documents(
+                [name], [embedding], datetime.now(), organization
+            )
+            await self.embeddings.insert_one(document)
+            await self._update_prototype(name, organization, [embedding])
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embedding: {str(e)}")
+
+    async def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Save several face embeddings of the same person with a single bulk insert.
+
+        Args:
+            name (str): Name of the person associated with the embeddings
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Face embedding vectors to save
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not embeddings:
+            return
+        try:
+            await self._require_organization(organization)
+            await self.embeddings.insert_many(
+                build_embedding_documents(
+                    [name] * len(embeddings), embeddings, datetime.now(), organization
+                )
+            )
+            await self._update_prototype(name, organization, embeddings)
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    async def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Save a batch of embeddings of any number of people in two round trips.
+
+        Args:
+            organization (str): Organization the people belong to
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the embeddings fails
+        """
+        if not len(names):
+            return
+        try:
+            await self._require_organization(organization)
+            await self.embeddings.insert_many(
+                build_embedding_documents(names, embeddings, datetime.now(), organization),
+                ordered=False,
+            )
+            await self.prototypes.bulk_write(
+                build_prototype_operations(names, embeddings, organization), ordered=False
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to save embeddings: {str(e)}")
+
+    async def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> AsyncIterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream every stored embedding of an organization in cursor batches.
+
+        Args:
+            organization (str): Organization to read
+            batch_size (int, optional): Rows per batch and cursor batch size.
+                Defaults to 10000.
+
+        Yields:
+            Tuple[List[str], np.ndarray]: Names and N x D float32 embeddings of each batch
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            cursor = self.embeddings.find(
+                {"organization": organization}, EMBEDDING_PROJECTION, batch_size=batch_size
+            )
+            batcher = EmbeddingBatcher(batch_size)
+            async for document in cursor:
+                batch = batcher.add(document)
+                if batch is not None:
+                    yield batch
+            batch = batcher.flush()
+            if batch is not None:
+                yield batch
+        except Exception as e:
+            raise RuntimeError(f"Failed to export embeddings: {str(e)}")
+
+    async def _update_prototype(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        """
+        Fold newly saved embeddings into the person's prototype.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Embeddings that were just saved
+        """
+        await self.prototypes.update_one(
+            {"organization": organization, "name": name},
+            build_prototype_update(embeddings),
+            upsert=True,
+        )
+
+    async def rebuild_index(self, organization: str, batch_size: int = 1000) -> int:
+        """
+        Recompute every prototype of an organization from its stored embeddings.
+
+        The shared vector indexes cover every organization and are maintained by
+        Atlas, so only the organization's prototypes are rebuilt. They are replaced
+        one person at a time, so searches never see the organization without
+        prototypes. People enrolled while it runs keep their incrementally updated
+        prototype until the next rebuild.
+
+        Args:
+            organization (str): Organization to re-index
+            batch_size (int, optional): Cursor batch size. Defaults to 1000.
+
+        Returns:
+            int: Number of prototypes recomputed
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or rebuilding fails
+        """
+        if not await self.organization_exists(organization):
+            raise RuntimeError(f"Organization '{organization}' does not exist.")
+        try:
+            tenant = {"organization": organization}
+            stored = {
+                document["name"]: document.get("count")
+                async for document in self.prototypes.find(
+                    tenant, {"_id": 0, "name": 1, "count": 1}
+                )
+            }
+            accumulator = PrototypeAccumulator()
+            async for document in self.embeddings.find(
+                tenant, EMBEDDING_PROJECTION, batch_size=batch_size
+            ):
+                accumulator.add(document)
+
+            documents = accumulator.documents(organization)
+            operations = build_prototype_rebuild(documents, stored, organization)
+            for start in range(0, len(operations), batch_size):
+                await self.prototypes.bulk_write(
+                    operations[start : start + batch_size], ordered=False
+                )
+        except Exception as e:
+            raise RuntimeError(f"Failed to rebuild index: {str(e)}")
+
+        logger.info(f"Rebuilt {len(documents)} prototypes for '{organization}'")
+        return len(documents)
+
+    async def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        """
+        Get every stored embedding of a person.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+
+        Returns:
+            List[np.ndarray]: Stored face embedding vectors, possibly empty
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        try:
+            cursor = self.embeddings.find(
+                {"organization": organization, "name": name}, {"_id": 0, "embedding": 1}
+            )
+            return [np.array(document["embedding"]) async for document in cursor]
+        except Exception as e:
+            raise RuntimeError(f"Failed to get embeddings: {str(e)}")
+
+    async def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get the settings stored for an organization, such as its quality gate.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name, empty if none were stored
+
+        Raises:
+            RuntimeError: If reading the settings fails
+        """
+        try:
+            document = await self.organizations.find_one(
+                {"_id": organization}, {"_id": 0, "settings": 1}
+            )
+            return (document or {}).get("settings") or {}
+        except Exception as e:
+            raise RuntimeError(f"Failed to get organization settings: {str(e)}")
+
+    async def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Replace the given settings sections of an organization, keeping the others.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, by section name
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            RuntimeError: If the organization doesn't exist or saving the settings fails
+        """
+        try:
+            await self._require_organization(organization)
+            if not settings:
+                return await self.get_organization_settings(organization)
+
+            document = await self.organizations.find_one_and_update(
+                {"_id": organization},
+                {"$set": {f"settings.{section}": value for section, value in settings.items()}},
+                projection={"_id": 0, "settings": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            return document["settings"]
+        except Exception as e:
+            raise RuntimeError(f"Failed to update organization settings: {str(e)}")
+
+    async def _check_searchable(self, organization: str) -> bool:
+        """
+        Ensure an organization exists and check the shared vector index before searching.
+
+        Args:
+            organization (str): Organization to search within
+
+        Returns:
+            bool: True if the vector index is queryable, False while it is building
+
+        Raises:
+            ValueError: If the organization doesn't exist
+            SearchUnavailableError: If the vector index failed or doesn't exist
+        """
+        await self._require_organization(organization)
+        state = await self.index_state("face_embbedings", "embeddings")
+        return not needs_exact_search(state, organization)
+
+    async def _search_exact(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search an organization while the shared vector index is not queryable yet.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+
+        Raises:
+            SearchUnavailableError: If the gallery is too large to scan
+        """
+        documents = await (
+            self.embeddings.find({"organization": organization}, EMBEDDING_PROJECTION)
+            .limit(self.exact_search_max_rows + 1)
+            .to_list(None)
+        )
+        check_exact_scan(documents, self.exact_search_max_rows, organization)
+        return search_exactly(embeddings, documents, threshold)
+
+    async def _uses_prototypes(self) -> bool:
+        """
+        Check whether searches should go through prototypes.
+
+        Returns:
+            bool: True if two-stage search is enabled and the prototype index is queryable
+        """
+        return self.two_stage_search and await self.vector_index_ready(
+            "face_prototypes", "prototypes"
+        )
+
+    async def _search(
+        self,
+        embedding: np.ndarray,
+        threshold: float,
+        organization: str,
+        use_prototypes: bool,
+    ) -> VectorSearchResult:
+        """
+        Run the vector search for a single embedding, restricted to one organization.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+            use_prototypes (bool): Search the prototypes first, as decided once per
+                call by `_uses_prototypes`
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+        """
+        tenant = {"organization": organization}
+        if use_prototypes:
+            cursor = await self.prototypes.aggregate(
+                build_prototype_search_pipeline(
+                    embedding, self.prototype_candidates, filter=tenant
+                )
+            )
+            candidates = await cursor.to_list(None)
+            if not self.rerank or not candidates:
+                return parse_vector_search_result(candidates, threshold)
+
+            documents = await self.embeddings.find(
+                {**tenant, "name": {"$in": [candidate["name"] for candidate in candidates]}},
+                EMBEDDING_PROJECTION,
+            ).to_list(None)
+            return rerank_by_embeddings(embedding, documents, threshold)
+
+        cursor = await self.embeddings.aggregate(
+            build_vector_search_pipeline(embedding, filter=tenant)
+        )
+        return parse_vector_search_result(await cursor.to_list(None), threshold)
+
+    async def vector_search(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        """
+        Search for the closest match to the provided embedding.
+
+        Args:
+            embedding (np.ndarray): Query face embedding vector
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            VectorSearchResult: Result containing the name of the matched person and similarity score
+
+        Raises:
+            SearchUnavailableError: If the shared index cannot serve searches
+            RuntimeError: If the organization is missing, or the search fails
+        """
+        try:
+            if not await self._check_searchable(organization):
+                [result] = await self._search_exact([embedding], threshold, organization)
+                return result
+            use_prototypes = await self._uses_prototypes()
+            return await self._search(embedding, threshold, organization, use_prototypes)
+        except SearchUnavailableError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
+
+    async def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        """
+        Search for the closest match of each embedding in a batch.
+
+        Args:
+            embeddings (List[np.ndarray]): Query face embedding vectors
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+
+        Returns:
+            List[VectorSearchResult]: One search result per embedding, in input order
+
+        Raises:
+            SearchUnavailableError: If the shared index cannot serve searches
+            RuntimeError: If search operation fails
+        """
+        if not embeddings:
+            return []
+        try:
+            if not await self._check_searchable(organization):
+                return await self._search_exact(embeddings, threshold, organization)
+            use_prototypes = await self._uses_prototypes()
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._search(embedding, threshold, organization, use_prototypes)
+                        for embedding in embeddings
+                    )
+                )
+            )
+        except SearchUnavailableError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to search similar embeddings: {str(e)}")
+
+    async def get_organizations(self) -> List[str]:
+        """
+        Get the names of all registered organizations.
+
+        Returns:
+            List[str]: List of organization names
+
+        Raises:
+            RuntimeError: If getting organizations fails
+        """
+        try:
+            return [
+                document["_id"]
+                async for document in self.organizations.find({}, {"_id": 1})
+            ]
+        except Exception as e:
+            logger.error(f"Failed to get organizations: {e}")
+            raise RuntimeError(f"Failed to get organizations: {str(e)}")
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+
+from src.domain.interfaces import AsyncFaceDatabase, FaceDatabase
+from src.domain.models import VectorSearchResult, APIKey
+
+
+class ThreadedFaceDatabase(AsyncFaceDatabase):
+    """
+    Adapter exposing a synchronous FaceDatabase through the AsyncFaceDatabase interface.
+
+    Every call runs in the default thread pool executor, so blocking drivers
+    never stall the event loop.
+    """
+
+    def __init__(self, database: FaceDatabase):
+        """
+        Wrap a synchronous database implementation.
+
+        Args:
+            database (FaceDatabase): Synchronous database to delegate to
+        """
+        self.database = database
+
+    async def create_organization(self, organization: str) -> bool:
+        return await asyncio.to_thread(self.database.create_organization, organization)
+
+    async def save_embedding(
+        self, name: str, organization: str, embedding: np.ndarray
+    ) -> None:
+        await asyncio.to_thread(
+            self.database.save_embedding, name, organization, embedding
+        )
+
+    async def save_embeddings(
+        self, name: str, organization: str, embeddings: List[np.ndarray]
+    ) -> None:
+        await asyncio.to_thread(
+            self.database.save_embeddings, name, organization, embeddings
+        )
+
+    async def save_embeddings_bulk(
+        self, organization: str, names: List[str], embeddings: np.ndarray
+    ) -> None:
+        await asyncio.to_thread(
+            self.database.save_embeddings_bulk, organization, names, embeddings
+        )
+
+    async def iter_embeddings(
+        self, organization: str, batch_size: int = 10000
+    ) -> AsyncIterator[Tuple[List[str], np.ndarray]]:
+        # Each batch is pulled from the synchronous generator in a worker thread
+        batches = await asyncio.to_thread(
+            self.database.iter_embeddings, organization, batch_size
+        )
+        try:
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            await asyncio.to_thread(batches.close)
+
+    async def rebuild_index(self, organization: str) -> int:
+        return await asyncio.to_thread(self.database.rebuild_index, organization)
+
+    async def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        return await asyncio.to_thread(self.database.get_embeddings, name, organization)
+
+    async def vector_search(
+        self, embedding: np.ndarray, threshold: float, organization: str
+    ) -> VectorSearchResult:
+        return await asyncio.to_thread(
+            self.database.vector_search, embedding, threshold, organization
+        )
+
+    async def vector_search_batch(
+        self, embeddings: List[np.ndarray], threshold: float, organization: str
+    ) -> List[VectorSearchResult]:
+        return await asyncio.to_thread(
+            self.database.vector_search_batch, embeddings, threshold, organization
+        )
+
+    async def generate_api_key(
+        self, user: str, api_key_name: str, organization: str
+    ) -> APIKey:
+        return await asyncio.to_thread(
+            self.database.generate_api_key, user, api_key_name, organization
+        )
+
+    async def revoke_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        return await asyncio.to_thread(
+            self.database.revoke_api_key, api_key, user, api_key_name, organization
+        )
+
+    async def validate_api_key(
+        self, api_key: str, user: str, api_key_name: str, organization: str
+    ) -> bool:
+        return await asyncio.to_thread(
+            self.database.validate_api_key, api_key, user, api_key_name, organization
+        )
+
+    async def get_organizations(self) -> List[str]:
+        return await asyncio.to_thread(self.database.get_organizations)
+
+    async def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(
+            self.database.get_organization_status, organization
+        )
+
+    async def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(
+            self.database.get_organization_settings, organization
+        )
+
+    async def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return await asyncio.to_thread(
+            self.database.update_organization_settings, organization, settings
+        )
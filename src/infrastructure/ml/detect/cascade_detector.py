@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from src.domain.interfaces import FaceDetector
+from src.domain.models import DetectionResults
+from src.utils.image import decode_image
+
+NO_FACE = "no_face"
+LOW_CONFIDENCE = "low_confidence"
+REQUESTED = "requested"
+ESCALATION_REASONS = (NO_FACE, LOW_CONFIDENCE, REQUESTED)
+
+
+class CascadeDetector(FaceDetector):
+    """
+    Two-stage detector running a cheap backend first and an accurate one only when needed.
+
+    Every image goes through the fast detector. Its result is returned as is when it
+    found at least one face and every face scored at least `min_confidence`;
+    otherwise the image is escalated to the accurate detector, whose result replaces
+    the fast one. `detect_accurate` skips the fast pass for callers that need the
+    best detections. Escalations are counted by reason and reported by `stats`.
+    """
+
+    def __init__(
+        self,
+        fast: FaceDetector,
+        accurate: FaceDetector,
+        min_confidence: float = 0.9,
+    ):
+        """
+        Initialize the cascade.
+
+        Args:
+            fast (FaceDetector): Cheap detector run on every image
+            accurate (FaceDetector): Expensive detector run on escalated images
+            min_confidence (float, optional): Lowest fast-pass face confidence accepted
+                without escalation. Defaults to 0.9.
+        """
+        self.fast = fast
+        self.accurate = accurate
+        self.min_confidence = min_confidence
+        # detect runs in worker threads, so counters are updated under a lock
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._escalations: Dict[str, int] = dict.fromkeys(ESCALATION_REASONS, 0)
+        self._fast_time = 0.0
+        self._accurate_time = 0.0
+
+    def load(self) -> None:
+        self.fast.load()
+        self.accurate.load()
+
+    def _escalation_reason(self, results: DetectionResults) -> Optional[str]:
+        if not results.result:
+            return NO_FACE
+        if min(face.confidence for face in results.result) < self.min_confidence:
+            return LOW_CONFIDENCE
+        return None
+
+    def _run_accurate(self, image: np.ndarray, reason: str) -> DetectionResults:
+        start = time.perf_counter()
+        results = self.accurate.detect(image)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._escalations[reason] += 1
+            self._accurate_time += elapsed
+        return results
+
+    def detect(self, image: Union[str, np.ndarray]) -> DetectionResults:
+        # Decoded once so an escalated image is not decoded or downloaded twice
+        image = decode_image(image)
+        start = time.perf_counter()
+        fast_results = self.fast.detect(image)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._frames += 1
+            self._fast_time += elapsed
+
+        reason = self._escalation_reason(fast_results)
+        if reason is None:
+            return fast_results
+        results = self._run_accurate(image, reason)
+        results.inference_time += fast_results.inference_time
+        return results
+
+    def detect_accurate(self, image: Union[str, np.ndarray]) -> DetectionResults:
+        with self._lock:
+            self._frames += 1
+        return self._run_accurate(decode_image(image), REQUESTED)
+
+    def stats(self) -> dict:
+        """
+        Report how often images were escalated to the accurate detector.
+
+        Returns:
+            dict: Images detected, escalations by reason, escalation rate, and mean
+                seconds per fast and accurate pass
+        """
+        with self._lock:
+            frames = self._frames
+            escalations = dict(self._escalations)
+            fast_time = self._fast_time
+            accurate_time = self._accurate_time
+        escalated = sum(escalations.values())
+        fast_passes = frames - escalations[REQUESTED]
+        return {
+            "frames": frames,
+            "fast_only": frames - escalated,
+            "escalated": escalated,
+            "escalations": escalations,
+            "escalation_rate": escalated / frames if frames else 0.0,
+            "min_confidence": self.min_confidence,
+            "mean_fast_time": fast_time / fast_passes if fast_passes else 0.0,
+            "mean_accurate_time": accurate_time / escalated if escalated else 0.0,
+        }
@@ -2,6 +2,7 @@ from typing import Union
 
 import numpy as np
 from deepface import DeepFace
+from deepface.modules import modeling
 import time
 
 from src.domain.interfaces import FaceDetector
@@ -11,7 +12,11 @@ from src.utils.logging import logger
 class DeepFaceDetector(FaceDetector):
     def __init__(self, detector_backend: str = "yolov8"):
         self.detector_backend = detector_backend
-        
+
+    def load(self) -> None:
+        if self.detector_backend != "skip":
+            modeling.build_model(task="face_detector", model_name=self.detector_backend)
+
     def detect(self, image: Union[str, np.ndarray]) -> DetectionResults:
         try:
             start_time = time.time()
@@ -31,7 +36,8 @@ class DeepFaceDetector(FaceDetector):
                         h=face["facial_area"]["h"]
                     ),
                     confidence=face["confidence"],
-                    face_image=face["face"]
+                    # DeepFace returns float64 crops in [0, 1]; uint8 takes 8x less memory
+                    face_image=np.multiply(face["face"], 255).round().astype(np.uint8)
                 )
                 for face in faces
                 if face["confidence"] > 0.7
@@ -1,5 +1,8 @@
+from typing import List
+
 import numpy as np
 from deepface import DeepFace
+from deepface.modules import modeling, preprocessing
 from src.domain.interfaces import FaceEmbedder
 from src.utils.logging import logger
 
@@ -7,6 +10,9 @@ class DeepFaceEmbedder(FaceEmbedder):
     def __init__(self, model_name: str = "Facenet512"):
         self.model_name = model_name
 
+    def load(self) -> None:
+        modeling.build_model(task="facial_recognition", model_name=self.model_name)
+
     def generate_embedding(self, face_image: np.ndarray) -> np.ndarray:
         try:
             result = DeepFace.represent(
@@ -18,4 +24,36 @@ class DeepFaceEmbedder(FaceEmbedder):
             return np.array(result[0]["embedding"])
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def generate_embeddings(self, face_images: List[np.ndarray]) -> List[np.ndarray]:
+        if not face_images:
+            return []
+        try:
+            model = modeling.build_model(
+                task="facial_recognition", model_name=self.model_name
+            )
+            network = getattr(model, "model", None)
+            if not hasattr(network, "predict_on_batch"):
+                # Not a Keras network (e.g. Dlib, SFace): fall back to one pass per face
+                return super().generate_embeddings(face_images)
+
+            # Same preprocessing as DeepFace.represent with detector_backend='skip'
+            target_size = (model.input_shape[1], model.input_shape[0])
+            batch = np.concatenate(
+                [
+                    preprocessing.normalize_input(
+                        img=preprocessing.resize_image(
+                            img=face_image[:, :, ::-1], target_size=target_size
+                        ),
+                        normalization="base",
+                    )
+                    for face_image in face_images
+                ],
+                axis=0,
+            )
+            embeddings = np.asarray(network.predict_on_batch(batch))
+            return [np.array(embedding) for embedding in embeddings]
+        except Exception as e:
+            logger.error(f"Batched embedding generation failed: {e}")
+            raise
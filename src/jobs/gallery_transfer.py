@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+from src.infrastructure.database import create_face_database
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.logging import logger
+
+
+async def run(args: argparse.Namespace) -> int:
+    # Export and import never run inference, so no models are loaded
+    service = FaceRecognitionService(
+        detector=None, embedder=None, database=create_face_database()
+    )
+    if args.command == "export":
+        return await service.export_gallery(args.organization, args.path, args.batch_size)
+    return await service.import_gallery(args.organization, args.path, args.batch_size)
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Export or import an organization's embeddings as a .npz gallery file"
+    )
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("organization")
+    parser.add_argument("path", help="Gallery file to write or read")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"{args.command.capitalize()}ed {count} embeddings in {elapsed:.1f}s "
+        f"({count / elapsed if elapsed else 0:.0f} vectors/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import os
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from src.infrastructure.database.async_mongodb import AsyncMongoDBFaceDatabase
+from src.infrastructure.database.shared_mongodb import SharedMongoDBFaceDatabase
+from src.utils.logging import logger
+
+# Set on an organization's registration until all of its documents are copied
+MIGRATING = "migrating"
+
+
+async def migrate_organization(
+    source: AsyncMongoDBFaceDatabase,
+    target: SharedMongoDBFaceDatabase,
+    organization: str,
+    batch_size: int = 10000,
+    overwrite: bool = False,
+) -> Optional[int]:
+    """
+    Copy an organization from its own database into the shared collections.
+
+    The organization is registered in the shared layout first and flagged as
+    migrating until its settings, API keys and embeddings are all copied, so an
+    interrupted migration is detected and redone on the next run. API keys keep
+    their bcrypt hashes, so clients keep using the same keys.
+
+    Args:
+        source (AsyncMongoDBFaceDatabase): Database-per-organization layout
+        target (SharedMongoDBFaceDatabase): Shared layout
+        organization (str): Organization to migrate
+        batch_size (int, optional): Embeddings copied per round trip. Defaults to 10000.
+        overwrite (bool, optional): Replace an organization already migrated.
+            Defaults to False.
+
+    Returns:
+        Optional[int]: Number of embeddings copied, or None if the organization was
+            already migrated
+
+    Raises:
+        RuntimeError: If the copied embeddings don't match the source count
+    """
+    registration = await target.organizations.find_one({"_id": organization})
+    if registration is not None and not registration.get(MIGRATING) and not overwrite:
+        logger.info(f"Skipping '{organization}': already in the shared layout")
+        return None
+    if registration is not None:
+        for collection in (target.api_keys, target.embeddings, target.prototypes):
+            await collection.delete_many({"organization": organization})
+
+    await target.create_organization(organization)
+    await target.organizations.update_one(
+        {"_id": organization}, {"$set": {MIGRATING: True}}
+    )
+
+    source_db = source.client[organization]
+    settings = await source.get_organization_settings(organization)
+    await target.update_organization_settings(organization, settings)
+
+    api_keys = [
+        {**document, "organization": organization}
+        async for document in source_db["api_keys"].find({}, {"_id": 0})
+    ]
+    if api_keys:
+        await target.api_keys.insert_many(api_keys)
+
+    copied = 0
+    async for names, embeddings in source.iter_embeddings(organization, batch_size):
+        await target.save_embeddings_bulk(organization, names, embeddings)
+        copied += len(names)
+
+    expected = await source_db["embeddings"].count_documents({})
+    if copied != expected:
+        raise RuntimeError(
+            f"Copied {copied} of {expected} embeddings of '{organization}'; run again"
+        )
+
+    await target.organizations.update_one(
+        {"_id": organization}, {"$unset": {MIGRATING: ""}}
+    )
+    logger.info(
+        f"Migrated '{organization}': {copied} embeddings, {len(api_keys)} API keys"
+    )
+    return copied
+
+
+async def run(args: argparse.Namespace) -> int:
+    connection_string = os.getenv("MONGODB_URI")
+    source = AsyncMongoDBFaceDatabase(connection_string)
+    target = SharedMongoDBFaceDatabase(connection_string, database=args.database)
+    await source.verify_connection()
+
+    organizations = args.organizations or [
+        organization
+        for organization in await source.get_organizations()
+        if organization != args.database
+    ]
+    total = 0
+    for organization in organizations:
+        copied = await migrate_organization(
+            source, target, organization, args.batch_size, args.overwrite
+        )
+        if copied is None:
+            continue
+        total += copied
+        if args.drop_source:
+            await source.client.drop_database(organization)
+            logger.info(f"Dropped database '{organization}'")
+    return total
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Move organizations from their own databases into the shared layout"
+    )
+    parser.add_argument(
+        "organizations", nargs="*", help="Organizations to migrate; all by default"
+    )
+    parser.add_argument(
+        "--database",
+        default=os.getenv("MONGODB_DATABASE", "faceapi"),
+        help="Database of the shared layout",
+    )
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Migrate again organizations already in the shared layout",
+    )
+    parser.add_argument(
+        "--drop-source",
+        action="store_true",
+        help="Drop each organization's database once it is migrated",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+    logger.info(f"Migrated {count} embeddings in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
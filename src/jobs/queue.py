@@ -0,0 +1,396 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio
+
+from src.utils.logging import logger
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED)
+
+REGISTER = "register"
+RECOGNIZE_BATCH = "recognize_batch"
+REINDEX = "reindex"
+JOB_KINDS = (REGISTER, RECOGNIZE_BATCH, REINDEX)
+
+# Hash fields stored as JSON rather than plain strings
+JSON_FIELDS = ("payload", "result")
+
+
+class JobQueue:
+    """
+    Durable job queue on a Redis Stream consumed by a worker group.
+
+    Each job is a hash `{prefix}:job:{id}` holding its kind, organization, payload,
+    status, progress and result, plus a stream entry carrying only the job id.
+    Workers read entries through a consumer group, so every job goes to a single
+    worker and stays in the group's pending list until acknowledged. Entries of a
+    worker that died are reclaimed with XAUTOCLAIM once idle for
+    `visibility_timeout` seconds; running workers keep their entries fresh with
+    every progress update. A job is failed after `max_attempts` deliveries, and
+    finished jobs expire after `result_ttl` seconds.
+
+    Every state change is also published on `{prefix}:job:{id}:events` as a JSON
+    snapshot of the job, for clients that subscribe instead of polling.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        events_client: Optional[redis.asyncio.Redis] = None,
+        prefix: str = "faceapi",
+        group: str = "workers",
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        result_ttl: int = 86400,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            client (redis.Redis): Redis client created with `decode_responses=True`
+            events_client (Optional[redis.asyncio.Redis], optional): Asynchronous client
+                to the same server used by `watch`. Defaults to None.
+            prefix (str, optional): Namespace of the stream and job keys. Defaults to "faceapi".
+            group (str, optional): Consumer group of the workers. Defaults to "workers".
+            visibility_timeout (float, optional): Seconds without progress after which
+                a delivered job is handed to another worker. Defaults to 300.0.
+            max_attempts (int, optional): Deliveries before a job is failed. Defaults to 3.
+            result_ttl (int, optional): Seconds finished jobs are kept. Defaults to 86400.
+        """
+        self.client = client
+        self.events_client = events_client
+        self.prefix = prefix
+        self.stream = f"{prefix}:jobs"
+        self.group = group
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self._group_ready = False
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def channel(self, job_id: str) -> str:
+        """
+        Get the pub/sub channel receiving the state changes of a job.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            str: Channel name
+        """
+        return f"{self._key(job_id)}:events"
+
+    def ensure_group(self) -> None:
+        """Create the stream and consumer group if they don't exist yet."""
+        if self._group_ready:
+            return
+        try:
+            self.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def submit(self, kind: str, organization: str, payload: Dict[str, Any]) -> str:
+        """
+        Enqueue a job.
+
+        Args:
+            kind (str): One of JOB_KINDS
+            organization (str): Organization the job runs for
+            payload (Dict[str, Any]): JSON-serializable job arguments
+
+        Returns:
+            str: Job identifier
+
+        Raises:
+            ValueError: If the job kind is unknown
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        self.ensure_group()
+
+        job_id = uuid.uuid4().hex
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hset(
+            self._key(job_id),
+            mapping={
+                "id": job_id,
+                "kind": kind,
+                "organization": organization,
+                "status": QUEUED,
+                "payload": json.dumps(payload),
+                "progress": 0,
+                "total": 0,
+                "attempts": 0,
+                "created_at": time.time(),
+            },
+        )
+        pipeline.xadd(self.stream, {"job_id": job_id})
+        pipeline.execute()
+        logger.info(f"Queued {kind} job {job_id} for '{organization}'")
+        return job_id
+
+    def get(self, job_id: str, include_payload: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get the current state of a job.
+
+        Args:
+            job_id (str): Job identifier
+            include_payload (bool, optional): Include the job arguments. Defaults to False.
+
+        Returns:
+            Optional[Dict[str, Any]]: Job state, or None if unknown or expired
+        """
+        job = self.client.hgetall(self._key(job_id))
+        if not job:
+            return None
+        if not include_payload:
+            job.pop("payload", None)
+        for field in JSON_FIELDS:
+            if field in job:
+                job[field] = json.loads(job[field])
+        for field in ("progress", "total", "attempts"):
+            job[field] = int(job.get(field, 0))
+        return job
+
+    def claim(self, consumer: str, count: int = 1, block: float = 5.0) -> List[Tuple[str, str]]:
+        """
+        Take jobs for a worker, preferring abandoned jobs over new ones.
+
+        Args:
+            consumer (str): Name of the worker within the group
+            count (int, optional): Maximum number of jobs. Defaults to 1.
+            block (float, optional): Seconds to wait for a new job. Defaults to 5.0.
+
+        Returns:
+            List[Tuple[str, str]]: Stream entry id and job id of each claimed job
+        """
+        self.ensure_group()
+        reclaimed = self.client.xautoclaim(
+            self.stream,
+            self.group,
+            consumer,
+            min_idle_time=int(self.visibility_timeout * 1000),
+            start_id="0-0",
+            count=count,
+        )
+        # Entries trimmed from the stream come back without fields
+        entries = [entry for entry in reclaimed[1] if entry[1]]
+        if entries:
+            logger.warning(f"Worker {consumer} reclaimed {len(entries)} abandoned jobs")
+        else:
+            response = self.client.xreadgroup(
+                self.group,
+                consumer,
+                {self.stream: ">"},
+                count=count,
+                block=int(block * 1000),
+            )
+            entries = response[0][1] if response else []
+        return [(entry_id, fields["job_id"]) for entry_id, fields in entries]
+
+    def start(self, entry_id: str, job_id: str, consumer: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark a claimed job as running.
+
+        Jobs that already finished, expired, or exhausted their attempts are
+        acknowledged and skipped.
+
+        Args:
+            entry_id (str): Stream entry id returned by `claim`
+            job_id (str): Job identifier
+            consumer (str): Name of the worker
+
+        Returns:
+            Optional[Dict[str, Any]]: Job state including its payload, or None if it
+                must not run
+        """
+        key = self._key(job_id)
+        if not self.client.exists(key):
+            self._acknowledge(entry_id)
+            return None
+        attempts = self.client.hincrby(key, "attempts", 1)
+        status = self.client.hget(key, "status")
+        if status in TERMINAL_STATUSES:
+            self._acknowledge(entry_id)
+            return None
+        if attempts > self.max_attempts:
+            self.fail(entry_id, job_id, f"Gave up after {self.max_attempts} attempts")
+            return None
+
+        self.client.hset(
+            key, mapping={"status": RUNNING, "worker": consumer, "started_at": time.time()}
+        )
+        self._publish(job_id)
+        return self.get(job_id, include_payload=True)
+
+    def progress(
+        self, entry_id: str, job_id: str, consumer: str, done: int, total: int
+    ) -> None:
+        """
+        Record the progress of a running job and extend its lease.
+
+        Args:
+            entry_id (str): Stream entry id of the job
+            job_id (str): Job identifier
+            consumer (str): Name of the worker running the job
+            done (int): Processed items
+            total (int): Total items
+        """
+        self.client.hset(self._key(job_id), mapping={"progress": done, "total": total})
+        self.extend_lease(entry_id, consumer)
+        self._publish(job_id)
+
+    def extend_lease(self, entry_id: str, consumer: str) -> None:
+        """
+        Keep a running job from being reclaimed, without touching its state.
+
+        Args:
+            entry_id (str): Stream entry id of the job
+            consumer (str): Name of the worker running the job
+        """
+        # Claiming the entry again resets its idle time, so it is not reclaimed
+        # by another worker while this one is still making progress
+        self.client.xclaim(
+            self.stream, self.group, consumer, 0, [entry_id], justid=True
+        )
+
+    def complete(self, entry_id: str, job_id: str, result: Any) -> None:
+        """
+        Store the result of a job and acknowledge it.
+
+        Args:
+            entry_id (str): Stream entry id of the job
+            job_id (str): Job identifier
+            result (Any): JSON-serializable result; NumPy scalars are stored as floats
+        """
+        self._finish(
+            entry_id,
+            job_id,
+            {"status": SUCCEEDED, "result": json.dumps(result, default=float)},
+        )
+
+    def fail(self, entry_id: str, job_id: str, error: str) -> None:
+        """
+        Mark a job as failed and acknowledge it.
+
+        Args:
+            entry_id (str): Stream entry id of the job
+            job_id (str): Job identifier
+            error (str): Error message reported to the client
+        """
+        logger.error(f"Job {job_id} failed: {error}")
+        self._finish(entry_id, job_id, {"status": FAILED, "error": error})
+
+    def _finish(self, entry_id: str, job_id: str, fields: Dict[str, Any]) -> None:
+        key = self._key(job_id)
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hset(key, mapping={**fields, "finished_at": time.time()})
+        # Images are only needed while the job can still run
+        pipeline.hdel(key, "payload")
+        pipeline.expire(key, self.result_ttl)
+        pipeline.xack(self.stream, self.group, entry_id)
+        pipeline.xdel(self.stream, entry_id)
+        pipeline.execute()
+        self._publish(job_id)
+
+    def _acknowledge(self, entry_id: str) -> None:
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.xack(self.stream, self.group, entry_id)
+        pipeline.xdel(self.stream, entry_id)
+        pipeline.execute()
+
+    def _publish(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is not None:
+            self.client.publish(self.channel(job_id), json.dumps(job))
+
+    async def watch(
+        self, job_id: str, keepalive: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Follow the state changes of a job until it finishes.
+
+        The current state is read after subscribing, so no change is lost between
+        the two, and comes first.
+
+        Args:
+            job_id (str): Job identifier
+            keepalive (float, optional): Seconds without changes after which None is
+                yielded, letting callers keep idle connections alive. Defaults to 15.0.
+
+        Yields:
+            Optional[Dict[str, Any]]: Job state snapshots, or None after `keepalive` seconds
+
+        Raises:
+            RuntimeError: If the queue has no asynchronous client
+        """
+        if self.events_client is None:
+            raise RuntimeError("Job queue was created without an events client")
+
+        pubsub = self.events_client.pubsub()
+        await pubsub.subscribe(self.channel(job_id))
+        try:
+            job = await asyncio.to_thread(self.get, job_id)
+            if job is None:
+                return
+            yield job
+            while job["status"] not in TERMINAL_STATUSES:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=keepalive
+                )
+                if message is None:
+                    yield None
+                    continue
+                job = json.loads(message["data"])
+                yield job
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the queue backlog.
+
+        Returns:
+            Dict[str, int]: Entries in the stream and entries delivered but not acknowledged
+        """
+        self.ensure_group()
+        return {
+            "length": self.client.xlen(self.stream),
+            "pending": self.client.xpending(self.stream, self.group)["pending"],
+        }
+
+
+def create_job_queue() -> JobQueue:
+    """
+    Build the job queue on the Redis instance configured by the environment.
+
+    Returns:
+        JobQueue: Queue configured by the `REDIS_*` and `JOB_*` variables
+    """
+    connection = {
+        "host": os.getenv("REDIS_HOST", "localhost"),
+        "port": int(os.getenv("REDIS_PORT", 6379)),
+        "password": os.getenv("REDIS_PASSWORD", ""),
+        "decode_responses": True,
+    }
+    return JobQueue(
+        redis.Redis(**connection),
+        events_client=redis.asyncio.Redis(**connection),
+        visibility_timeout=float(os.getenv("JOB_VISIBILITY_TIMEOUT", 300)),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+        result_ttl=int(os.getenv("JOB_RESULT_TTL", 86400)),
+    )
@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import IO, Iterator, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.logging import logger
+
+
+@dataclass
+class VideoAnalyticsReport:
+    frames: int
+    faces: int
+    elapsed: float
+    fps: float
+    video_seconds: float
+
+
+def iter_video_frames(
+    path: str,
+    sample_fps: Optional[float] = 1.0,
+    start: float = 0.0,
+    end: Optional[float] = None,
+) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """
+    Stream sampled frames from a video file without loading the whole video.
+
+    Frames between samples are only grabbed, not decoded.
+
+    Args:
+        path (str): Video file or stream URL readable by OpenCV/FFmpeg
+        sample_fps (Optional[float], optional): Frames to analyze per second of video;
+            None analyzes every frame. Defaults to 1.0.
+        start (float, optional): Position in seconds to start from. Defaults to 0.0.
+        end (Optional[float], optional): Position in seconds to stop at; None reads
+            to the end. Defaults to None.
+
+    Yields:
+        Tuple[int, float, np.ndarray]: Frame number, timestamp in seconds and BGR frame
+
+    Raises:
+        ValueError: If the video cannot be opened
+    """
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video '{path}'")
+    try:
+        video_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        step = 1 if not sample_fps else max(1, round(video_fps / sample_fps))
+        frame_number = 0
+        if start > 0:
+            frame_number = int(start * video_fps)
+            capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+        while True:
+            timestamp = frame_number / video_fps
+            if end is not None and timestamp > end:
+                break
+            if frame_number % step:
+                if not capture.grab():
+                    break
+            else:
+                success, frame = capture.read()
+                if not success:
+                    break
+                yield frame_number, timestamp, frame
+            frame_number += 1
+    finally:
+        capture.release()
+
+
+async def analyze_frames(
+    service: FaceRecognitionService,
+    frames: Iterator[Tuple[int, float, np.ndarray]],
+    organization: str,
+    output: IO[str],
+    threshold: float = 0.5,
+    batch_size: int = 16,
+) -> VideoAnalyticsReport:
+    """
+    Recognize the faces of a frame stream and write one timeline record per frame.
+
+    Frames are fed lazily to `FaceRecognitionService.recognize_batch`, so only the
+    chunks in flight are held in memory whatever the length of the video.
+
+    Args:
+        service (FaceRecognitionService): Service running detection, embedding and search
+        frames (Iterator[Tuple[int, float, np.ndarray]]): Frame number, timestamp and frame
+        organization (str): Organization to search within
+        output (IO[str]): Text stream receiving the JSONL timeline
+        threshold (float, optional): Similarity threshold for matching. Defaults to 0.5.
+        batch_size (int, optional): Frames per detection and embedding batch. Defaults to 16.
+
+    Returns:
+        VideoAnalyticsReport: Number of frames and faces and the throughput
+    """
+    # Positions of frames handed to the pipeline whose results are still pending
+    positions = deque()
+
+    def images() -> Iterator[np.ndarray]:
+        for frame_number, timestamp, frame in frames:
+            positions.append((frame_number, timestamp))
+            yield frame
+
+    frame_count = face_count = 0
+    last_timestamp = 0.0
+    start = time.perf_counter()
+    async for result in service.recognize_batch(
+        images(), threshold, organization, batch_size
+    ):
+        frame_number, timestamp = positions.popleft()
+        faces = [
+            {
+                "name": search.name,
+                "distance": search.distance,
+                "confidence": detection.confidence,
+                "bounding_box": {
+                    "x": detection.bounding_box.x,
+                    "y": detection.bounding_box.y,
+                    "w": detection.bounding_box.w,
+                    "h": detection.bounding_box.h,
+                },
+            }
+            for detection, search in zip(result.detections.result, result.searchs)
+        ]
+        output.write(
+            json.dumps(
+                {
+                    "frame": frame_number,
+                    "timestamp": round(timestamp, 3),
+                    "identities": sorted(
+                        {face["name"] for face in faces if face["name"] != "unknown"}
+                    ),
+                    "faces": faces,
+                },
+                default=float,
+            )
+            + "\n"
+        )
+        frame_count += 1
+        face_count += len(faces)
+        last_timestamp = timestamp
+
+    elapsed = time.perf_counter() - start
+    return VideoAnalyticsReport(
+        frames=frame_count,
+        faces=face_count,
+        elapsed=elapsed,
+        fps=frame_count / elapsed if elapsed else 0.0,
+        video_seconds=last_timestamp,
+    )
+
+
+async def run(args: argparse.Namespace) -> VideoAnalyticsReport:
+    from src.api.inference import get_detector, get_embedder
+    from src.infrastructure.database import create_face_database
+
+    service = FaceRecognitionService(
+        detector=get_detector(),
+        embedder=get_embedder(),
+        database=create_face_database(),
+    )
+    frames = iter_video_frames(args.video, args.sample_fps, args.start, args.end)
+    with open(args.output, "w") as output:
+        return await analyze_frames(
+            service,
+            frames,
+            args.organization,
+            output,
+            threshold=args.threshold,
+            batch_size=args.batch_size,
+        )
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Index the identities appearing in a video file"
+    )
+    parser.add_argument("video", help="Video file or stream URL")
+    parser.add_argument("--organization", required=True)
+    parser.add_argument("--output", required=True, help="JSONL timeline to write")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument(
+        "--sample-fps",
+        type=float,
+        default=1.0,
+        help="Frames analyzed per second of video, 0 for every frame",
+    )
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--start", type=float, default=0.0, help="Start position in seconds")
+    parser.add_argument("--end", type=float, default=None, help="End position in seconds")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    logger.info(
+        f"Analyzed {report.frames} frames ({report.video_seconds:.1f}s of video) "
+        f"in {report.elapsed:.1f}s: {report.fps:.2f} frames/s, {report.faces} faces"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+import redis
+from dotenv import load_dotenv
+
+from src.api.server import PreforkServer
+from src.jobs.queue import RECOGNIZE_BATCH, REGISTER, REINDEX, JobQueue, create_job_queue
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.logging import logger
+from src.utils.posprocessing import serialize_result
+
+
+class JobWorker:
+    """
+    Consumer running queued jobs against a recognition service.
+
+    `concurrency` jobs run at once in the same event loop; inference within
+    them is still bounded by the service's admission controller.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        service: FaceRecognitionService,
+        consumer: Optional[str] = None,
+        concurrency: int = 1,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            queue (JobQueue): Queue to consume
+            service (FaceRecognitionService): Service running the jobs
+            consumer (Optional[str], optional): Name within the consumer group; must be
+                stable across restarts only if jobs should resume on the same worker.
+                Defaults to hostname and PID.
+            concurrency (int, optional): Jobs run at once. Defaults to 1.
+        """
+        self.queue = queue
+        self.service = service
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = max(1, concurrency)
+        self.handlers = {
+            REGISTER: self._register,
+            RECOGNIZE_BATCH: self._recognize_batch,
+            REINDEX: self._reindex,
+        }
+
+    async def _register(self, entry_id: str, job: Dict[str, Any]) -> Any:
+        payload = job["payload"]
+
+        async def progress(done: int, total: int) -> None:
+            await asyncio.to_thread(
+                self.queue.progress, entry_id, job["id"], self.consumer, done, total
+            )
+
+        enrollment = await self.service.register_person(
+            payload["images"],
+            payload["name"],
+            job["organization"],
+            duplicate_threshold=payload.get("duplicate_threshold"),
+            max_embeddings=payload.get("max_embeddings"),
+            progress=progress,
+        )
+        if enrollment is None:
+            raise ValueError("No face detected in any image")
+        return asdict(enrollment)
+
+    async def _recognize_batch(self, entry_id: str, job: Dict[str, Any]) -> Any:
+        payload = job["payload"]
+        total = len(payload["images"])
+        results = []
+        async for recognize_result in self.service.recognize_batch(
+            payload["images"],
+            payload["threshold"],
+            job["organization"],
+            payload.get("batch_size", 8),
+            quality=payload.get("quality"),
+        ):
+            results.append(serialize_result(recognize_result))
+            await asyncio.to_thread(
+                self.queue.progress,
+                entry_id,
+                job["id"],
+                self.consumer,
+                len(results),
+                total,
+            )
+        return results
+
+    async def _heartbeat(self, entry_id: str, job_id: str) -> None:
+        # Steps without progress to report still have to keep their lease
+        interval = self.queue.visibility_timeout / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.queue.extend_lease, entry_id, self.consumer)
+            except redis.RedisError as e:
+                logger.warning(f"Worker {self.consumer} cannot extend job {job_id}: {e}")
+
+    async def _reindex(self, entry_id: str, job: Dict[str, Any]) -> Any:
+        heartbeat = asyncio.create_task(self._heartbeat(entry_id, job["id"]))
+        try:
+            indexed = await self.service.rebuild_index(job["organization"])
+        finally:
+            heartbeat.cancel()
+        return {"indexed": indexed}
+
+    async def process(self, entry_id: str, job_id: str) -> None:
+        """
+        Run one claimed job and record its outcome.
+
+        Args:
+            entry_id (str): Stream entry id returned by `JobQueue.claim`
+            job_id (str): Job identifier
+        """
+        job = await asyncio.to_thread(self.queue.start, entry_id, job_id, self.consumer)
+        if job is None:
+            return
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            await asyncio.to_thread(
+                self.queue.fail, entry_id, job_id, f"Unknown job kind '{job['kind']}'"
+            )
+            return
+
+        logger.info(f"Worker {self.consumer} running {job['kind']} job {job_id}")
+        try:
+            result = await handler(entry_id, job)
+        except Exception as e:
+            await asyncio.to_thread(self.queue.fail, entry_id, job_id, str(e))
+            return
+        await asyncio.to_thread(self.queue.complete, entry_id, job_id, result)
+        logger.info(f"Worker {self.consumer} finished {job['kind']} job {job_id}")
+
+    async def _consume(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                claimed = await asyncio.to_thread(self.queue.claim, self.consumer)
+            except redis.RedisError as e:
+                logger.error(f"Worker {self.consumer} cannot read the queue: {e}")
+                await asyncio.sleep(1)
+                continue
+            for entry_id, job_id in claimed:
+                await self.process(entry_id, job_id)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Consume jobs until `stop` is set; running jobs are finished first.
+
+        Args:
+            stop (Optional[asyncio.Event], optional): Shutdown signal. Defaults to
+                an event set on SIGINT or SIGTERM.
+        """
+        if stop is None:
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, stop.set)
+        logger.info(f"Worker {self.consumer} consuming {self.queue.stream}")
+        await asyncio.gather(*(self._consume(stop) for _ in range(self.concurrency)))
+
+
+async def run_worker(concurrency: int = 1) -> None:
+    from src.api.inference import create_face_service
+    from src.infrastructure.database import create_face_database
+
+    # Created after the fork, so every worker has its own database and Redis clients
+    service = create_face_service(create_face_database())
+    await JobWorker(create_job_queue(), service, concurrency=concurrency).run()
+
+
+class JobWorkerPool(PreforkServer):
+    """
+    Pre-fork supervisor of job workers.
+
+    Models are loaded once in the master and shared copy-on-write by the forked
+    workers, which are restarted if they die, as in the API server.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        concurrency: int = 1,
+        log_level: str = "info",
+        preload: bool = True,
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to 2.
+            concurrency (int, optional): Jobs run at once by each worker. Defaults to 1.
+            log_level (str, optional): Log level. Defaults to "info".
+            preload (bool, optional): Load models in the master before forking.
+                Defaults to True.
+        """
+        super().__init__(workers=workers, log_level=log_level, preload=preload)
+        self.concurrency = concurrency
+
+    def _prepare(self) -> None:
+        pass
+
+    def _child(self) -> None:
+        from src.api.inference import preload_models
+
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        gc.enable()
+        preload_models()
+        asyncio.run(run_worker(self.concurrency))
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run job workers with preloaded models")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("JOB_WORKERS", 1))
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("JOB_CONCURRENCY", 1)),
+        help="Jobs run at once by each worker",
+    )
+    parser.add_argument("--no-preload", action="store_true")
+    args = parser.parse_args()
+
+    JobWorkerPool(
+        workers=args.workers, concurrency=args.concurrency, preload=not args.no_preload
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
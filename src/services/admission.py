@@ -0,0 +1,374 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+INTERACTIVE = "interactive"
+REST = "rest"
+BULK = "bulk"
+
+DEFAULT_PRIORITY_WEIGHTS = {INTERACTIVE: 8.0, REST: 4.0, BULK: 1.0}
+
+
+class OverloadedError(Exception):
+    """
+    Raised when inference capacity and its waiting queue are both full.
+
+    Attributes:
+        retry_after (int): Suggested number of seconds before retrying
+        queue_depth (int): Number of requests waiting when the request was shed
+    """
+
+    def __init__(self, retry_after: int, queue_depth: int):
+        super().__init__(f"Inference queue is full ({queue_depth} waiting)")
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    organization: Optional[str]
+    finish_tag: float
+    sequence: int
+    enqueued_at: float
+
+
+@dataclass
+class _TenantStats:
+    active: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    recent_wait: float = 0.0
+    queued: Dict[str, int] = field(default_factory=dict)
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a `name:value,name:value` mapping as used by the scheduler settings.
+
+    Args:
+        spec (Optional[str]): Mapping specification, e.g. "acme:2,globex:0.5"
+
+    Returns:
+        Dict[str, float]: Parsed values by name; empty for an empty specification
+
+    Raises:
+        ValueError: If an entry is not a `name:number` pair
+    """
+    weights = {}
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        name, separator, value = entry.rpartition(":")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid weight entry: {entry!r}")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+class AdmissionController:
+    """
+    Weighted fair scheduler with a bounded queue in front of model inference.
+
+    At most `max_concurrency` requests run detection and embedding at once and at
+    most `max_queue` more may wait for a slot. Anything beyond that is rejected
+    immediately with an OverloadedError instead of growing latency without bound.
+
+    Waiting requests are kept in one queue per (organization, priority class) and
+    dispatched by start-time fair queuing: each queue advances a virtual clock by
+    1 / weight per slot it receives, where the weight is the product of the
+    organization's and the priority class's weights, and the waiter with the
+    smallest virtual finish tag is served next. A tenant flooding the bulk class
+    therefore only gets its weighted share while other tenants' interactive
+    streams keep flowing. Organizations may also be capped to a number of
+    concurrent slots. Within a single queue order is FIFO, and slots are handed
+    directly to the next waiter so a newcomer can never overtake the queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        max_queue: int = 16,
+        priority_weights: Optional[Dict[str, float]] = None,
+        organization_weights: Optional[Dict[str, float]] = None,
+        organization_quotas: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Initialize the admission controller.
+
+        Args:
+            max_concurrency (int, optional): Number of requests allowed to run inference
+                at the same time. Defaults to 2.
+            max_queue (int, optional): Number of requests allowed to wait for a slot.
+                Defaults to 16.
+            priority_weights (Optional[Dict[str, float]], optional): Weight of each priority
+                class; unknown classes weigh 1. Defaults to DEFAULT_PRIORITY_WEIGHTS.
+            organization_weights (Optional[Dict[str, float]], optional): Weight of each
+                organization; unlisted organizations weigh 1. Defaults to None.
+            organization_quotas (Optional[Dict[str, int]], optional): Maximum concurrent slots
+                per organization; unlisted organizations may use every slot. Defaults to None.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.priority_weights = dict(DEFAULT_PRIORITY_WEIGHTS)
+        self.priority_weights.update(priority_weights or {})
+        self.organization_weights = dict(organization_weights or {})
+        self.organization_quotas = {
+            organization: max(1, int(quota))
+            for organization, quota in (organization_quotas or {}).items()
+        }
+        self._active = 0
+        self._queues: Dict[Tuple[Optional[str], str], Deque[_Waiter]] = {}
+        self._last_finish: Dict[Tuple[Optional[str], str], float] = {}
+        self._virtual_time = 0.0
+        self._sequence = 0
+        self._queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._service_time = 0.0
+        self._tenants: Dict[Optional[str], _TenantStats] = {}
+
+    @property
+    def active(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for a slot."""
+        return self._queued
+
+    def _weight(self, organization: Optional[str], priority: str) -> float:
+        weight = self.priority_weights.get(priority, 1.0) * self.organization_weights.get(
+            organization, 1.0
+        )
+        return max(weight, 1e-6)
+
+    def _tenant(self, organization: Optional[str]) -> _TenantStats:
+        if organization not in self._tenants:
+            self._tenants[organization] = _TenantStats()
+        return self._tenants[organization]
+
+    def _under_quota(self, organization: Optional[str]) -> bool:
+        quota = self.organization_quotas.get(organization)
+        return quota is None or self._tenant(organization).active < quota
+
+    def retry_after(self) -> int:
+        """
+        Estimate how long a rejected client should wait before retrying.
+
+        Returns:
+            int: Seconds until the current queue is expected to drain, at least 1
+        """
+        estimate = self._service_time * (self.queue_depth + 1) / self.max_concurrency
+        return max(1, math.ceil(estimate))
+
+    def _reject(self, organization: Optional[str] = None) -> None:
+        self._rejected += 1
+        self._tenant(organization).rejected += 1
+        raise OverloadedError(self.retry_after(), self.queue_depth)
+
+    def check(self, organization: Optional[str] = None) -> None:
+        """
+        Reject early if a new request would be shed.
+
+        Args:
+            organization (Optional[str], optional): Organization issuing the request.
+                Defaults to None.
+
+        Raises:
+            OverloadedError: If every slot is busy and the queue is full
+        """
+        if self._active >= self.max_concurrency and self.queue_depth >= self.max_queue:
+            self._reject(organization)
+
+    def _grant(self, organization: Optional[str], wait: float) -> None:
+        self._active += 1
+        self._admitted += 1
+        tenant = self._tenant(organization)
+        tenant.active += 1
+        tenant.admitted += 1
+        tenant.total_wait += wait
+        tenant.max_wait = max(tenant.max_wait, wait)
+        tenant.recent_wait = 0.8 * tenant.recent_wait + 0.2 * wait
+
+    def _dequeue(self, key: Tuple[Optional[str], str], waiter: _Waiter) -> None:
+        queue = self._queues[key]
+        queue.remove(waiter)
+        self._queued -= 1
+        self._tenant(key[0]).queued[key[1]] -= 1
+        if not queue:
+            del self._queues[key]
+            if self._last_finish.get(key, 0.0) <= self._virtual_time:
+                self._last_finish.pop(key, None)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the waiters with the smallest virtual finish tags."""
+        while self._active < self.max_concurrency:
+            best_key, best = None, None
+            for key, queue in self._queues.items():
+                head = queue[0]
+                if not self._under_quota(key[0]):
+                    continue
+                if best is None or (head.finish_tag, head.sequence) < (
+                    best.finish_tag,
+                    best.sequence,
+                ):
+                    best_key, best = key, head
+            if best is None:
+                return
+
+            self._dequeue(best_key, best)
+            self._virtual_time = max(
+                self._virtual_time,
+                best.finish_tag - 1.0 / self._weight(*best_key),
+            )
+            self._grant(best.organization, time.perf_counter() - best.enqueued_at)
+            best.future.set_result(None)
+
+    async def acquire(
+        self,
+        reject_when_full: bool = True,
+        organization: Optional[str] = None,
+        priority: str = REST,
+    ) -> None:
+        """
+        Wait for an inference slot.
+
+        Args:
+            reject_when_full (bool, optional): Raise instead of queueing past `max_queue`.
+                Requests already streaming results pass False so they are never cut
+                off midway. Defaults to True.
+            organization (Optional[str], optional): Organization issuing the request.
+                Defaults to None.
+            priority (str, optional): Priority class of the request. Defaults to REST.
+
+        Raises:
+            OverloadedError: If the queue is full and `reject_when_full` is True
+        """
+        if (
+            self._active < self.max_concurrency
+            and not self.queue_depth
+            and self._under_quota(organization)
+        ):
+            self._grant(organization, 0.0)
+            return
+
+        if reject_when_full and self.queue_depth >= self.max_queue:
+            self._reject(organization)
+
+        key = (organization, priority)
+        start_tag = max(self._virtual_time, self._last_finish.get(key, 0.0))
+        finish_tag = start_tag + 1.0 / self._weight(organization, priority)
+        self._last_finish[key] = finish_tag
+        self._sequence += 1
+        waiter = _Waiter(
+            future=asyncio.get_running_loop().create_future(),
+            organization=organization,
+            finish_tag=finish_tag,
+            sequence=self._sequence,
+            enqueued_at=time.perf_counter(),
+        )
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._queued += 1
+        queued = self._tenant(organization).queued
+        queued[priority] = queued.get(priority, 0) + 1
+
+        # Capacity may be free while every waiter belongs to a tenant at its quota
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was handed over just before cancellation: pass it on
+                self.release(organization)
+            elif waiter in self._queues.get(key, ()):
+                self._dequeue(key, waiter)
+            raise
+
+    def release(self, organization: Optional[str] = None) -> None:
+        """
+        Free a slot and hand it to the next waiter by weighted fair order.
+
+        Args:
+            organization (Optional[str], optional): Organization that held the slot.
+                Defaults to None.
+        """
+        self._active -= 1
+        self._tenant(organization).active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        reject_when_full: bool = True,
+        organization: Optional[str] = None,
+        priority: str = REST,
+    ) -> AsyncIterator[None]:
+        """
+        Hold an inference slot for the duration of the block.
+
+        Args:
+            reject_when_full (bool, optional): See `acquire`. Defaults to True.
+            organization (Optional[str], optional): Organization issuing the request.
+                Defaults to None.
+            priority (str, optional): Priority class of the request. Defaults to REST.
+
+        Raises:
+            OverloadedError: If the request is shed
+        """
+        await self.acquire(reject_when_full, organization, priority)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._service_time = (
+                elapsed if not self._service_time else 0.8 * self._service_time + 0.2 * elapsed
+            )
+            self.release(organization)
+
+    def stats(self) -> dict:
+        """
+        Report the controller's current load.
+
+        Returns:
+            dict: Active and queued requests, limits, counters, mean service time and,
+                per organization, queue lengths by priority class and wait times
+        """
+        return {
+            "active": self._active,
+            "queued": self.queue_depth,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "mean_service_time": self._service_time,
+            "priority_weights": self.priority_weights,
+            "organizations": {
+                str(organization): {
+                    "active": tenant.active,
+                    "queued": {
+                        priority: count
+                        for priority, count in tenant.queued.items()
+                        if count
+                    },
+                    "admitted": tenant.admitted,
+                    "rejected": tenant.rejected,
+                    "weight": self.organization_weights.get(organization, 1.0),
+                    "quota": self.organization_quotas.get(organization),
+                    "mean_wait": (
+                        tenant.total_wait / tenant.admitted if tenant.admitted else 0.0
+                    ),
+                    "recent_wait": tenant.recent_wait,
+                    "max_wait": tenant.max_wait,
+                }
+                for organization, tenant in self._tenants.items()
+            },
+        }
@@ -1,12 +1,49 @@
-from typing import List, Union
+import asyncio
+import inspect
+import time
+from itertools import islice
+from contextlib import nullcontext
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 import numpy as np
-from src.domain.interfaces import FaceDetector, FaceEmbedder, FaceDatabase
+from src.domain.interfaces import (
+    FaceDetector,
+    FaceEmbedder,
+    FaceDatabase,
+    AsyncFaceDatabase,
+)
 from src.domain.models import (
     DetectionResults,
+    FaceIdentity,
+    FrameDetections,
+    QualitySettings,
     RecognizeResult,
+    SkippedFace,
+    VectorSearchResult,
+    EnrollmentResult,
     APIKey,
 )
+from src.infrastructure.database.threaded import ThreadedFaceDatabase
+from src.services.admission import BULK, REST, AdmissionController, OverloadedError
+from src.services.profiling import current_profile
+from src.utils.embeddings import resolve_embedding_model, validate_embedding_settings
+from src.utils.enrollment import select_diverse_embeddings
+from src.utils.gallery_file import GalleryWriter, read_gallery
 from src.utils.logging import logger
+from src.utils.quality import assess_face, merge_quality_settings
+
+T = TypeVar("T")
 
 
 class FaceRecognitionService:
@@ -15,10 +52,23 @@ class FaceRecognitionService:
 
     This service acts as a facade over the detection, embedding, and database components,
     providing a simplified API for face recognition operations.
+
+    All operations are coroutines: database calls are awaited and CPU-bound detection
+    and embedding run in worker threads, so the event loop keeps serving other
+    connections while a request is in flight.
     """
 
     def __init__(
-        self, detector: FaceDetector, embedder: FaceEmbedder, database: FaceDatabase
+        self,
+        detector: FaceDetector,
+        embedder: FaceEmbedder,
+        database: Union[AsyncFaceDatabase, FaceDatabase],
+        duplicate_threshold: float = 0.95,
+        max_embeddings_per_person: Optional[int] = None,
+        admission: Optional[AdmissionController] = None,
+        quality: Optional[QualitySettings] = None,
+        settings_cache_ttl: float = 30.0,
+        embedding_model: Optional[str] = None,
     ):
         """
         Initialize the face recognition service with required components.
@@ -26,13 +76,107 @@ class FaceRecognitionService:
         Args:
             detector (FaceDetector): Component responsible for detecting faces in images
             embedder (FaceEmbedder): Component responsible for generating face embeddings
-            database (FaceDatabase): Component responsible for storing and retrieving face data
+            database (Union[AsyncFaceDatabase, FaceDatabase]): Component responsible for storing
+                and retrieving face data. Synchronous implementations are wrapped so their
+                calls run in a thread pool.
+            duplicate_threshold (float, optional): Cosine similarity above which a newly
+                enrolled embedding is dropped as a near-duplicate. Defaults to 0.95.
+            max_embeddings_per_person (Optional[int], optional): Cap on stored embeddings per
+                person; None disables it. Defaults to None.
+            admission (Optional[AdmissionController], optional): Limits concurrent inference
+                and sheds load when its queue is full; None disables admission control.
+                Defaults to None.
+            quality (Optional[QualitySettings], optional): Default quality gate applied to
+                detected faces before embedding; organizations and requests may override it.
+                Defaults to a gate that accepts every face.
+            settings_cache_ttl (float, optional): Seconds organization settings are cached
+                in memory. Defaults to 30.0.
+            embedding_model (Optional[str], optional): Model client-computed embeddings must
+                come from, unless an organization configures another. Defaults to the
+                embedder's `model_name`.
         """
         self.face_detector = detector
         self.face_embedder = embedder
+        if isinstance(database, FaceDatabase):
+            database = ThreadedFaceDatabase(database)
         self.face_database = database
+        self.duplicate_threshold = duplicate_threshold
+        self.max_embeddings_per_person = max_embeddings_per_person
+        self.admission = admission
+        self.quality = quality or QualitySettings()
+        self.settings_cache_ttl = settings_cache_ttl
+        self._settings_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.embedding_model = embedding_model or getattr(embedder, "model_name", None)
+
+    async def _run_inference(self, function: Callable[..., T], *args) -> T:
+        """
+        Run a CPU-bound detection or embedding call outside the event loop.
+
+        Args:
+            function (Callable[..., T]): Detector or embedder method to call
+            *args: Positional arguments forwarded to the function
+
+        Returns:
+            T: The function's return value
+        """
+        profile = current_profile()
+        if profile is not None:
+            return await asyncio.to_thread(profile.run, function, *args)
+        return await asyncio.to_thread(function, *args)
+
+    def _detector(self, accurate: bool) -> Callable[..., DetectionResults]:
+        """
+        Pick the detection method for a request.
+
+        Args:
+            accurate (bool): Whether the caller asked for the most accurate detector
+
+        Returns:
+            Callable[..., DetectionResults]: The detector's `detect_accurate` or `detect`
+        """
+        return self.face_detector.detect_accurate if accurate else self.face_detector.detect
+
+    def _inference_slot(
+        self,
+        organization: Optional[str] = None,
+        priority: str = REST,
+        reject_when_full: bool = True,
+    ):
+        """
+        Get the context holding an inference slot, if admission control is enabled.
 
-    def create_organization(self, organization: str) -> bool:
+        Args:
+            organization (Optional[str], optional): Organization the work is done for,
+                used to share inference fairly between tenants. Defaults to None.
+            priority (str, optional): Priority class of the work. Defaults to REST.
+            reject_when_full (bool, optional): Shed the request when the queue is full.
+                Defaults to True.
+
+        Returns:
+            AsyncContextManager: Slot context, or a no-op context without admission control
+
+        Raises:
+            OverloadedError: On entering the context, if the request is shed
+        """
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot(reject_when_full, organization, priority)
+
+    def check_admission(self, organization: Optional[str] = None) -> None:
+        """
+        Reject a request up front if it would be shed, before any response is started.
+
+        Args:
+            organization (Optional[str], optional): Organization issuing the request.
+                Defaults to None.
+
+        Raises:
+            OverloadedError: If inference slots and queue are full
+        """
+        if self.admission is not None:
+            self.admission.check(organization)
+
+    async def create_organization(self, organization: str) -> bool:
         """
         Create a new organization in the database.
 
@@ -43,14 +187,30 @@ class FaceRecognitionService:
             bool: True if creation was successful, False otherwise
         """
         try:
-            result = self.face_database.create_organization(organization)
+            result = await self.face_database.create_organization(organization)
         except Exception as e:
-            print(e)
+            logger.error(f"Failed to create organization: {e}")
             return False
 
         return result
 
-    def generate_api_key(
+    async def get_organization_status(self, organization: str) -> Dict[str, Any]:
+        """
+        Report whether an organization's search indexes are built.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Provisioning `status` and the state of each index
+
+        Raises:
+            ValueError: If the organization doesn't exist
+        """
+        status = await self.face_database.get_organization_status(organization)
+        return {"organization": organization, **status}
+
+    async def generate_api_key(
         self, user: str, api_key_name: str, organization: str
     ) -> APIKey | None:
         """
@@ -65,12 +225,14 @@ class FaceRecognitionService:
             APIKey | None: Generated API key information or None if operation fails
         """
         try:
-            return self.face_database.generate_api_key(user, api_key_name, organization)
+            return await self.face_database.generate_api_key(
+                user, api_key_name, organization
+            )
         except Exception as e:
             logger.error(f"Failed to generate API key: {e}")
             return None
 
-    def revoke_api_key(
+    async def revoke_api_key(
         self, api_key: str, user: str, api_key_name: str, organization: str
     ) -> bool:
         """
@@ -86,14 +248,14 @@ class FaceRecognitionService:
             bool: True if revocation was successful, False otherwise
         """
         try:
-            return self.face_database.revoke_api_key(
+            return await self.face_database.revoke_api_key(
                 api_key, user, api_key_name, organization
             )
         except Exception as e:
             logger.error(f"Failed to revoke API key: {e}")
             return False
 
-    def validate_api_key(
+    async def validate_api_key(
         self, api_key: str, user: str, api_key_name: str, organization: str
     ) -> bool:
         """
@@ -109,97 +271,775 @@ class FaceRecognitionService:
             bool: True if the API key is valid, False otherwise
         """
         try:
-            return self.face_database.validate_api_key(
+            return await self.face_database.validate_api_key(
                 api_key, user, api_key_name, organization
             )
         except Exception as e:
             logger.error(f"Failed to validate API key: {e}")
             return False
 
-    def register_person(
-        self, images: List[Union[str, np.ndarray]], name: str, organization: str
-    ) -> bool:
+    async def get_organization_settings(self, organization: str) -> Dict[str, Any]:
+        """
+        Get an organization's settings, served from a short-lived in-memory cache.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: Settings by section name
+        """
+        cached = self._settings_cache.get(organization)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        settings = await self.face_database.get_organization_settings(organization)
+        self._settings_cache[organization] = (
+            time.monotonic() + self.settings_cache_ttl,
+            settings,
+        )
+        return settings
+
+    async def update_organization_settings(
+        self, organization: str, settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Validate and store settings sections of an organization.
+
+        Args:
+            organization (str): Organization name
+            settings (Dict[str, Any]): Sections to store, e.g. {"quality": {...}}
+
+        Returns:
+            Dict[str, Any]: All settings of the organization after the update
+
+        Raises:
+            ValueError: If a section contains unknown settings
+        """
+        if "quality" in settings:
+            merge_quality_settings(self.quality, settings["quality"])
+        if "embedding" in settings:
+            validate_embedding_settings(settings["embedding"])
+        updated = await self.face_database.update_organization_settings(
+            organization, settings
+        )
+        self._settings_cache.pop(organization, None)
+        return updated
+
+    async def get_quality_settings(
+        self, organization: str, overrides: Optional[Dict[str, Any]] = None
+    ) -> QualitySettings:
+        """
+        Resolve the quality gate of a request.
+
+        Service defaults are overridden by the organization's stored settings, which
+        are in turn overridden by the request.
+
+        Args:
+            organization (str): Organization the request belongs to
+            overrides (Optional[Dict[str, Any]], optional): Per-request thresholds.
+                Defaults to None.
+
+        Returns:
+            QualitySettings: Thresholds to apply
+
+        Raises:
+            ValueError: If the overrides contain unknown settings
+        """
+        settings = await self.get_organization_settings(organization)
+        quality = merge_quality_settings(self.quality, settings.get("quality"))
+        return merge_quality_settings(quality, overrides)
+
+    async def get_embedding_model(self, organization: str) -> Dict[str, Any]:
+        """
+        Resolve the model an organization's embeddings come from.
+
+        Args:
+            organization (str): Organization name
+
+        Returns:
+            Dict[str, Any]: `model` name and `dimensions`, either None when unknown
+        """
+        settings = await self.get_organization_settings(organization)
+        return resolve_embedding_model(self.embedding_model, settings.get("embedding"))
+
+    async def _check_embedding_model(
+        self, organization: str, model: str, embeddings: np.ndarray
+    ) -> None:
+        """
+        Reject client-computed embeddings that cannot be compared with the gallery.
+
+        Args:
+            organization (str): Organization the embeddings are meant for
+            model (str): Model the client declares the embeddings come from
+            embeddings (np.ndarray): Decoded N x D embeddings
+
+        Raises:
+            ValueError: If the model or the dimension differs from the organization's
+        """
+        expected = await self.get_embedding_model(organization)
+        if expected["model"] and model != expected["model"]:
+            raise ValueError(
+                f"Organization '{organization}' uses '{expected['model']}' embeddings, "
+                f"got '{model}'"
+            )
+        if expected["dimensions"] and embeddings.shape[1] != expected["dimensions"]:
+            raise ValueError(
+                f"Organization '{organization}' uses {expected['dimensions']}-dimensional "
+                f"embeddings, got {embeddings.shape[1]}"
+            )
+
+    def _apply_quality_gate(
+        self, detection_results: DetectionResults, quality: QualitySettings
+    ) -> Tuple[List[int], List[SkippedFace]]:
+        """
+        Split detected faces into those worth embedding and those skipped.
+
+        Args:
+            detection_results (DetectionResults): Faces detected in an image
+            quality (QualitySettings): Thresholds to apply
+
+        Returns:
+            Tuple[List[int], List[SkippedFace]]: Indices of the accepted faces and
+                the skipped faces with their reasons
+        """
+        accepted, skipped = [], []
+        for index, detection in enumerate(detection_results.result):
+            rejection = assess_face(index, detection, quality)
+            if rejection is None:
+                accepted.append(index)
+            else:
+                skipped.append(rejection)
+        return accepted, skipped
+
+    def _release_crops(
+        self, detection_results: DetectionResults, indices: Optional[Iterable[int]] = None
+    ) -> None:
+        """
+        Drop face crops that are no longer needed, so results don't keep them alive.
+
+        Args:
+            detection_results (DetectionResults): Faces detected in an image
+            indices (Optional[Iterable[int]], optional): Faces to release. Defaults to all.
+        """
+        faces = detection_results.result
+        for index in range(len(faces)) if indices is None else indices:
+            faces[index].face_image = None
+
+    def _build_recognize_result(
+        self,
+        detection_results: DetectionResults,
+        accepted: List[int],
+        search_results: List[VectorSearchResult],
+        skipped: List[SkippedFace],
+    ) -> RecognizeResult:
+        """
+        Assemble a result whose searches stay aligned with the detections.
+
+        Skipped faces get an "unknown" search result without a distance.
+
+        Args:
+            detection_results (DetectionResults): Faces detected in the image
+            accepted (List[int]): Indices of the faces that were embedded
+            search_results (List[VectorSearchResult]): Search results of the accepted faces
+            skipped (List[SkippedFace]): Faces rejected by the quality gate
+
+        Returns:
+            RecognizeResult: Detection, recognition and skip information of the image
+        """
+        searchs = [
+            VectorSearchResult(name="unknown", distance=None)
+            for _ in detection_results.result
+        ]
+        for index, search_result in zip(accepted, search_results):
+            searchs[index] = search_result
+        return RecognizeResult(
+            detections=detection_results, searchs=searchs, skipped=skipped
+        )
+
+    async def register_person(
+        self,
+        images: List[Union[str, np.ndarray]],
+        name: str,
+        organization: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+        progress: Optional[Callable[[int, int], Any]] = None,
+    ) -> EnrollmentResult | None:
         """
         Register a person in the face recognition system.
 
-        Processes multiple images of a person, detects faces in each,
-        generates embeddings, and stores them in the database.
+        Processes multiple images of a person, keeps the largest face detected in each,
+        generates embeddings in one batch and stores the ones that add information:
+        near-duplicates of the person's existing or newly accepted embeddings are
+        discarded, and the person's gallery is capped to the most diverse vectors.
 
         Args:
             images (List[Union[str, np.ndarray]]): List of images containing the person's face
             name (str): Name of the person to register
             organization (str): Organization the person belongs to
+            duplicate_threshold (Optional[float], optional): Cosine similarity above which a new
+                embedding is a near-duplicate. Defaults to the service setting.
+            max_embeddings (Optional[int], optional): Maximum stored embeddings for the person.
+                Defaults to the service setting.
+            progress (Optional[Callable[[int, int], Any]], optional): Called with the number
+                of processed images and the total after each image; awaited if it returns
+                an awaitable. Defaults to None.
 
         Returns:
-            bool: True if at least one face was successfully registered, False otherwise
+            EnrollmentResult | None: Number of embeddings kept and discarded, or None if
+                no face was detected in any image
         """
-        embeddings = []
+        faces = []
 
+        # Each inference takes its own bulk slot, so interactive requests can be
+        # scheduled between the images of a long enrollment. Only the first one is
+        # shed when the queue is full; once started, an enrollment waits its turn.
         for i, image in enumerate(images, 1):
             try:
-                print(f"Processing image {i}/{len(images)}")
-                detection_results = self.face_detector.detect(image)
+                logger.debug(f"Processing image {i}/{len(images)}")
+                async with self._inference_slot(
+                    organization, BULK, reject_when_full=i == 1
+                ):
+                    # Enrollment quality outlives the request, so it skips the fast detector
+                    detection_results = await self._run_inference(
+                        self.face_detector.detect_accurate, image
+                    )
 
                 if detection_results.result:
-                    for detection in detection_results.result:
-                        embedding = self.face_embedder.generate_embedding(
-                            detection.face_image
-                        )
-                        embeddings.append(embedding)
+                    # Bystanders must not be enrolled under the person's name
+                    largest = max(
+                        detection_results.result,
+                        key=lambda detection: detection.bounding_box.w
+                        * detection.bounding_box.h,
+                    )
+                    faces.append(largest.face_image)
                 else:
-                    print(f"No faces detected in image {i}")
+                    logger.info(f"No faces detected in image {i}")
+            except OverloadedError:
+                raise
             except Exception as e:
-                print(f"Error processing image {i}: {e}")
-                continue
+                logger.error(f"Error processing image {i}: {e}")
+            finally:
+                if progress is not None:
+                    reported = progress(i, len(images))
+                    if inspect.isawaitable(reported):
+                        await reported
+
+        if not faces:
+            logger.warning("No faces detected in any image")
+            return None
+
+        async with self._inference_slot(organization, BULK, reject_when_full=False):
+            embeddings = await self._run_inference(
+                self.face_embedder.generate_embeddings, faces
+            )
+        return await self._enroll(
+            name, organization, embeddings, duplicate_threshold, max_embeddings
+        )
+
+    async def _enroll(
+        self,
+        name: str,
+        organization: str,
+        embeddings: List[np.ndarray],
+        duplicate_threshold: Optional[float],
+        max_embeddings: Optional[int],
+    ) -> EnrollmentResult:
+        """
+        Store the new embeddings of a person that add information to their gallery.
+
+        Args:
+            name (str): Name of the person
+            organization (str): Organization the person belongs to
+            embeddings (List[np.ndarray]): Candidate embeddings
+            duplicate_threshold (Optional[float]): Near-duplicate similarity, or None for
+                the service setting
+            max_embeddings (Optional[int]): Gallery cap, or None for the service setting
+
+        Returns:
+            EnrollmentResult: Number of embeddings kept and discarded
+        """
+        existing = await self.face_database.get_embeddings(name, organization)
+        kept_indices = select_diverse_embeddings(
+            embeddings,
+            existing,
+            duplicate_threshold=(
+                self.duplicate_threshold
+                if duplicate_threshold is None
+                else duplicate_threshold
+            ),
+            max_per_person=(
+                self.max_embeddings_per_person if max_embeddings is None else max_embeddings
+            ),
+        )
+
+        kept = [embeddings[index] for index in kept_indices]
+        logger.info(
+            f"Saving {len(kept)} of {len(embeddings)} embeddings for {name} "
+            f"({len(existing)} already stored)"
+        )
+        await self.face_database.save_embeddings(name, organization, kept)
+        return EnrollmentResult(
+            kept=len(kept), discarded=len(embeddings) - len(kept)
+        )
+
+    async def register_embeddings(
+        self,
+        embeddings: np.ndarray,
+        model: str,
+        name: str,
+        organization: str,
+        duplicate_threshold: Optional[float] = None,
+        max_embeddings: Optional[int] = None,
+    ) -> EnrollmentResult:
+        """
+        Register a person from embeddings computed by the client.
+
+        No inference runs: the embeddings are checked against the organization's
+        model and go through the same near-duplicate filtering and gallery cap as
+        `register_person`.
+
+        Args:
+            embeddings (np.ndarray): Embeddings as an N x D array
+            model (str): Model the embeddings come from
+            name (str): Name of the person to register
+            organization (str): Organization the person belongs to
+            duplicate_threshold (Optional[float], optional): Cosine similarity above which a new
+                embedding is a near-duplicate. Defaults to the service setting.
+            max_embeddings (Optional[int], optional): Maximum stored embeddings for the person.
+                Defaults to the service setting.
+
+        Returns:
+            EnrollmentResult: Number of embeddings kept and discarded
+
+        Raises:
+            ValueError: If the embeddings don't match the organization's model
+        """
+        await self._check_embedding_model(organization, model, embeddings)
+        return await self._enroll(
+            name, organization, list(embeddings), duplicate_threshold, max_embeddings
+        )
+
+    async def recognize_embeddings(
+        self,
+        embeddings: np.ndarray,
+        model: str,
+        threshold: float,
+        organization: str,
+    ) -> List[VectorSearchResult]:
+        """
+        Search the organization for embeddings computed by the client.
+
+        Args:
+            embeddings (np.ndarray): Embeddings as an N x D array
+            model (str): Model the embeddings come from
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
 
-        if embeddings:
-            print(f"Saving {len(embeddings)} embeddings for {name}")
-            for embedding in embeddings:
-                self.face_database.save_embedding(name, organization, embedding)
-            return True
+        Returns:
+            List[VectorSearchResult]: Closest match of each embedding, in input order
 
-        print("No faces detected in any image")
-        return False
+        Raises:
+            ValueError: If the embeddings don't match the organization's model
+        """
+        await self._check_embedding_model(organization, model, embeddings)
+        return await self.face_database.vector_search_batch(
+            list(embeddings), threshold, organization
+        )
 
-    def detect_faces(self, image: Union[str, np.ndarray]) -> DetectionResults:
+    async def detect_faces(
+        self,
+        image: Union[str, np.ndarray],
+        organization: Optional[str] = None,
+        accurate: bool = False,
+    ) -> DetectionResults:
         """
         Detect faces in the provided image.
 
         Args:
             image (Union[str, np.ndarray]): Image to analyze, either as a file path or numpy array
+            organization (Optional[str], optional): Organization the detection is done for.
+                Defaults to None.
+            accurate (bool, optional): Use the most accurate detector even if a cheaper
+                one would do. Defaults to False.
 
         Returns:
             DetectionResults: Container object with detection results including face coordinates,
                               confidence scores, and cropped face images
         """
-        return self.face_detector.detect(image)
+        async with self._inference_slot(organization):
+            return await self._run_inference(self._detector(accurate), image)
 
-    def recognize_person(
-        self, image: Union[str, np.ndarray], threshold: float, organization: str
+    async def recognize_person(
+        self,
+        image: Union[str, np.ndarray],
+        threshold: float,
+        organization: str,
+        priority: str = REST,
+        quality: Optional[Dict[str, Any]] = None,
+        accurate: bool = False,
     ) -> RecognizeResult:
         """
         Recognize people in an image by comparing detected faces against the database.
 
+        Faces failing the quality gate are not embedded; they are reported in the
+        result's `skipped` list with the reason and get an "unknown" search result.
+
         Args:
             image (Union[str, np.ndarray]): Image to analyze, either as a file path or numpy array
             threshold (float): Similarity threshold for matching (higher values require closer matches)
             organization (str): Organization to search within
+            priority (str, optional): Scheduling class of the request, INTERACTIVE for live
+                streams. Defaults to REST.
+            quality (Optional[Dict[str, Any]], optional): Quality gate overrides for this
+                request. Defaults to None.
+            accurate (bool, optional): Use the most accurate detector even if a cheaper
+                one would do. Defaults to False.
 
         Returns:
             RecognizeResult: Result containing both detection information and recognition results
+
+        Raises:
+            ValueError: If the quality overrides contain unknown settings
+        """
+        quality_settings = await self.get_quality_settings(organization, quality)
+        async with self._inference_slot(organization, priority):
+            detection_results = await self._run_inference(
+                self._detector(accurate), image
+            )
+            accepted, skipped = self._apply_quality_gate(
+                detection_results, quality_settings
+            )
+            embeddings = await self._run_inference(
+                self.face_embedder.generate_embeddings,
+                [detection_results.result[index].face_image for index in accepted],
+            )
+        self._release_crops(detection_results)
+
+        search_results = await self.face_database.vector_search_batch(
+            embeddings, threshold, organization
+        )
+
+        return self._build_recognize_result(
+            detection_results, accepted, search_results, skipped
+        )
+
+    async def recognize_person_progressive(
+        self,
+        image: Union[str, np.ndarray],
+        threshold: float,
+        organization: str,
+        priority: str = REST,
+        quality: Optional[Dict[str, Any]] = None,
+        accurate: bool = False,
+    ) -> AsyncIterator[Union[FrameDetections, FaceIdentity]]:
+        """
+        Recognize people in an image, yielding each stage as soon as it is ready.
+
+        The detections come first, as soon as the detector returns. Faces passing
+        the quality gate are then embedded one at a time; each face's search starts
+        as soon as its embedding is ready, and its identity is yielded when the
+        search completes, so identities may arrive out of order.
+
+        Args:
+            image (Union[str, np.ndarray]): Image to analyze, either as a file path or numpy array
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+            priority (str, optional): Scheduling class of the request. Defaults to REST.
+            quality (Optional[Dict[str, Any]], optional): Quality gate overrides for this
+                request. Defaults to None.
+            accurate (bool, optional): Use the most accurate detector even if a cheaper
+                one would do. Defaults to False.
+
+        Yields:
+            Union[FrameDetections, FaceIdentity]: The detections with the indices of the
+                faces still being identified, then one identity per pending face
+
+        Raises:
+            ValueError: If the quality overrides contain unknown settings
+        """
+        quality_settings = await self.get_quality_settings(organization, quality)
+        searches = set()
+
+        async def identify(index: int, embedding: np.ndarray) -> FaceIdentity:
+            search = await self.face_database.vector_search(
+                embedding, threshold, organization
+            )
+            return FaceIdentity(index=index, search=search)
+
+        try:
+            async with self._inference_slot(organization, priority):
+                detection_results = await self._run_inference(
+                    self._detector(accurate), image
+                )
+                accepted, skipped = self._apply_quality_gate(
+                    detection_results, quality_settings
+                )
+                self._release_crops(detection_results, [face.index for face in skipped])
+                yield FrameDetections(
+                    detections=detection_results, skipped=skipped, pending=accepted
+                )
+
+                for index in accepted:
+                    [embedding] = await self._run_inference(
+                        self.face_embedder.generate_embeddings,
+                        [detection_results.result[index].face_image],
+                    )
+                    self._release_crops(detection_results, [index])
+                    searches.add(asyncio.ensure_future(identify(index, embedding)))
+                    for search in [search for search in searches if search.done()]:
+                        searches.discard(search)
+                        yield search.result()
+
+            for search in asyncio.as_completed(searches):
+                yield await search
+        finally:
+            for search in searches:
+                search.cancel()
+
+    async def recognize_batch(
+        self,
+        images: Iterable[Union[str, np.ndarray]],
+        threshold: float,
+        organization: str,
+        batch_size: int = 8,
+        quality: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[RecognizeResult]:
+        """
+        Recognize people in many images, yielding one result per image in input order.
+
+        Images are processed in chunks of `batch_size`. Reading and detection of the
+        next chunk run in a worker thread while the faces of the current chunk are
+        embedded in a single batch and searched together. Images are pulled from the
+        iterable lazily, so at most two chunks are held in memory at any time, even
+        for an unbounded stream such as the frames of a video.
+
+        Args:
+            images (Iterable[Union[str, np.ndarray]]): Images to analyze, as file paths, URLs,
+                base64 strings or numpy arrays
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+            batch_size (int, optional): Number of images per pipeline chunk. Defaults to 8.
+            quality (Optional[Dict[str, Any]], optional): Quality gate overrides for the
+                whole batch. Defaults to None.
+
+        Yields:
+            RecognizeResult: Detection and recognition results for each image
+
+        Raises:
+            ValueError: If the quality overrides contain unknown settings
+        """
+        quality_settings = await self.get_quality_settings(organization, quality)
+        batch_size = max(1, batch_size)
+        images = iter(images)
+
+        pending = asyncio.ensure_future(
+            self._detect_chunk_admitted(images, batch_size, organization)
+        )
+        try:
+            while True:
+                chunk_detections = await pending
+                if not chunk_detections:
+                    break
+                pending = asyncio.ensure_future(
+                    self._detect_chunk_admitted(images, batch_size, organization)
+                )
+                for result in await self._recognize_chunk(
+                    chunk_detections, threshold, organization, quality_settings
+                ):
+                    yield result
+        finally:
+            pending.cancel()
+
+    async def _detect_chunk_admitted(
+        self,
+        images: Iterator[Union[str, np.ndarray]],
+        batch_size: int,
+        organization: str,
+    ) -> List[DetectionResults]:
+        """
+        Pull the next chunk and detect its faces while holding a bulk inference slot.
+
+        A batch that is already streaming waits for capacity instead of being shed.
+
+        Args:
+            images (Iterator[Union[str, np.ndarray]]): Remaining images of the batch
+            batch_size (int): Number of images to pull
+            organization (str): Organization the batch belongs to
+
+        Returns:
+            List[DetectionResults]: Detection results for each image, in input order;
+                empty once the images are exhausted
+        """
+        async with self._inference_slot(organization, BULK, reject_when_full=False):
+            return await self._run_inference(self._detect_chunk, images, batch_size)
+
+    def _detect_chunk(
+        self, images: Iterator[Union[str, np.ndarray]], batch_size: int
+    ) -> List[DetectionResults]:
+        """
+        Pull, decode and detect faces in every image of the next chunk.
+
+        Args:
+            images (Iterator[Union[str, np.ndarray]]): Remaining images of the batch
+            batch_size (int): Number of images to pull
+
+        Returns:
+            List[DetectionResults]: Detection results for each image, in input order
+        """
+        return [self.face_detector.detect(image) for image in islice(images, batch_size)]
+
+    async def _recognize_chunk(
+        self,
+        chunk_detections: List[DetectionResults],
+        threshold: float,
+        organization: str,
+        quality: QualitySettings,
+    ) -> List[RecognizeResult]:
+        """
+        Embed and search every face of a chunk that passes the quality gate,
+        with one batched call each.
+
+        Args:
+            chunk_detections (List[DetectionResults]): Detection results of the chunk
+            threshold (float): Similarity threshold for matching
+            organization (str): Organization to search within
+            quality (QualitySettings): Quality gate to apply before embedding
+
+        Returns:
+            List[RecognizeResult]: Recognition results for each image, in input order
         """
-        detection_results = self.face_detector.detect(image)
+        gated = [
+            self._apply_quality_gate(detection_results, quality)
+            for detection_results in chunk_detections
+        ]
+        faces = [
+            detection_results.result[index].face_image
+            for detection_results, (accepted, _) in zip(chunk_detections, gated)
+            for index in accepted
+        ]
+        async with self._inference_slot(organization, BULK, reject_when_full=False):
+            embeddings = await self._run_inference(
+                self.face_embedder.generate_embeddings, faces
+            )
+        del faces
+        for detection_results in chunk_detections:
+            self._release_crops(detection_results)
+        search_results = await self.face_database.vector_search_batch(
+            embeddings, threshold, organization
+        )
 
-        search_results = []
-        for detection in detection_results.result:
-            embedding = self.face_embedder.generate_embedding(detection.face_image)
-            search_results.append(
-                self.face_database.vector_search(embedding, threshold, organization)
+        results = []
+        offset = 0
+        for detection_results, (accepted, skipped) in zip(chunk_detections, gated):
+            count = len(accepted)
+            results.append(
+                self._build_recognize_result(
+                    detection_results,
+                    accepted,
+                    search_results[offset : offset + count],
+                    skipped,
+                )
             )
+            offset += count
+        return results
 
-        return RecognizeResult(detections=detection_results, searchs=search_results)
+    async def rebuild_index(self, organization: str) -> int:
+        """
+        Rebuild the search index structures of an organization from its embeddings.
+
+        Args:
+            organization (str): Organization to re-index
+
+        Returns:
+            int: Number of indexed entries
+
+        Raises:
+            NotImplementedError: If the database backend has no index to rebuild
+            RuntimeError: If rebuilding fails
+        """
+        start = time.perf_counter()
+        count = await self.face_database.rebuild_index(organization)
+        logger.info(
+            f"Re-indexed '{organization}': {count} entries in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+        return count
+
+    async def export_gallery(
+        self, organization: str, path: str, batch_size: int = 10000
+    ) -> int:
+        """
+        Export every embedding of an organization to a `.npz` gallery file.
+
+        Embeddings are streamed from the database in batches and spooled to disk,
+        so memory stays bounded by the batch size.
+
+        Args:
+            organization (str): Organization to export
+            path (str): Gallery file to write
+            batch_size (int, optional): Rows per database batch. Defaults to 10000.
+
+        Returns:
+            int: Number of exported embeddings
+
+        Raises:
+            RuntimeError: If reading the embeddings fails
+        """
+        writer = GalleryWriter(path)
+        try:
+            async for names, embeddings in self.face_database.iter_embeddings(
+                organization, batch_size
+            ):
+                await asyncio.to_thread(writer.write, names, embeddings)
+        except BaseException:
+            writer.discard()
+            raise
+        await asyncio.to_thread(writer.close)
+        logger.info(f"Exported {writer.count} embeddings of '{organization}' to {path}")
+        return writer.count
+
+    async def import_gallery(
+        self, organization: str, path: str, batch_size: int = 10000
+    ) -> int:
+        """
+        Bulk-insert the embeddings of a `.npz` gallery file into an organization.
+
+        The organization is created if needed and rows are appended to any
+        existing gallery, one bulk write per batch.
+
+        Args:
+            organization (str): Organization to import into
+            path (str): Gallery file to read
+            batch_size (int, optional): Rows per bulk write. Defaults to 10000.
+
+        Returns:
+            int: Number of imported embeddings
+
+        Raises:
+            ValueError: If the file is not a gallery file
+            RuntimeError: If the organization cannot be created or saving fails
+        """
+        if not await self.face_database.create_organization(organization):
+            raise RuntimeError(f"Failed to create organization '{organization}'")
+
+        batches = read_gallery(path, batch_size)
+        imported = 0
+        try:
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                names, embeddings = batch
+                await self.face_database.save_embeddings_bulk(
+                    organization, names, embeddings
+                )
+                imported += len(names)
+        finally:
+            await asyncio.to_thread(batches.close)
+        logger.info(f"Imported {imported} embeddings from {path} into '{organization}'")
+        return imported
 
-    def get_organizations(self) -> List[str]:
+    async def get_organizations(self) -> List[str]:
         """
         Get a list of all registered organizations.
 
@@ -207,7 +1047,7 @@ class FaceRecognitionService:
             List[str]: A list of organization names
         """
         try:
-            return self.face_database.get_organizations()
+            return await self.face_database.get_organizations()
         except Exception as e:
             logger.error(f"Failed to get organizations: {e}")
             return []
@@ -0,0 +1,125 @@
+from typing import Any, Hashable, Optional, Tuple
+
+import numpy as np
+
+GRID_SIZE = 32
+
+
+def frame_signature(image: np.ndarray, grid_size: int = GRID_SIZE) -> np.ndarray:
+    """
+    Reduce a frame to a small grayscale thumbnail by block averaging.
+
+    Averaging whole blocks rather than sampling pixels makes the thumbnail robust
+    to sensor noise and JPEG artifacts, which would otherwise look like motion.
+
+    Args:
+        image (np.ndarray): Frame as an HxW grayscale or HxWxC color array
+        grid_size (int, optional): Side of the thumbnail. Defaults to GRID_SIZE.
+
+    Returns:
+        np.ndarray: Float32 thumbnail of at most grid_size x grid_size, in 0-255 intensities
+    """
+    gray = np.asarray(image, dtype=np.float32)
+    if gray.ndim == 3:
+        gray = gray.mean(axis=2)
+    rows = min(grid_size, gray.shape[0])
+    cols = min(grid_size, gray.shape[1])
+    block_h = gray.shape[0] // rows
+    block_w = gray.shape[1] // cols
+    return (
+        gray[: rows * block_h, : cols * block_w]
+        .reshape(rows, block_h, cols, block_w)
+        .mean(axis=(1, 3))
+    )
+
+
+class MotionGate:
+    """
+    Per-connection change detector for streamed frames.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with the
+    thumbnail of the last frame that was actually processed. While the mean
+    absolute difference stays below `threshold`, the previous result is reused
+    instead of running detection again. Comparing against the last processed
+    frame, rather than the previous one, means slow drifts still add up to a
+    change. A fresh result is forced every `refresh_interval` skipped frames.
+    """
+
+    def __init__(self, threshold: float = 4.0, refresh_interval: int = 30):
+        """
+        Initialize the gate.
+
+        Args:
+            threshold (float, optional): Mean absolute thumbnail difference, in 0-255
+                intensities, below which a frame counts as unchanged; 0 disables
+                the gate. Defaults to 4.0.
+            refresh_interval (int, optional): Maximum consecutive frames served from
+                the cache. Defaults to 30.
+        """
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.frames = 0
+        self.processed = 0
+        self.skipped = 0
+        self._reference: Optional[np.ndarray] = None
+        self._key: Hashable = None
+        self._result: Any = None
+        self._consecutive_skips = 0
+
+    def check(self, signature: np.ndarray, key: Hashable = None) -> Tuple[bool, Any]:
+        """
+        Decide whether a frame needs processing.
+
+        Args:
+            signature (np.ndarray): Thumbnail of the frame from `frame_signature`
+            key (Hashable, optional): Request parameters the cached result depends on,
+                such as organization and threshold; a different key forces processing.
+                Defaults to None.
+
+        Returns:
+            Tuple[bool, Any]: (True, previous result) if the frame is unchanged,
+                otherwise (False, None)
+        """
+        self.frames += 1
+        unchanged = (
+            self.threshold > 0
+            and self._reference is not None
+            and self._reference.shape == signature.shape
+            and key == self._key
+            and self._consecutive_skips < self.refresh_interval
+            and float(np.abs(signature - self._reference).mean()) < self.threshold
+        )
+        if not unchanged:
+            return False, None
+        self.skipped += 1
+        self._consecutive_skips += 1
+        return True, self._result
+
+    def update(self, signature: np.ndarray, result: Any, key: Hashable = None) -> None:
+        """
+        Record a processed frame as the new reference.
+
+        Args:
+            signature (np.ndarray): Thumbnail of the processed frame
+            result (Any): Result to re-emit for unchanged frames
+            key (Hashable, optional): Request parameters of the result. Defaults to None.
+        """
+        self.processed += 1
+        self._reference = signature
+        self._result = result
+        self._key = key
+        self._consecutive_skips = 0
+
+    def stats(self) -> dict:
+        """
+        Report how many frames were skipped.
+
+        Returns:
+            dict: Frame, processed and skipped counts and the skip ratio
+        """
+        return {
+            "frames": self.frames,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / self.frames if self.frames else 0.0,
+        }
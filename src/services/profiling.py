@@ -0,0 +1,406 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from types import FrameType
+from typing import Callable, Dict, List, Optional, TypeVar
+
+import redis
+
+from src.utils.logging import logger
+
+T = TypeVar("T")
+
+# Profile of the request being handled; set only while a request is profiled
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "active_profile", default=None
+)
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    """
+    Get the profile of the request running in the current context, if any.
+
+    Returns:
+        Optional[RequestProfile]: The active profile, or None when not profiling
+    """
+    return _active_profile.get()
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame: Optional[FrameType], boundary: Optional[FrameType]) -> List[str]:
+    # Walks from the leaf up to, but excluding, the boundary frame; returns root first
+    stack = []
+    while frame is not None and frame is not boundary:
+        stack.append(_label(frame))
+        frame = frame.f_back
+    if frame is None and boundary is not None:
+        return []
+    stack.reverse()
+    return stack
+
+
+def _await_stack(coroutine) -> List[str]:
+    stack = []
+    while coroutine is not None and getattr(coroutine, "cr_frame", None) is not None:
+        stack.append(_label(coroutine.cr_frame))
+        coroutine = coroutine.cr_await
+    return stack
+
+
+class RequestProfile:
+    """
+    Profile of a single request or WebSocket frame.
+
+    Two views are collected while the profile is active:
+
+    - cProfile statistics of the detection and embedding calls the request runs
+      in worker threads, where DeepFace spends its time
+    - Wall-clock samples of the request's task, as collapsed stacks: the task's own
+      frames while it runs on the event loop (service code, pymongo), the coroutines
+      it awaits while suspended, and the worker threads running its inference
+
+    Samples are taken by a background thread, so the request itself only pays for
+    the cProfile instrumentation of its inference calls.
+    """
+
+    def __init__(self, label: str, interval: float = 0.005):
+        """
+        Initialize the profile.
+
+        Args:
+            label (str): What is profiled, e.g. the route and organization
+            interval (float, optional): Seconds between stack samples. Defaults to 0.005.
+        """
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.interval = interval
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+        self._stats: Optional[pstats.Stats] = None
+        # Worker threads running the request's inference, with their entry frame
+        self._threads: Dict[int, FrameType] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._token = None
+        self._start = 0.0
+
+    def start(self) -> "RequestProfile":
+        """
+        Start profiling the calling task. Must be called from the request's task.
+
+        Returns:
+            RequestProfile: The profile itself
+        """
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._token = _active_profile.set(self)
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name=f"profile-{self.id[:8]}", daemon=True
+        )
+        self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop profiling. Must be called from the task that started the profile.
+        """
+        self.duration = time.perf_counter() - self._start
+        _active_profile.reset(self._token)
+        self._stopped.set()
+        self._sampler.join()
+
+    def run(self, function: Callable[..., T], *args) -> T:
+        """
+        Call a function under cProfile. Runs in the worker thread of an inference call.
+
+        Args:
+            function (Callable[..., T]): Detector or embedder method to call
+            *args: Positional arguments forwarded to the function
+
+        Returns:
+            T: The function's return value
+        """
+        ident = threading.get_ident()
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._threads[ident] = sys._getframe()
+        try:
+            return profiler.runcall(function, *args)
+        finally:
+            with self._lock:
+                del self._threads[ident]
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+
+    def _sample_loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        coroutine = self._task.get_coro()
+        root = coroutine.cr_frame
+        if root is None:
+            return
+        # A running coroutine's frame is linked to the event loop frame that resumed it
+        caller = root.f_back
+        if caller is not None and asyncio.current_task(self._loop) is self._task:
+            task_stack = _thread_stack(frames.get(self._loop_thread), caller)
+        else:
+            task_stack = _await_stack(coroutine)
+        with self._lock:
+            threads = list(self._threads.items())
+        for ident, entry in threads:
+            thread_stack = _thread_stack(frames.get(ident), entry)
+            if thread_stack:
+                self.samples[";".join(task_stack + ["[thread]"] + thread_stack)] += 1
+        if task_stack and not threads:
+            self.samples[";".join(task_stack)] += 1
+
+    def collapsed(self) -> str:
+        """
+        Format the samples as collapsed stacks, one `frame;frame;... count` per line.
+
+        Returns:
+            str: Input for flamegraph.pl, speedscope or inferno
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def stats(self, limit: int = 50) -> str:
+        """
+        Format the cProfile statistics of the request's inference calls.
+
+        Args:
+            limit (int, optional): Functions listed, by cumulative time. Defaults to 50.
+
+        Returns:
+            str: pstats report, empty if the request ran no inference
+        """
+        if self._stats is None:
+            return ""
+        stream = io.StringIO()
+        self._stats.stream = stream
+        self._stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def report(self) -> dict:
+        """
+        Summarize the profile for storage.
+
+        Returns:
+            dict: Identifier, label, timing, sample count, collapsed stacks and
+                cProfile statistics
+        """
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "sample_interval": self.interval,
+            "samples": sum(self.samples.values()),
+            "collapsed": self.collapsed(),
+            "stats": self.stats(),
+        }
+
+
+class Profiler:
+    """
+    Decides which requests are profiled and stores their profiles in Redis.
+
+    A request is profiled when it carries the admin token (the `X-Profile` header,
+    or a WebSocket frame's `profile` field) or is picked by the sampling rate.
+    Without an admin token profiling is disabled entirely, since the profiles
+    could not be retrieved. Profiles expire after `ttl` seconds and only the
+    latest `max_profiles` are listed.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        admin_token: str = "",
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        ttl: int = 3600,
+        max_profiles: int = 100,
+        prefix: str = "profiles",
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            client (redis.Redis): Redis client created with `decode_responses=True`
+            admin_token (str, optional): Token enabling profiling and its admin routes.
+                Defaults to "", which disables profiling.
+            sample_rate (float, optional): Fraction of requests profiled without being
+                asked. Defaults to 0.0.
+            interval (float, optional): Seconds between stack samples. Defaults to 0.005.
+            ttl (int, optional): Seconds a profile is kept. Defaults to 3600.
+            max_profiles (int, optional): Profiles kept in the listing. Defaults to 100.
+            prefix (str, optional): Prefix of the Redis keys. Defaults to "profiles".
+        """
+        self.client = client
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.ttl = ttl
+        self.max_profiles = max_profiles
+        self.prefix = prefix
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        """
+        Check a token against the admin token in constant time.
+
+        Args:
+            token (Optional[str]): Token sent by the client
+
+        Returns:
+            bool: True if profiling is enabled and the token matches
+        """
+        return (
+            self.enabled
+            and token is not None
+            and hmac.compare_digest(token.encode(), self.admin_token.encode())
+        )
+
+    def should_profile(self, token: Optional[str]) -> bool:
+        """
+        Decide whether a request is profiled.
+
+        Args:
+            token (Optional[str]): Admin token sent with the request, if any
+
+        Returns:
+            bool: True if the token is the admin token or the request is sampled
+        """
+        if not self.enabled:
+            return False
+        if token is not None:
+            return self.is_admin(token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, label: str) -> RequestProfile:
+        """
+        Start profiling the calling task.
+
+        Args:
+            label (str): What is profiled, e.g. the route and organization
+
+        Returns:
+            RequestProfile: The started profile
+        """
+        return RequestProfile(label, self.interval).start()
+
+    async def finish(self, profile: RequestProfile) -> str:
+        """
+        Stop a profile and store its report. Must be awaited from the request's task.
+
+        Args:
+            profile (RequestProfile): Profile returned by `start`
+
+        Returns:
+            str: Identifier the profile is retrievable under
+        """
+        profile.stop()
+        await asyncio.to_thread(self.save, profile)
+        return profile.id
+
+    def save(self, profile: RequestProfile) -> None:
+        """
+        Store the report of a stopped profile. Storage errors are logged, not raised,
+        so they never fail the profiled request.
+
+        Args:
+            profile (RequestProfile): Stopped profile
+        """
+        try:
+            key = f"{self.prefix}:{profile.id}"
+            pipeline = self.client.pipeline()
+            pipeline.set(key, json.dumps(profile.report()), ex=self.ttl)
+            pipeline.lpush(self.prefix, profile.id)
+            pipeline.ltrim(self.prefix, 0, self.max_profiles - 1)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to store profile {profile.id}: {str(e)}")
+            return
+        logger.info(
+            f"Profiled {profile.label} in {profile.duration * 1000:.0f} ms: {profile.id}"
+        )
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        """
+        Get a stored profile.
+
+        Args:
+            profile_id (str): Identifier returned with the profiled request
+
+        Returns:
+            Optional[dict]: The profile report, or None if unknown or expired
+        """
+        data = self.client.get(f"{self.prefix}:{profile_id}")
+        return json.loads(data) if data else None
+
+    def list(self) -> List[dict]:
+        """
+        List the latest stored profiles, newest first.
+
+        Returns:
+            List[dict]: Identifier, label, start and duration of each profile
+        """
+        ids = self.client.lrange(self.prefix, 0, -1)
+        if not ids:
+            return []
+        reports = self.client.mget([f"{self.prefix}:{profile_id}" for profile_id in ids])
+        return [
+            {field: report[field] for field in ("id", "label", "started_at", "duration")}
+            for report in map(json.loads, filter(None, reports))
+        ]
+
+
+def create_profiler() -> Profiler:
+    """
+    Build the profiler on the Redis instance configured by the environment.
+
+    Returns:
+        Profiler: Profiler configured by the `REDIS_*` and `PROFILING_*` variables
+    """
+    return Profiler(
+        redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            password=os.getenv("REDIS_PASSWORD", ""),
+            decode_responses=True,
+        ),
+        admin_token=os.getenv("PROFILING_ADMIN_TOKEN", ""),
+        sample_rate=float(os.getenv("PROFILING_SAMPLE_RATE", 0)),
+        interval=float(os.getenv("PROFILING_SAMPLE_INTERVAL", 0.005)),
+        ttl=int(os.getenv("PROFILING_TTL", 3600)),
+    )
@@ -0,0 +1,148 @@
+import bisect
+import hashlib
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring with bounded loads, mapping organizations to replicas.
+
+    Every replica is placed on the ring at `virtual_nodes` points. An organization
+    belongs to the first replica found clockwise from its own hash, so adding or
+    removing a replica only moves the organizations of the ring segments it gains
+    or loses. With bounded loads, a replica already serving more than
+    `load_factor` times the average load is skipped and the organization spills
+    over to the next replica on the ring, which keeps a hot tenant from
+    overloading its home replica while the other tenants keep their affinity.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str] = (),
+        virtual_nodes: int = 100,
+        load_factor: float = 1.25,
+    ):
+        """
+        Initialize the ring.
+
+        Args:
+            nodes (Iterable[str], optional): Initial replicas. Defaults to ().
+            virtual_nodes (int, optional): Points per replica on the ring. Defaults to 100.
+            load_factor (float, optional): Load a replica may reach, relative to the
+                average, before organizations spill over. Defaults to 1.25.
+
+        Raises:
+            ValueError: If `load_factor` is not greater than 1
+        """
+        if load_factor <= 1:
+            raise ValueError("load_factor must be greater than 1")
+        self.virtual_nodes = virtual_nodes
+        self.load_factor = load_factor
+        self._points: List[Tuple[int, str]] = []
+        self._hashes: List[int] = []
+        self._nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def add(self, node: str) -> bool:
+        """
+        Add a replica to the ring.
+
+        Args:
+            node (str): Replica to add
+
+        Returns:
+            bool: True if the replica was added, False if it was already on the ring
+        """
+        if node in self._nodes:
+            return False
+        self._nodes.append(node)
+        for index in range(self.virtual_nodes):
+            bisect.insort(self._points, (_hash(f"{node}#{index}"), node))
+        self._hashes = [point for point, _ in self._points]
+        return True
+
+    def remove(self, node: str) -> bool:
+        """
+        Remove a replica from the ring.
+
+        Args:
+            node (str): Replica to remove
+
+        Returns:
+            bool: True if the replica was removed, False if it was not on the ring
+        """
+        if node not in self._nodes:
+            return False
+        self._nodes.remove(node)
+        self._points = [point for point in self._points if point[1] != node]
+        self._hashes = [point for point, _ in self._points]
+        return True
+
+    def candidates(self, key: str) -> Iterator[str]:
+        """
+        Walk the replicas clockwise from a key's position, each replica once.
+
+        Args:
+            key (str): Key to place on the ring, e.g. an organization
+
+        Yields:
+            str: Replicas in order of preference for the key
+        """
+        if not self._points:
+            return
+        start = bisect.bisect(self._hashes, _hash(key))
+        seen = set()
+        for offset in range(len(self._points)):
+            node = self._points[(start + offset) % len(self._points)][1]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self._nodes):
+                    return
+
+    def capacity(self, loads: Dict[str, int]) -> int:
+        """
+        Compute the load a replica may carry when one more request is placed.
+
+        Args:
+            loads (Dict[str, int]): Current load by replica
+
+        Returns:
+            int: Maximum load per replica, at least 1
+        """
+        total = sum(loads.get(node, 0) for node in self._nodes) + 1
+        return max(1, math.ceil(self.load_factor * total / len(self._nodes)))
+
+    def assign(self, key: str, loads: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """
+        Pick the replica serving a key.
+
+        Args:
+            key (str): Key to place, e.g. an organization
+            loads (Optional[Dict[str, int]], optional): Current load by replica; without
+                loads the key always goes to its home replica. Defaults to None.
+
+        Returns:
+            Optional[str]: The first replica clockwise whose load is under capacity,
+                or None if the ring is empty
+        """
+        if not self._nodes:
+            return None
+        if not loads:
+            return next(self.candidates(key))
+        capacity = self.capacity(loads)
+        for node in self.candidates(key):
+            if loads.get(node, 0) < capacity:
+                return node
+        # Unreachable: capacity times the number of replicas exceeds the total load
+        return next(self.candidates(key))
@@ -0,0 +1,139 @@
+from typing import List, Optional, Tuple
+
+from src.services.admission import AdmissionController
+
+# (longest image side in pixels, JPEG quality) from best to most degraded
+DEFAULT_QUALITY_LADDER: List[Tuple[int, float]] = [
+    (960, 0.9),
+    (640, 0.85),
+    (480, 0.75),
+    (320, 0.65),
+]
+
+
+class StreamController:
+    """
+    Per-connection frame rate and resolution negotiation for streamed frames.
+
+    The controller keeps an exponentially weighted mean of the time each frame
+    takes from submission to result, which includes the wait for an inference
+    slot. The target frame rate is the rate at which results can come back,
+    divided by the number of requests competing for each inference slot, so
+    clients back off together as the queue grows and speed up when the server
+    is idle. Resolution and JPEG quality move along a ladder: one step down
+    when frames take longer than `target_latency` or the queue is more than half
+    full, one step up when frames are fast and nothing is waiting.
+    """
+
+    def __init__(
+        self,
+        admission: Optional[AdmissionController] = None,
+        min_fps: float = 0.5,
+        max_fps: float = 10.0,
+        target_latency: float = 0.5,
+        ladder: Optional[List[Tuple[int, float]]] = None,
+        initial_level: int = 1,
+        smoothing: float = 0.3,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            admission (Optional[AdmissionController], optional): Admission controller
+                whose queue depth measures server load. Defaults to None.
+            min_fps (float, optional): Lowest frame rate requested. Defaults to 0.5.
+            max_fps (float, optional): Highest frame rate requested. Defaults to 10.0.
+            target_latency (float, optional): Per-frame processing time in seconds
+                above which resolution is reduced. Defaults to 0.5.
+            ladder (Optional[List[Tuple[int, float]]], optional): Resolution and JPEG
+                quality steps, best first. Defaults to DEFAULT_QUALITY_LADDER.
+            initial_level (int, optional): Starting step of the ladder. Defaults to 1.
+            smoothing (float, optional): Weight of the newest sample in the processing
+                time mean. Defaults to 0.3.
+        """
+        self.admission = admission
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.target_latency = target_latency
+        self.ladder = ladder or DEFAULT_QUALITY_LADDER
+        self.level = min(max(0, initial_level), len(self.ladder) - 1)
+        self.smoothing = smoothing
+        self.processing_time = 0.0
+        self._sent: Optional[dict] = None
+
+    def _load(self) -> Tuple[float, float]:
+        """
+        Measure contention for inference slots.
+
+        Returns:
+            Tuple[float, float]: Requests per slot, and how full the queue is (0-1)
+        """
+        if self.admission is None:
+            return 1.0, 0.0
+        admission = self.admission
+        per_slot = (admission.active + admission.queue_depth) / admission.max_concurrency
+        fill = admission.queue_depth / admission.max_queue if admission.max_queue else 0.0
+        return max(1.0, per_slot), fill
+
+    def record(self, elapsed: float) -> None:
+        """
+        Add the processing time of a frame and adjust the resolution step.
+
+        Args:
+            elapsed (float): Seconds from receiving the frame to having its result
+        """
+        self.processing_time = (
+            elapsed
+            if not self.processing_time
+            else (1 - self.smoothing) * self.processing_time + self.smoothing * elapsed
+        )
+        _, fill = self._load()
+        if self.processing_time > self.target_latency or fill > 0.5:
+            self.level = min(self.level + 1, len(self.ladder) - 1)
+        elif self.processing_time < self.target_latency / 2 and fill == 0:
+            self.level = max(self.level - 1, 0)
+
+    def record_overload(self) -> None:
+        """Drop straight to the lowest step after a frame was shed."""
+        self.level = len(self.ladder) - 1
+
+    def control(self) -> dict:
+        """
+        Compute the settings the client should stream with.
+
+        Returns:
+            dict: Control message with `target_fps`, `max_resolution` and `jpeg_quality`
+        """
+        per_slot, _ = self._load()
+        if self.processing_time:
+            fps = 1.0 / (self.processing_time * per_slot)
+        else:
+            fps = self.max_fps / per_slot
+        resolution, jpeg_quality = self.ladder[self.level]
+        return {
+            "type": "control",
+            "target_fps": round(min(self.max_fps, max(self.min_fps, fps)), 2),
+            "max_resolution": resolution,
+            "jpeg_quality": jpeg_quality,
+        }
+
+    def update(self) -> Optional[dict]:
+        """
+        Get a control message if the settings changed enough to be worth sending.
+
+        Frame rate changes under 20% are ignored so clients are not told to adjust
+        after every frame.
+
+        Returns:
+            Optional[dict]: New control message, or None if the last one still holds
+        """
+        control = self.control()
+        sent = self._sent
+        if (
+            sent is not None
+            and control["max_resolution"] == sent["max_resolution"]
+            and abs(control["target_fps"] - sent["target_fps"]) <= 0.2 * sent["target_fps"]
+        ):
+            return None
+        self._sent = control
+        return control
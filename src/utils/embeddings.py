@@ -0,0 +1,117 @@
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+# Output size of the DeepFace recognition models
+MODEL_DIMENSIONS = {
+    "VGG-Face": 4096,
+    "Facenet": 128,
+    "Facenet512": 512,
+    "OpenFace": 128,
+    "DeepFace": 4096,
+    "DeepID": 160,
+    "Dlib": 128,
+    "ArcFace": 512,
+    "SFace": 128,
+    "GhostFaceNet": 512,
+}
+
+EMBEDDING_SETTINGS = ("model", "dimensions")
+
+
+def decode_embeddings(
+    data: Union[str, bytes, List[float], List[List[float]]], dimensions: int
+) -> np.ndarray:
+    """
+    Decode embeddings sent by a client.
+
+    Args:
+        data (Union[str, bytes, List[float], List[List[float]]]): One vector or a list of
+            vectors as numbers, or little-endian float32 values as raw bytes or a
+            base64 string
+        dimensions (int): Declared size of each vector
+
+    Returns:
+        np.ndarray: Embeddings as an N x dimensions float32 array
+
+    Raises:
+        ValueError: If the data is not a whole number of finite vectors of the declared size
+    """
+    if dimensions <= 0:
+        raise ValueError("Embedding dimensions must be positive")
+    if isinstance(data, str):
+        try:
+            data = base64.b64decode(data, validate=True)
+        except binascii.Error:
+            raise ValueError("Embeddings string is not valid base64")
+
+    if isinstance(data, (bytes, bytearray)):
+        if len(data) % (4 * dimensions):
+            raise ValueError(
+                f"Payload of {len(data)} bytes is not a whole number of "
+                f"{dimensions}-dimensional float32 vectors"
+            )
+        embeddings = np.frombuffer(data, dtype="<f4").astype(np.float32)
+    else:
+        embeddings = np.asarray(data, dtype=np.float32)
+        if embeddings.ndim == 1:
+            embeddings = embeddings[np.newaxis]
+        if embeddings.ndim != 2 or embeddings.shape[1] != dimensions:
+            raise ValueError(
+                f"Expected {dimensions}-dimensional vectors, got shape {embeddings.shape}"
+            )
+
+    embeddings = embeddings.reshape(-1, dimensions)
+    if not len(embeddings):
+        raise ValueError("No embeddings provided")
+    if not np.isfinite(embeddings).all():
+        raise ValueError("Embeddings contain NaN or infinite values")
+    return embeddings
+
+
+def validate_embedding_settings(settings: Dict[str, Any]) -> None:
+    """
+    Check the `embedding` section of organization settings.
+
+    Args:
+        settings (Dict[str, Any]): Section with optional `model` and `dimensions`
+
+    Raises:
+        ValueError: If the section has unknown keys or the dimensions contradict the model
+    """
+    unknown = set(settings) - set(EMBEDDING_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown embedding settings: {', '.join(sorted(unknown))}")
+    dimensions = settings.get("dimensions")
+    if dimensions is not None and (not isinstance(dimensions, int) or dimensions <= 0):
+        raise ValueError("Embedding dimensions must be a positive integer")
+    known = MODEL_DIMENSIONS.get(settings.get("model"))
+    if known and dimensions and known != dimensions:
+        raise ValueError(
+            f"Model '{settings['model']}' produces {known}-dimensional embeddings, "
+            f"not {dimensions}"
+        )
+
+
+def resolve_embedding_model(
+    model: Optional[str], settings: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Resolve the embedding model an organization's gallery is built with.
+
+    Args:
+        model (Optional[str]): Model of the server's embedder
+        settings (Optional[Dict[str, Any]], optional): The organization's `embedding`
+            settings section, overriding the server model. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: `model` name and `dimensions`, either None when unknown
+    """
+    settings = settings or {}
+    model = settings.get("model") or model
+    return {
+        "model": model,
+        "dimensions": settings.get("dimensions") or MODEL_DIMENSIONS.get(model),
+    }
@@ -0,0 +1,80 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+def _normalize(vectors: List[np.ndarray]) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float64).reshape(len(vectors), -1)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def select_diverse_embeddings(
+    new_embeddings: List[np.ndarray],
+    existing_embeddings: List[np.ndarray],
+    duplicate_threshold: float,
+    max_per_person: Optional[int] = None,
+) -> List[int]:
+    """
+    Choose which newly computed embeddings of a person are worth storing.
+
+    A new embedding is dropped when its cosine similarity to any existing or
+    already accepted embedding exceeds `duplicate_threshold`. When the person would
+    then hold more than `max_per_person` vectors, the remaining slots are filled by
+    farthest-point selection, starting from the candidate closest to the person's
+    mean, so the stored set covers the widest range of poses and conditions.
+    Existing embeddings are always kept.
+
+    Args:
+        new_embeddings (List[np.ndarray]): Candidate embeddings from this enrollment
+        existing_embeddings (List[np.ndarray]): Embeddings already stored for the person
+        duplicate_threshold (float): Raw cosine similarity above which a vector is a near-duplicate
+        max_per_person (Optional[int], optional): Maximum stored vectors per person;
+            None or 0 disables the cap. Defaults to None.
+
+    Returns:
+        List[int]: Indices of `new_embeddings` to store, in input order
+    """
+    if not new_embeddings:
+        return []
+
+    candidates = _normalize(new_embeddings)
+    reference = (
+        _normalize(existing_embeddings)
+        if existing_embeddings
+        else np.empty((0, candidates.shape[1]))
+    )
+
+    # Greedy near-duplicate suppression against everything kept so far
+    kept = []
+    for index, vector in enumerate(candidates):
+        accepted = np.concatenate([reference, candidates[kept]])
+        if len(accepted) and np.max(accepted @ vector) > duplicate_threshold:
+            continue
+        kept.append(index)
+
+    if not max_per_person:
+        return kept
+
+    slots = max(0, max_per_person - len(reference))
+    if len(kept) <= slots:
+        return kept
+    if slots == 0:
+        return []
+
+    pool = candidates[kept]
+    if len(reference):
+        # Similarity of each candidate to its closest already-stored vector
+        closest = np.max(pool @ reference.T, axis=1)
+        next_index = int(np.argmin(closest))
+    else:
+        closest = np.full(len(pool), -np.inf)
+        next_index = int(np.argmax(pool @ pool.mean(axis=0)))
+
+    selected = [next_index]
+    while len(selected) < slots:
+        closest = np.maximum(closest, pool @ pool[next_index])
+        closest[selected] = np.inf
+        next_index = int(np.argmin(closest))
+        selected.append(next_index)
+
+    return sorted(kept[index] for index in selected)
@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+import zipfile
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+NAMES_MEMBER = "names.npy"
+EMBEDDINGS_MEMBER = "embeddings.npy"
+COPY_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class GalleryWriter:
+    """
+    Streaming writer of the `.npz` gallery format.
+
+    The file is a regular NumPy `.npz` archive, loadable with `np.load`, holding
+    `names.npy` (N fixed-width unicode strings) and `embeddings.npy` (an N x D
+    float32 block). `np.savez` needs every array in memory, so batches are first
+    spooled to temporary files next to the target and the archive members are
+    then assembled by streaming copies, keeping memory bounded by the batch size.
+    """
+
+    def __init__(self, path: str):
+        """
+        Start writing a gallery file.
+
+        Args:
+            path (str): Target `.npz` file, overwritten when the writer is closed
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        self._vectors = tempfile.TemporaryFile(dir=directory)
+        self._names = tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=directory)
+        self.count = 0
+        self.dimensions: Optional[int] = None
+        self._max_name_length = 1
+
+    def write(self, names: List[str], embeddings: np.ndarray) -> None:
+        """
+        Append a batch of rows.
+
+        Args:
+            names (List[str]): Person name of each row
+            embeddings (np.ndarray): Embeddings as an N x D array
+
+        Raises:
+            ValueError: If the batch is inconsistent or its dimension differs from earlier rows
+        """
+        embeddings = np.asarray(embeddings, dtype="<f4").reshape(len(names), -1)
+        if self.dimensions is None:
+            self.dimensions = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Expected {self.dimensions}-dimensional embeddings, got {embeddings.shape[1]}"
+            )
+        self._vectors.write(np.ascontiguousarray(embeddings).tobytes())
+        for name in names:
+            self._names.write(json.dumps(name) + "\n")
+            self._max_name_length = max(self._max_name_length, len(name))
+        self.count += len(names)
+
+    def _write_member(self, archive: zipfile.ZipFile, member: str, header: dict, chunks) -> None:
+        with archive.open(member, "w", force_zip64=True) as output:
+            np.lib.format.write_array_header_2_0(output, header)
+            for chunk in chunks:
+                output.write(chunk)
+
+    def _name_chunks(self) -> Iterator[bytes]:
+        self._names.seek(0)
+        dtype = f"<U{self._max_name_length}"
+        batch = []
+        for line in self._names:
+            batch.append(json.loads(line))
+            if len(batch) == 65536:
+                yield np.array(batch, dtype=dtype).tobytes()
+                batch = []
+        if batch:
+            yield np.array(batch, dtype=dtype).tobytes()
+
+    def _vector_chunks(self) -> Iterator[bytes]:
+        self._vectors.seek(0)
+        while chunk := self._vectors.read(COPY_CHUNK_SIZE):
+            yield chunk
+
+    def close(self) -> None:
+        """Assemble the archive at the target path and discard the spooled data."""
+        try:
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED) as archive:
+                self._write_member(
+                    archive,
+                    NAMES_MEMBER,
+                    {
+                        "descr": f"<U{self._max_name_length}",
+                        "fortran_order": False,
+                        "shape": (self.count,),
+                    },
+                    self._name_chunks(),
+                )
+                self._write_member(
+                    archive,
+                    EMBEDDINGS_MEMBER,
+                    {
+                        "descr": "<f4",
+                        "fortran_order": False,
+                        "shape": (self.count, self.dimensions or 0),
+                    },
+                    self._vector_chunks(),
+                )
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        """Drop the spooled data without writing the archive."""
+        self._vectors.close()
+        self._names.close()
+
+    def __enter__(self) -> "GalleryWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _read_header(member) -> Tuple[tuple, np.dtype]:
+    version = np.lib.format.read_magic(member)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(member)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(member)
+    return shape, dtype
+
+
+def read_gallery(
+    path: str, batch_size: int = 10000
+) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """
+    Stream the rows of a gallery file in batches.
+
+    Args:
+        path (str): `.npz` gallery file, as written by GalleryWriter or `np.savez`
+            (uncompressed, with `names` and `embeddings` arrays)
+        batch_size (int, optional): Rows per batch. Defaults to 10000.
+
+    Yields:
+        Tuple[List[str], np.ndarray]: Names and float32 embeddings of each batch
+
+    Raises:
+        ValueError: If the archive is not a gallery file
+    """
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        raise ValueError(f"'{path}' is not a gallery file")
+
+    with archive:
+        try:
+            names_member = archive.open(NAMES_MEMBER)
+            embeddings_member = archive.open(EMBEDDINGS_MEMBER)
+        except KeyError:
+            raise ValueError(f"'{path}' is not a gallery file")
+
+        with names_member, embeddings_member:
+            (count,), names_dtype = _read_header(names_member)
+            shape, embeddings_dtype = _read_header(embeddings_member)
+            if len(shape) != 2 or shape[0] != count:
+                raise ValueError(f"'{path}' has {count} names but embeddings of shape {shape}")
+
+            dimensions = shape[1]
+            for start in range(0, count, batch_size):
+                rows = min(batch_size, count - start)
+                names = np.frombuffer(
+                    names_member.read(rows * names_dtype.itemsize), dtype=names_dtype
+                )
+                embeddings = np.frombuffer(
+                    embeddings_member.read(rows * dimensions * embeddings_dtype.itemsize),
+                    dtype=embeddings_dtype,
+                ).reshape(rows, dimensions)
+                yield names.tolist(), embeddings.astype(np.float32)
@@ -0,0 +1,28 @@
+from typing import Union
+
+import numpy as np
+
+
+def decode_image(image: Union[str, np.ndarray]) -> np.ndarray:
+    """
+    Decode an image the same way the detector does.
+
+    Decoding once up front lets callers inspect the pixels and pass the array on,
+    instead of every stage decoding the same base64 string or downloading the URL.
+
+    Args:
+        image (Union[str, np.ndarray]): File path, URL, base64 string or BGR array
+
+    Returns:
+        np.ndarray: BGR image array
+
+    Raises:
+        ValueError: If the image cannot be loaded
+    """
+    if isinstance(image, np.ndarray):
+        return image
+
+    from deepface.commons import image_utils
+
+    decoded, _ = image_utils.load_image(image)
+    return decoded
@@ -1,9 +1,214 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+from contextvars import ContextVar
+from typing import Dict, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Path of the request being handled, set by the API's route middleware
+request_route: ContextVar[Optional[str]] = ContextVar("request_route", default=None)
 
-logger = logging.getLogger('face_recognition')
\ No newline at end of file
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+REDACTED = "[REDACTED]"
+# Bearer credentials, `key=value` / `"key": value` secrets and passwords in URIs
+SECRET_PATTERNS = [
+    re.compile(r"(?i)(bearer\s+)[^\s'\",]+"),
+    re.compile(
+        r"(?i)((?:token|api_key|apikey|password|secret)[\"']?\s*[=:]\s*[\"']?)[^\s&'\",}]+"
+    ),
+    re.compile(r"(://[^:/@\s]+:)[^@\s]+(?=@)"),
+]
+
+
+def redact(message: str) -> str:
+    """
+    Mask credentials in a log message.
+
+    Args:
+        message (str): Formatted log message
+
+    Returns:
+        str: The message with tokens, API keys and passwords replaced
+    """
+    for pattern in SECRET_PATTERNS:
+        message = pattern.sub(lambda match: match.group(1) + REDACTED, message)
+    return message
+
+
+def parse_sample_rates(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a `route=rate,route=rate` mapping of success log sampling rates.
+
+    Args:
+        spec (Optional[str]): Mapping specification, e.g. "/recognize=0.01,/ws=0.1"
+
+    Returns:
+        Dict[str, float]: Rates by route prefix; empty for an empty specification
+
+    Raises:
+        ValueError: If an entry is not a `route=number` pair or a rate is outside [0, 1]
+    """
+    rates = {}
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        route, separator, rate = entry.rpartition("=")
+        if not separator or not route.strip():
+            raise ValueError(f"Invalid sample rate entry: {entry!r}")
+        rates[route.strip()] = float(rate)
+        if not 0 <= rates[route.strip()] <= 1:
+            raise ValueError(f"Sample rate must be between 0 and 1: {entry!r}")
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the success logs of each route.
+
+    Records below WARNING are kept with the rate of the longest matching route
+    prefix, and every record of unlisted routes or emitted outside a request is
+    kept. Warnings and errors are never dropped. uvicorn access logs carry their
+    path in the record's arguments, so their route is read from there. The route
+    is attached to every record as `route`.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefixes first, so the most specific route wins
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _route(self, record: logging.LogRecord) -> Optional[str]:
+        if record.name == "uvicorn.access" and isinstance(record.args, tuple):
+            if len(record.args) >= 3:
+                return str(record.args[2]).split("?", 1)[0]
+        return request_route.get()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        route = self._route(record)
+        record.route = route
+        if record.levelno >= logging.WARNING or route is None:
+            return True
+        for prefix, rate in self.rates:
+            if route.startswith(prefix):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that drops records instead of blocking when the queue is full.
+
+    Messages are formatted and redacted in the calling thread, as the arguments
+    may not be safe to read later; writing them is left to the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.msg = redact(record.msg)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, as read by Cloud Logging."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route is not None:
+            entry["route"] = route
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _output_handler() -> logging.Handler:
+    output = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "text") == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return output
+
+
+def _start_listener() -> None:
+    global _listener
+    # A fresh queue: one inherited through fork may hold a lock of a dead thread
+    _handler.queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+    _listener = logging.handlers.QueueListener(
+        _handler.queue, _output_handler(), respect_handler_level=False
+    )
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Write the queued records and stop the listener thread.
+
+    Called at exit; processes leaving through `os._exit` call it themselves.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging() -> None:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Emitting a record only formats it and puts it on a bounded queue; the listener
+    thread writes it to stdout, so requests never wait on the stream. The level is
+    read from `LOG_LEVEL` (default INFO), the output format from `LOG_FORMAT`
+    (`text` or `json`) and per-route success log sampling from `LOG_SAMPLE_RATES`.
+    uvicorn's loggers propagate to the same handler. Forked workers start their
+    own listener thread.
+    """
+    global _handler
+    if _handler is not None:
+        return
+    _handler = NonBlockingQueueHandler(queue.Queue())
+    _handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("LOG_SAMPLE_RATES"))))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _start_listener()
+    os.register_at_fork(after_in_child=_start_listener)
+    atexit.register(stop_logging)
+
+
+configure_logging()
+
+logger = logging.getLogger('face_recognition')
@@ -0,0 +1,73 @@
+import argparse
+import os
+from typing import Dict, List
+
+# Fields of /proc/<pid>/smaps_rollup, reported in kB by the kernel
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def read_memory(pid: int) -> Dict[str, int]:
+    """
+    Read the memory usage of a process from /proc/<pid>/smaps_rollup (Linux only).
+
+    RSS counts every resident page, including pages shared with other processes,
+    so summing it over forked workers overstates their footprint. PSS divides each
+    shared page between the processes mapping it and sums to the real usage.
+
+    Args:
+        pid (int): Process to inspect
+
+    Returns:
+        Dict[str, int]: Usage in kB for each of FIELDS
+    """
+    usage = dict.fromkeys(FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            key, _, value = line.partition(":")
+            if key in usage:
+                usage[key] = int(value.split()[0])
+    return usage
+
+
+def child_pids(pid: int) -> List[int]:
+    """
+    List the direct children of a process.
+
+    Args:
+        pid (int): Parent process
+
+    Returns:
+        List[int]: Child process IDs
+    """
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as entries:
+            children.extend(int(child) for child in entries.read().split())
+    return children
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report RSS and PSS of the server master and its workers"
+    )
+    parser.add_argument("pid", type=int, help="PID of the server master process")
+    args = parser.parse_args()
+
+    pids = [args.pid] + child_pids(args.pid)
+    print(f"{'pid':>8} {'rss_mb':>9} {'pss_mb':>9} {'shared_mb':>10} {'private_mb':>11}")
+    total_rss = total_pss = 0
+    for pid in pids:
+        usage = read_memory(pid)
+        shared = usage["Shared_Clean"] + usage["Shared_Dirty"]
+        private = usage["Private_Clean"] + usage["Private_Dirty"]
+        total_rss += usage["Rss"]
+        total_pss += usage["Pss"]
+        print(
+            f"{pid:>8} {usage['Rss'] / 1024:>9.1f} {usage['Pss'] / 1024:>9.1f} "
+            f"{shared / 1024:>10.1f} {private / 1024:>11.1f}"
+        )
+    print(f"{'total':>8} {total_rss / 1024:>9.1f} {total_pss / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from dataclasses import fields, is_dataclass
+
+
 def remove_face_image(data):
     if isinstance(data, dict):
         return {k: remove_face_image(v) for k, v in data.items() if k != 'face_image'}
@@ -5,3 +8,29 @@ def remove_face_image(data):
         return [remove_face_image(item) for item in data]
     else:
         return data
+
+
+def serialize_result(data):
+    """
+    Convert a result dataclass to plain dicts and lists without its face crops.
+
+    Equivalent to `remove_face_image(asdict(data))`, except that crops are never
+    visited: `asdict` deep-copies every array before they are dropped.
+
+    Args:
+        data: Dataclass instance, or a list or dict of them
+
+    Returns:
+        The same structure with every dataclass converted to a dict
+    """
+    if is_dataclass(data) and not isinstance(data, type):
+        return {
+            field.name: serialize_result(getattr(data, field.name))
+            for field in fields(data)
+            if field.name != "face_image"
+        }
+    if isinstance(data, (list, tuple)):
+        return [serialize_result(item) for item in data]
+    if isinstance(data, dict):
+        return {key: serialize_result(value) for key, value in data.items()}
+    return data
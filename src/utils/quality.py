@@ -0,0 +1,107 @@
+from dataclasses import fields, replace
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.domain.models import DetectionResult, QualitySettings, SkippedFace
+
+
+def merge_quality_settings(
+    settings: QualitySettings, overrides: Optional[Dict[str, Any]]
+) -> QualitySettings:
+    """
+    Apply overrides on top of quality settings.
+
+    Args:
+        settings (QualitySettings): Base settings
+        overrides (Optional[Dict[str, Any]]): Values to override; None values are ignored
+
+    Returns:
+        QualitySettings: New settings with the overrides applied
+
+    Raises:
+        ValueError: If an override names an unknown setting
+    """
+    if not overrides:
+        return settings
+    known = {setting.name for setting in fields(QualitySettings)}
+    unknown = set(overrides) - known
+    if unknown:
+        raise ValueError(f"Unknown quality settings: {', '.join(sorted(unknown))}")
+    return replace(
+        settings, **{name: value for name, value in overrides.items() if value is not None}
+    )
+
+
+def _grayscale(face_image: np.ndarray) -> np.ndarray:
+    face_image = np.asarray(face_image)
+    gray = face_image.astype(np.float32)
+    if gray.ndim == 3:
+        gray = gray.mean(axis=2)
+    # Detector crops are uint8 0-255; float crops are taken to be scaled to [0, 1].
+    # The dtype decides, since a nearly black uint8 crop also has values <= 1
+    if np.issubdtype(face_image.dtype, np.floating):
+        gray = gray * 255.0
+    return gray
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """
+    Measure sharpness as the variance of the 4-neighbour Laplacian.
+
+    Args:
+        gray (np.ndarray): Grayscale image in 0-255 intensities
+
+    Returns:
+        float: Laplacian variance; low values indicate a blurred image
+    """
+    if gray.shape[0] < 3 or gray.shape[1] < 3:
+        return 0.0
+    laplacian = (
+        gray[:-2, 1:-1]
+        + gray[2:, 1:-1]
+        + gray[1:-1, :-2]
+        + gray[1:-1, 2:]
+        - 4.0 * gray[1:-1, 1:-1]
+    )
+    return float(laplacian.var())
+
+
+def assess_face(
+    index: int, detection: DetectionResult, settings: QualitySettings
+) -> Optional[SkippedFace]:
+    """
+    Check a detected face against the quality gate, cheapest test first.
+
+    Args:
+        index (int): Position of the face in the detection results
+        detection (DetectionResult): Detected face with its crop
+        settings (QualitySettings): Thresholds to apply; zero disables a minimum
+
+    Returns:
+        Optional[SkippedFace]: Why the face should not be embedded, or None if it passes
+    """
+    size = min(detection.bounding_box.w, detection.bounding_box.h)
+    if size < settings.min_face_size:
+        return SkippedFace(index=index, reason="too_small", value=float(size))
+
+    if (
+        settings.min_brightness <= 0
+        and settings.max_brightness >= 255
+        and settings.min_blur_variance <= 0
+    ):
+        return None
+
+    gray = _grayscale(detection.face_image)
+    brightness = float(gray.mean()) if gray.size else 0.0
+    if brightness < settings.min_brightness:
+        return SkippedFace(index=index, reason="too_dark", value=brightness)
+    if brightness > settings.max_brightness:
+        return SkippedFace(index=index, reason="too_bright", value=brightness)
+
+    if settings.min_blur_variance > 0:
+        sharpness = laplacian_variance(gray)
+        if sharpness < settings.min_blur_variance:
+            return SkippedFace(index=index, reason="blurry", value=sharpness)
+
+    return None
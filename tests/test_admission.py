@@ -0,0 +1,229 @@
+import asyncio
+
+import pytest
+
+from src.services.admission import (
+    BULK,
+    INTERACTIVE,
+    REST,
+    AdmissionController,
+    OverloadedError,
+    parse_weights,
+)
+
+
+def test_concurrency_is_capped():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=2, max_queue=10)
+        running = 0
+        peak = 0
+
+        async def work():
+            nonlocal running, peak
+            async with controller.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(8)))
+        assert peak == 2
+        assert controller.stats()["admitted"] == 8
+        assert controller.stats()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold(reject_when_full=True):
+            async with controller.slot(reject_when_full):
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        waiter = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedError) as excinfo:
+            controller.check()
+        assert excinfo.value.queue_depth == 1
+        assert excinfo.value.retry_after >= 1
+        with pytest.raises(OverloadedError):
+            await controller.acquire()
+
+        # Requests that must not be shed still queue up
+        extra = asyncio.ensure_future(hold(reject_when_full=False))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 2
+        extra.cancel()
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert controller.stats()["rejected"] == 2
+        assert controller.stats()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_slots_are_handed_over_in_fifo_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=10)
+        order = []
+
+        async def work(index):
+            async with controller.slot():
+                order.append(index)
+                await asyncio.sleep(0)
+
+        await controller.acquire()
+        tasks = [asyncio.ensure_future(work(index)) for index in range(5)]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+        assert order == list(range(5))
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=10)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 0
+
+        controller.release()
+        assert controller.stats()["active"] == 0
+        await asyncio.wait_for(controller.acquire(), timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_weighted_fair_share_between_tenants():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=100)
+        order = []
+
+        async def work(organization, priority):
+            async with controller.slot(organization=organization, priority=priority):
+                order.append(organization)
+                await asyncio.sleep(0)
+
+        await controller.acquire()
+        # The backfill tenant queues a large bulk batch before the live stream arrives
+        tasks = [asyncio.ensure_future(work("backfill", BULK)) for _ in range(20)]
+        tasks += [asyncio.ensure_future(work("live", INTERACTIVE)) for _ in range(4)]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+
+        # Interactive work weighs 8x bulk, so the live frames are not stuck behind the batch
+        assert max(index for index, name in enumerate(order) if name == "live") < 8
+        stats = controller.stats()["organizations"]
+        assert stats["live"]["mean_wait"] < stats["backfill"]["mean_wait"]
+
+    asyncio.run(scenario())
+
+
+def test_organization_quota_leaves_slots_to_others():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrency=2, max_queue=100, organization_quotas={"greedy": 1}
+        )
+        release = asyncio.Event()
+
+        async def hold(organization):
+            async with controller.slot(organization=organization):
+                await release.wait()
+
+        greedy = [asyncio.ensure_future(hold("greedy")) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert controller.stats()["active"] == 1
+        assert controller.stats()["organizations"]["greedy"]["queued"] == {REST: 2}
+
+        other = asyncio.ensure_future(hold("other"))
+        await asyncio.sleep(0)
+        assert controller.stats()["organizations"]["other"]["active"] == 1
+
+        release.set()
+        await asyncio.gather(*greedy, other)
+        assert controller.stats()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_parse_weights():
+    assert parse_weights("acme:2, globex:0.5") == {"acme": 2.0, "globex": 0.5}
+    assert parse_weights(None) == {}
+    with pytest.raises(ValueError):
+        parse_weights("acme")
+
+
+def test_enrollment_yields_slots_between_images():
+    import time
+
+    import numpy as np
+
+    from src.domain.models import BoundingBox, DetectionResult, DetectionResults
+    from src.services.face_recognition_service import FaceRecognitionService
+
+    controller = AdmissionController(max_concurrency=1, max_queue=100)
+    order = []
+
+    class SlowDetector:
+        def detect_accurate(self, image):
+            order.append("image")
+            time.sleep(0.02)
+            face = DetectionResult(
+                bounding_box=BoundingBox(x=0, y=0, w=8, h=8),
+                confidence=0.9,
+                face_image=np.zeros((8, 8, 3), dtype=np.uint8),
+            )
+            return DetectionResults(result=[face], inference_time=0.0)
+
+    class Embedder:
+        def generate_embeddings(self, faces):
+            return [np.ones(4) for _ in faces]
+
+    class Database:
+        async def get_embeddings(self, name, organization):
+            return []
+
+        async def save_embeddings(self, name, organization, embeddings):
+            pass
+
+    service = FaceRecognitionService(
+        detector=SlowDetector(), embedder=Embedder(), database=Database(), admission=controller
+    )
+    reported = []
+
+    async def progress(done, total):
+        # Would never get the only slot if the enrollment still held it
+        async with controller.slot(organization="org", priority=INTERACTIVE):
+            reported.append(done)
+
+    async def frame():
+        await asyncio.sleep(0.01)
+        async with controller.slot(organization="org", priority=INTERACTIVE):
+            order.append("frame")
+
+    async def scenario():
+        enrollment, _ = await asyncio.wait_for(
+            asyncio.gather(
+                service.register_person([b"0"] * 4, "alice", "org", progress=progress),
+                frame(),
+            ),
+            timeout=5,
+        )
+        return enrollment
+
+    assert asyncio.run(scenario()).kept == 1
+    # The live frame got the only slot between two images of the enrollment
+    assert order.index("frame") < 3
+    assert reported == [1, 2, 3, 4]
@@ -0,0 +1,641 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.domain.interfaces import AsyncFaceDatabase, FaceDatabase
+from src.domain.models import APIKey, VectorSearchResult
+from src.services.face_recognition_service import FaceRecognitionService
+
+LATENCY = 0.05
+
+
+class InMemoryFaceDatabase(AsyncFaceDatabase):
+    """In-memory stand-in that simulates a fixed round-trip latency."""
+
+    def __init__(self):
+        self.organizations = {}
+
+    async def create_organization(self, organization: str) -> bool:
+        await asyncio.sleep(LATENCY)
+        self.organizations.setdefault(organization, {"embeddings": [], "api_keys": {}})
+        return True
+
+    async def save_embedding(self, name: str, organization: str, embedding: np.ndarray) -> None:
+        await asyncio.sleep(LATENCY)
+        self.organizations[organization]["embeddings"].append((name, embedding))
+
+    async def get_embeddings(self, name: str, organization: str) -> List[np.ndarray]:
+        await asyncio.sleep(LATENCY)
+        return [stored for stored_name, stored in self.organizations[organization]["embeddings"] if stored_name == name]
+
+    async def vector_search(self, embedding: np.ndarray, threshold: float, organization: str) -> VectorSearchResult:
+        await asyncio.sleep(LATENCY)
+        best = VectorSearchResult(name="unknown", distance=None)
+        for name, stored in self.organizations[organization]["embeddings"]:
+            score = float(np.dot(embedding, stored) / (np.linalg.norm(embedding) * np.linalg.norm(stored)))
+            if best.distance is None or score > best.distance:
+                best = VectorSearchResult(name=name if score >= threshold else "unknown", distance=score)
+        return best
+
+    async def generate_api_key(self, user: str, api_key_name: str, organization: str) -> APIKey:
+        await asyncio.sleep(LATENCY)
+        key = APIKey(
+            key=f"{user}-{api_key_name}",
+            user=user,
+            api_key_name=api_key_name,
+            organization=organization,
+            created_at=datetime.now(),
+            last_used=None,
+            is_active=True,
+        )
+        self.organizations[organization]["api_keys"][(user, api_key_name)] = key.key
+        return key
+
+    async def revoke_api_key(self, api_key: str, user: str, api_key_name: str, organization: str) -> bool:
+        if not await self.validate_api_key(api_key, user, api_key_name, organization):
+            return False
+        del self.organizations[organization]["api_keys"][(user, api_key_name)]
+        return True
+
+    async def validate_api_key(self, api_key: str, user: str, api_key_name: str, organization: str) -> bool:
+        await asyncio.sleep(LATENCY)
+        return self.organizations[organization]["api_keys"].get((user, api_key_name)) == api_key
+
+    async def get_organizations(self) -> List[str]:
+        await asyncio.sleep(LATENCY)
+        return list(self.organizations)
+
+
+class BlockingFaceDatabase(FaceDatabase):
+    """Synchronous stand-in whose calls block like a pymongo round trip."""
+
+    def create_organization(self, organization):
+        return True
+
+    def save_embedding(self, name, organization, embedding):
+        time.sleep(LATENCY)
+
+    def get_embeddings(self, name, organization):
+        return []
+
+    def vector_search(self, embedding, threshold, organization):
+        time.sleep(LATENCY)
+        return VectorSearchResult(name="unknown", distance=None)
+
+    def generate_api_key(self, user, api_key_name, organization):
+        raise NotImplementedError
+
+    def revoke_api_key(self, api_key, user, api_key_name, organization):
+        return False
+
+    def validate_api_key(self, api_key, user, api_key_name, organization):
+        time.sleep(LATENCY)
+        return True
+
+    def get_organizations(self):
+        return []
+
+
+def make_service(database) -> FaceRecognitionService:
+    return FaceRecognitionService(detector=None, embedder=None, database=database)
+
+
+def test_api_key_lifecycle_in_memory():
+    async def scenario():
+        service = make_service(InMemoryFaceDatabase())
+        assert await service.create_organization("org")
+        api_key = await service.generate_api_key("user", "key", "org")
+        assert await service.validate_api_key(api_key.key, "user", "key", "org")
+        assert await service.revoke_api_key(api_key.key, "user", "key", "org")
+        assert not await service.validate_api_key(api_key.key, "user", "key", "org")
+        assert await service.get_organizations() == ["org"]
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_validations_overlap():
+    async def scenario():
+        database = InMemoryFaceDatabase()
+        service = make_service(database)
+        await service.create_organization("org")
+        api_key = await service.generate_api_key("user", "key", "org")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(service.validate_api_key(api_key.key, "user", "key", "org") for _ in range(20))
+        )
+        elapsed = time.perf_counter() - start
+
+        assert all(results)
+        assert elapsed < 10 * LATENCY
+
+    asyncio.run(scenario())
+
+
+def test_sync_database_is_wrapped_and_does_not_block_loop():
+    async def scenario():
+        service = make_service(BlockingFaceDatabase())
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(service.validate_api_key("k", "user", "key", "org") for _ in range(8))
+        )
+        elapsed = time.perf_counter() - start
+
+        assert all(results)
+        assert elapsed < 4 * LATENCY
+
+    asyncio.run(scenario())
+
+
+def test_vector_search_batch_default_gathers():
+    async def scenario():
+        database = InMemoryFaceDatabase()
+        await database.create_organization("org")
+        await database.save_embedding("alice", "org", np.array([1.0, 0.0]))
+        await database.save_embedding("bob", "org", np.array([0.0, 1.0]))
+
+        start = time.perf_counter()
+        results = await database.vector_search_batch(
+            [np.array([1.0, 0.1]), np.array([0.1, 1.0])] * 5, 0.5, "org"
+        )
+        elapsed = time.perf_counter() - start
+
+        assert [result.name for result in results] == ["alice", "bob"] * 5
+        assert elapsed < 4 * LATENCY
+
+    asyncio.run(scenario())
+
+
+def test_index_readiness_and_exact_fallback():
+    from src.infrastructure.database.mongodb_common import (
+        parse_index_state,
+        search_exactly,
+        summarize_index_states,
+    )
+
+    assert parse_index_state([]) == "DOES_NOT_EXIST"
+    assert parse_index_state([{"status": "BUILDING", "queryable": False}]) == "BUILDING"
+    assert parse_index_state([{"status": "STALE", "queryable": True}]) == "READY"
+
+    assert summarize_index_states({"face_embbedings": "BUILDING", "face_prototypes": "PENDING"}) == "provisioning"
+    assert summarize_index_states({"face_embbedings": "READY", "face_prototypes": "BUILDING"}) == "ready"
+    assert summarize_index_states({"face_embbedings": "READY", "face_prototypes": "FAILED"}) == "failed"
+
+    documents = [
+        {"name": "alice", "embedding": [1.0, 0.0]},
+        {"name": "bob", "embedding": [0.0, 1.0]},
+    ]
+    results = search_exactly([np.array([0.9, 0.1]), np.array([-1.0, 0.0])], documents, 0.8)
+    assert results[0].name == "alice"
+    assert results[1].name == "unknown"
+
+
+def test_streamed_embeddings_are_batched_and_folded_into_prototypes():
+    from src.infrastructure.database.mongodb_common import (
+        EmbeddingBatcher,
+        PrototypeAccumulator,
+    )
+
+    documents = [
+        {"name": "alice", "embedding": [2.0, 0.0]},
+        {"name": "bob", "embedding": [0.0, 3.0]},
+        {"name": "alice", "embedding": [0.0, 1.0]},
+    ]
+    batcher = EmbeddingBatcher(2)
+    batches = [batcher.add(document) for document in documents] + [batcher.flush()]
+    assert batches[0] is None and batches[2] is None
+    assert batches[1][0] == ["alice", "bob"] and batches[1][1].dtype == np.float32
+    assert batches[3][0] == ["alice"] and batches[3][1].shape == (1, 2)
+    assert batcher.flush() is None
+
+    accumulator = PrototypeAccumulator()
+    for document in documents:
+        accumulator.add(document)
+    prototypes = {
+        prototype["name"]: prototype for prototype in accumulator.documents("acme")
+    }
+    assert prototypes["alice"]["count"] == 2
+    assert prototypes["alice"]["sum"] == [1.0, 1.0]
+    assert np.allclose(prototypes["alice"]["embedding"], [0.5**0.5, 0.5**0.5])
+    assert prototypes["bob"]["organization"] == "acme"
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not os.getenv("MONGODB_TEST_URI"), reason="MONGODB_TEST_URI points to a local mongod"
+)
+def test_async_mongodb_api_keys():
+    from src.infrastructure.database.async_mongodb import AsyncMongoDBFaceDatabase
+
+    async def scenario():
+        database = AsyncMongoDBFaceDatabase(os.getenv("MONGODB_TEST_URI"), max_pool_size=10)
+        await database.verify_connection()
+        organization = "test_async_org"
+        await database.client.drop_database(organization)
+        # Plain mongod has no search indexes, so only create the api_keys collection
+        await database.client[organization].create_collection("api_keys")
+        try:
+            api_key = await database.generate_api_key("user", "key", organization)
+            validations = await asyncio.gather(
+                *(database.validate_api_key(api_key.key, "user", "key", organization) for _ in range(5))
+            )
+            assert all(validations)
+            assert await database.revoke_api_key(api_key.key, "user", "key", organization)
+            assert not await database.validate_api_key(api_key.key, "user", "key", organization)
+        finally:
+            await database.client.drop_database(organization)
+            await database.client.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not os.getenv("MONGODB_TEST_URI"), reason="MONGODB_TEST_URI points to a local mongod"
+)
+def test_shared_layout_keeps_organizations_apart():
+    from src.infrastructure.database.shared_mongodb import SharedMongoDBFaceDatabase
+
+    async def scenario():
+        database = SharedMongoDBFaceDatabase(
+            os.getenv("MONGODB_TEST_URI"), database="test_shared_layout"
+        )
+        await database.client.drop_database("test_shared_layout")
+        # Plain mongod has no search indexes, so register the organizations directly
+        await database.api_keys.create_index(
+            [("organization", 1), ("user", 1), ("api_key_name", 1)], unique=True
+        )
+        await database.organizations.insert_many(
+            [{"_id": "acme", "settings": {}}, {"_id": "globex", "settings": {}}]
+        )
+        try:
+            acme_key = await database.generate_api_key("user", "key", "acme")
+            globex_key = await database.generate_api_key("user", "key", "globex")
+            assert await database.validate_api_key(acme_key.key, "user", "key", "acme")
+            assert not await database.validate_api_key(acme_key.key, "user", "key", "globex")
+
+            await database.update_organization_settings("acme", {"quality": {"min_face_size": 40}})
+            assert await database.get_organization_settings("acme") == {
+                "quality": {"min_face_size": 40}
+            }
+            assert await database.get_organization_settings("globex") == {}
+
+            await database.save_embeddings("alice", "acme", [np.ones(4)])
+            assert len(await database.get_embeddings("alice", "acme")) == 1
+            assert await database.get_embeddings("alice", "globex") == []
+            assert sorted(await database.get_organizations()) == ["acme", "globex"]
+            assert await database.revoke_api_key(globex_key.key, "user", "key", "globex")
+        finally:
+            await database.client.drop_database("test_shared_layout")
+            await database.client.close()
+
+    asyncio.run(scenario())
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def limit(self, count):
+        return FakeCursor(self.documents[:count])
+
+    async def to_list(self, length):
+        if isinstance(self.documents, Exception):
+            raise self.documents
+        return list(self.documents)
+
+    async def __aiter__(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeCollection:
+    """Collection whose search index stays in one Atlas status."""
+
+    def __init__(self, index_name, status, documents=(), matches=()):
+        self.index_name = index_name
+        self.status = status
+        self.documents = list(documents)
+        self.matches = list(matches)
+        self.pipelines = []
+        self.deletes = []
+        self.index_queries = 0
+
+    async def list_search_indexes(self, index_name=None):
+        self.index_queries += 1
+        if isinstance(self.status, Exception):
+            return FakeCursor(self.status)
+        if self.status is None:
+            return FakeCursor([])
+        return FakeCursor([{"name": self.index_name, "status": self.status, "queryable": False}])
+
+    def find(self, filter, projection=None, batch_size=None):
+        names = filter.get("name", {}).get("$in")
+        return FakeCursor(
+            [document for document in self.documents if names is None or document["name"] in names]
+        )
+
+    async def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeCursor(self.matches)
+
+    async def bulk_write(self, operations, ordered=True):
+        from pymongo.operations import DeleteOne, ReplaceOne
+
+        for operation in operations:
+            matched = [
+                document
+                for document in self.documents
+                if all(document.get(key) == value for key, value in operation._filter.items())
+            ]
+            if isinstance(operation, DeleteOne):
+                self.deletes.append(operation._filter)
+                self.documents = [d for d in self.documents if d not in matched]
+            elif matched:
+                if isinstance(operation, ReplaceOne):
+                    self.documents[self.documents.index(matched[0])] = operation._doc
+            elif operation._upsert:
+                self.documents.append(operation._doc["$setOnInsert"])
+
+
+class FakeOrganizationDatabase(dict):
+    def get_collection(self, collection):
+        return self[collection]
+
+    async def list_collection_names(self):
+        return list(self)
+
+
+def fake_mongodb(status, documents=(), prototypes=(), matches=(), **options):
+    from src.infrastructure.database.async_mongodb import AsyncMongoDBFaceDatabase
+
+    # The driver connects lazily, so no server is contacted
+    database = AsyncMongoDBFaceDatabase("mongodb://localhost:1", **options)
+    fake = FakeOrganizationDatabase(
+        embeddings=FakeCollection("face_embbedings", status, documents),
+        prototypes=FakeCollection("face_prototypes", status, prototypes, matches),
+    )
+    database._get_organization_db = lambda organization: fake
+
+    async def database_exists(name):
+        return True
+
+    database.database_exists = database_exists
+    return database, fake
+
+
+def test_exact_fallback_only_serves_small_galleries_of_building_indexes():
+    from src.domain.interfaces import SearchUnavailableError
+
+    documents = [
+        {"name": "alice", "embedding": [1.0, 0.0]},
+        {"name": "bob", "embedding": [0.0, 1.0]},
+    ]
+    query = [np.array([0.9, 0.1])]
+
+    async def search(status, max_rows=10):
+        database, _ = fake_mongodb(status, documents, exact_search_max_rows=max_rows)
+        return await database.vector_search_batch(query, 0.8, "org")
+
+    [result] = asyncio.run(search("BUILDING"))
+    assert result.name == "alice"
+    with pytest.raises(SearchUnavailableError, match="exceeds 1 embeddings"):
+        asyncio.run(search("PENDING", max_rows=1))
+    with pytest.raises(SearchUnavailableError, match="FAILED"):
+        asyncio.run(search("FAILED"))
+    with pytest.raises(SearchUnavailableError, match="no vector search index"):
+        asyncio.run(search(None))
+
+
+def test_index_watcher_gives_up_on_stuck_or_rejected_builds():
+    from pymongo.errors import AutoReconnect, OperationFailure
+
+    from src.domain.interfaces import SearchUnavailableError
+
+    async def watch(status, timeout):
+        database, fake = fake_mongodb(
+            status, index_poll_interval=0.01, index_build_timeout=timeout
+        )
+        start = time.perf_counter()
+        await asyncio.wait_for(database._watch_indexes("org"), 2)
+        elapsed = time.perf_counter() - start
+        for collection in fake.values():
+            collection.status = "BUILDING"
+        return database, elapsed
+
+    async def stuck():
+        database, elapsed = await watch("BUILDING", 0.05)
+        assert elapsed >= 0.05
+        assert (await database.get_organization_status("org"))["status"] == "failed"
+        with pytest.raises(SearchUnavailableError):
+            await database.vector_search(np.ones(2), 0.5, "org")
+
+    async def unreachable():
+        # Network errors may clear, so polling goes on until the deadline
+        database, elapsed = await watch(AutoReconnect("connection reset"), 0.05)
+        assert elapsed >= 0.05
+        assert await database.index_state("org", "face_embbedings") == "FAILED"
+
+    async def rejected():
+        database, elapsed = await watch(OperationFailure("ns not found"), 60)
+        assert elapsed < 1
+        assert await database.index_state("org", "face_embbedings") == "BUILDING"
+
+    asyncio.run(stuck())
+    asyncio.run(unreachable())
+    asyncio.run(rejected())
+
+
+def evaluate(expression, document, variables):
+    """Evaluate the aggregation expressions used by the prototype update."""
+    if isinstance(expression, str) and expression.startswith("$$"):
+        return variables[expression[2:]]
+    if isinstance(expression, str) and expression.startswith("$"):
+        return document.get(expression[1:])
+    if isinstance(expression, list):
+        return [evaluate(item, document, variables) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+
+    [(operator, argument)] = expression.items()
+    if operator == "$literal":
+        return argument
+    if operator == "$map":
+        return [
+            evaluate(argument["in"], document, {**variables, argument["as"]: item})
+            for item in evaluate(argument["input"], document, variables)
+        ]
+    if operator == "$reduce":
+        value = evaluate(argument["initialValue"], document, variables)
+        for item in evaluate(argument["input"], document, variables):
+            value = evaluate(argument["in"], document, {**variables, "value": value, "this": item})
+        return value
+    if operator == "$let":
+        bound = {name: evaluate(value, document, variables) for name, value in argument["vars"].items()}
+        return evaluate(argument["in"], document, {**variables, **bound})
+
+    values = evaluate(argument, document, variables)
+    if operator == "$add":
+        return sum(values)
+    if operator == "$multiply":
+        return values[0] * values[1]
+    if operator == "$divide":
+        return values[0] / values[1]
+    if operator == "$max":
+        return max(values)
+    if operator == "$sqrt":
+        return values**0.5
+    if operator == "$ifNull":
+        return values[1] if values[0] is None else values[0]
+    if operator == "$range":
+        return list(range(*values))
+    if operator == "$arrayElemAt":
+        array, index = values
+        return array[index] if array is not None and index < len(array) else None
+    raise NotImplementedError(operator)
+
+
+def apply_update(pipeline, document):
+    for stage in pipeline:
+        [(operator, fields)] = stage.items()
+        assert operator == "$set"
+        values = {field: evaluate(expression, document, {"NOW": "now"}) for field, expression in fields.items()}
+        document = {**document, **values}
+    return document
+
+
+def test_incremental_prototype_updates_match_a_rebuild():
+    from src.infrastructure.database.mongodb_common import (
+        PrototypeAccumulator,
+        build_prototype_update,
+    )
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(5, 4))
+
+    # An upsert starts from a document without any prototype field
+    prototype = apply_update(build_prototype_update(list(embeddings[:3])), {})
+    prototype = apply_update(build_prototype_update(list(embeddings[3:])), prototype)
+
+    accumulator = PrototypeAccumulator()
+    for embedding in embeddings:
+        accumulator.add({"name": "alice", "embedding": embedding.tolist()})
+    [rebuilt] = accumulator.documents()
+
+    assert prototype["count"] == rebuilt["count"] == 5
+    assert np.allclose(prototype["sum"], rebuilt["sum"])
+    assert np.allclose(prototype["embedding"], rebuilt["embedding"])
+    assert np.isclose(np.linalg.norm(prototype["embedding"]), 1.0)
+
+
+def test_rerank_scores_candidates_like_atlas():
+    from src.infrastructure.database.mongodb_common import rerank_by_embeddings
+
+    documents = [
+        {"name": "alice", "embedding": [1.0, 0.0]},
+        {"name": "bob", "embedding": [0.0, 2.0]},
+        {"name": "bob", "embedding": [0.6, 0.8]},
+    ]
+    result = rerank_by_embeddings(np.array([0.8, 0.6]), documents, 0.9)
+    # cos = 0.96 with bob's second photo, Atlas reports (1 + cos) / 2
+    assert result.name == "bob"
+    assert result.distance == pytest.approx(0.98)
+
+    below = rerank_by_embeddings(np.array([-1.0, 0.0]), documents, 0.9)
+    assert below.name == "unknown" and below.distance == pytest.approx(0.5)
+    assert rerank_by_embeddings(np.ones(2), [], 0.5).distance is None
+
+
+def test_two_stage_search_reranks_the_prototype_candidates():
+    documents = [
+        {"name": "alice", "embedding": [1.0, 0.0]},
+        {"name": "alice", "embedding": [0.0, 1.0]},
+        {"name": "bob", "embedding": [0.8, 0.6]},
+        {"name": "carol", "embedding": [0.0, -1.0]},
+    ]
+    # The prototype stage ranks alice's mean first; her photos are far from the query
+    matches = [{"name": "alice", "score": 0.95}, {"name": "bob", "score": 0.9}]
+
+    async def search(rerank):
+        database, fake = fake_mongodb(
+            "READY",
+            documents,
+            matches=matches,
+            two_stage_search=True,
+            rerank=rerank,
+            prototype_candidates=2,
+        )
+        result = await database.vector_search(np.array([0.8, 0.6]), 0.5, "org")
+        return result, fake
+
+    result, fake = asyncio.run(search(rerank=True))
+    assert result.name == "bob" and result.distance == pytest.approx(1.0)
+    [pipeline] = fake["prototypes"].pipelines
+    assert pipeline[0]["$vectorSearch"]["index"] == "face_prototypes"
+    assert pipeline[0]["$vectorSearch"]["limit"] == 2
+    assert fake["embeddings"].pipelines == []
+
+    result, _ = asyncio.run(search(rerank=False))
+    assert result.name == "alice" and result.distance == 0.95
+
+
+def test_missing_prototype_index_is_checked_once_per_poll_interval():
+    async def search():
+        database, fake = fake_mongodb("READY", two_stage_search=True)
+        # Organizations created before two-stage search have no prototype index
+        fake["prototypes"].status = None
+        for _ in range(3):
+            await database.vector_search_batch([np.ones(2)] * 4, 0.5, "org")
+        return fake
+
+    fake = asyncio.run(search())
+    assert fake["prototypes"].index_queries == 1
+    assert len(fake["embeddings"].pipelines) == 12
+
+
+def test_rebuild_replaces_prototypes_in_place():
+    documents = [
+        {"name": "alice", "embedding": [1.0, 0.0]},
+        {"name": "alice", "embedding": [0.0, 1.0]},
+        {"name": "bob", "embedding": [0.0, 3.0]},
+        {"name": "erin", "embedding": [1.0, 0.0]},
+    ]
+    stored = [
+        {"name": "alice", "sum": [9.0, 9.0], "count": 9, "embedding": [1.0, 0.0]},
+        {"name": "carol", "sum": [0.0, 2.0], "count": 2, "embedding": [0.0, 1.0]},
+        {"name": "dave", "sum": [1.0, 0.0], "count": 1, "embedding": [1.0, 0.0]},
+    ]
+
+    async def rebuild():
+        database, fake = fake_mongodb("READY", documents, prototypes=stored)
+        # Enrollments running alongside the rebuild add to carol's prototype and
+        # create erin's once the stored prototypes have been read
+        read_prototypes = fake["prototypes"].find
+
+        def find(filter, projection=None, batch_size=None):
+            cursor = read_prototypes(filter, projection, batch_size)
+            cursor.documents = [dict(document) for document in cursor.documents]
+            fake["embeddings"].documents.append({"name": "carol", "embedding": [1.0, 0.0]})
+            fake["prototypes"].documents[1] = {**stored[1], "count": 3}
+            fake["prototypes"].documents.append({"name": "erin", "count": 7})
+            return cursor
+
+        fake["prototypes"].find = find
+        return await database.rebuild_index("org", batch_size=2), fake
+
+    written, fake = asyncio.run(rebuild())
+    prototypes = {document["name"]: document for document in fake["prototypes"].documents}
+    assert written == 4
+    assert sorted(prototypes) == ["alice", "bob", "carol", "erin"]
+    assert prototypes["alice"]["count"] == 2 and prototypes["alice"]["sum"] == [1.0, 1.0]
+    assert prototypes["bob"]["count"] == 1
+    # Prototypes updated by enrollments during the rebuild are not overwritten
+    assert prototypes["carol"]["count"] == 3
+    assert prototypes["erin"]["count"] == 7
+    # Only the people left without embeddings are deleted, never the whole collection
+    assert fake["prototypes"].deletes == [{"name": "dave", "count": 1}]
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+
+from src.api.middleware.auth import APIKeyAuth
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class KeyService:
+    """Stands in for the database: one valid key per owner until it is revoked."""
+
+    def __init__(self, keys):
+        self.keys = dict(keys)
+        self.validations = 0
+
+    async def validate_api_key(self, api_key, user, api_key_name, organization):
+        self.validations += 1
+        return self.keys.get((organization, user, api_key_name)) == api_key
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def replicas():
+    server = fakeredis.FakeServer()
+    service = KeyService({("org", "alice", "camera"): "secret"})
+    replicas = []
+    for _ in range(2):
+        auth = APIKeyAuth(service)
+        auth.cache = fakeredis.FakeRedis(server=server, decode_responses=True)
+        auth.start()
+        replicas.append(auth)
+    for auth in replicas:
+        wait_for(auth._listening.is_set)
+    yield service, replicas
+    for auth in replicas:
+        auth.stop()
+
+
+def test_revocation_reaches_every_replica_cache_at_once(replicas):
+    service, (first, second) = replicas
+
+    def validate(auth, token="secret"):
+        return asyncio.run(auth.validate(token, "org", "alice", "camera"))
+
+    assert validate(first)
+    assert validate(first)
+    assert validate(second)
+    # Only the first lookup reached the database; the rest were served by the caches
+    assert service.validations == 1
+    assert ("org", "alice", "camera") in second._local
+    assert "secret" not in first.cache.get("auth:org:alice:camera")
+    assert not validate(second, "guess")
+
+    del service.keys[("org", "alice", "camera")]
+    first.invalidate("org", "alice", "camera")
+    wait_for(lambda: ("org", "alice", "camera") not in second._local)
+
+    assert not validate(first)
+    assert not validate(second)
+    assert first.cache.get("auth:org:alice:camera") == "revoked"
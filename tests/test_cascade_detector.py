@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.domain.interfaces import FaceDetector
+from src.domain.models import BoundingBox, DetectionResult, DetectionResults
+from src.infrastructure.ml.detect.cascade_detector import CascadeDetector
+
+
+class ScriptedDetector(FaceDetector):
+    """Returns faces with the confidences given by the image's first pixel."""
+
+    def __init__(self, confidences):
+        self.confidences = confidences
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        faces = [
+            DetectionResult(
+                bounding_box=BoundingBox(x=0, y=0, w=10, h=10),
+                confidence=confidence,
+                face_image=np.zeros((8, 8, 3), dtype=np.float32),
+            )
+            for confidence in self.confidences[int(image[0, 0, 0])]
+        ]
+        return DetectionResults(result=faces, inference_time=0.01)
+
+
+def image(kind):
+    return np.full((4, 4, 3), kind, dtype=np.uint8)
+
+
+def test_confident_frames_never_reach_the_accurate_detector():
+    fast = ScriptedDetector({0: [0.99, 0.95]})
+    accurate = ScriptedDetector({0: [0.99, 0.99]})
+    cascade = CascadeDetector(fast, accurate, min_confidence=0.9)
+
+    for _ in range(3):
+        results = cascade.detect(image(0))
+
+    assert [face.confidence for face in results.result] == [0.99, 0.95]
+    assert accurate.calls == 0
+    stats = cascade.stats()
+    assert stats["frames"] == 3 and stats["fast_only"] == 3
+    assert stats["escalation_rate"] == 0.0
+
+
+def test_escalates_missing_and_uncertain_faces():
+    fast = ScriptedDetector({0: [], 1: [0.98, 0.6], 2: [0.97]})
+    accurate = ScriptedDetector({0: [0.92], 1: [0.99, 0.93], 2: [0.99]})
+    cascade = CascadeDetector(fast, accurate, min_confidence=0.9)
+
+    missed = cascade.detect(image(0))
+    uncertain = cascade.detect(image(1))
+    cascade.detect(image(2))
+
+    assert [face.confidence for face in missed.result] == [0.92]
+    assert [face.confidence for face in uncertain.result] == [0.99, 0.93]
+    # Both passes count towards the escalated image's inference time
+    assert np.isclose(missed.inference_time, 0.02)
+    stats = cascade.stats()
+    assert stats["escalations"] == {"no_face": 1, "low_confidence": 1, "requested": 0}
+    assert np.isclose(stats["escalation_rate"], 2 / 3)
+
+
+def test_accurate_requests_skip_the_fast_detector():
+    fast = ScriptedDetector({0: [0.99]})
+    accurate = ScriptedDetector({0: [0.97]})
+    cascade = CascadeDetector(fast, accurate)
+
+    results = cascade.detect_accurate(image(0))
+
+    assert [face.confidence for face in results.result] == [0.97]
+    assert fast.calls == 0
+    assert cascade.stats()["escalations"]["requested"] == 1
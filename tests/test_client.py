@@ -0,0 +1,236 @@
+import asyncio
+import base64
+import importlib
+import json
+import time
+
+import numpy as np
+import pytest
+
+from src.client import AsyncFaceAPIClient, FaceAPIClient, FaceAPIError, FrameStream
+from src.domain.interfaces import FaceDetector, FaceEmbedder
+from src.domain.models import BoundingBox, DetectionResult, DetectionResults
+
+fakeredis = pytest.importorskip("fakeredis")
+httpx = pytest.importorskip("httpx")
+
+
+class PersonDetector(FaceDetector):
+    """Finds one face whose pixels hold the person id sent as the image bytes."""
+
+    def detect(self, image):
+        person = int(base64.b64decode(image))
+        face = DetectionResult(
+            bounding_box=BoundingBox(x=0, y=0, w=50, h=50),
+            confidence=0.9,
+            face_image=np.full((8, 8, 3), person, dtype=np.uint8),
+        )
+        return DetectionResults(result=[face], inference_time=0.0)
+
+
+class BatchingEmbedder(FaceEmbedder):
+    """One-hot embedder paying a fixed cost per call, like a model invocation."""
+
+    def generate_embedding(self, face_image):
+        return np.eye(4)[int(face_image[0, 0, 0])]
+
+    def generate_embeddings(self, face_images):
+        time.sleep(0.01)
+        return [self.generate_embedding(face_image) for face_image in face_images]
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setenv("FACE_DATABASE_BACKEND", "mmap")
+    monkeypatch.setenv("FACE_DATABASE_PATH", str(tmp_path))
+    monkeypatch.setenv("EMBEDDING_DIMENSIONS", "4")
+    monkeypatch.setenv("INFERENCE_MAX_QUEUE", "64")
+    import src.api.inference as inference
+
+    monkeypatch.setattr(inference, "get_detector", PersonDetector)
+    monkeypatch.setattr(inference, "get_embedder", BatchingEmbedder)
+    import src.api.main as main
+
+    main = importlib.reload(main)
+    main.auth_handler.cache = fakeredis.FakeRedis(decode_responses=True)
+    return main.app
+
+
+@pytest.fixture
+def client(api):
+    from fastapi.testclient import TestClient
+
+    with FaceAPIClient(
+        "http://test", "org", http_client=TestClient(api, base_url="http://test")
+    ) as client:
+        client.create_organization()
+        client.create_api_key("tester", "sdk")
+        client.register([b"0"], "alice")
+        client.register([b"1"], "bob")
+        yield client
+
+
+def test_sync_client_covers_the_rest_routes(client):
+    assert client.health()["status"] == "ok"
+    assert "org" in client.get_organizations()
+
+    result = client.recognize(b"0", threshold=0.5)
+    assert result["searchs"][0]["name"] == "alice"
+
+    client.register_embeddings(np.eye(4)[2:3], model="default", name="carol")
+    [search] = client.recognize_embeddings(np.eye(4)[2], model="default")
+    assert search["name"] == "carol"
+
+    results = list(client.recognize_many([b"1", b"0", b"1"], batch_size=2))
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["searchs"][0]["name"] for result in results] == [
+        "bob",
+        "alice",
+        "bob",
+    ]
+
+    client.revoke_api_key()
+    with pytest.raises(FaceAPIError) as error:
+        client.recognize(b"0")
+    assert error.value.status_code == 403
+
+
+def test_batching_raises_throughput_against_the_in_process_app(api, client):
+    images = [str(index % 2).encode() for index in range(32)]
+
+    async def run(batch_window):
+        requests = []
+
+        async def count(request):
+            requests.append(request)
+
+        http = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=api),
+            base_url="http://test",
+            event_hooks={"request": [count]},
+        )
+        sdk = AsyncFaceAPIClient(
+            "http://test",
+            "org",
+            api_key=client.routes.api_key,
+            user="tester",
+            api_key_name="sdk",
+            batch_window=batch_window,
+            max_batch_size=8,
+            http_client=http,
+        )
+        async with sdk:
+            slots = asyncio.Semaphore(8)
+
+            async def recognize(image):
+                async with slots:
+                    return await sdk.recognize(image, threshold=0.5)
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(recognize(image) for image in images))
+            elapsed = time.perf_counter() - start
+        return results, len(requests), len(images) / elapsed
+
+    single, single_requests, single_throughput = asyncio.run(run(None))
+    batched, batched_requests, batched_throughput = asyncio.run(run(0.02))
+
+    names = [result["searchs"][0]["name"] for result in batched]
+    assert names == [result["searchs"][0]["name"] for result in single]
+    assert names[:2] == ["alice", "bob"]
+    assert single_requests == 32
+    assert batched_requests == 4
+    assert batched_throughput > single_throughput
+
+
+class FakeConnection:
+    """Server side of one WebSocket connection that drops after `drop_after` frames."""
+
+    def __init__(self, drop_after=None, target_fps=1000):
+        self.replies = asyncio.Queue()
+        self.replies.put_nowait(
+            {
+                "type": "control",
+                "target_fps": target_fps,
+                "max_resolution": 640,
+                "jpeg_quality": 0.8,
+            }
+        )
+        self.drop_after = drop_after
+        self.received = []
+        self.max_in_flight = 0
+        self.in_flight = 0
+
+    async def send(self, message):
+        frame = json.loads(message)
+        self.received.append(frame["frame_id"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.drop_after is not None and len(self.received) > self.drop_after:
+            self.replies.put_nowait(None)
+            return
+        # Answer later, so several frames can be waiting at once
+        asyncio.get_running_loop().call_later(
+            0.01,
+            self.replies.put_nowait,
+            {"type": "result", "frame_id": frame["frame_id"], "searchs": []},
+        )
+
+    async def recv(self):
+        reply = await self.replies.get()
+        if reply is None:
+            raise ConnectionResetError("dropped")
+        if reply.get("type") == "result":
+            self.in_flight -= 1
+        return json.dumps(reply)
+
+    async def close(self):
+        pass
+
+
+def test_frame_stream_reconnects_and_bounds_frames_in_flight():
+    connections = [FakeConnection(drop_after=3), FakeConnection()]
+    attempts = []
+
+    async def connect(url):
+        attempts.append(url)
+        if len(attempts) == 2:
+            raise ConnectionRefusedError("restarting")
+        return connections.pop(0)
+
+    async def frames():
+        for _ in range(10):
+            yield b"frame"
+
+    async def collect():
+        stream = FrameStream(
+            "ws://test/ws/recognize",
+            max_in_flight=2,
+            reconnect_delay=0.001,
+            connect=connect,
+        )
+        return stream, [reply async for reply in stream.run(frames())]
+
+    first, second = connections
+    stream, replies = asyncio.run(collect())
+
+    assert len(attempts) == 3
+    assert stream.reconnects == 1
+    results = [reply for reply in replies if reply["type"] == "result"]
+    errors = [reply for reply in replies if reply.get("error") == "disconnected"]
+    assert len(results) + len(errors) == 10
+    assert errors and all(reply["frame_id"] <= 4 for reply in errors)
+    assert first.max_in_flight <= 2 and second.max_in_flight <= 2
+    assert stream.control["target_fps"] == 1000
+
+
+def test_revoke_succeeds_when_cache_invalidation_fails(client, monkeypatch):
+    import src.api.main as main
+
+    def unreachable(*args):
+        raise RuntimeError("Failed to invalidate API key: connection refused")
+
+    monkeypatch.setattr(main.auth_handler, "invalidate", unreachable)
+    response = client.http.send(client._build(client.routes.revoke_api_key()))
+
+    assert response.status_code == 202
+    assert response.json()["cache_ttl"] == main.auth_handler.cache_ttl
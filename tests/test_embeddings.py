@@ -0,0 +1,83 @@
+import asyncio
+import base64
+
+import numpy as np
+import pytest
+
+from src.domain.interfaces import FaceEmbedder
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.embeddings import decode_embeddings, validate_embedding_settings
+
+
+class UnusedEmbedder(FaceEmbedder):
+    model_name = "Facenet"
+
+    def generate_embedding(self, face_image):
+        raise AssertionError("client embeddings must not run the model")
+
+
+def test_decode_embeddings_formats():
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+    raw = vectors.astype("<f4").tobytes()
+
+    np.testing.assert_array_equal(decode_embeddings(vectors.tolist(), 4), vectors)
+    np.testing.assert_array_equal(decode_embeddings(raw, 4), vectors)
+    np.testing.assert_array_equal(decode_embeddings(base64.b64encode(raw).decode(), 4), vectors)
+    assert decode_embeddings([1.0, 2.0, 3.0, 4.0], 4).shape == (1, 4)
+
+    with pytest.raises(ValueError):
+        decode_embeddings(raw[:-4], 4)
+    with pytest.raises(ValueError):
+        decode_embeddings(vectors.tolist(), 8)
+    with pytest.raises(ValueError):
+        decode_embeddings([[float("nan")] * 4], 4)
+    with pytest.raises(ValueError):
+        decode_embeddings("not base64!", 4)
+
+
+def test_validate_embedding_settings():
+    validate_embedding_settings({"model": "custom", "dimensions": 256})
+    with pytest.raises(ValueError):
+        validate_embedding_settings({"model": "Facenet512", "dimensions": 128})
+    with pytest.raises(ValueError):
+        validate_embedding_settings({"size": 128})
+
+
+def test_client_embeddings_skip_inference(tmp_path):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=128)
+    database.create_organization("org")
+    service = FaceRecognitionService(
+        detector=None, embedder=UnusedEmbedder(), database=database
+    )
+    rng = np.random.default_rng(0)
+    alice = rng.normal(size=(2, 128)).astype(np.float32)
+    bob = rng.normal(size=(1, 128)).astype(np.float32)
+
+    async def scenario():
+        enrollment = await service.register_embeddings(alice, "Facenet", "alice", "org")
+        assert (enrollment.kept, enrollment.discarded) == (2, 0)
+        await service.register_embeddings(bob, "Facenet", "bob", "org")
+
+        results = await service.recognize_embeddings(
+            np.vstack([bob, alice[:1]]), "Facenet", 0.9, "org"
+        )
+        assert [result.name for result in results] == ["bob", "alice"]
+
+        with pytest.raises(ValueError, match="'Facenet512'"):
+            await service.recognize_embeddings(bob, "Facenet512", 0.9, "org")
+        with pytest.raises(ValueError, match="128-dimensional"):
+            await service.recognize_embeddings(bob[:, :64], "Facenet", 0.9, "org")
+
+        # An organization can declare the model its gallery is built with
+        await service.update_organization_settings(
+            "org", {"embedding": {"model": "edge-v2", "dimensions": 128}}
+        )
+        assert await service.get_embedding_model("org") == {
+            "model": "edge-v2",
+            "dimensions": 128,
+        }
+        results = await service.recognize_embeddings(bob, "edge-v2", 0.9, "org")
+        assert results[0].name == "bob"
+
+    asyncio.run(scenario())
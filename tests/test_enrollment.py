@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.utils.enrollment import select_diverse_embeddings
+
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=float)
+    return vector / np.linalg.norm(vector)
+
+
+def test_near_duplicates_of_new_and_existing_vectors_are_dropped():
+    base = unit([1, 0, 0])
+    new = [base, unit([1, 0.01, 0]), unit([0, 1, 0]), unit([0, 1, 0.01])]
+
+    assert select_diverse_embeddings(new, [], duplicate_threshold=0.95) == [0, 2]
+    assert select_diverse_embeddings(new, [base], duplicate_threshold=0.95) == [2]
+
+
+def test_cap_keeps_most_diverse_vectors():
+    existing = [unit([1, 0, 0])]
+    new = [unit([0.9, 0.3, 0]), unit([0, 1, 0]), unit([0, 0, 1]), unit([0.7, 0.7, 0])]
+
+    kept = select_diverse_embeddings(new, existing, duplicate_threshold=0.99, max_per_person=3)
+
+    assert kept == [1, 2]
+
+
+def test_cap_reached_discards_everything():
+    existing = [unit([1, 0, 0]), unit([0, 1, 0])]
+    new = [unit([0, 0, 1])]
+
+    assert select_diverse_embeddings(new, existing, duplicate_threshold=0.95, max_per_person=2) == []
+    assert select_diverse_embeddings([], existing, duplicate_threshold=0.95) == []
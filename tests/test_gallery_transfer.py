@@ -0,0 +1,62 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.gallery_file import GalleryWriter, read_gallery
+
+DIMENSIONS = 8
+
+
+def test_gallery_file_roundtrip_in_batches(tmp_path):
+    path = str(tmp_path / "gallery.npz")
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(25, DIMENSIONS)).astype(np.float32)
+    names = [f"person_{index % 7}" for index in range(25)] + ["José"]
+    embeddings = np.vstack([embeddings, np.ones((1, DIMENSIONS), dtype=np.float32)])
+
+    with GalleryWriter(path) as writer:
+        for start in range(0, 26, 10):
+            writer.write(names[start : start + 10], embeddings[start : start + 10])
+
+    # The file is a plain .npz archive
+    archive = np.load(path)
+    assert archive["names"].tolist() == names
+    np.testing.assert_array_equal(archive["embeddings"], embeddings)
+
+    batches = list(read_gallery(path, batch_size=4))
+    assert [len(batch_names) for batch_names, _ in batches] == [4] * 6 + [2]
+    assert sum((batch_names for batch_names, _ in batches), []) == names
+    np.testing.assert_array_equal(np.vstack([rows for _, rows in batches]), embeddings)
+
+
+def test_read_gallery_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_gallery.npz"
+    path.write_bytes(b"plain text")
+    with pytest.raises(ValueError):
+        list(read_gallery(str(path)))
+
+
+def test_export_and_import_between_organizations(tmp_path):
+    async def scenario():
+        source = MemoryMappedFaceDatabase(str(tmp_path / "source"), dimensions=DIMENSIONS)
+        target = MemoryMappedFaceDatabase(str(tmp_path / "target"), dimensions=DIMENSIONS)
+        source.create_organization("org")
+        rng = np.random.default_rng(1)
+        for index in range(5):
+            source.save_embeddings(f"person_{index}", "org", list(rng.normal(size=(3, DIMENSIONS))))
+
+        path = str(tmp_path / "org.npz")
+        exporter = FaceRecognitionService(detector=None, embedder=None, database=source)
+        importer = FaceRecognitionService(detector=None, embedder=None, database=target)
+        assert await exporter.export_gallery("org", path, batch_size=4) == 15
+        assert await importer.import_gallery("clone", path, batch_size=4) == 15
+
+        query = source.get_embeddings("person_3", "org")[1]
+        result = target.vector_search(query, 0.9, "clone")
+        assert result.name == "person_3"
+        assert result.distance == pytest.approx(1.0, abs=1e-5)
+
+    asyncio.run(scenario())
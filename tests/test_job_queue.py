@@ -0,0 +1,153 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.domain.interfaces import FaceDetector, FaceEmbedder
+from src.domain.models import BoundingBox, DetectionResult, DetectionResults
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.jobs.queue import FAILED, QUEUED, REGISTER, REINDEX, SUCCEEDED, JobQueue
+from src.jobs.worker import JobWorker
+from src.services.face_recognition_service import FaceRecognitionService
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def queue(server):
+    return JobQueue(
+        fakeredis.FakeRedis(server=server, decode_responses=True),
+        events_client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        visibility_timeout=60,
+    )
+
+
+class StringDetector(FaceDetector):
+    """Finds one face in every image except the string "empty"."""
+
+    def detect(self, image):
+        if image == "empty":
+            return DetectionResults(result=[], inference_time=0.0)
+        face = DetectionResult(
+            bounding_box=BoundingBox(x=0, y=0, w=10, h=10),
+            confidence=0.9,
+            face_image=np.full((10, 10, 3), 128, dtype=np.uint8),
+        )
+        return DetectionResults(result=[face], inference_time=0.0)
+
+
+class ConstantEmbedder(FaceEmbedder):
+    def generate_embedding(self, face_image):
+        return np.ones(4)
+
+
+def test_job_lifecycle(queue):
+    job_id = queue.submit(REGISTER, "org", {"name": "alice", "images": ["a"]})
+    assert queue.get(job_id)["status"] == QUEUED
+    assert "payload" not in queue.get(job_id)
+
+    [(entry_id, claimed_id)] = queue.claim("worker-1", block=0.01)
+    assert claimed_id == job_id
+    job = queue.start(entry_id, job_id, "worker-1")
+    assert job["payload"] == {"name": "alice", "images": ["a"]}
+
+    queue.progress(entry_id, job_id, "worker-1", 1, 2)
+    assert queue.get(job_id)["progress"] == 1
+    queue.complete(entry_id, job_id, {"kept": np.float32(1)})
+
+    job = queue.get(job_id, include_payload=True)
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"kept": 1.0}
+    assert "payload" not in job
+    assert queue.stats() == {"length": 0, "pending": 0}
+    assert queue.claim("worker-1", block=0.01) == []
+
+
+def test_abandoned_job_is_reclaimed_then_given_up(queue):
+    queue.visibility_timeout = 0
+    queue.max_attempts = 2
+    job_id = queue.submit(REINDEX, "org", {})
+
+    # Two workers die without acknowledging the job
+    for consumer in ("worker-1", "worker-2"):
+        [(entry_id, _)] = queue.claim(consumer, block=0.01)
+        assert queue.start(entry_id, job_id, consumer) is not None
+
+    [(entry_id, _)] = queue.claim("worker-3", block=0.01)
+    assert queue.start(entry_id, job_id, "worker-3") is None
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["attempts"] == 3
+    assert queue.stats()["pending"] == 0
+
+
+def test_worker_runs_registration_job(queue, tmp_path):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=4)
+    database.create_organization("org")
+    service = FaceRecognitionService(
+        detector=StringDetector(), embedder=ConstantEmbedder(), database=database
+    )
+    worker = JobWorker(queue, service, consumer="worker-1")
+    registered = queue.submit(REGISTER, "org", {"name": "alice", "images": ["a", "b"]})
+    empty = queue.submit(REGISTER, "org", {"name": "bob", "images": ["empty"]})
+
+    async def scenario():
+        events = []
+
+        async def follow():
+            async for job in queue.watch(registered, keepalive=1):
+                if job is not None:
+                    events.append(job)
+
+        watcher = asyncio.create_task(follow())
+        await asyncio.sleep(0.05)
+        for entry_id, job_id in queue.claim(worker.consumer, count=2, block=0.01):
+            await worker.process(entry_id, job_id)
+        await asyncio.wait_for(watcher, 2)
+        return events
+
+    events = asyncio.run(scenario())
+    job = queue.get(registered)
+    assert job["status"] == SUCCEEDED
+    assert (job["progress"], job["total"]) == (2, 2)
+    assert job["result"] == {"kept": 1, "discarded": 1}
+    assert len(database.get_embeddings("alice", "org")) == 1
+    assert [event["status"] for event in events][-1] == SUCCEEDED
+    assert any(event["progress"] == 1 for event in events)
+
+    assert queue.get(empty)["status"] == FAILED
+    assert queue.get(empty)["error"] == "No face detected in any image"
+
+
+def test_long_reindex_keeps_its_lease(queue):
+    class SlowIndexService:
+        async def rebuild_index(self, organization):
+            await asyncio.sleep(0.3)
+            return 10
+
+    queue.visibility_timeout = 0.15
+    worker = JobWorker(queue, SlowIndexService(), consumer="worker-1")
+    job_id = queue.submit(REINDEX, "org", {})
+
+    async def scenario():
+        [(entry_id, claimed)] = queue.claim(worker.consumer, block=0.01)
+        running = asyncio.create_task(worker.process(entry_id, claimed))
+        await asyncio.sleep(0.2)
+        # Idle past the visibility timeout without the heartbeat
+        stolen = queue.claim("worker-2", block=0.01)
+        during = queue.get(job_id)
+        await running
+        return stolen, during
+
+    stolen, during = asyncio.run(scenario())
+    assert stolen == []
+    # The heartbeat reports no progress of its own
+    assert (during["progress"], during["total"]) == (0, 0)
+    job = queue.get(job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"indexed": 10}
@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 from dotenv import load_dotenv
 import os
+import json
 import time
 
 from src.api.main import app
@@ -86,8 +87,10 @@ def test_register_person():
         },
         headers={"Authorization": f"Bearer {api_key}"}
     )
+    json_response = response.json()
     assert response.status_code == 200
-    assert response.json() == {"message": "Person registered successfully"}
+    assert json_response["message"] == "Person registered successfully"
+    assert json_response["kept"] + json_response["discarded"] > 0
 
 def test_recognize_person():
     api_key = test_create_api_key("test_key_to_recognize")
@@ -111,4 +114,29 @@ def test_recognize_person():
     assert response.status_code == 200
     assert json_response["searchs"][0]["name"] == "José"
     assert json_response["searchs"][0]["distance"] > 0.5
-    
+
+
+def test_recognize_batch():
+    api_key = test_create_api_key("test_key_to_recognize_batch")
+    root_dir = "/home/samuel/Codes/unifei/ecot01a/project/assets/images"
+    images = [os.path.join(root_dir, path) for path in os.listdir(root_dir) if path.endswith(".jpg")]
+
+    response = client.post(
+        "/recognize/test_org/batch",
+        json={
+            "images": images,
+            "threshold": 0.5,
+            "batch_size": 4,
+            "api_auth": {
+                "user": "test_user",
+                "api_key_name": "test_key_to_recognize_batch"
+            }
+        },
+        headers={"Authorization": f"Bearer {api_key}"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [line["index"] for line in lines] == list(range(len(images)))
+    assert all("searchs" in line for line in lines)
@@ -0,0 +1,30 @@
+import os
+import signal
+
+import pytest
+
+from src.utils.memory import child_pids, read_memory
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"),
+    reason="requires Linux /proc/<pid>/smaps_rollup",
+)
+
+
+def test_forked_child_shares_parent_pages():
+    payload = bytearray(64 * 1024 * 1024)
+    payload[::4096] = b"x" * len(payload[::4096])
+
+    pid = os.fork()
+    if pid == 0:
+        signal.pause()
+        os._exit(0)
+    try:
+        assert pid in child_pids(os.getpid())
+        usage = read_memory(pid)
+        # The child has not written to the buffer, so its pages are still shared
+        assert usage["Rss"] > 64 * 1024
+        assert usage["Pss"] < usage["Rss"]
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
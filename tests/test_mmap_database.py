@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+
+DIMENSIONS = 16
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=DIMENSIONS)
+    database.create_organization("org")
+    return database
+
+
+def random_embeddings(count, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, DIMENSIONS))
+
+
+def test_create_organization_is_idempotent(database):
+    assert database.create_organization("org")
+    assert database.get_organizations() == ["org"]
+
+
+def test_search_returns_exact_nearest_neighbour(database):
+    embeddings = random_embeddings(50)
+    for index, embedding in enumerate(embeddings):
+        database.save_embedding(f"person_{index}", "org", embedding)
+
+    query = embeddings[17] + 0.01
+    result = database.vector_search(query, 0.9, "org")
+    assert result.name == "person_17"
+    assert result.distance > 0.99
+
+    results = database.vector_search_batch(list(embeddings[:5]), 0.9, "org")
+    assert [result.name for result in results] == [f"person_{i}" for i in range(5)]
+
+
+def test_threshold_and_empty_gallery(database):
+    assert database.vector_search(random_embeddings(1)[0], 0.5, "org").distance is None
+
+    database.save_embedding("alice", "org", np.eye(DIMENSIONS)[0])
+    result = database.vector_search(-np.eye(DIMENSIONS)[0], 0.5, "org")
+    assert result.name == "unknown"
+    assert result.distance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_rows_saved_by_another_instance_are_visible(tmp_path, database):
+    database.save_embedding("alice", "org", np.eye(DIMENSIONS)[0])
+    assert database.vector_search(np.eye(DIMENSIONS)[1], 0.9, "org").name == "unknown"
+
+    other_worker = MemoryMappedFaceDatabase(str(tmp_path), dimensions=DIMENSIONS)
+    other_worker.save_embedding("bob", "org", np.eye(DIMENSIONS)[1])
+
+    assert database.vector_search(np.eye(DIMENSIONS)[1], 0.9, "org").name == "bob"
+
+
+def wait_for_ivf_build(database, organization):
+    for thread in threading.enumerate():
+        if thread.name == f"ivf-build-{organization}":
+            thread.join(10)
+
+
+def test_ivf_search_matches_exact_search(tmp_path):
+    database = MemoryMappedFaceDatabase(
+        str(tmp_path), dimensions=DIMENSIONS, ivf_lists=4, ivf_probes=2, ivf_min_rows=100
+    )
+    database.create_organization("org")
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(4, DIMENSIONS)) * 10
+    embeddings = np.concatenate([center + rng.normal(size=(50, DIMENSIONS)) for center in centers])
+    for index, embedding in enumerate(embeddings):
+        database.save_embedding(f"person_{index}", "org", embedding)
+
+    # The first search over a large gallery is exact and trains the index in the background
+    expected = [f"person_{i}" for i in range(0, 200, 25)]
+    results = database.vector_search_batch(list(embeddings[::25]), 0.5, "org")
+    assert [result.name for result in results] == expected
+    wait_for_ivf_build(database, "org")
+    assert (tmp_path / "org" / "ivf_centroids.npy").exists()
+    results = database.vector_search_batch(list(embeddings[::25]), 0.5, "org")
+    assert [result.name for result in results] == expected
+
+    # Rows appended after training are assigned to a partition on write
+    database.save_embedding("late", "org", centers[2] * 3)
+    assert database.vector_search(centers[2] * 3, 0.5, "org").name == "late"
+    gallery = database._load_gallery("org")
+    assert (gallery.rows, gallery.listed_rows) == (201, 200)
+    database.save_embeddings("later", "org", list(centers[3] + rng.normal(size=(30, DIMENSIONS))))
+    gallery = database._load_gallery("org")
+    assert (gallery.rows, gallery.listed_rows) == (231, 231)
+    assert database.vector_search(centers[2] * 3, 0.5, "org").name == "late"
+    assert database.rebuild_index("org") == 231
+    assert database.vector_search(centers[2] * 3, 0.5, "org").name == "late"
+
+
+def test_reindex_by_another_process_reloads_the_ivf_view(tmp_path):
+    database = MemoryMappedFaceDatabase(
+        str(tmp_path), dimensions=DIMENSIONS, ivf_lists=4, ivf_probes=4, ivf_min_rows=100
+    )
+    database.create_organization("org")
+    database.save_embeddings("person", "org", list(random_embeddings(200)))
+    database.rebuild_index("org")
+    assert len(database._load_gallery("org").centroids) == 4
+
+    worker = MemoryMappedFaceDatabase(
+        str(tmp_path), dimensions=DIMENSIONS, ivf_lists=8, ivf_min_rows=100
+    )
+    worker.rebuild_index("org")
+
+    gallery = database._load_gallery("org")
+    assert len(gallery.centroids) == 8
+    assert gallery.assignments.max() < 8
+    assert not list((tmp_path / "org").glob("*.tmp"))
+
+
+def test_orphan_rows_of_a_crashed_append_are_dropped(tmp_path, database):
+    database.save_embedding("alice", "org", np.eye(DIMENSIONS)[0])
+    # A writer died after its vectors and before their names
+    with open(tmp_path / "org" / "embeddings.f32", "ab") as embeddings_file:
+        embeddings_file.write(np.ones((3, DIMENSIONS), dtype=np.float32).tobytes())
+
+    database.save_embedding("bob", "org", np.eye(DIMENSIONS)[1])
+
+    assert database.vector_search(np.eye(DIMENSIONS)[1], 0.9, "org").name == "bob"
+    assert database.get_embeddings("bob", "org")[0][1] == pytest.approx(1.0)
+    assert (tmp_path / "org" / "embeddings.f32").stat().st_size == 2 * DIMENSIONS * 4
+
+
+def test_api_key_lifecycle(database):
+    api_key = database.generate_api_key("user", "key", "org")
+    assert database.validate_api_key(api_key.key, "user", "key", "org")
+    assert not database.validate_api_key("wrong", "user", "key", "org")
+
+    with pytest.raises(ValueError):
+        database.generate_api_key("user", "key", "org")
+
+    assert database.revoke_api_key(api_key.key, "user", "key", "org")
+    assert not database.validate_api_key(api_key.key, "user", "key", "org")
+
+
+def test_wrong_dimension_is_rejected(database):
+    with pytest.raises(RuntimeError):
+        database.save_embedding("alice", "org", np.ones(DIMENSIONS + 1))
+
+
+def test_bulk_save_and_get_embeddings(database):
+    embeddings = list(random_embeddings(3))
+    database.save_embeddings("alice", "org", embeddings)
+    database.save_embedding("bob", "org", random_embeddings(1, seed=1)[0])
+
+    stored = database.get_embeddings("alice", "org")
+    assert len(stored) == 3
+    assert np.allclose(stored[0], embeddings[0] / np.linalg.norm(embeddings[0]), atol=1e-6)
+    assert database.get_embeddings("carol", "org") == []
+
+
+def test_organization_settings_are_merged_by_section(database):
+    assert database.get_organization_settings("org") == {}
+    database.update_organization_settings("org", {"quality": {"min_face_size": 40}})
+    settings = database.update_organization_settings("org", {"other": {"enabled": True}})
+    assert settings == {"quality": {"min_face_size": 40}, "other": {"enabled": True}}
@@ -0,0 +1,52 @@
+import numpy as np
+
+from src.services.motion import MotionGate, frame_signature
+
+
+def make_frame(seed=0, shape=(480, 640, 3)):
+    return np.random.default_rng(seed).integers(0, 256, size=shape).astype(np.uint8)
+
+
+def test_signature_is_block_average():
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    frame[:32] = 200
+    signature = frame_signature(frame, grid_size=2)
+    assert signature.tolist() == [[200.0, 200.0], [0.0, 0.0]]
+    assert frame_signature(make_frame()).shape == (32, 32)
+
+
+def test_static_scene_reuses_last_result():
+    gate = MotionGate(threshold=4.0, refresh_interval=100)
+    base = make_frame()
+    noise = np.random.default_rng(1).integers(-6, 7, size=base.shape)
+
+    unchanged, _ = gate.check(frame_signature(base), "key")
+    assert not unchanged
+    gate.update(frame_signature(base), {"searchs": []}, "key")
+
+    noisy = np.clip(base.astype(int) + noise, 0, 255).astype(np.uint8)
+    for _ in range(9):
+        unchanged, result = gate.check(frame_signature(noisy), "key")
+        assert unchanged
+        assert result == {"searchs": []}
+
+    assert gate.stats() == {"frames": 10, "processed": 1, "skipped": 9, "skip_ratio": 0.9}
+
+
+def test_change_key_and_refresh_force_processing():
+    gate = MotionGate(threshold=4.0, refresh_interval=2)
+    frame = make_frame()
+    signature = frame_signature(frame)
+    gate.update(signature, "first", "key")
+
+    # Someone walks into a quarter of the view
+    entered = frame.copy()
+    entered[120:360, 160:480] = 255
+    assert not gate.check(frame_signature(entered), "key")[0]
+    assert not gate.check(signature, "other key")[0]
+    assert gate.check(signature, "key")[0]
+    assert gate.check(signature, "key")[0]
+    # Two frames in a row came from the cache: the next one is processed
+    assert not gate.check(signature, "key")[0]
+
+    assert not MotionGate(threshold=0).check(signature)[0]
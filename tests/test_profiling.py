@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from src.domain.interfaces import FaceDetector, FaceEmbedder
+from src.domain.models import BoundingBox, DetectionResult, DetectionResults
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.services.face_recognition_service import FaceRecognitionService
+from src.services.profiling import Profiler, current_profile
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class SlowDetector(FaceDetector):
+    def detect(self, image):
+        busy_wait(0.05)
+        face = DetectionResult(
+            bounding_box=BoundingBox(x=0, y=0, w=10, h=10),
+            confidence=0.9,
+            face_image=np.zeros((10, 10, 3), dtype=np.uint8),
+        )
+        return DetectionResults(result=[face], inference_time=0.05)
+
+
+class ConstantEmbedder(FaceEmbedder):
+    def generate_embedding(self, face_image):
+        return np.eye(4)[0]
+
+
+@pytest.fixture
+def profiler():
+    return Profiler(
+        fakeredis.FakeRedis(decode_responses=True), admin_token="secret", interval=0.001
+    )
+
+
+def test_profiles_a_single_request(tmp_path, profiler):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=4)
+    database.create_organization("org")
+    service = FaceRecognitionService(
+        detector=SlowDetector(), embedder=ConstantEmbedder(), database=database
+    )
+
+    async def profiled_request():
+        profile = profiler.start("POST /recognize/org")
+        await service.recognize_person("frame", 0.5, "org")
+        await profiler.finish(profile)
+        return profile.id
+
+    profile_id = asyncio.run(profiled_request())
+
+    assert current_profile() is None
+    report = profiler.get(profile_id)
+    assert report["label"] == "POST /recognize/org"
+    assert report["samples"] > 0
+    assert "busy_wait" in report["collapsed"]
+    # Inference thread samples hang under the coroutine that awaited them
+    assert "recognize_person" in report["collapsed"].split("[thread]")[0]
+    assert "detect" in report["stats"]
+    assert [summary["id"] for summary in profiler.list()] == [profile_id]
+
+
+def test_only_admins_and_sampled_requests_are_profiled(profiler):
+    assert profiler.should_profile("secret")
+    assert not profiler.should_profile("guess")
+    assert not profiler.should_profile(None)
+
+    profiler.sample_rate = 1.0
+    assert profiler.should_profile(None)
+
+    disabled = Profiler(fakeredis.FakeRedis(decode_responses=True), sample_rate=1.0)
+    assert not disabled.should_profile(None) and not disabled.is_admin("")
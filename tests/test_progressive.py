@@ -0,0 +1,84 @@
+import asyncio
+
+import numpy as np
+
+from src.domain.interfaces import FaceDetector, FaceEmbedder
+from src.domain.models import (
+    BoundingBox,
+    DetectionResult,
+    DetectionResults,
+    FaceIdentity,
+    FrameDetections,
+)
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.posprocessing import serialize_result
+
+
+class ThreeFaceDetector(FaceDetector):
+    """Finds a face per person id plus one face too small for the quality gate."""
+
+    def detect(self, image):
+        faces = [
+            DetectionResult(
+                bounding_box=BoundingBox(x=0, y=0, w=size, h=size),
+                confidence=0.9,
+                face_image=np.full((8, 8, 3), person, dtype=np.float32),
+            )
+            for person, size in ((0, 50), (1, 10), (2, 50))
+        ]
+        return DetectionResults(result=faces, inference_time=0.0)
+
+
+class OneHotEmbedder(FaceEmbedder):
+    def generate_embedding(self, face_image):
+        return np.eye(4)[int(face_image[0, 0, 0])]
+
+
+def test_detections_come_first_then_one_identity_per_face(tmp_path):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=4)
+    database.create_organization("org")
+    database.save_embedding("alice", "org", np.eye(4)[0])
+    database.save_embedding("carol", "org", np.eye(4)[2])
+    service = FaceRecognitionService(
+        detector=ThreeFaceDetector(), embedder=OneHotEmbedder(), database=database
+    )
+
+    async def collect():
+        return [
+            event
+            async for event in service.recognize_person_progressive(
+                "frame", 0.9, "org", quality={"min_face_size": 20}
+            )
+        ]
+
+    events = asyncio.run(collect())
+    first, identities = events[0], events[1:]
+    assert isinstance(first, FrameDetections)
+    assert len(first.detections.result) == 3
+    assert first.pending == [0, 2]
+    assert [face.index for face in first.skipped] == [1]
+
+    assert all(isinstance(event, FaceIdentity) for event in identities)
+    assert sorted((event.index, event.search.name) for event in identities) == [
+        (0, "alice"),
+        (2, "carol"),
+    ]
+
+
+def test_crops_are_released_once_embedded(tmp_path):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=4)
+    database.create_organization("org")
+    database.save_embedding("alice", "org", np.eye(4)[0])
+    service = FaceRecognitionService(
+        detector=ThreeFaceDetector(), embedder=OneHotEmbedder(), database=database
+    )
+
+    result = asyncio.run(
+        service.recognize_person("frame", 0.9, "org", quality={"min_face_size": 20})
+    )
+
+    assert all(face.face_image is None for face in result.detections.result)
+    serialized = serialize_result(result)
+    assert "face_image" not in serialized["detections"]["result"][0]
+    assert serialized["searchs"][0]["name"] == "alice"
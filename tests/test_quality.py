@@ -0,0 +1,116 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.domain.interfaces import FaceDetector, FaceEmbedder
+from src.domain.models import (
+    BoundingBox,
+    DetectionResult,
+    DetectionResults,
+    QualitySettings,
+)
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.services.face_recognition_service import FaceRecognitionService
+from src.utils.quality import assess_face, merge_quality_settings
+
+
+def make_detection(face_image, size=100):
+    return DetectionResult(
+        bounding_box=BoundingBox(x=0, y=0, w=size, h=size),
+        confidence=0.99,
+        face_image=face_image,
+    )
+
+
+def sharp_face(seed=0):
+    return np.random.default_rng(seed).uniform(0.2, 0.8, size=(64, 64, 3))
+
+
+def test_assess_face_reports_reason():
+    settings = QualitySettings(
+        min_face_size=40, min_blur_variance=50, min_brightness=40, max_brightness=220
+    )
+    assert assess_face(0, make_detection(sharp_face()), settings) is None
+
+    small = assess_face(1, make_detection(sharp_face(), size=20), settings)
+    assert (small.index, small.reason, small.value) == (1, "too_small", 20.0)
+
+    dark = assess_face(0, make_detection(sharp_face() * 0.1), settings)
+    assert dark.reason == "too_dark"
+
+    bright = assess_face(0, make_detection(np.ones((64, 64, 3))), settings)
+    assert bright.reason == "too_bright"
+
+    flat = assess_face(0, make_detection(np.full((64, 64, 3), 0.5)), settings)
+    assert flat.reason == "blurry"
+    assert flat.value == pytest.approx(0.0)
+
+
+def test_dark_uint8_crop_is_not_rescaled():
+    settings = QualitySettings(min_blur_variance=0, min_brightness=40)
+    pixels = np.random.default_rng(0).integers(0, 2, size=(64, 64, 3), dtype=np.uint8)
+
+    dark = assess_face(0, make_detection(pixels), settings)
+    assert dark.reason == "too_dark"
+    assert dark.value < 1.0
+
+
+def test_merge_quality_settings():
+    settings = merge_quality_settings(
+        QualitySettings(), {"min_face_size": 32, "min_brightness": None}
+    )
+    assert settings == QualitySettings(min_face_size=32)
+    with pytest.raises(ValueError):
+        merge_quality_settings(settings, {"min_sharpness": 1})
+
+
+class FixedDetector(FaceDetector):
+    def __init__(self, detections):
+        self.detections = detections
+
+    def detect(self, image):
+        return DetectionResults(result=self.detections, inference_time=0.0)
+
+
+class CountingEmbedder(FaceEmbedder):
+    def __init__(self):
+        self.embedded = 0
+
+    def generate_embedding(self, face_image):
+        self.embedded += 1
+        return np.ones(4)
+
+
+def test_skipped_faces_are_not_embedded(tmp_path):
+    async def scenario():
+        database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=4)
+        database.create_organization("org")
+        database.save_embedding("alice", "org", np.ones(4))
+        embedder = CountingEmbedder()
+        service = FaceRecognitionService(
+            detector=FixedDetector(
+                [make_detection(sharp_face(), size=20), make_detection(sharp_face())]
+            ),
+            embedder=embedder,
+            database=database,
+        )
+
+        result = await service.recognize_person("image", 0.5, "org")
+        assert [search.name for search in result.searchs] == ["alice", "alice"]
+        assert result.skipped == []
+
+        await service.update_organization_settings("org", {"quality": {"min_face_size": 40}})
+        result = await service.recognize_person("image", 0.5, "org")
+        assert [search.name for search in result.searchs] == ["unknown", "alice"]
+        assert [skipped.reason for skipped in result.skipped] == ["too_small"]
+        assert embedder.embedded == 3
+
+        # Request overrides win over the organization setting
+        result = await service.recognize_person("image", 0.5, "org", quality={"min_face_size": 0})
+        assert result.skipped == []
+
+        with pytest.raises(ValueError):
+            await service.update_organization_settings("org", {"quality": {"unknown": 1}})
+
+    asyncio.run(scenario())
@@ -0,0 +1,76 @@
+import json
+from collections import Counter
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src.api.gateway import Gateway, create_gateway_app, request_organization
+from src.services.routing import ConsistentHashRing
+
+ORGANIZATIONS = [f"org-{index}" for index in range(2000)]
+
+
+def test_assignments_spread_and_move_only_to_or_from_changed_replicas():
+    ring = ConsistentHashRing(["a", "b", "c"])
+    before = {organization: ring.assign(organization) for organization in ORGANIZATIONS}
+    counts = Counter(before.values())
+    assert min(counts.values()) > len(ORGANIZATIONS) / 3 * 0.7
+
+    ring.add("d")
+    joined = {organization: ring.assign(organization) for organization in ORGANIZATIONS}
+    moved = [org for org in ORGANIZATIONS if joined[org] != before[org]]
+    assert all(joined[org] == "d" for org in moved)
+    assert 0.15 < len(moved) / len(ORGANIZATIONS) < 0.35
+
+    ring.remove("b")
+    left = {organization: ring.assign(organization) for organization in ORGANIZATIONS}
+    moved = [org for org in ORGANIZATIONS if left[org] != joined[org]]
+    assert all(joined[org] == "b" for org in moved)
+
+
+def test_loaded_replica_spills_over_to_the_next_one():
+    ring = ConsistentHashRing(["a", "b", "c"], load_factor=1.25)
+    home = ring.assign("acme")
+    loads = {home: 10}
+    spilled = ring.assign("acme", loads)
+    assert spilled != home
+    assert spilled == list(ring.candidates("acme"))[1]
+    # Under capacity the organization stays home
+    assert ring.assign("acme", {home: 1, spilled: 1}) == home
+
+
+def test_organization_is_read_from_path_query_or_body():
+    assert request_organization("/recognize/acme", {}) == "acme"
+    assert request_organization("/metrics/inference/acme", {}) == "acme"
+    assert request_organization("/orgs", {}, b'{"organization": "acme"}') == "acme"
+    assert request_organization("/ws/recognize", {"organization": "acme"}) == "acme"
+    assert request_organization("/metrics/jobs", {}) is None
+
+
+def test_gateway_keeps_affinity_and_reroutes_when_a_replica_is_down():
+    down = set()
+
+    def handler(request):
+        replica = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        if replica in down:
+            raise httpx.ConnectError("refused", request=request)
+        # Streamed like a network response, unlike a `json=` response
+        body = json.dumps({"replica": replica, "path": request.url.path}).encode()
+        return httpx.Response(200, stream=httpx.ByteStream(body))
+
+    replicas = ["http://replica-1:8000", "http://replica-2:8000"]
+    gateway = Gateway(replicas, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    # Without the lifespan, no health check runs and every replica starts on the ring
+    client = TestClient(create_gateway_app(gateway))
+
+    first = client.get("/jobs/acme/123")
+    home = first.headers["X-Replica"]
+    assert first.json() == {"replica": home, "path": "/jobs/acme/123"}
+    assert client.get("/jobs/acme/456").headers["X-Replica"] == home
+
+    down.add(home)
+    rerouted = client.get("/jobs/acme/789")
+    assert rerouted.status_code == 200
+    assert rerouted.headers["X-Replica"] != home
+    assert gateway.stats()["healthy"] == [rerouted.headers["X-Replica"]]
+    assert gateway.loads[rerouted.headers["X-Replica"]] == 0
@@ -0,0 +1,63 @@
+import asyncio
+
+from src.services.admission import AdmissionController
+from src.services.stream_control import DEFAULT_QUALITY_LADDER, StreamController
+
+
+def test_idle_server_speeds_up_and_raises_quality():
+    controller = StreamController(max_fps=10)
+    assert controller.update() == {
+        "type": "control",
+        "target_fps": 10,
+        "max_resolution": 640,
+        "jpeg_quality": 0.85,
+    }
+
+    for _ in range(3):
+        controller.record(0.1)
+    control = controller.control()
+    assert control["max_resolution"] == DEFAULT_QUALITY_LADDER[0][0]
+    assert control["target_fps"] == 10
+
+
+def test_slow_frames_lower_rate_and_resolution():
+    controller = StreamController(min_fps=0.5, target_latency=0.5)
+    controller.update()
+    for _ in range(5):
+        controller.record(1.0)
+    control = controller.update()
+    assert control["target_fps"] == 1.0
+    assert control["max_resolution"] == DEFAULT_QUALITY_LADDER[-1][0]
+
+    # Small fluctuations don't produce a new message
+    controller.record(1.05)
+    assert controller.update() is None
+
+    controller.record_overload()
+    assert controller.control()["max_resolution"] == DEFAULT_QUALITY_LADDER[-1][0]
+
+
+def test_queue_depth_divides_the_frame_rate():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=4)
+        controller = StreamController(admission, max_fps=10)
+        controller.record(0.2)
+        alone = controller.control()["target_fps"]
+
+        async def hold(release: asyncio.Event):
+            async with admission.slot(organization="org"):
+                await release.wait()
+
+        release = asyncio.Event()
+        holders = [asyncio.create_task(hold(release)) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert (admission.active, admission.queue_depth) == (1, 3)
+        busy = controller.control()["target_fps"]
+
+        release.set()
+        await asyncio.gather(*holders)
+        return alone, busy
+
+    alone, busy = asyncio.run(scenario())
+    assert alone == 5.0
+    assert busy == 1.25
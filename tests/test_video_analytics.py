@@ -0,0 +1,70 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+
+from src.domain.interfaces import FaceDetector, FaceEmbedder
+from src.domain.models import BoundingBox, DetectionResult, DetectionResults
+from src.infrastructure.database.mmap_database import MemoryMappedFaceDatabase
+from src.jobs.video_analytics import analyze_frames
+from src.services.face_recognition_service import FaceRecognitionService
+
+BATCH_SIZE = 4
+
+
+class BrightnessDetector(FaceDetector):
+    """Finds one face in bright frames and none in dark ones."""
+
+    def detect(self, image):
+        if image.mean() < 128:
+            return DetectionResults(result=[], inference_time=0.0)
+        face = DetectionResult(
+            bounding_box=BoundingBox(x=1, y=2, w=3, h=4),
+            confidence=0.9,
+            face_image=image,
+        )
+        return DetectionResults(result=[face], inference_time=0.0)
+
+
+class ConstantEmbedder(FaceEmbedder):
+    def generate_embedding(self, face_image):
+        return np.ones(4)
+
+
+def test_timeline_is_written_with_bounded_lookahead(tmp_path):
+    database = MemoryMappedFaceDatabase(str(tmp_path), dimensions=4)
+    database.create_organization("org")
+    database.save_embedding("alice", "org", np.ones(4))
+    service = FaceRecognitionService(
+        detector=BrightnessDetector(), embedder=ConstantEmbedder(), database=database
+    )
+
+    read = []
+    written = []
+
+    def frames():
+        for frame_number in range(0, 100, 5):
+            read.append(frame_number)
+            # The pipeline never runs more than two chunks ahead of the output
+            assert len(read) - len(written) <= 2 * BATCH_SIZE
+            value = 255 if frame_number % 10 == 0 else 0
+            yield frame_number, frame_number / 25, np.full((8, 8, 3), value, dtype=np.uint8)
+
+    class Output(io.StringIO):
+        def write(self, line):
+            written.append(line)
+            return super().write(line)
+
+    output = Output()
+    report = asyncio.run(
+        analyze_frames(service, frames(), "org", output, batch_size=BATCH_SIZE)
+    )
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["frame"] for record in records] == list(range(0, 100, 5))
+    assert records[0]["identities"] == ["alice"]
+    assert records[0]["faces"][0]["bounding_box"] == {"x": 1, "y": 2, "w": 3, "h": 4}
+    assert records[1] == {"frame": 5, "timestamp": 0.2, "identities": [], "faces": []}
+    assert report.frames == 20
+    assert report.faces == 10
@@ -3,7 +3,7 @@ import { Scan } from 'lucide-react';
 import { WebcamCapture } from './WebcamCapture';
 import { api } from '../services/api';
 import { websocketService } from '../services/websocketService';
-import { APIKeyResponse, RecognitionResult } from '../types/api';
+import { APIKeyResponse, RecognitionResult, StreamControl } from '../types/api';
 import { ConnectionToggle, ConnectionType } from './ConnectionToggle';
 
 interface FaceRecognitionProps {
@@ -17,12 +17,14 @@ export const FaceRecognition: React.FC<FaceRecognitionProps> = ({ organization,
   const [loading, setLoading] = useState(false);
   const [isCapturing, setIsCapturing] = useState(false);
   const [connectionType, setConnectionType] = useState<ConnectionType>('http');
+  const [streamControl, setStreamControl] = useState<StreamControl | null>(null);
 
   useEffect(() => {
     if (connectionType === 'websocket' && isCapturing) {
       websocketService.connect(organization, apiKey.key, apiKey.user, apiKey.api_key_name)
         .then(() => {
           websocketService.setMessageCallback(setResult);
+          websocketService.setControlCallback(setStreamControl);
         })
         .catch((error) => {
           console.error('Failed to connect to WebSocket:', error);
@@ -33,6 +35,7 @@ export const FaceRecognition: React.FC<FaceRecognitionProps> = ({ organization,
     return () => {
       if (connectionType === 'websocket') {
         websocketService.disconnect();
+        setStreamControl(null);
       }
     };
   }, [connectionType, isCapturing, organization, apiKey]);
@@ -106,6 +109,9 @@ export const FaceRecognition: React.FC<FaceRecognitionProps> = ({ organization,
           isCapturing={isCapturing}
           onToggleCapture={handleToggleCapture}
           detections={result?.detections}
+          targetFps={streamControl?.target_fps}
+          maxResolution={streamControl?.max_resolution}
+          jpegQuality={streamControl?.jpeg_quality}
         />
         {loading && (
           <div className="text-center text-gray-600">Processing...</div>
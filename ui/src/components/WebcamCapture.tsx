@@ -8,37 +8,57 @@ interface WebcamCaptureProps {
   isCapturing: boolean;
   onToggleCapture: () => void;
   detections?: DetectionResults;
+  targetFps?: number;
+  maxResolution?: number;
+  jpegQuality?: number;
 }
 
 export const WebcamCapture: React.FC<WebcamCaptureProps> = ({
   onCapture,
   isCapturing,
   onToggleCapture,
-  detections
+  detections,
+  targetFps = 2,
+  maxResolution,
+  jpegQuality = 0.92
 }) => {
   const webcamRef = useRef<Webcam>(null);
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
   const [dimensions, setDimensions] = useState({ width: 0, height: 0 });
   const intervalRef = useRef<number>();
+  // Ratio between the sent frame and the video, to map boxes back onto the video
+  const captureScaleRef = useRef(1);
 
   const capture = useCallback(() => {
-    const imageSrc = webcamRef.current?.getScreenshot();
+    const video = webcamRef.current?.video;
+    let imageSrc: string | null | undefined;
+    if (maxResolution && video && video.videoWidth) {
+      const scale = Math.min(1, maxResolution / Math.max(video.videoWidth, video.videoHeight));
+      captureScaleRef.current = scale;
+      imageSrc = webcamRef.current?.getScreenshot({
+        width: Math.round(video.videoWidth * scale),
+        height: Math.round(video.videoHeight * scale)
+      });
+    } else {
+      captureScaleRef.current = 1;
+      imageSrc = webcamRef.current?.getScreenshot();
+    }
     if (imageSrc) {
       onCapture(imageSrc);
     }
-  }, [onCapture]);
+  }, [onCapture, maxResolution]);
 
   useEffect(() => {
     if (isCapturing) {
-      intervalRef.current = window.setInterval(capture, 500);
+      intervalRef.current = window.setInterval(capture, 1000 / targetFps);
     }
     return () => {
       if (intervalRef.current) {
         window.clearInterval(intervalRef.current);
       }
     };
-  }, [isCapturing, capture]);
+  }, [isCapturing, capture, targetFps]);
 
   const updateDimensions = useCallback(() => {
     if (webcamRef.current?.video && containerRef.current) {
@@ -86,8 +106,8 @@ export const WebcamCapture: React.FC<WebcamCaptureProps> = ({
     const videoRect = video.getBoundingClientRect();
     
     // Calculate scale factors based on the actual rendered size vs original video size
-    const scaleX = 1.0; // videoRect.width / video.videoWidth;
-    const scaleY = 1.0;  // videoRect.height / video.videoHeight;
+    const scaleX = 1.0 / captureScaleRef.current; // videoRect.width / video.videoWidth;
+    const scaleY = 1.0 / captureScaleRef.current;  // videoRect.height / video.videoHeight;
 
     // Draw bounding boxes
     detections.result.forEach((detection) => {
@@ -126,6 +146,7 @@ export const WebcamCapture: React.FC<WebcamCaptureProps> = ({
         audio={false}
         ref={webcamRef}
         screenshotFormat="image/jpeg"
+        screenshotQuality={jpegQuality}
         className="w-full rounded-lg"
         videoConstraints={{
           width: 640,
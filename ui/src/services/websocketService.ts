@@ -1,8 +1,9 @@
-import { RecognitionResult } from '../types/api';
+import { RecognitionResult, StreamControl } from '../types/api';
 
 export class WebSocketService {
   private ws: WebSocket | null = null;
   private messageCallback: ((result: RecognitionResult) => void) | null = null;
+  private controlCallback: ((control: StreamControl) => void) | null = null;
 
   connect(organization: string, apiKey: string, user: string, apiKeyName: string): Promise<void> {
     return new Promise((resolve, reject) => {
@@ -21,8 +22,13 @@ export class WebSocketService {
 
       this.ws.onmessage = (event) => {
         try {
-          const result = JSON.parse(event.data) as RecognitionResult;
-          this.messageCallback?.(result);
+          const message = JSON.parse(event.data);
+          if (message.type === 'control') {
+            // Server-side pacing: frame rate, resolution and JPEG quality to send at
+            this.controlCallback?.(message as StreamControl);
+          } else if (!message.error) {
+            this.messageCallback?.(message as RecognitionResult);
+          }
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -41,6 +47,10 @@ export class WebSocketService {
     this.messageCallback = callback;
   }
 
+  setControlCallback(callback: (control: StreamControl) => void) {
+    this.controlCallback = callback;
+  }
+
   sendImage(data: { image: string; threshold: number; organization: string }) {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
       this.ws.send(JSON.stringify(data));
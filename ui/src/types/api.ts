@@ -49,7 +49,24 @@ export interface VectorSearchResult {
   distance?: number;
 }
 
+export interface SkippedFace {
+  index: number;
+  reason: 'too_small' | 'too_dark' | 'too_bright' | 'blurry';
+  value: number;
+}
+
 export interface RecognitionResult {
   detections: DetectionResults;
   searchs: VectorSearchResult[];
-}
\ No newline at end of file
+  skipped?: SkippedFace[];
+  cached?: boolean;
+  type?: 'result';
+  frame_id?: number | string;
+}
+
+export interface StreamControl {
+  type: 'control';
+  target_fps: number;
+  max_resolution: number;
+  jpeg_quality: number;
+}